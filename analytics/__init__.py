@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+
+"""
+Пакет аналитики Royal Stats.
+Векторизованные (numpy) расчеты распределений и временных рядов, не зависящие от UI.
+"""
+
+from .distributions import (
+    FTStackDistributions,
+    ft_stack_bucket_labels,
+    ko_attempts_distribution,
+)
+from .time_series import DailyAggregates, RollingStats, TournamentTimeSeries
+from .downsampling import MAX_CHART_POINTS, chart_points_for_width, downsample, visible_slice
+
+__all__ = [
+    'FTStackDistributions',
+    'ft_stack_bucket_labels',
+    'ko_attempts_distribution',
+    'DailyAggregates',
+    'RollingStats',
+    'TournamentTimeSeries',
+    'MAX_CHART_POINTS',
+    'chart_points_for_width',
+    'downsample',
+    'visible_slice',
+]
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+
+"""
+Консольный вывод распределений по стекам FT для базы данных.
+
+Пример:
+    python -m analytics --db databases/royal_stats.db --step 400
+"""
+
+import argparse
+import json
+
+# services импортируется первым: db.manager зависит от services.app_config
+from services import app_config  # noqa: F401
+from db.manager import ReadOnlyDatabaseManager
+from db.repositories import TournamentRepository, FinalTableHandRepository
+from viewmodels import StatsGridDataset, StatsGridChartData
+from .distributions import FTStackDistributions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Распределения по стекам выхода на FT")
+    parser.add_argument("--db", required=True, help="Путь к файлу БД")
+    parser.add_argument("--step", type=int, default=200, help="Шаг интервалов в фишках")
+    parser.add_argument("--session", default=None, help="ID сессии для фильтрации")
+    parser.add_argument("--buyin", type=float, default=None, help="Фильтр по бай-ину")
+    args = parser.parse_args(argv)
+
+    # Только чтение: путь из --db не становится текущей БД приложения
+    db = ReadOnlyDatabaseManager(args.db)
+    try:
+        tournaments = TournamentRepository(db).get_all_tournaments(
+            session_id=args.session, buyin_filter=args.buyin
+        )
+        tournament_ids = [t.tournament_id for t in tournaments]
+        hands = FinalTableHandRepository(db).get_hands_by_filters(
+            session_id=args.session, tournament_ids=tournament_ids
+        ) if tournament_ids else []
+    finally:
+        db.close_connection()
+
+    chart_data = StatsGridChartData.from_dataset(StatsGridDataset(tournaments, hands))
+    distributions = FTStackDistributions(chart_data.ft_stacks)
+    stack_dist, stack_median = distributions.stack_distribution(args.step)
+    result = {
+        "step": args.step,
+        "ft_count": len(distributions),
+        "ft_stack_median": stack_median,
+        "ft_stack": stack_dist,
+        "ft_stack_roi": distributions.roi_distribution(args.step)[0],
+        "ft_stack_conversion": distributions.conversion_distribution(args.step)[0],
+        "ko_attempts": chart_data.ko_attempts_dist,
+    }
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
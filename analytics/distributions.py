@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+
+"""
+Векторизованные распределения для графиков StatsGrid.
+
+Распределения по стекам выхода на финальный стол строятся на numpy-массивах
+и кешируются по шагу интервалов, поэтому смена плотности графика
+не требует повторного обращения к БД и повторного прохода по турнирам.
+"""
+
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Границы распределения стеков FT в фишках
+FT_STACK_MIN = 800
+FT_STACK_MAX = 4000
+
+# Количество фишек на один ожидаемый KO (18 игроков по 1000 фишек)
+EXPECTED_KO_CHIPS = 18000
+
+
+def _format_chips(value: int) -> str:
+    """Форматирует границу интервала так же, как подписи графика: 1200 -> "1.2k"."""
+    if value >= 1000:
+        return f"{value/1000:.1f}k".rstrip('0').rstrip('.')
+    return str(value)
+
+
+def ft_stack_bucket_labels(step: int) -> List[str]:
+    """
+    Возвращает подписи интервалов стеков FT для заданного шага.
+
+    Первый интервал "≤800", последний "≥4k", между ними - полные
+    интервалы шириной step. Неполный хвостовой интервал попадает в "≥4k".
+    """
+    labels = ["≤800"]
+    current = FT_STACK_MIN
+    while current + step <= FT_STACK_MAX:
+        labels.append(f"{_format_chips(current)}-{_format_chips(current + step)}")
+        current += step
+    labels.append("≥4k")
+    return labels
+
+
+def ft_stack_bucket_indices(chips: np.ndarray, step: int) -> np.ndarray:
+    """Возвращает индекс интервала из ft_stack_bucket_labels для каждого стека."""
+    full_buckets = (FT_STACK_MAX - FT_STACK_MIN) // step
+    last = full_buckets + 1
+    middle = np.floor((chips - FT_STACK_MIN) / step).astype(np.int64) + 1
+    idx = np.where(middle > full_buckets, last, middle)
+    idx = np.where(chips <= FT_STACK_MIN, 0, idx)
+    idx = np.where(chips >= FT_STACK_MAX, last, idx)
+    return idx
+
+
+class FTStackDistributions:
+    """
+    Распределения по стекам выхода на FT с кешем по шагу интервалов.
+
+    Принимает строки StatsGridChartData.ft_stacks:
+    (стек в фишках, бай-ин, выплата, игроков на старте FT, ранние KO Hero).
+    """
+
+    def __init__(self, ft_stacks: Sequence[tuple]):
+        rows = list(ft_stacks)
+        count = len(rows)
+        self.chips = np.fromiter((r[0] for r in rows), dtype=np.float64, count=count)
+        self.buyin = np.fromiter((r[1] or 0.0 for r in rows), dtype=np.float64, count=count)
+        self.payout = np.fromiter((r[2] or 0.0 for r in rows), dtype=np.float64, count=count)
+        self.has_start_players = np.fromiter(
+            (r[3] is not None for r in rows), dtype=bool, count=count
+        )
+        start_players = np.fromiter(
+            (r[3] or 0 for r in rows), dtype=np.float64, count=count
+        )
+        early_ko = np.fromiter((r[4] for r in rows), dtype=np.float64, count=count)
+
+        # Конверсия стека в ранние KO считается один раз, не зависит от шага
+        expected_ko = self.chips / EXPECTED_KO_CHIPS * np.maximum(0.0, start_players - 5)
+        self.conversion = np.divide(
+            early_ko, expected_ko,
+            out=np.zeros(count, dtype=np.float64),
+            where=expected_ko > 0,
+        )
+
+        self._cache: Dict[Tuple[str, int], tuple] = {}
+
+    def __len__(self) -> int:
+        return len(self.chips)
+
+    @staticmethod
+    def _median(values: np.ndarray) -> Optional[float]:
+        return float(np.median(values)) if len(values) else None
+
+    def stack_distribution(self, step: int = 200) -> Tuple[Dict[str, int], Optional[float]]:
+        """Количество выходов на FT по интервалам стека и медиана стеков."""
+        key = ('stack', step)
+        if key not in self._cache:
+            labels = ft_stack_bucket_labels(step)
+            counts = np.bincount(
+                ft_stack_bucket_indices(self.chips, step), minlength=len(labels)
+            )
+            self._cache[key] = (
+                dict(zip(labels, (int(c) for c in counts))),
+                self._median(self.chips),
+            )
+        return self._cache[key]
+
+    def roi_distribution(self, step: int = 200) -> Tuple[Dict[str, float], Optional[float]]:
+        """
+        ROI (%) по интервалам стека: сумма прибыли / сумма бай-инов.
+        Турниры без бай-ина в ROI не учитываются.
+        """
+        key = ('roi', step)
+        if key not in self._cache:
+            labels = ft_stack_bucket_labels(step)
+            mask = self.buyin > 0
+            idx = ft_stack_bucket_indices(self.chips[mask], step)
+            buyin = self.buyin[mask]
+            profit = self.payout[mask] - buyin
+            profit_sum = np.bincount(idx, weights=profit, minlength=len(labels))
+            buyin_sum = np.bincount(idx, weights=buyin, minlength=len(labels))
+            roi = {
+                label: (float(p / b * 100) if b > 0 else 0)
+                for label, p, b in zip(labels, profit_sum, buyin_sum)
+            }
+            self._cache[key] = (roi, self._median(self.chips))
+        return self._cache[key]
+
+    def conversion_distribution(self, step: int = 200) -> Tuple[Dict[str, float], Optional[float]]:
+        """Средняя конверсия стека в ранние KO по интервалам стека."""
+        key = ('conversion', step)
+        if key not in self._cache:
+            labels = ft_stack_bucket_labels(step)
+            chips = self.chips[self.has_start_players]
+            idx = ft_stack_bucket_indices(chips, step)
+            conv_sum = np.bincount(
+                idx, weights=self.conversion[self.has_start_players], minlength=len(labels)
+            )
+            counts = np.bincount(idx, minlength=len(labels))
+            conv = {
+                label: (float(s / c) if c else 0.0)
+                for label, s, c in zip(labels, conv_sum, counts)
+            }
+            self._cache[key] = (conv, self._median(chips))
+        return self._cache[key]
+
+
+def ko_attempts_distribution(attempts: Iterable[Optional[int]]) -> Dict[int, int]:
+    """
+    Распределение количества попыток KO в одной руке.
+    Руки без попыток игнорируются, значения 5+ объединяются.
+    """
+    values = np.fromiter((a or 0 for a in attempts), dtype=np.int64)
+    counts = np.bincount(np.minimum(values[values > 0], 5), minlength=6)
+    return {i: int(counts[i]) for i in range(1, 6)}
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+
+"""
+Прореживание рядов перед передачей в QtCharts.
+
+QLineSeries рисует каждую точку, и ряд из сотен тысяч турниров тормозит
+и при построении, и при каждой перерисовке. Ширина графика - несколько
+сотен пикселей, поэтому достаточно нескольких точек на пиксель:
+
+- min_max_indices - в каждом пиксельном интервале оси X оставляет
+  минимум и максимум. Векторно (reduceat), сохраняет пики и просадки -
+  для накопленного профита важны именно они;
+- lttb_indices - Largest-Triangle-Three-Buckets: по одной точке на
+  интервал, выбирается образующая наибольший треугольник с соседними.
+  Лучше передаёт форму шумных рядов (скользящие показатели).
+
+Прореживание пересчитывается при изменении размера и масштаба графика:
+в видимый диапазон (visible_slice) попадает меньше исходных точек, и
+детализация растёт.
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+# Предельное число точек одного ряда на графике
+MAX_CHART_POINTS = 4000
+# Точек на пиксель ширины области построения
+POINTS_PER_PIXEL = 2
+# Нижняя граница, чтобы свёрнутый график не вырождался в ломаную из пары точек
+MIN_CHART_POINTS = 100
+
+
+def chart_points_for_width(pixel_width: float, max_points: int = MAX_CHART_POINTS) -> int:
+    """Число точек ряда для области построения шириной pixel_width пикселей."""
+    return int(min(max_points, max(MIN_CHART_POINTS, pixel_width * POINTS_PER_PIXEL)))
+
+
+def visible_slice(x: np.ndarray, x_min: float, x_max: float) -> slice:
+    """
+    Срез отсортированного x, попадающий в [x_min, x_max], плюс по одной
+    точке за каждой границей, чтобы линия доходила до края графика.
+    """
+    start = max(int(np.searchsorted(x, x_min, side="left")) - 1, 0)
+    stop = min(int(np.searchsorted(x, x_max, side="right")) + 1, len(x))
+    return slice(start, stop)
+
+
+def _first_in_segments(mask: np.ndarray, segment: np.ndarray) -> np.ndarray:
+    """Первые индексы, где mask истинна, в каждом сегменте."""
+    candidates = np.flatnonzero(mask)
+    seg = segment[candidates]
+    return candidates[np.r_[True, seg[1:] != seg[:-1]]]
+
+
+def min_max_indices(x: np.ndarray, y: np.ndarray, buckets: int) -> np.ndarray:
+    """
+    Индексы точек, оставляемых прореживанием min-max: x делится на buckets
+    равных интервалов (пикселей), в каждом берутся минимум и максимум y,
+    первая и последняя точки ряда сохраняются. Точек не больше 2*buckets+2.
+    """
+    n = len(x)
+    if buckets < 1 or n <= 2 * buckets + 2:
+        return np.arange(n)
+
+    x0, x1 = float(x[0]), float(x[-1])
+    if x1 > x0:
+        bucket = ((x - x0) * (buckets / (x1 - x0))).astype(np.int64)
+        np.minimum(bucket, buckets - 1, out=bucket)
+    else:
+        bucket = np.arange(n, dtype=np.int64) * buckets // n
+
+    # x отсортирован: интервалы идут непрерывными сегментами
+    starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+    segment = np.repeat(np.arange(len(starts)), np.diff(np.r_[starts, n]))
+    mins = np.minimum.reduceat(y, starts)
+    maxs = np.maximum.reduceat(y, starts)
+    return np.unique(np.r_[
+        0,
+        _first_in_segments(y == mins[segment], segment),
+        _first_in_segments(y == maxs[segment], segment),
+        n - 1,
+    ])
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Индексы threshold точек, выбранных алгоритмом LTTB. Первая и последняя
+    точки сохраняются, остальные n-2 делятся на threshold-2 интервалов
+    поровну по числу точек.
+    """
+    n = len(x)
+    if threshold < 3 or n <= threshold:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    # Средние точки интервалов (последний "интервал" - финальная точка ряда)
+    counts = np.diff(np.r_[edges, n]).astype(np.float64)
+    avg_x = np.add.reduceat(x, edges) / counts
+    avg_y = np.add.reduceat(y, edges) / counts
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        xa, ya = x[a], y[a]
+        cx, cy = avg_x[i + 1], avg_y[i + 1]
+        # Удвоенная площадь треугольника (a, кандидат, среднее следующего интервала)
+        area = np.abs((xa - cx) * (y[lo:hi] - ya) - (xa - x[lo:hi]) * (cy - ya))
+        a = lo + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def downsample(
+    x: np.ndarray,
+    y: np.ndarray,
+    max_points: int = MAX_CHART_POINTS,
+    method: str = "minmax",
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Прореживает ряд (x отсортирован) до не более чем max_points точек.
+
+    Args:
+        method: "minmax" (сохраняет экстремумы) или "lttb" (сохраняет форму)
+    """
+    if method == "lttb":
+        indices = lttb_indices(x, y, max_points)
+    elif method == "minmax":
+        indices = min_max_indices(x, y, max(1, (max_points - 2) // 2))
+    else:
+        raise ValueError(f"Неизвестный метод прореживания: {method}")
+    return x[indices], y[indices]
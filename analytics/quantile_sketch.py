@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+
+"""
+Слияемый скетч квантилей для медиан и перцентилей по фильтрам.
+
+Медиану нельзя сложить из медиан частей, поэтому для каждой сессии и
+каждого бай-ина хранится компактный скетч распределения. Медиана или
+перцентиль для объединения фильтров получается слиянием нескольких
+скетчей без загрузки самих турниров.
+
+Скетч устроен как DDSketch: значения раскладываются по логарифмическим
+корзинам с гарантированной относительной точностью alpha. В отличие от
+t-digest и KLL такой скетч детерминирован и поддерживает удаление
+значения (счётчик корзины уменьшается), что нужно для инкрементального
+обновления статистики при удалении и повторном импорте турниров.
+
+Формат (little-endian):
+    заголовок  B версия, d alpha, q число нулей, I число корзин
+               положительных значений, I число корзин отрицательных
+    корзина    i индекс, q счётчик (сначала положительные, затем
+               отрицательные значения)
+"""
+
+import math
+import struct
+from typing import Dict, Iterable, Optional
+
+# Текущая версия формата скетча
+SKETCH_FORMAT_VERSION = 1
+
+# Относительная точность по умолчанию: для стека 2000 фишек - ±2 фишки
+DEFAULT_RELATIVE_ACCURACY = 0.001
+
+_HEADER = struct.Struct('<BdqII')
+_BIN = struct.Struct('<iq')
+
+
+class QuantileSketch:
+    """Слияемый скетч квантилей с относительной точностью alpha."""
+
+    def __init__(self, relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy должна быть в интервале (0, 1)")
+        self.relative_accuracy = relative_accuracy
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self.positive: Dict[int, int] = {}
+        self.negative: Dict[int, int] = {}
+        self.zero_count = 0
+
+    @classmethod
+    def from_values(
+        cls,
+        values: Iterable[float],
+        relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY,
+    ) -> 'QuantileSketch':
+        sketch = cls(relative_accuracy)
+        for value in values:
+            sketch.add(value)
+        return sketch
+
+    @property
+    def count(self) -> int:
+        return self.zero_count + sum(self.positive.values()) + sum(self.negative.values())
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, QuantileSketch):
+            return NotImplemented
+        return (
+            self.relative_accuracy == other.relative_accuracy
+            and self.zero_count == other.zero_count
+            and self.positive == other.positive
+            and self.negative == other.negative
+        )
+
+    def _index(self, value: float) -> int:
+        return math.ceil(math.log(value) / self._log_gamma)
+
+    def _value(self, index: int) -> float:
+        # Середина корзины (gamma^(i-1), gamma^i] с относительной ошибкой alpha
+        return 2 * self._gamma ** index / (self._gamma + 1)
+
+    def add(self, value: float, count: int = 1) -> None:
+        """Добавляет значение (count < 0 - удаляет ранее добавленное)."""
+        if value > 0:
+            store, index = self.positive, self._index(value)
+        elif value < 0:
+            store, index = self.negative, self._index(-value)
+        else:
+            self.zero_count += count
+            if self.zero_count < 0:
+                raise ValueError("Удаление значения, которого нет в скетче")
+            return
+        total = store.get(index, 0) + count
+        if total < 0:
+            raise ValueError("Удаление значения, которого нет в скетче")
+        if total:
+            store[index] = total
+        else:
+            store.pop(index, None)
+
+    def remove(self, value: float) -> None:
+        """Удаляет одно ранее добавленное значение."""
+        self.add(value, -1)
+
+    def merge(self, other: 'QuantileSketch') -> None:
+        """Добавляет к скетчу все значения другого скетча той же точности."""
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Нельзя слить скетчи с разной относительной точностью")
+        self.zero_count += other.zero_count
+        for store, other_store in ((self.positive, other.positive), (self.negative, other.negative)):
+            for index, count in other_store.items():
+                store[index] = store.get(index, 0) + count
+
+    def copy(self) -> 'QuantileSketch':
+        sketch = QuantileSketch(self.relative_accuracy)
+        sketch.merge(self)
+        return sketch
+
+    def _value_at_rank(self, rank: int) -> float:
+        """Оценка значения с порядковым номером rank (с нуля) по возрастанию."""
+        seen = 0
+        for index in sorted(self.negative, reverse=True):
+            seen += self.negative[index]
+            if rank < seen:
+                return -self._value(index)
+        seen += self.zero_count
+        if rank < seen:
+            return 0.0
+        for index in sorted(self.positive):
+            seen += self.positive[index]
+            if rank < seen:
+                return self._value(index)
+        raise IndexError(rank)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Квантиль q в [0, 1] с линейной интерполяцией между соседними
+        рангами (как statistics.median и numpy.quantile по умолчанию).
+        Для пустого скетча - None.
+        """
+        if not 0 <= q <= 1:
+            raise ValueError("Квантиль должен быть в интервале [0, 1]")
+        count = self.count
+        if not count:
+            return None
+        position = q * (count - 1)
+        lower = math.floor(position)
+        lower_value = self._value_at_rank(lower)
+        if position == lower:
+            return lower_value
+        upper_value = self._value_at_rank(lower + 1)
+        return lower_value + (upper_value - lower_value) * (position - lower)
+
+    def median(self) -> Optional[float]:
+        return self.quantile(0.5)
+
+    def to_bytes(self) -> bytes:
+        parts = [_HEADER.pack(
+            SKETCH_FORMAT_VERSION, self.relative_accuracy, self.zero_count,
+            len(self.positive), len(self.negative),
+        )]
+        for store in (self.positive, self.negative):
+            parts.extend(_BIN.pack(index, count) for index, count in sorted(store.items()))
+        return b''.join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'QuantileSketch':
+        version, relative_accuracy, zero_count, positive_bins, negative_bins = _HEADER.unpack_from(data, 0)
+        if version != SKETCH_FORMAT_VERSION:
+            raise ValueError(f"Неподдерживаемая версия скетча: {version}")
+        sketch = cls(relative_accuracy)
+        sketch.zero_count = zero_count
+        offset = _HEADER.size
+        for store, bin_count in ((sketch.positive, positive_bins), (sketch.negative, negative_bins)):
+            end = offset + bin_count * _BIN.size
+            store.update(_BIN.iter_unpack(data[offset:end]))
+            offset = end
+        return sketch
+
+
+def merge_sketches(sketches: Iterable[QuantileSketch]) -> Optional[QuantileSketch]:
+    """Сливает скетчи в новый; None, если скетчей нет."""
+    merged: Optional[QuantileSketch] = None
+    for sketch in sketches:
+        if merged is None:
+            merged = sketch.copy()
+        else:
+            merged.merge(sketch)
+    return merged
@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+
+"""
+Временные ряды по турнирам: накопленный профит, скользящие ROI/ITM/KO
+и агрегаты по дням.
+
+Турниры приходят колонками (numpy-массивы), упорядоченными по start_epoch,
+как их отдаёт TournamentRepository.get_time_series_rows. Все расчёты -
+векторные: суммы по скользящему окну берутся разностью префиксных сумм
+(то же, что свёртка с окном из единиц, но за O(n) при любой ширине окна),
+дни - сегментами np.add.reduceat по отсортированному start_day. Результаты
+кешируются по ширине окна, поэтому смена окна на графике не требует
+повторного чтения БД.
+"""
+
+from dataclasses import dataclass
+from itertools import chain
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+SECONDS_PER_DAY = 86400
+
+
+@dataclass
+class RollingStats:
+    """
+    Скользящие показатели: значение в точке i считается по последним
+    window турнирам до i включительно (в начале ряда - по всем имеющимся).
+    """
+
+    window: int
+    roi: np.ndarray  # ROI, %; 0 для окна без бай-инов
+    itm: np.ndarray  # ITM (топ-3), %
+    ko_per_tournament: np.ndarray
+    tournaments: np.ndarray  # турниров в окне
+
+
+@dataclass
+class DailyAggregates:
+    """Агрегаты по дням (start_day - номер дня от 1970-01-01)."""
+
+    day: np.ndarray
+    tournaments: np.ndarray
+    buy_in: np.ndarray
+    payout: np.ndarray
+    knockouts: np.ndarray
+    itm: np.ndarray  # число попаданий в топ-3 за день
+    cumulative_profit: np.ndarray  # накопленный профит на конец дня
+
+    @property
+    def profit(self) -> np.ndarray:
+        return self.payout - self.buy_in
+
+    @property
+    def day_start_epoch(self) -> np.ndarray:
+        """Начало каждого дня в секундах (для оси времени графика)."""
+        return self.day * SECONDS_PER_DAY
+
+
+def _window_sums(prefix: np.ndarray, window: int) -> np.ndarray:
+    """Суммы по окну из префиксных сумм prefix (prefix[0] = 0)."""
+    ends = np.arange(1, len(prefix))
+    return prefix[ends] - prefix[np.maximum(ends - window, 0)]
+
+
+def _prefix(values: np.ndarray) -> np.ndarray:
+    prefix = np.empty(len(values) + 1, dtype=np.float64)
+    prefix[0] = 0.0
+    np.cumsum(values, out=prefix[1:])
+    return prefix
+
+
+class TournamentTimeSeries:
+    """Временной ряд турниров, упорядоченных по времени начала."""
+
+    def __init__(
+        self,
+        start_epoch: np.ndarray,
+        buyin: np.ndarray,
+        payout: np.ndarray,
+        ko_count: np.ndarray,
+        finish_place: np.ndarray,
+    ):
+        self.start_epoch = np.asarray(start_epoch, dtype=np.int64)
+        self.buyin = np.asarray(buyin, dtype=np.float64)
+        self.payout = np.asarray(payout, dtype=np.float64)
+        self.ko_count = np.asarray(ko_count, dtype=np.float64)
+        finish_place = np.asarray(finish_place, dtype=np.int64)
+        self.itm = ((finish_place >= 1) & (finish_place <= 3)).astype(np.float64)
+        self.profit = self.payout - self.buyin
+
+        self._prefix: Dict[str, np.ndarray] = {}
+        self._rolling: Dict[int, RollingStats] = {}
+        self._cumulative_profit: Optional[np.ndarray] = None
+        self._daily: Optional[DailyAggregates] = None
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[tuple]) -> "TournamentTimeSeries":
+        """
+        Собирает ряд из строк (start_epoch, buyin, payout, ko_count,
+        finish_place) без NULL, упорядоченных по start_epoch.
+        """
+        # fromiter по плоской последовательности вдвое быстрее np.array(rows)
+        data = np.fromiter(
+            chain.from_iterable(rows), dtype=np.float64, count=len(rows) * 5
+        ).reshape(-1, 5)
+        return cls(data[:, 0], data[:, 1], data[:, 2], data[:, 3], data[:, 4])
+
+    def __len__(self) -> int:
+        return len(self.start_epoch)
+
+    def _prefix_sums(self, name: str) -> np.ndarray:
+        if name not in self._prefix:
+            self._prefix[name] = _prefix(getattr(self, name))
+        return self._prefix[name]
+
+    def cumulative_profit(self) -> np.ndarray:
+        """Накопленный профит после каждого турнира."""
+        if self._cumulative_profit is None:
+            self._cumulative_profit = self._prefix_sums("profit")[1:]
+        return self._cumulative_profit
+
+    def rolling(self, window: int = 100) -> RollingStats:
+        """Скользящие ROI, ITM и KO за турнир по окну из window турниров."""
+        window = max(1, int(window))
+        if window not in self._rolling:
+            profit = _window_sums(self._prefix_sums("profit"), window)
+            buyin = _window_sums(self._prefix_sums("buyin"), window)
+            itm = _window_sums(self._prefix_sums("itm"), window)
+            ko = _window_sums(self._prefix_sums("ko_count"), window)
+            counts = np.minimum(np.arange(1, len(self) + 1), window).astype(np.float64)
+            roi = np.divide(
+                profit * 100.0, buyin, out=np.zeros(len(self), dtype=np.float64), where=buyin > 0
+            )
+            self._rolling[window] = RollingStats(
+                window=window,
+                roi=roi,
+                itm=itm / counts * 100.0,
+                ko_per_tournament=ko / counts,
+                tournaments=counts.astype(np.int64),
+            )
+        return self._rolling[window]
+
+    def daily(self) -> DailyAggregates:
+        """Агрегаты по дням начала турниров."""
+        if self._daily is None:
+            days = self.start_epoch // SECONDS_PER_DAY
+            if len(days):
+                # Ряд отсортирован по времени: дни идут непрерывными сегментами
+                starts = np.flatnonzero(np.r_[True, days[1:] != days[:-1]])
+            else:
+                starts = np.zeros(0, dtype=np.int64)
+
+            def _sum(values: np.ndarray) -> np.ndarray:
+                if not len(starts):
+                    return np.zeros(0, dtype=np.float64)
+                return np.add.reduceat(values, starts)
+
+            counts = np.diff(np.r_[starts, len(days)]).astype(np.int64)
+            buy_in = _sum(self.buyin)
+            payout = _sum(self.payout)
+            self._daily = DailyAggregates(
+                day=days[starts],
+                tournaments=counts,
+                buy_in=buy_in,
+                payout=payout,
+                knockouts=_sum(self.ko_count),
+                itm=_sum(self.itm).astype(np.int64),
+                cumulative_profit=np.cumsum(payout - buy_in),
+            )
+        return self._daily
@@ -0,0 +1,5 @@
+"""
+Воспроизводимые бенчмарки Royal Stats.
+
+Запуск: python -m benchmarks --tournaments 300 --output results.json
+"""
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+
+"""
+CLI бенчмарков: python -m benchmarks [--tournaments N] [--output FILE] [--compare BASELINE]
+"""
+
+import os
+import sys
+import json
+import argparse
+import logging
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.generator import GeneratorConfig
+from benchmarks.suite import run_suite, compare_results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Бенчмарки Royal Stats")
+    parser.add_argument("--tournaments", type=int, default=200, help="число турниров в наборе")
+    parser.add_argument("--ft-reach-rate", type=float, default=0.35, help="доля турниров с финалкой")
+    parser.add_argument("--pre-ft-hands", type=int, default=40, help="раздач до финалки на турнир")
+    parser.add_argument("--ft-hands", type=int, default=30, help="раздач на финалке на турнир")
+    parser.add_argument("--side-pot-rate", type=float, default=0.25, help="доля олл-инов с сайд-потами")
+    parser.add_argument("--split-pot-rate", type=float, default=0.05, help="доля олл-инов с дележом банка")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=3, help="повторов каждого замера")
+    parser.add_argument("--output", default="benchmark_results.json", help="файл результатов JSON")
+    parser.add_argument("--compare", help="JSON предыдущего прогона для сравнения")
+    args = parser.parse_args(argv)
+
+    # Логи приложения не должны искажать замеры
+    logging.getLogger("ROYAL_Stats").setLevel(logging.WARNING)
+
+    config = GeneratorConfig(
+        tournaments=args.tournaments,
+        ft_reach_rate=args.ft_reach_rate,
+        pre_ft_hands=args.pre_ft_hands,
+        ft_hands=args.ft_hands,
+        side_pot_rate=args.side_pot_rate,
+        split_pot_rate=args.split_pot_rate,
+        seed=args.seed,
+    )
+    results = run_suite(config, repeat=args.repeat)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+
+    for name, entry in results["benchmarks"].items():
+        print(f"{name:<22} min={entry['min_s']:.4f} с  median={entry['median_s']:.4f} с")
+    print(f"Результаты записаны в {args.output}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        print(f"Сравнение с {baseline.get('git', {}).get('commit') or args.compare}:")
+        if baseline.get("config") != results["config"]:
+            print("  Внимание: параметры набора данных отличаются, сравнение неточно")
+        for row in compare_results(baseline, results):
+            print(f"  {row['benchmark']:<22} {row['baseline_s']:.4f} -> {row['current_s']:.4f} с (x{row['ratio']})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
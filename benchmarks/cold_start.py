@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+
+"""
+Замер холодного старта Royal Stats в отдельном процессе.
+
+python -m benchmarks.cold_start DB_PATH CACHE_PATH
+
+Процесс повторяет путь запуска приложения и печатает JSON с длительностью
+этапов (секунды от начала работы модуля):
+  - imports            — импорт сервисов, репозиториев и ViewModel;
+  - facade             — сборка AppFacade на указанной БД;
+  - first_stat         — первый расчёт стат-карточки через плагин;
+  - first_window       — QApplication, тема и показ MainWindow
+                         (None, если PyQt6 недоступен).
+Общее время до первого окна вместе со стартом интерпретатора
+измеряет вызывающий процесс (benchmarks.suite.bench_cold_start).
+"""
+
+import os
+import sys
+import json
+import time
+
+_START = time.perf_counter()
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    db_path, cache_path = argv[0], argv[1]
+    phases = {}
+
+    import services  # noqa: F401
+    import viewmodels  # noqa: F401
+    from benchmarks.suite import _create_facade
+    phases["imports"] = time.perf_counter() - _START
+
+    facade = _create_facade(db_path, cache_path)
+    phases["facade"] = time.perf_counter() - _START
+
+    plugin = next(p for p in facade.statistics_service.stat_plugins if p.name == "ROI")
+    plugin.compute([], [], [], precomputed_stats={})
+    phases["first_stat"] = time.perf_counter() - _START
+    phases["ready_at"] = time.time()
+
+    phases["first_window"] = None
+    try:
+        from PyQt6 import QtWidgets
+    except ImportError:
+        QtWidgets = None
+    if QtWidgets is not None:
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+        from ui.main_window import MainWindow
+        from ui.app_style import apply_dark_theme
+
+        app = QtWidgets.QApplication([sys.argv[0]])
+        apply_dark_theme(app)
+        window = MainWindow(app_facade=facade)
+        window.show()
+        app.processEvents()
+        phases["first_window"] = time.perf_counter() - _START
+        phases["ready_at"] = time.time()
+        window.close()
+
+    print(json.dumps(phases))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,344 @@
+# -*- coding: utf-8 -*-
+
+"""
+Детерминированный генератор синтетических файлов GG Poker для бенчмарков.
+
+Генерирует пары файлов Hand History и Tournament Summary турниров
+Mystery Battle Royale. Раздачи включают простые розыгрыши, стилы с
+возвратом непоставленной ставки, олл-ины с выбиванием, мультипоты с
+сайд-потами и дележи банка. Один и тот же GeneratorConfig (включая seed)
+всегда даёт побайтово одинаковый набор файлов.
+"""
+
+import os
+import random
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+HERO = "Hero"
+FINAL_TABLE_SIZE = 9
+PRE_FT_TABLE_SIZE = 5
+
+# Фиксированная доска для олл-инов: парсеру важны только суммы
+_BOARD = [
+    "*** FLOP *** [Ah 7d 2c]",
+    "*** TURN *** [Ah 7d 2c] [Ks]",
+    "*** RIVER *** [Ah 7d 2c Ks] [3h]",
+    "*** SHOWDOWN ***",
+]
+
+
+@dataclass
+class GeneratorConfig:
+    """Параметры синтетического набора данных."""
+    tournaments: int = 100
+    ft_reach_rate: float = 0.35          # доля турниров с выходом на финалку
+    pre_ft_hands: int = 40               # раздач до финалки (±25%)
+    ft_hands: int = 30                   # раздач на финалке (±25%)
+    allin_rate: float = 0.12             # доля раздач с олл-ином
+    side_pot_rate: float = 0.25          # доля олл-инов с несколькими выставившимися
+    split_pot_rate: float = 0.05         # доля олл-инов с дележом банка
+    incomplete_ft_rate: float = 0.3      # доля финалок, стартующих неполным составом
+    buyins: Tuple[float, ...] = (0.25, 1.0, 3.0, 10.0, 25.0)
+    first_tournament_id: int = 700000000
+    start_time: str = "2025/01/01 12:00:00"
+    seed: int = 42
+
+    def as_dict(self) -> Dict:
+        return {k: list(v) if isinstance(v, tuple) else v for k, v in self.__dict__.items()}
+
+
+@dataclass
+class GeneratedTournament:
+    """Описание сгенерированного турнира (ожидаемые значения для проверок)."""
+    tournament_id: str
+    buyin: float
+    reached_final_table: bool
+    finish_place: int
+    payout: float
+    hands: int
+    hh_text: str = field(repr=False)
+    ts_text: str = field(repr=False)
+
+
+def _fmt_money(value: float) -> str:
+    return f"{value:,.2f}".rstrip("0").rstrip(".") if value % 1 else f"{int(value):,}"
+
+
+def _ordinal(n: int) -> str:
+    if 10 <= n % 100 <= 20:
+        return f"{n}th"
+    return f"{n}{ {1: 'st', 2: 'nd', 3: 'rd'}.get(n % 10, 'th') }"
+
+
+class _HandWriter:
+    """Рендерит раздачи одного турнира и ведёт стеки игроков."""
+
+    def __init__(self, rng: random.Random, config: GeneratorConfig, tournament_id: str,
+                 buyin: float, started: datetime):
+        self.rng = rng
+        self.config = config
+        self.tournament_id = tournament_id
+        self.buyin = buyin
+        self.started = started
+        self.number = 0
+        self.hero_kos = 0
+
+    # --- раздачи ---
+
+    def hand(self, table_size: int, stacks: Dict[str, int], level: int) -> str:
+        """Генерирует одну раздачу и обновляет stacks на месте."""
+        self.number += 1
+        bb = 100 * level
+        ante = 10 * level
+        when = self.started + timedelta(seconds=40 * self.number)
+        players = list(stacks)
+        button = self.number % len(players)
+        sb_player = players[(button + 1) % len(players)]
+        bb_player = players[(button + 2) % len(players)]
+        lines = [
+            f"Poker Hand #TM{self.tournament_id}{self.number:04d}: Tournament #{self.tournament_id}, "
+            f"Mystery Battle Royale ${_fmt_money(self.buyin)} Hold'em No Limit - "
+            f"Level{level}({bb // 2:,}/{bb:,}) - {when:%Y/%m/%d %H:%M:%S}",
+            f"Table '{1 + int(self.tournament_id) % 97}' {table_size}-max Seat #{button + 1} is the button",
+        ]
+        lines += [f"Seat {i + 1}: {name} ({stacks[name]:,} in chips)" for i, name in enumerate(players)]
+
+        # Короткий стек может оказаться в олл-ине уже на анте или блайнде
+        contrib = {name: min(ante, stacks[name]) for name in players}
+        lines += [f"{name}: posts the ante {contrib[name]}" for name in players]
+        street = {name: 0 for name in players}
+        for name, blind, label in ((sb_player, bb // 2, "small"), (bb_player, bb, "big")):
+            street[name] = min(blind, stacks[name] - contrib[name])
+            if street[name] > 0:
+                lines.append(f"{name}: posts {label} blind {street[name]:,}")
+        lines.append("*** HOLE CARDS ***")
+        active = [p for p in players if stacks[p] > contrib[p] + street[p]]
+
+        roll = self.rng.random()
+        short = [p for p in active if p != HERO and stacks[p] - ante <= 2 * bb]
+        allin = None
+        if HERO in active and (short or roll < self.config.allin_rate):
+            allin = self._pick_allin(active, stacks, ante, bb, short)
+        raiser = None
+        if not allin:
+            # Короткий Hero ворует блайнды, чтобы не вылететь на анте
+            openers = [p for p in active if p != bb_player and stacks[p] - ante > 3 * bb]
+            if stacks[HERO] < 6 * bb:
+                can_open = HERO in active and HERO != bb_player and stacks[HERO] - ante > 2 * bb
+                raiser = HERO if can_open else None
+            elif openers and roll < self.config.allin_rate + 0.3:
+                raiser = self.rng.choice(openers)
+
+        won: Dict[str, int] = {}
+        if allin:
+            victims, caller, outcome = allin
+            self._render_allin(lines, stacks, active, contrib, street, won, victims, caller, outcome, bb)
+        elif raiser:
+            # Стил: игрок открывает, все сбрасывают, лишняя ставка возвращается
+            lines.append(f"{raiser}: raises {bb:,} to {bb * 2:,}")
+            lines += [f"{p}: folds" for p in active if p != raiser]
+            uncalled = bb * 2 - max(v for p, v in street.items() if p != raiser)
+            lines.append(f"Uncalled bet ({uncalled:,}) returned to {raiser}")
+            street[raiser] = bb * 2 - uncalled
+        else:
+            lines += [f"{p}: folds" for p in active if p != bb_player]
+
+        for name in players:
+            contrib[name] += street[name]
+        if not allin:
+            won[raiser or bb_player] = sum(contrib.values())
+        for name, amount in won.items():
+            lines.append(f"{name} collected {amount:,} from pot")
+        lines += ["*** SUMMARY ***", f"Total pot {sum(contrib.values()):,} | Rake 0"]
+
+        for name in players:
+            stacks[name] += won.get(name, 0) - contrib[name]
+            if stacks[name] <= 0:
+                # Выбывший без выигрыша при выигрыше Hero — нокаут Hero
+                self.hero_kos += bool(won.get(HERO))
+                del stacks[name]
+        return "\n".join(lines)
+
+    def _pick_allin(self, active, stacks, ante, bb, short) -> Optional[Tuple[List[str], Optional[str], str]]:
+        """Выбирает выставляющихся игроков, третьего участника и исход."""
+        rng = self.rng
+        others = [p for p in active if p != HERO]
+        caller = None
+        if len(others) >= 2 and rng.random() < 0.5:
+            caller = max(others, key=lambda p: (stacks[p], p))
+        cover = stacks[HERO] - ante
+        if caller:
+            cover = min(cover, stacks[caller] - ante)
+        candidates = [p for p in others if p != caller and stacks[p] - ante < cover]
+        forced = [p for p in short if p in candidates]
+        if forced:
+            victims = forced
+        else:
+            candidates = [p for p in candidates if stacks[p] - ante > bb]
+            if not candidates:
+                return None
+            count = 1
+            if len(candidates) >= 2 and rng.random() < self.config.side_pot_rate:
+                count = rng.randint(2, min(3, len(candidates)))
+            victims = rng.sample(candidates, count)
+        victims.sort(key=lambda p: (stacks[p], p))
+
+        outcome_roll = rng.random()
+        # Проигрыш банка не должен оставить Hero без фишек на следующие блайнды
+        hero_can_lose = stacks[HERO] - ante - stacks[victims[-1]] > 5 * bb
+        if caller and outcome_roll < self.config.split_pot_rate:
+            outcome = "split"
+        elif caller and hero_can_lose and outcome_roll < 0.3:
+            outcome = "opponent"
+        elif len(victims) >= 2 and hero_can_lose and outcome_roll < 0.6:
+            outcome = "side"     # самый короткий забирает основной банк
+        else:
+            outcome = "hero"
+        return victims, caller, outcome
+
+    def _render_allin(self, lines, stacks, active, contrib, street, won, victims, caller, outcome, bb):
+        """Олл-ин: выставившиеся пушат, caller и Hero коллируют, банк делится по слоям."""
+        current = bb
+        for victim in victims:
+            total = stacks[victim] - contrib[victim]
+            if total > current:
+                lines.append(f"{victim}: raises {total - current:,} to {total:,} and is all-in")
+                current = total
+            else:
+                lines.append(f"{victim}: calls {total - street[victim]:,} and is all-in")
+            street[victim] = total
+        lines += [f"{p}: folds" for p in active if p not in victims and p not in (HERO, caller)]
+        for p in (caller, HERO):
+            if p:
+                lines.append(f"{p}: calls {current - street[p]:,}")
+                street[p] = current
+        lines += _BOARD
+
+        # Слои банка по уровням вклада выставившихся; последний слой — вклад коллеров
+        totals = [contrib[p] + street[p] for p in contrib]
+        levels = sorted({contrib[v] + street[v] for v in victims} | {contrib[HERO] + street[HERO]})
+        previous = 0
+        for index, level in enumerate(levels):
+            amount = sum(min(t, level) - min(t, previous) for t in totals)
+            previous = level
+            if outcome == "split":
+                winners = [HERO, caller]
+            elif outcome == "opponent":
+                winners = [caller]
+            elif outcome == "side" and index == 0:
+                winners = [victims[0]]
+            else:
+                winners = [HERO]
+            share, rest = divmod(amount, len(winners))
+            for i, winner in enumerate(winners):
+                won[winner] = won.get(winner, 0) + share + (rest if i == 0 else 0)
+
+
+def _tournament(rng: random.Random, config: GeneratorConfig, index: int) -> GeneratedTournament:
+    tournament_id = str(config.first_tournament_id + index)
+    buyin = rng.choice(config.buyins)
+    started = datetime.strptime(config.start_time, "%Y/%m/%d %H:%M:%S") + timedelta(minutes=7 * index)
+    writer = _HandWriter(rng, config, tournament_id, buyin, started)
+    reached_ft = rng.random() < config.ft_reach_rate
+    hands: List[str] = []
+    next_player = 1
+
+    def new_player(prefix: str) -> str:
+        nonlocal next_player
+        next_player += 1
+        return f"{prefix}{next_player:03d}"
+
+    # Стадия до финалки: 5-max стол, выбывшие заменяются новыми игроками
+    stacks: Dict[str, int] = {HERO: 1000}
+    for _ in range(PRE_FT_TABLE_SIZE - 1):
+        stacks[new_player("p")] = rng.randint(600, 2500)
+    pre_ft = max(1, round(config.pre_ft_hands * rng.uniform(0.75, 1.25)))
+    for i in range(pre_ft):
+        level = 1 + i // 10
+        hands.append(writer.hand(PRE_FT_TABLE_SIZE, stacks, level))
+        while len(stacks) < PRE_FT_TABLE_SIZE:
+            stacks[new_player("p")] = rng.randint(600, 3000)
+
+    level = 1 + pre_ft // 10
+    if reached_ft:
+        start_players = FINAL_TABLE_SIZE
+        if rng.random() < config.incomplete_ft_rate:
+            start_players = rng.randint(6, FINAL_TABLE_SIZE - 1)
+        stacks = {HERO: stacks[HERO]}
+        for _ in range(start_players - 1):
+            stacks[new_player("f")] = rng.randint(5, 60) * 100 * level
+        ft = max(1, round(config.ft_hands * rng.uniform(0.75, 1.25)))
+        for i in range(ft):
+            if len(stacks) < 2:
+                break
+            hands.append(writer.hand(FINAL_TABLE_SIZE, stacks, level + i // 10))
+        remaining = len(stacks)
+        finish_place = remaining if rng.random() < 0.7 else rng.randint(1, remaining)
+    else:
+        finish_place = rng.randint(FINAL_TABLE_SIZE + 1, 18)
+
+    payout = {1: 4.0, 2: 3.0, 3: 2.0}.get(finish_place, 0.0) * buyin
+    for _ in range(writer.hero_kos if reached_ft else 0):
+        payout += buyin * rng.choices([0.5, 1, 2, 5, 10, 100], weights=[40, 30, 15, 10, 4, 1])[0]
+    payout = round(payout, 2)
+
+    title = f"Tournament #{tournament_id}, Mystery Battle Royale ${_fmt_money(buyin)}, Hold'em No Limit"
+    ts_lines = [
+        title,
+        f"Buy-in: ${_fmt_money(buyin / 2)}+${_fmt_money(buyin * 0.08)}+${_fmt_money(buyin / 2)}",
+        "18 Players",
+        f"Total Prize Pool: ${_fmt_money(buyin * 18)}",
+        f"Tournament started {started:%Y/%m/%d %H:%M:%S}",
+        f"{_ordinal(finish_place)} : {HERO}, ${_fmt_money(payout)}",
+        f"You finished the tournament in {_ordinal(finish_place)} place.",
+        f"You received a total of ${_fmt_money(payout)}.",
+    ]
+    return GeneratedTournament(
+        tournament_id=tournament_id,
+        buyin=buyin,
+        reached_final_table=reached_ft,
+        finish_place=finish_place,
+        payout=payout,
+        hands=len(hands),
+        # GG пишет новые раздачи сверху
+        hh_text="\n\n".join(reversed(hands)) + "\n",
+        ts_text="\n".join(ts_lines) + "\n",
+    )
+
+
+def generate_tournaments(config: GeneratorConfig) -> List[GeneratedTournament]:
+    """Генерирует турниры в памяти (без записи на диск)."""
+    rng = random.Random(config.seed)
+    return [_tournament(rng, config, i) for i in range(config.tournaments)]
+
+
+def write_dataset(directory: str, config: GeneratorConfig) -> Dict[str, object]:
+    """
+    Записывает набор HH и TS файлов в directory.
+
+    Returns:
+        Сводка: пути HH/TS файлов, число раздач и байт.
+    """
+    os.makedirs(directory, exist_ok=True)
+    hh_files: List[str] = []
+    ts_files: List[str] = []
+    total_hands = 0
+    total_bytes = 0
+    for t in generate_tournaments(config):
+        name = f"Tournament #{t.tournament_id} - Mystery Battle Royale ${_fmt_money(t.buyin)}"
+        for text, suffix, bucket in ((t.hh_text, "", hh_files), (t.ts_text, " summary", ts_files)):
+            path = os.path.join(directory, f"GG {name}{suffix}.txt")
+            data = text.encode("utf-8")
+            with open(path, "wb") as f:
+                f.write(data)
+            total_bytes += len(data)
+            bucket.append(path)
+        total_hands += t.hands
+    return {
+        "hh_files": hh_files,
+        "ts_files": ts_files,
+        "hands": total_hands,
+        "bytes": total_bytes,
+    }
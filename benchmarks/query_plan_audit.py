@@ -0,0 +1,272 @@
+# -*- coding: utf-8 -*-
+
+"""
+Аудит планов запросов репозиториев.
+
+python -m benchmarks.query_plan_audit [--db DB_PATH] [--tournaments N] [--output FILE]
+
+Вызывает методы репозиториев со всеми сочетаниями фильтров, которые
+используют StatsGrid, TournamentView, SessionView и пересчёт статистики,
+перехватывает выполненные SQL (с подставленными параметрами) и для
+каждого запроса выполняет EXPLAIN QUERY PLAN. В отчёте:
+  - full_scans     — запросы с фильтром, просматривающие всю таблицу;
+  - temp_sorts     — запросы с сортировкой во временном B-дереве;
+  - unused_indexes — индексы схемы, не использованные ни одним запросом
+                     (кандидаты на удаление: замедляют массовую вставку).
+Без --db создаётся временная БД с синтетическим набором (benchmarks.generator).
+Код возврата 1, если в запросах из HOT_QUERY_SHAPES есть полный просмотр
+или временная сортировка.
+"""
+
+import os
+import sys
+import json
+import shutil
+import sqlite3
+import argparse
+import logging
+import tempfile
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.generator import GeneratorConfig, write_dataset
+
+# Таблицы, полный просмотр которых в запросе с фильтром считается проблемой
+AUDITED_TABLES = ("tournaments", "hero_final_table_hands", "sessions")
+
+
+@dataclass
+class AuditContext:
+    """Репозитории и типичные значения фильтров для вызова запросов."""
+
+    tournament_repo: Any
+    ft_hand_repo: Any
+    session_repo: Any
+    session_id: Optional[str]
+    buyin: Optional[float]
+    date_from: Optional[str]
+    date_to: Optional[str]
+    tournament_ids: List[str] = field(default_factory=list)
+
+
+def _stats_grid(ctx: AuditContext, **filters) -> None:
+    from services.federated_stats_service import load_filtered_dataset
+    load_filtered_dataset(ctx.tournament_repo, ctx.ft_hand_repo, **filters)
+
+
+def _tournament_view(ctx: AuditContext, sort_column: str = "start_time", **filters) -> None:
+    ctx.tournament_repo.get_tournaments_paginated(page=2, page_size=50, sort_column=sort_column, **filters)
+
+
+# Запросы интерактивных экранов: выполняются при каждой смене фильтра
+HOT_QUERY_SHAPES: Dict[str, Callable[[AuditContext], None]] = {
+    "statsgrid_all": lambda ctx: _stats_grid(ctx),
+    "statsgrid_session": lambda ctx: _stats_grid(ctx, session_id=ctx.session_id),
+    "statsgrid_buyin": lambda ctx: _stats_grid(ctx, buyin_filter=ctx.buyin),
+    "statsgrid_dates": lambda ctx: _stats_grid(ctx, date_from=ctx.date_from, date_to=ctx.date_to),
+    "statsgrid_session_dates": lambda ctx: _stats_grid(
+        ctx, session_id=ctx.session_id, date_from=ctx.date_from, date_to=ctx.date_to),
+    "statsgrid_buyin_dates": lambda ctx: _stats_grid(
+        ctx, buyin_filter=ctx.buyin, date_from=ctx.date_from, date_to=ctx.date_to),
+    "statsgrid_time_range": lambda ctx: ctx.tournament_repo.get_start_time_range(),
+    "tournament_view_all": lambda ctx: _tournament_view(ctx),
+    "tournament_view_session": lambda ctx: _tournament_view(ctx, session_id=ctx.session_id),
+    "tournament_view_buyin": lambda ctx: _tournament_view(ctx, buyin_filter=ctx.buyin),
+    "tournament_view_dates": lambda ctx: _tournament_view(
+        ctx, start_time_from=ctx.date_from, start_time_to=ctx.date_to),
+    "tournament_view_session_dates": lambda ctx: _tournament_view(
+        ctx, session_id=ctx.session_id, start_time_from=ctx.date_from, start_time_to=ctx.date_to),
+    "tournament_view_buyin_dates": lambda ctx: _tournament_view(
+        ctx, buyin_filter=ctx.buyin, start_time_from=ctx.date_from, start_time_to=ctx.date_to),
+    "tournament_view_final_table": lambda ctx: _tournament_view(ctx, result_filter="final_table"),
+    "tournament_view_prizes": lambda ctx: _tournament_view(ctx, result_filter="prizes"),
+    "tournament_view_out_of_prizes": lambda ctx: _tournament_view(ctx, result_filter="out_of_prizes"),
+    "distinct_buyins": lambda ctx: ctx.tournament_repo.get_distinct_buyins(),
+    "session_stats": lambda ctx: ctx.session_repo.calculate_session_stats_efficient(ctx.session_id),
+    "hands_by_tournament": lambda ctx: ctx.ft_hand_repo.get_hands_by_tournament(ctx.tournament_ids[0]),
+    "tournament_by_id": lambda ctx: ctx.tournament_repo.get_tournament_by_id(ctx.tournament_ids[0]),
+}
+
+# Остальные формы запросов: импорт, пересчёт статистики и сортировка
+# TournamentView по колонкам без индекса. Полный просмотр для них ожидаем,
+# но они учитываются при поиске неиспользуемых индексов.
+OTHER_QUERY_SHAPES: Dict[str, Callable[[AuditContext], None]] = {
+    "tournament_view_sorted_" + column: (
+        lambda ctx, column=column: _tournament_view(ctx, sort_column=column)
+    )
+    for column in ("tournament_id", "buyin", "finish_place", "payout", "ko_count", "profit")
+}
+OTHER_QUERY_SHAPES.update({
+    "all_tournaments": lambda ctx: ctx.tournament_repo.get_all_tournaments(),
+    "all_hands": lambda ctx: ctx.ft_hand_repo.get_all_hands(),
+    "all_sessions": lambda ctx: ctx.session_repo.get_all_sessions(),
+    "tournaments_by_ids": lambda ctx: ctx.tournament_repo.get_tournaments_by_ids(ctx.tournament_ids[:20]),
+    "existing_hand_keys": lambda ctx: ctx.ft_hand_repo.get_existing_hand_keys(ctx.tournament_ids[:20]),
+    "ko_counts_for_tournaments": lambda ctx: ctx.ft_hand_repo.get_ko_counts_for_tournaments(
+        ctx.tournament_ids[:20]),
+    "ko_counts_all": lambda ctx: ctx.ft_hand_repo.get_ko_counts_for_tournaments(None),
+})
+
+
+def _plan(conn: sqlite3.Connection, sql: str) -> List[str]:
+    return [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql)]
+
+
+def _is_full_scan(detail: str) -> bool:
+    # "SCAN tournaments" без "USING ... INDEX" - просмотр всей таблицы
+    words = detail.split()
+    return (
+        len(words) >= 2 and words[0] == "SCAN" and words[1] in AUDITED_TABLES
+        and "INDEX" not in detail
+    )
+
+
+def _has_filter(sql: str) -> bool:
+    # Запрос без WHERE читает всю таблицу по смыслу, его просмотр не ошибка
+    sql = " ".join(sql.upper().split()).replace("WHERE 1=1 ORDER BY", "ORDER BY")
+    return " WHERE " in f" {sql} "
+
+
+def _used_indexes(detail: str) -> List[str]:
+    words = detail.split()
+    return [words[i + 1] for i, word in enumerate(words[:-1]) if word == "INDEX"]
+
+
+def audit_queries(ctx: AuditContext, conn: sqlite3.Connection) -> Dict[str, Any]:
+    """Выполняет все формы запросов и собирает их планы."""
+    shapes = [(name, func, True) for name, func in HOT_QUERY_SHAPES.items()]
+    shapes += [(name, func, False) for name, func in OTHER_QUERY_SHAPES.items()]
+
+    queries: List[Dict[str, Any]] = []
+    used = set()
+    for name, func, hot in shapes:
+        statements: List[str] = []
+        conn.set_trace_callback(statements.append)
+        try:
+            func(ctx)
+        finally:
+            conn.set_trace_callback(None)
+        for sql in statements:
+            if not sql.lstrip().upper().startswith(("SELECT", "WITH", "UPDATE", "DELETE")):
+                continue
+            plan = _plan(conn, sql)
+            for detail in plan:
+                used.update(_used_indexes(detail))
+            queries.append({
+                "shape": name,
+                "hot": hot,
+                "sql": " ".join(sql.split()),
+                "plan": plan,
+                "full_scan": _has_filter(sql) and any(_is_full_scan(d) for d in plan),
+                "temp_sort": any("USE TEMP B-TREE" in d for d in plan),
+            })
+
+    declared = [
+        row[0] for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL ORDER BY name"
+        )
+    ]
+    return {
+        "queries": queries,
+        "full_scans": [q["shape"] for q in queries if q["hot"] and q["full_scan"]],
+        "temp_sorts": [q["shape"] for q in queries if q["hot"] and q["temp_sort"]],
+        "used_indexes": sorted(used),
+        "unused_indexes": [name for name in declared if name not in used],
+    }
+
+
+def build_context(db_manager) -> AuditContext:
+    """Типичные значения фильтров из самой БД: самая крупная сессия, самый частый бай-ин, средняя треть дат."""
+    from db.repositories import TournamentRepository, FinalTableHandRepository, SessionRepository
+
+    tournament_repo = TournamentRepository(db_manager)
+    conn = db_manager.get_connection()
+    row = conn.execute(
+        "SELECT session_id FROM tournaments GROUP BY session_id ORDER BY COUNT(*) DESC LIMIT 1"
+    ).fetchone()
+    session_id = row[0] if row else None
+    row = conn.execute(
+        "SELECT buyin FROM tournaments WHERE buyin IS NOT NULL GROUP BY buyin ORDER BY COUNT(*) DESC LIMIT 1"
+    ).fetchone()
+    buyin = row[0] if row else None
+    times = [r[0] for r in conn.execute(
+        "SELECT start_time FROM tournaments WHERE start_time IS NOT NULL ORDER BY start_time"
+    )]
+    date_from = times[len(times) // 3] if times else None
+    date_to = times[2 * len(times) // 3] if times else None
+    tournament_ids = [r[0] for r in conn.execute(
+        "SELECT DISTINCT tournament_id FROM hero_final_table_hands LIMIT 50"
+    )] or ["0"]
+    return AuditContext(
+        tournament_repo=tournament_repo,
+        ft_hand_repo=FinalTableHandRepository(db_manager),
+        session_repo=SessionRepository(db_manager),
+        session_id=session_id,
+        buyin=buyin,
+        date_from=date_from,
+        date_to=date_to,
+        tournament_ids=tournament_ids,
+    )
+
+
+def run_audit(db_path: Optional[str] = None, tournaments: int = 300) -> Dict[str, Any]:
+    """Аудит указанной БД (копии) или временной БД с синтетическим набором."""
+    import services  # noqa: F401  (services импортируется раньше db, как в приложении)
+    from db.manager import DatabaseManager
+
+    work_dir = tempfile.mkdtemp(prefix="royal_stats_plan_audit_")
+    db_manager = None
+    try:
+        if db_path:
+            # Копия: открытие БД выполняет миграции схемы
+            audit_db = os.path.join(work_dir, os.path.basename(db_path))
+            shutil.copyfile(db_path, audit_db)
+            db_manager = DatabaseManager(audit_db)
+        else:
+            from benchmarks.suite import _create_facade
+
+            config = GeneratorConfig(tournaments=tournaments)
+            dataset = write_dataset(os.path.join(work_dir, "files"), config)
+            facade = _create_facade(os.path.join(work_dir, "audit.db"), os.path.join(work_dir, "cache.json"))
+            db_manager = facade.db_manager
+            facade.import_files(sorted(dataset["hh_files"] + dataset["ts_files"]), "audit")
+        ctx = build_context(db_manager)
+        return audit_queries(ctx, db_manager.get_connection())
+    finally:
+        if db_manager is not None:
+            db_manager.close_all_connections()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Аудит планов запросов Royal Stats")
+    parser.add_argument("--db", help="БД для аудита (проверяется копия)")
+    parser.add_argument("--tournaments", type=int, default=300, help="размер синтетического набора без --db")
+    parser.add_argument("--output", help="файл отчёта JSON")
+    parser.add_argument("--verbose", action="store_true", help="печатать планы всех запросов")
+    args = parser.parse_args(argv)
+
+    logging.getLogger("ROYAL_Stats").setLevel(logging.WARNING)
+    report = run_audit(args.db, args.tournaments)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    for query in report["queries"]:
+        flags = [flag for flag in ("full_scan", "temp_sort") if query[flag]]
+        if args.verbose or (query["hot"] and flags):
+            print(f"{query['shape']:<34} {' '.join(flags) or 'ok'}")
+            print(f"    {query['sql'][:160]}")
+            for detail in query["plan"]:
+                print(f"      {detail}")
+    print(f"Полный просмотр в интерактивных запросах: {', '.join(report['full_scans']) or 'нет'}")
+    print(f"Временная сортировка в интерактивных запросах: {', '.join(report['temp_sorts']) or 'нет'}")
+    print(f"Неиспользуемые индексы: {', '.join(report['unused_indexes']) or 'нет'}")
+    # Временная сортировка выборки по нескольким турнирам неизбежна, ошибка - только полный просмотр
+    return 1 if report["full_scans"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,505 @@
+# -*- coding: utf-8 -*-
+
+"""
+Набор бенчмарков Royal Stats.
+
+Каждый прогон создаёт синтетический набор файлов (benchmarks.generator),
+временную БД и замеряет:
+  - parse_hh / parse_ts     — пропускная способность парсеров (в памяти);
+  - line_classifier         — классификация строк HH одним регулярным выражением;
+  - pot_engine              — разбор банков и KO на мультивейных олл-инах;
+  - import_full             — импорт через AppFacade в пустую БД;
+  - import_incremental      — догрузка новой порции файлов в непустую БД;
+  - bulk_import_db_save     — этап db_save импорта в пустую БД с отложенным
+                              построением индексов против вставки с индексами;
+  - stats_incremental       — этап stats_update этой догрузки (из профайлера);
+  - stats_full              — полный пересчёт статистики;
+  - statsgrid_viewmodel     — построение ViewModel StatsGrid без кеша;
+  - pagination              — обход всех страниц списка турниров;
+  - time_series             — чтение 500k турниров по индексу start_epoch и
+                              расчёт накопленного профита, скользящих
+                              показателей и агрегатов по дням;
+  - cold_start              — запуск приложения в новом процессе до первого
+                              окна (или до первого расчёта стата без PyQt6)
+                              с проверкой бюджета COLD_START_BUDGET_S.
+
+Из нескольких повторов берётся минимум: он меньше всего зависит от шума.
+"""
+
+import os
+import sys
+import time
+import shutil
+import logging
+import platform
+import json
+import statistics
+import subprocess
+import tempfile
+from datetime import datetime
+from typing import Any, Callable, Dict, List
+
+from benchmarks.generator import FINAL_TABLE_SIZE, HERO, GeneratorConfig, generate_tournaments, write_dataset
+
+logger = logging.getLogger('ROYAL_Stats.Benchmarks')
+
+RESULTS_FORMAT_VERSION = 1
+PAGE_SIZE = 50
+# Бюджет холодного старта (time-to-first-window), секунды
+COLD_START_BUDGET_S = 2.0
+
+
+def _git_revision(repo_dir: str) -> Dict[str, Any]:
+    """Коммит и признак незакоммиченных изменений (если доступен git)."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=repo_dir,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = bool(subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"], cwd=repo_dir,
+            capture_output=True, text=True, check=True
+        ).stdout.strip())
+        return {"commit": commit, "dirty": dirty}
+    except (OSError, subprocess.CalledProcessError):
+        return {"commit": None, "dirty": None}
+
+
+def _timed(func: Callable[[], Any]) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def _summary(runs: List[float], **extra: Any) -> Dict[str, Any]:
+    result = {
+        "min_s": round(min(runs), 6),
+        "median_s": round(statistics.median(runs), 6),
+        "runs_s": [round(r, 6) for r in runs],
+    }
+    result.update(extra)
+    return result
+
+
+def _create_facade(db_path: str, cache_path: str):
+    """
+    Собирает AppFacade на отдельной БД так же, как DependencyContainer.
+    БД открывается собственным DatabaseManager: путь к ней не становится
+    текущей БД приложения.
+    """
+    from services import AppFacade, EventBus, ImportService, StatisticsService, app_config
+    from db.manager import DatabaseManager
+    from db.repositories import (
+        TournamentRepository,
+        SessionRepository,
+        OverallStatsRepository,
+        PlaceDistributionRepository,
+        FinalTableHandRepository,
+    )
+
+    db_manager = DatabaseManager(db_path)
+    event_bus = EventBus()
+    tournament_repo = TournamentRepository(db_manager)
+    session_repo = SessionRepository(db_manager)
+    ft_hand_repo = FinalTableHandRepository(db_manager)
+    import_service = ImportService(
+        tournament_repo=tournament_repo,
+        session_repo=session_repo,
+        ft_hand_repo=ft_hand_repo,
+        event_bus=event_bus,
+    )
+    statistics_service = StatisticsService(
+        tournament_repo=tournament_repo,
+        session_repo=session_repo,
+        overall_stats_repo=OverallStatsRepository(db_manager),
+        place_dist_repo=PlaceDistributionRepository(db_manager),
+        ft_hand_repo=ft_hand_repo,
+        cache_file_path=cache_path,
+        event_bus=event_bus,
+    )
+    return AppFacade(app_config, db_manager, event_bus, import_service, statistics_service)
+
+
+def bench_parsers(config: GeneratorConfig, repeat: int) -> Dict[str, Any]:
+    """Пропускная способность парсеров HH и TS на текстах в памяти."""
+    from parsers.hand_history import HandHistoryParser
+    from parsers.tournament_summary import TournamentSummaryParser
+
+    tournaments = generate_tournaments(config)
+    hh_texts = [t.hh_text for t in tournaments]
+    ts_texts = [t.ts_text for t in tournaments]
+    hands = sum(t.hands for t in tournaments)
+    hh_bytes = sum(len(text.encode("utf-8")) for text in hh_texts)
+
+    def parse_hh():
+        for text in hh_texts:
+            HandHistoryParser(HERO).parse(text, "bench.txt")
+
+    def parse_ts():
+        for text in ts_texts:
+            TournamentSummaryParser(HERO).parse(text, "bench.txt")
+
+    hh_runs = [_timed(parse_hh) for _ in range(repeat)]
+    ts_runs = [_timed(parse_ts) for _ in range(repeat)]
+    return {
+        "parse_hh": _summary(
+            hh_runs,
+            files=len(hh_texts),
+            hands=hands,
+            hands_per_s=round(hands / min(hh_runs), 1),
+            mb_per_s=round(hh_bytes / 1024 / 1024 / min(hh_runs), 3),
+        ),
+        "parse_ts": _summary(
+            ts_runs,
+            files=len(ts_texts),
+            files_per_s=round(len(ts_texts) / min(ts_runs), 1),
+        ),
+    }
+
+
+def _import_round(config: GeneratorConfig, work_dir: str, incremental_share: float) -> Dict[str, float]:
+    """Один прогон: импорт, догрузка, полный пересчёт, StatsGrid, пагинация."""
+    from services import DataImportedEvent, app_config
+
+    dataset = write_dataset(os.path.join(work_dir, "files"), config)
+    files = sorted(dataset["hh_files"] + dataset["ts_files"])
+    tail = max(1, int(config.tournaments * incremental_share))
+    tail_ids = {str(config.first_tournament_id + i)
+                for i in range(config.tournaments - tail, config.tournaments)}
+    late = {f for f in files if os.path.basename(f).split("#")[1].split(" ")[0] in tail_ids}
+    early = [f for f in files if f not in late]
+    late = sorted(late)
+
+    facade = _create_facade(
+        os.path.join(work_dir, "bench.db"), os.path.join(work_dir, "stats_cache.json")
+    )
+    timings: Dict[str, float] = {}
+    try:
+        timings["import_full"] = _timed(lambda: facade.import_files(early, "bench"))
+
+        previous = app_config.import_profiling
+        app_config.import_profiling = True
+        try:
+            # Профиль догрузки приходит в DataImportedEvent
+            profiles: List[Dict[str, Any]] = []
+
+            def on_imported(event):
+                if event.profile:
+                    profiles.append(event.profile)
+
+            facade.event_bus.subscribe(DataImportedEvent, on_imported)
+            timings["import_incremental"] = _timed(lambda: facade.import_files(late, "bench-tail"))
+        finally:
+            app_config.import_profiling = previous
+        stages = {s["stage"]: s for s in profiles[-1]["stages"]} if profiles else {}
+        if "stats_update" in stages:
+            timings["stats_incremental"] = stages["stats_update"]["wall_s"]
+
+        timings["stats_full"] = _timed(lambda: facade.statistics_service.update_all_statistics(
+            session_id=None, db_path=facade.db_path, use_incremental=False
+        ))
+        timings["statsgrid_viewmodel"] = _timed(facade.create_stats_grid_viewmodel)
+
+        def paginate():
+            page = facade.get_tournaments_paginated(page=1, page_size=PAGE_SIZE)
+            for number in range(2, page.total_pages + 1):
+                facade.get_tournaments_paginated(page=number, page_size=PAGE_SIZE)
+
+        timings["pagination"] = _timed(paginate)
+    finally:
+        facade.db_manager.close_all_connections()
+    return timings
+
+
+def _bulk_import_db_save(files: List[str], work_dir: str, min_rows: int) -> float:
+    """Этап db_save (из профайлера) импорта files в пустую БД."""
+    from services import DataImportedEvent, app_config
+
+    facade = _create_facade(
+        os.path.join(work_dir, f"bulk_{min_rows}.db"), os.path.join(work_dir, f"bulk_{min_rows}.json")
+    )
+    profiles: List[Dict[str, Any]] = []
+
+    def on_imported(event):
+        if event.profile:
+            profiles.append(event.profile)
+
+    # EventBus хранит слабые ссылки: обработчик держится локальной переменной
+    facade.event_bus.subscribe(DataImportedEvent, on_imported)
+    previous = (app_config.import_profiling, app_config.bulk_import_min_rows)
+    app_config.import_profiling, app_config.bulk_import_min_rows = True, min_rows
+    try:
+        facade.import_files(files, "bulk")
+    finally:
+        app_config.import_profiling, app_config.bulk_import_min_rows = previous
+        facade.db_manager.close_all_connections()
+    stages = {s["stage"]: s for s in profiles[-1]["stages"]}
+    return stages["db_save"]["wall_s"]
+
+
+def bench_bulk_import(config: GeneratorConfig, repeat: int) -> Dict[str, Any]:
+    """
+    Первый импорт в пустую БД: вставка с отложенным построением индексов
+    (bulk_import_min_rows=1) против вставки с индексами (0 - никогда).
+    Замеряется только сохранение в БД, без разбора файлов.
+    """
+    work_dir = tempfile.mkdtemp(prefix="royal_stats_bench_")
+    try:
+        dataset = write_dataset(os.path.join(work_dir, "files"), config)
+        files = sorted(dataset["hh_files"] + dataset["ts_files"])
+        indexed_runs, deferred_runs = [], []
+        for _ in range(repeat):
+            indexed_runs.append(_bulk_import_db_save(files, tempfile.mkdtemp(dir=work_dir), 0))
+            deferred_runs.append(_bulk_import_db_save(files, tempfile.mkdtemp(dir=work_dir), 1))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return {
+        "bulk_import_db_save": _summary(
+            deferred_runs,
+            tournaments=config.tournaments,
+            indexed_min_s=round(min(indexed_runs), 6),
+            speedup=round(min(indexed_runs) / min(deferred_runs), 2),
+        ),
+    }
+
+
+def bench_time_series(repeat: int, tournaments: int = 500_000) -> Dict[str, Any]:
+    """Временные ряды для графика по большой БД: чтение колонок и расчёт."""
+    import sqlite3
+    import random
+    from services import app_config  # noqa: F401  (services до db, как в приложении)
+    from db import migrations
+    from db.manager import ReadOnlyDatabaseManager
+    from db.repositories import TournamentRepository
+    from analytics.time_series import TournamentTimeSeries
+
+    rng = random.Random(7)
+    work_dir = tempfile.mkdtemp(prefix="royal_stats_bench_")
+    db_path = os.path.join(work_dir, "time_series.db")
+    try:
+        conn = sqlite3.connect(db_path)
+        migrations.migrate(conn)
+        start = 1_600_000_000
+        rows = []
+        for number in range(tournaments):
+            epoch = start + number * 90
+            place = rng.randint(1, 18)
+            rows.append((
+                str(number), epoch, epoch // 86400, rng.choice((1.0, 3.0, 10.0, 25.0)),
+                rng.random() * 100 if place <= 3 else 0.0, place, rng.random() * 3,
+            ))
+        conn.executemany(
+            "INSERT INTO tournaments (tournament_id, start_epoch, start_day, buyin, payout, finish_place, ko_count)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+        conn.commit()
+        conn.close()
+
+        db_manager = ReadOnlyDatabaseManager(db_path)
+        repo = TournamentRepository(db_manager)
+
+        read_runs: List[float] = []
+        compute_runs: List[float] = []
+        try:
+            for _ in range(repeat):
+                started = time.perf_counter()
+                rows = repo.get_time_series_rows()
+                read_runs.append(time.perf_counter() - started)
+
+                def compute():
+                    series = TournamentTimeSeries.from_rows(rows)
+                    series.cumulative_profit()
+                    series.rolling(100)
+                    series.daily()
+
+                compute_runs.append(_timed(compute))
+        finally:
+            db_manager.close_connection()
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    runs = [r + c for r, c in zip(read_runs, compute_runs)]
+    return {"time_series": _summary(
+        runs,
+        tournaments=tournaments,
+        read_min_s=round(min(read_runs), 6),
+        compute_min_s=round(min(compute_runs), 6),
+    )}
+
+
+def bench_line_classifier(config: GeneratorConfig, repeat: int) -> Dict[str, Any]:
+    """
+    Классификация строк HH: единый RE_HH_LINE против прежней цепочки
+    strip() + RE_ACTION / RE_RAISE_TO / RE_UNCALLED / RE_COLLECTED.
+    """
+    from parsers import hand_history as hh
+
+    lines = [line for t in generate_tournaments(config) for line in t.hh_text.splitlines()]
+
+    def legacy():
+        for raw in lines:
+            line = raw.strip()
+            if line.startswith(('*** FLOP ***', '*** TURN ***', '*** RIVER ***')):
+                continue
+            m_action = hh.RE_ACTION.match(line)
+            if m_action and m_action.group('action') == 'raises':
+                hh.RE_RAISE_TO.search(line)
+            hh.RE_UNCALLED.match(line)
+            hh.RE_COLLECTED.match(line)
+
+    def merged():
+        match = hh.RE_HH_LINE.match
+        for line in lines:
+            if line.startswith('***'):
+                continue
+            m_line = match(line)
+            if m_line:
+                m_line.lastgroup
+
+    legacy_runs = [_timed(legacy) for _ in range(repeat)]
+    merged_runs = [_timed(merged) for _ in range(repeat)]
+    return {
+        "line_classifier": _summary(
+            merged_runs,
+            lines=len(lines),
+            legacy_min_s=round(min(legacy_runs), 6),
+            speedup=round(min(legacy_runs) / min(merged_runs), 2),
+        ),
+    }
+
+
+def bench_pot_engine(config: GeneratorConfig, repeat: int, hands: int = 20000) -> Dict[str, Any]:
+    """Разбор банков и подсчёт KO на мультивейных раздачах с олл-инами."""
+    import random
+    from parsers.hand_history import HandData, HandHistoryParser
+
+    rng = random.Random(config.seed)
+    parser = HandHistoryParser(HERO)
+    prepared = []
+    for number in range(hands):
+        players = [HERO] + [f"P{i}" for i in range(1, FINAL_TABLE_SIZE)]
+        seats = {p: rng.randint(5, 60) * 100 for p in players}
+        seats[HERO] = 10000
+        # Часть игроков выставляется, остальные сбрасывают после анте
+        all_in = rng.sample(players[1:], rng.randint(2, 6))
+        cover = max(seats[p] for p in all_in)
+        contrib = {p: (seats[p] if p in all_in else 50) for p in players}
+        contrib[HERO] = min(cover, seats[HERO])
+        hand = HandData(f"H{number}", number, "1", FINAL_TABLE_SIZE, 100.0, seats)
+        hand.contrib = contrib
+        winner = rng.choice([HERO, all_in[0]])
+        hand.collects = {winner: sum(contrib.values())}
+        hand.eliminated_players = {p for p in all_in if p != winner}
+        prepared.append(hand)
+
+    def run():
+        for hand in prepared:
+            hand.pots, hand.pot_index = parser._build_pots(hand.contrib)
+            parser._assign_winners(hand.pots, hand.collects, hand.pot_index)
+            parser._count_ko_in_hand_from_data(hand)
+
+    runs = [_timed(run) for _ in range(repeat)]
+    return {"pot_engine": _summary(runs, hands=hands, hands_per_s=round(hands / min(runs), 1))}
+
+
+def bench_pipeline(config: GeneratorConfig, repeat: int,
+                   incremental_share: float = 0.1) -> Dict[str, Any]:
+    """Импорт и статистика на временной БД; каждый повтор — с чистой БД."""
+    rounds: List[Dict[str, float]] = []
+    for _ in range(repeat):
+        work_dir = tempfile.mkdtemp(prefix="royal_stats_bench_")
+        try:
+            rounds.append(_import_round(config, work_dir, incremental_share))
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    results: Dict[str, Any] = {}
+    for name in rounds[0]:
+        runs = [r[name] for r in rounds if name in r]
+        results[name] = _summary(runs)
+    results["import_full"]["tournaments"] = config.tournaments - max(1, int(config.tournaments * incremental_share))
+    results["import_incremental"]["tournaments"] = max(1, int(config.tournaments * incremental_share))
+    return results
+
+
+def bench_cold_start(repeat: int, budget_s: float = COLD_START_BUDGET_S) -> Dict[str, Any]:
+    """
+    Холодный старт: каждый повтор - новый интерпретатор (benchmarks.cold_start)
+    на пустой временной БД. Время считается от запуска процесса до показа
+    главного окна; без PyQt6 - до первого расчёта стата.
+    """
+    repo_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    runs: List[float] = []
+    phase_runs: Dict[str, List[float]] = {}
+    for _ in range(repeat):
+        work_dir = tempfile.mkdtemp(prefix="royal_stats_bench_")
+        try:
+            # Часы time.time() общие для процессов: так в замер входит старт
+            # интерпретатора, но не завершение дочернего процесса
+            started_at = time.time()
+            completed = subprocess.run(
+                [sys.executable, "-m", "benchmarks.cold_start",
+                 os.path.join(work_dir, "cold_start.db"), os.path.join(work_dir, "stats_cache.json")],
+                cwd=repo_dir, capture_output=True, text=True, check=True,
+            )
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+        phases = json.loads(completed.stdout.strip().splitlines()[-1])
+        runs.append(phases.pop("ready_at") - started_at)
+        for name, value in phases.items():
+            if value is not None:
+                phase_runs.setdefault(name, []).append(value)
+
+    return {"cold_start": _summary(
+        runs,
+        measured_until="first_window" if "first_window" in phase_runs else "first_stat",
+        phases_s={name: round(min(values), 6) for name, values in phase_runs.items()},
+        budget_s=budget_s,
+        within_budget=min(runs) <= budget_s,
+    )}
+
+
+def run_suite(config: GeneratorConfig, repeat: int = 3) -> Dict[str, Any]:
+    """Запускает все бенчмарки и возвращает результат, готовый для JSON."""
+    repo_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    benchmarks: Dict[str, Any] = {}
+    benchmarks.update(bench_parsers(config, repeat))
+    benchmarks.update(bench_line_classifier(config, repeat))
+    benchmarks.update(bench_pot_engine(config, repeat))
+    benchmarks.update(bench_pipeline(config, repeat))
+    benchmarks.update(bench_bulk_import(config, repeat))
+    benchmarks.update(bench_time_series(repeat))
+    benchmarks.update(bench_cold_start(repeat))
+    return {
+        "format_version": RESULTS_FORMAT_VERSION,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "git": _git_revision(repo_dir),
+        "environment": {
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "config": config.as_dict(),
+        "repeat": repeat,
+        "benchmarks": benchmarks,
+    }
+
+
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Сравнивает два результата по min_s.
+
+    ratio > 1 означает замедление относительно baseline.
+    """
+    rows = []
+    for name, entry in current.get("benchmarks", {}).items():
+        base = baseline.get("benchmarks", {}).get(name)
+        if not base or not base.get("min_s"):
+            continue
+        rows.append({
+            "benchmark": name,
+            "baseline_s": base["min_s"],
+            "current_s": entry["min_s"],
+            "ratio": round(entry["min_s"] / base["min_s"], 3),
+        })
+    return rows
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+
+"""
+Массовая загрузка с отложенным построением индексов.
+
+При первом импорте большого архива в пустую или маленькую БД каждая
+вставка обновляет все индексы tournaments и hero_final_table_hands.
+Дешевле удалить неуникальные индексы из db.schema.CREATE_INDEXES,
+загрузить пакет и построить индексы заново одной сортировкой, после чего
+обновить статистику планировщика (ANALYZE). Уникальные автоиндексы
+(tournament_id, (tournament_id, hand_id)) остаются: на них опираются
+upsert и проверка уже импортированных раздач.
+
+Пока индексы удалены, в db_meta лежит отметка. Если импорт прервался
+(падение программы), индексы восстанавливаются при следующем импорте
+(restore_deferred_indexes).
+
+Выигрыш на сохранении первого импорта в бенчмарке (bench_bulk_import) -
+около 1.05-1.1x, поэтому по умолчанию режим выключен
+(bulk_import_min_rows = 0 в config.ini).
+"""
+
+import sqlite3
+import logging
+from contextlib import contextmanager
+from typing import Iterator, List, Sequence
+
+import db.schema
+import db.migrations
+
+logger = logging.getLogger('ROYAL_Stats.Database')
+
+# Таблицы, индексы которых откладываются при массовой загрузке
+BULK_LOAD_TABLES = ("tournaments", "hero_final_table_hands")
+
+
+def deferrable_indexes(tables: Sequence[str] = BULK_LOAD_TABLES) -> List[str]:
+    """Имена индексов из CREATE_INDEXES, построенных по таблицам tables."""
+    names = []
+    for index_query in db.schema.CREATE_INDEXES:
+        index_name, _, target = index_query.split("IF NOT EXISTS ")[1].partition(" ON ")
+        if target.split("(")[0].strip() in tables:
+            names.append(index_name.strip())
+    return names
+
+
+def estimate_rows(conn: sqlite3.Connection, tables: Sequence[str] = BULK_LOAD_TABLES) -> int:
+    """
+    Оценка числа строк в таблицах по максимальному rowid: поиск по
+    первичному ключу вместо COUNT(*) по всей таблице. После удалений
+    оценка завышена, что для эвристики безопасно.
+    """
+    total = 0
+    for table in tables:
+        total += conn.execute(f"SELECT COALESCE(MAX(rowid), 0) FROM {table}").fetchone()[0]
+    return total
+
+
+def should_defer_indexes(existing_rows: int, incoming_rows: int, min_rows: int) -> bool:
+    """
+    Выгоднее ли перестроить индексы, чем обновлять их при каждой вставке.
+
+    Перестроение сортирует всю таблицу, поэтому окупается, когда пакет не
+    меньше уже имеющихся данных; маленькие пакеты (< min_rows) всегда
+    вставляются с индексами. min_rows <= 0 отключает отложенные индексы.
+    """
+    if min_rows <= 0 or incoming_rows < min_rows:
+        return False
+    return incoming_rows >= existing_rows
+
+
+def rebuild_indexes(conn: sqlite3.Connection, tables: Sequence[str] = BULK_LOAD_TABLES) -> None:
+    """Строит недостающие индексы, обновляет статистику планировщика и снимает отметку."""
+    cursor = conn.cursor()
+    db.migrations.ensure_indexes(cursor)
+    for table in tables:
+        cursor.execute(f"ANALYZE {table}")
+    cursor.execute("DELETE FROM db_meta WHERE key = ?", (db.schema.DB_META_DEFERRED_INDEXES,))
+    conn.commit()
+
+
+def restore_deferred_indexes(conn: sqlite3.Connection) -> bool:
+    """
+    Восстанавливает индексы, оставшиеся удалёнными после прерванной
+    массовой загрузки. Returns: True, если индексы пришлось строить.
+    """
+    row = conn.execute(
+        "SELECT value FROM db_meta WHERE key = ?", (db.schema.DB_META_DEFERRED_INDEXES,)
+    ).fetchone()
+    if row is None:
+        return False
+    logger.warning("Индексы не были восстановлены после прерванного импорта, строим заново")
+    rebuild_indexes(conn)
+    return True
+
+
+@contextmanager
+def deferred_indexes(conn: sqlite3.Connection, tables: Sequence[str] = BULK_LOAD_TABLES) -> Iterator[None]:
+    """
+    Контекст массовой загрузки: на входе удаляет неуникальные индексы
+    таблиц tables, на выходе (в том числе при ошибке) строит их заново
+    и выполняет ANALYZE.
+
+    Транзакцию загрузки контекст не охватывает: репозитории фиксируют
+    пакеты сами, и при ошибке откатывается только незафиксированный
+    остаток, а уже сохранённые строки остаются в БД.
+    """
+    names = deferrable_indexes(tables)
+    cursor = conn.cursor()
+    # Отметка и удаление индексов - одна транзакция
+    cursor.execute(
+        "INSERT OR REPLACE INTO db_meta (key, value) VALUES (?, ?)",
+        (db.schema.DB_META_DEFERRED_INDEXES, ",".join(names)),
+    )
+    for index_name in names:
+        cursor.execute(f"DROP INDEX IF EXISTS {index_name}")
+    conn.commit()
+    logger.info(f"Массовая загрузка: индексы {', '.join(names)} будут построены после вставки")
+    try:
+        yield
+    except BaseException:
+        # Незафиксированный остаток пакета отбрасывается до перестроения индексов
+        conn.rollback()
+        raise
+    finally:
+        rebuild_indexes(conn, tables)
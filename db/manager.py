@@ -14,6 +14,7 @@ from typing import Optional, List, Dict, Any
 
 from services.app_config import app_config
 import db.schema # Импортируем схему для создания таблиц
+import db.migrations # Реестр миграций схемы
 
 # Настройка логирования
 logger = logging.getLogger('ROYAL_Stats.Database')
@@ -98,17 +99,24 @@ class DatabaseManager:
     Поддерживает переключение между файлами БД и инициализацию схемы.
     """
 
-    def __init__(self):
+    def __init__(self, db_path: Optional[str] = None):
         """
         Инициализирует менеджер БД.
         Путь к БД берется из app_config.current_db_path при первом подключении.
+
+        Args:
+            db_path: Путь к БД для отдельного менеджера (CLI, бенчмарки, тесты).
+                Такой менеджер не сохраняет свой путь в конфиг и не трогает
+                папку БД приложения.
         """
-        self._db_path = app_config.current_db_path  # Текущий активный путь к БД
+        self._persist_path = db_path is None  # Сохранять ли путь в app_config
+        self._db_path = app_config.current_db_path if db_path is None else db_path  # Текущий активный путь к БД
         self._conn_manager: Optional[ThreadLocalConnection] = None
         self._is_initialized = False # Флаг, показывающий, была ли инициализирована текущая БД
 
         # Убеждаемся, что папка для БД существует
-        os.makedirs(app_config.db_dir, exist_ok=True)
+        if self._persist_path:
+            os.makedirs(app_config.db_dir, exist_ok=True)
 
     @property
     def db_path(self) -> str:
@@ -126,7 +134,8 @@ class DatabaseManager:
             self._db_path = new_db_path
             self._conn_manager = None # Сбрасываем менеджер соединений
             self._is_initialized = False # Сбрасываем флаг инициализации
-            app_config.set_current_db_path(new_db_path)  # Сохраняем новый путь в конфиг
+            if self._persist_path:
+                app_config.set_current_db_path(new_db_path)  # Сохраняем новый путь в конфиг
 
 
     def get_connection(self) -> sqlite3.Connection:
@@ -245,89 +254,73 @@ class DatabaseManager:
         
     def initialize_db(self, conn: sqlite3.Connection) -> None:
         """
-        Инициализирует базу данных, создавая необходимые таблицы и начальные записи.
-        Вызывается при первом подключении к новой или пустой БД.
+        Приводит схему БД к актуальной версии (db.migrations).
+        Для актуальной БД это одно чтение PRAGMA user_version.
         """
         try:
-            cursor = conn.cursor()
-
-            # Создаем все таблицы
-            for query in db.schema.CREATE_TABLES_QUERIES:
-                cursor.execute(query)
-
-            # Вставляем начальные данные (overall_stats, places_distribution)
-            for query in db.schema.INITIALIZATION_QUERIES:
-                 cursor.execute(query)
-
-            # Проверяем и добавляем новые колонки для существующих таблиц (миграции)
-            # Проверяем наличие колонки final_table_start_players в таблице tournaments
-            cursor.execute("PRAGMA table_info(tournaments)")
-            columns = [col[1] for col in cursor.fetchall()]
-            if 'final_table_start_players' not in columns:
-                cursor.execute("ALTER TABLE tournaments ADD COLUMN final_table_start_players INTEGER")
-                # Отладочная информация о миграции схемы
-                logger.debug("Добавлена колонка final_table_start_players в таблицу tournaments")
-            
-            # Проверяем наличие колонки hero_ko_attempts в таблице hero_final_table_hands
-            cursor.execute("PRAGMA table_info(hero_final_table_hands)")
-            columns = [col[1] for col in cursor.fetchall()]
-            if 'hero_ko_attempts' not in columns:
-                cursor.execute("ALTER TABLE hero_final_table_hands ADD COLUMN hero_ko_attempts INTEGER DEFAULT 0")
-                logger.debug("Добавлена колонка hero_ko_attempts в таблицу hero_final_table_hands")
-
-            # Проверяем наличие колонки pre_ft_chipev в таблице overall_stats
-            cursor.execute("PRAGMA table_info(overall_stats)")
-            columns = [col[1] for col in cursor.fetchall()]
-            if 'pre_ft_chipev' not in columns:
-                cursor.execute("ALTER TABLE overall_stats ADD COLUMN pre_ft_chipev REAL DEFAULT 0")
-                logger.debug("Добавлена колонка pre_ft_chipev в таблицу overall_stats")
-            
-            # Обновление индексов для существующих БД
-            self._update_indexes(cursor)
-
-            conn.commit()
-            logger.info(f"База данных успешно инициализирована: {self._db_path}")
-
+            applied = db.migrations.migrate(conn)
+            if applied:
+                logger.info(f"База данных успешно инициализирована: {self._db_path}")
         except Exception as e:
-            conn.rollback() # Откатываем все изменения при ошибке
             logger.critical(f"Критическая ошибка при инициализации базы данных {self._db_path}: {str(e)}")
             # В реальном приложении здесь можно показать сообщение пользователю
             # и, возможно, завершить работу или предложить выбрать другую БД.
             raise # Пробрасываем исключение, так как работа без схемы невозможна
-    
-    def _update_indexes(self, cursor: sqlite3.Cursor) -> None:
+
+
+class ReadOnlyDatabaseManager:
+    """
+    Подключение только для чтения к произвольному файлу БД.
+
+    В отличие от DatabaseManager не меняет путь текущей БД в конфиге,
+    не создаёт таблиц и не выполняет миграций, поэтому годится для
+    чтения чужих БД (например, в сводной статистике по нескольким БД).
+    Совместим с репозиториями по execute_query и get_connection.
+    Соединение создаётся отдельно для каждого потока.
+    """
+
+    def __init__(self, db_path: str):
+        self._db_path = db_path
+        self._local = threading.local()
+
+    @property
+    def db_path(self) -> str:
+        """Возвращает путь к базе данных."""
+        return self._db_path
+
+    def get_connection(self) -> sqlite3.Connection:
+        """Возвращает соединение только для чтения для текущего потока."""
+        conn = getattr(self._local, 'connection', None)
+        if conn is None:
+            from urllib.request import pathname2url
+
+            uri = "file:" + pathname2url(os.path.abspath(self._db_path)) + "?mode=ro"
+            conn = sqlite3.connect(uri, uri=True, timeout=30.0)
+            conn.execute("PRAGMA query_only = ON")
+            conn.execute("PRAGMA cache_size = -64000")
+            conn.execute("PRAGMA temp_store = MEMORY")
+            conn.execute("PRAGMA mmap_size = 268435456")
+            conn.row_factory = sqlite3.Row
+            self._local.connection = conn
+        return conn
+
+    def execute_query(self, query: str, params=None) -> List[sqlite3.Row]:
         """
-        Проверяет и создает недостающие индексы для оптимизации производительности.
-        Безопасно для выполнения на существующих БД - CREATE INDEX IF NOT EXISTS.
+        Выполняет SELECT запрос. Ошибки (например, устаревшая схема БД)
+        пробрасываются, чтобы вызывающий код мог пропустить такую БД.
         """
-        try:
-            # Получаем список существующих индексов
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='index'")
-            existing_indexes = set(row[0] for row in cursor.fetchall())
-            
-            # Подсчитываем созданные индексы
-            created_indexes = 0
-            
-            # Создаем недостающие индексы
-            for index_query in db.schema.CREATE_INDEXES:
-                # Извлекаем имя индекса из запроса
-                index_name = index_query.split("IF NOT EXISTS ")[1].split(" ON")[0].strip()
-                
-                if index_name not in existing_indexes:
-                    try:
-                        cursor.execute(index_query)
-                        created_indexes += 1
-                        logger.debug(f"Создан индекс: {index_name}")
-                    except sqlite3.Error as e:
-                        # Если индекс уже существует под другим именем или есть другая проблема
-                        logger.warning(f"Не удалось создать индекс {index_name}: {e}")
-            
-            if created_indexes > 0:
-                logger.info(f"Создано {created_indexes} новых индексов для оптимизации производительности")
-                
-        except Exception as e:
-            logger.error(f"Ошибка при обновлении индексов: {e}")
-            # Не прерываем инициализацию БД из-за проблем с индексами
+        cursor = self.get_connection().cursor()
+        cursor.execute(query, params or ())
+        return cursor.fetchall()
+
+    def close_connection(self):
+        """Закрывает соединение текущего потока."""
+        conn = getattr(self._local, 'connection', None)
+        if conn is not None:
+            conn.close()
+            self._local.connection = None
+
+    close_all_connections = close_connection
 
 
 # Синглтон менеджер БД
@@ -0,0 +1,244 @@
+# -*- coding: utf-8 -*-
+
+"""
+Реестр миграций схемы БД.
+
+Версия схемы хранится в PRAGMA user_version, поэтому проверка актуальной
+БД при открытии - одно чтение этой PRAGMA. Для БД со старой версией
+миграции выполняются по порядку, каждая в своей транзакции вместе с
+записью нового номера версии: прерванная миграция при следующем открытии
+повторяется целиком.
+
+Новая БД проходит все миграции с первой, поэтому миграции должны быть
+идемпотентны (CREATE ... IF NOT EXISTS, проверка колонок перед ALTER).
+Новое изменение схемы - новая функция с декоратором @migration и
+следующим номером; уже выпущенные миграции не меняются.
+"""
+
+import sqlite3
+import logging
+from dataclasses import dataclass
+from typing import Callable, Dict, List
+
+from services.app_config import app_config
+import db.schema
+
+logger = logging.getLogger('ROYAL_Stats.Database')
+
+
+@dataclass(frozen=True)
+class Migration:
+    """Шаг миграции схемы до версии version."""
+
+    version: int
+    description: str
+    apply: Callable[[sqlite3.Cursor], None]
+
+
+# Миграции в порядке возрастания версии
+MIGRATIONS: List[Migration] = []
+
+
+def migration(version: int, description: str):
+    """Регистрирует функцию миграции схемы до указанной версии."""
+    def decorator(func: Callable[[sqlite3.Cursor], None]):
+        if MIGRATIONS and version != MIGRATIONS[-1].version + 1:
+            raise ValueError(f"Миграция {version} зарегистрирована не по порядку")
+        MIGRATIONS.append(Migration(version, description, func))
+        return func
+    return decorator
+
+
+def _table_columns(cursor: sqlite3.Cursor, table: str) -> List[str]:
+    cursor.execute(f"PRAGMA table_info({table})")
+    return [col[1] for col in cursor.fetchall()]
+
+
+def ensure_indexes(cursor: sqlite3.Cursor) -> None:
+    """
+    Создает недостающие индексы из db.schema.CREATE_INDEXES.
+    Индекс по колонке, которую добавит одна из следующих миграций,
+    пропускается; индекс, который не удалось создать, пропускается
+    с предупреждением.
+    """
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='index'")
+    existing_indexes = set(row[0] for row in cursor.fetchall())
+    table_columns: Dict[str, List[str]] = {}
+
+    created_indexes = 0
+    for index_query in db.schema.CREATE_INDEXES:
+        # Извлекаем имя индекса, таблицу и колонки из запроса
+        index_name, _, target = index_query.split("IF NOT EXISTS ")[1].partition(" ON ")
+        index_name = index_name.strip()
+        if index_name in existing_indexes:
+            continue
+        table, _, columns = target.partition("(")
+        table = table.strip()
+        if table not in table_columns:
+            table_columns[table] = _table_columns(cursor, table)
+        if not all(c.strip() in table_columns[table] for c in columns.rstrip(") ").split(",")):
+            logger.debug(f"Индекс {index_name} отложен до миграции, добавляющей его колонки")
+            continue
+        try:
+            cursor.execute(index_query)
+            created_indexes += 1
+            logger.debug(f"Создан индекс: {index_name}")
+        except sqlite3.Error as e:
+            # Если индекс уже существует под другим именем или есть другая проблема
+            logger.warning(f"Не удалось создать индекс {index_name}: {e}")
+
+    if created_indexes > 0:
+        logger.info(f"Создано {created_indexes} новых индексов для оптимизации производительности")
+
+
+@migration(1, "Базовая схема и миграции колонок до введения user_version")
+def _baseline_schema(cursor: sqlite3.Cursor) -> None:
+    # Создаем все таблицы
+    for query in db.schema.CREATE_TABLES_QUERIES:
+        cursor.execute(query)
+
+    # Вставляем начальные данные (overall_stats, places_distribution)
+    for query in db.schema.INITIALIZATION_QUERIES:
+        cursor.execute(query)
+
+    # Колонки, добавленные в схему после первых версий программы
+    if 'final_table_start_players' not in _table_columns(cursor, 'tournaments'):
+        cursor.execute("ALTER TABLE tournaments ADD COLUMN final_table_start_players INTEGER")
+        logger.debug("Добавлена колонка final_table_start_players в таблицу tournaments")
+
+    columns = _table_columns(cursor, 'hero_final_table_hands')
+    if 'hero_ko_attempts' not in columns:
+        cursor.execute("ALTER TABLE hero_final_table_hands ADD COLUMN hero_ko_attempts INTEGER DEFAULT 0")
+        logger.debug("Добавлена колонка hero_ko_attempts в таблицу hero_final_table_hands")
+
+    # KO перед финалкой без коэффициента. Для уже посчитанных рук
+    # восстанавливается делением pre_ft_ko на текущий коэффициент.
+    if 'pre_ft_raw_ko' not in columns:
+        cursor.execute("ALTER TABLE hero_final_table_hands ADD COLUMN pre_ft_raw_ko INTEGER DEFAULT 0")
+        cte, params = db.schema.ko_coeff_cte(app_config.ko_coeff)
+        cursor.execute(
+            f"""
+            {cte}
+            UPDATE hero_final_table_hands
+            SET pre_ft_raw_ko = CAST(ROUND(pre_ft_ko / (
+                SELECT value FROM ko_coeff WHERE players = players_count
+            )) AS INTEGER)
+            WHERE pre_ft_ko > 0
+              AND (SELECT value FROM ko_coeff WHERE players = players_count) > 0
+            """,
+            params,
+        )
+        logger.debug("Добавлена колонка pre_ft_raw_ko в таблицу hero_final_table_hands")
+
+    # Данные БД без отпечатка считаются посчитанными с текущим ko_coeff
+    cursor.execute(
+        "INSERT OR IGNORE INTO db_meta (key, value) VALUES (?, ?)",
+        (db.schema.DB_META_KO_COEFF, db.schema.ko_coeff_fingerprint(app_config.ko_coeff)),
+    )
+
+    columns = _table_columns(cursor, 'overall_stats')
+    if 'pre_ft_chipev' not in columns:
+        cursor.execute("ALTER TABLE overall_stats ADD COLUMN pre_ft_chipev REAL DEFAULT 0")
+        logger.debug("Добавлена колонка pre_ft_chipev в таблицу overall_stats")
+
+    # Накопительные суммы для инкрементального обновления overall_stats
+    for column, column_type in db.schema.OVERALL_STATS_AGGREGATE_COLUMNS:
+        if column not in columns:
+            cursor.execute(f"ALTER TABLE overall_stats ADD COLUMN {column} {column_type}")
+            logger.debug(f"Добавлена колонка {column} в таблицу overall_stats")
+
+    ensure_indexes(cursor)
+
+
+@migration(2, "Индексы под фактический набор запросов вместо избыточных")
+def _query_mix_indexes(cursor: sqlite3.Cursor) -> None:
+    # Индексы, не используемые ни одним запросом или дублирующие префикс
+    # другого индекса (в т.ч. автоиндекса UNIQUE(tournament_id, hand_id))
+    for index_name in (
+        "idx_tournaments_session",
+        "idx_tournaments_buyin",
+        "idx_tournaments_reached_ft",
+        "idx_tournaments_ft_place",
+        "idx_tournaments_ft_stacks",
+        "idx_tournaments_session_place",
+        "idx_tournaments_buyin_payout",
+        "idx_tournaments_id_ko",
+        "idx_tournaments_stats",
+        "idx_ft_hands_tournament",
+        "idx_ft_hands_session",
+        "idx_ft_hands_is_early",
+        "idx_ft_hands_ko",
+        "idx_ft_hands_early_ko",
+    ):
+        cursor.execute(f"DROP INDEX IF EXISTS {index_name}")
+    ensure_indexes(cursor)
+
+
+@migration(3, "Целочисленные start_epoch/start_day и индексы по ним вместо start_time")
+def _start_epoch_columns(cursor: sqlite3.Cursor) -> None:
+    columns = _table_columns(cursor, 'tournaments')
+    if 'start_epoch' not in columns:
+        cursor.execute("ALTER TABLE tournaments ADD COLUMN start_epoch INTEGER")
+    if 'start_day' not in columns:
+        cursor.execute("ALTER TABLE tournaments ADD COLUMN start_day INTEGER")
+    cursor.execute(
+        f"""
+        UPDATE tournaments
+        SET start_epoch = {db.schema.START_EPOCH_SQL},
+            start_day = {db.schema.START_EPOCH_SQL} / {db.schema.SECONDS_PER_DAY}
+        WHERE start_time IS NOT NULL AND start_epoch IS NULL
+        """
+    )
+    for index_name in (
+        "idx_tournaments_start_time",
+        "idx_tournaments_session_start",
+        "idx_tournaments_buyin_start",
+        "idx_tournaments_ft_start",
+    ):
+        cursor.execute(f"DROP INDEX IF EXISTS {index_name}")
+    ensure_indexes(cursor)
+
+
+def latest_schema_version() -> int:
+    """Версия схемы, до которой мигрирует эта версия программы."""
+    return MIGRATIONS[-1].version
+
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    """Версия схемы БД (0 - БД создана до введения user_version или пустая)."""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn: sqlite3.Connection) -> int:
+    """
+    Приводит схему БД к последней версии.
+
+    Returns:
+        Число выполненных миграций (0 - БД уже актуальна)
+    """
+    version = get_schema_version(conn)
+    latest = latest_schema_version()
+    if version == latest:
+        return 0
+    if version > latest:
+        logger.warning(
+            f"Схема БД новее программы (версия {version}, поддерживается {latest}), миграции пропущены"
+        )
+        return 0
+
+    applied = 0
+    for step in MIGRATIONS:
+        if step.version <= version:
+            continue
+        conn.execute("BEGIN")
+        try:
+            step.apply(conn.cursor())
+            # PRAGMA не принимает параметры; версия - целое из реестра
+            conn.execute(f"PRAGMA user_version = {int(step.version)}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        logger.info(f"Схема БД обновлена до версии {step.version}: {step.description}")
+        applied += 1
+    return applied
@@ -12,6 +12,9 @@ from .session_repo import SessionRepository
 from .overall_stats_repo import OverallStatsRepository
 from .place_distribution_repo import PlaceDistributionRepository
 from .final_table_hand_repo import FinalTableHandRepository
+from .hand_summary_repo import HandSummaryRepository
+from .meta_repo import MetaRepository
+from .stat_sketch_repo import StatSketchRepository
 
 __all__ = [
     'BaseRepository',
@@ -21,4 +24,7 @@ __all__ = [
     'OverallStatsRepository',
     'PlaceDistributionRepository',
     'FinalTableHandRepository',
+    'HandSummaryRepository',
+    'MetaRepository',
+    'StatSketchRepository',
 ]
\ No newline at end of file
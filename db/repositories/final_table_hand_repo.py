@@ -6,9 +6,10 @@
 
 import sqlite3
 import logging
-from typing import List, Optional
+from typing import Dict, List, Optional, Set, Tuple
 from db.manager import DatabaseManager, database_manager  # Используем синглтон менеджер БД
-from models import FinalTableHand
+from db.schema import ko_coeff_cte
+from models import FinalTableHand, FinalTableHandTotals
 from services.app_config import app_config
 
 logger = logging.getLogger('ROYAL_Stats.FinalTableHandRepository')
@@ -41,8 +42,8 @@ class FinalTableHandRepository:
             INSERT INTO hero_final_table_hands (
                 tournament_id, hand_id, hand_number, table_size, bb,
                 hero_stack, players_count, hero_ko_this_hand, pre_ft_ko,
-                hero_ko_attempts, session_id, is_early_final
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                hero_ko_attempts, session_id, is_early_final, pre_ft_raw_ko
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             ON CONFLICT(tournament_id, hand_id) DO NOTHING
         """
         params = (
@@ -58,6 +59,7 @@ class FinalTableHandRepository:
             hand.hero_ko_attempts,
             hand.session_id,
             hand.is_early_final,
+            hand.pre_ft_raw_ko,
         )
         
         result = self.db.execute_update(query, params)
@@ -72,8 +74,8 @@ class FinalTableHandRepository:
             INSERT INTO hero_final_table_hands (
                 tournament_id, hand_id, hand_number, table_size, bb,
                 hero_stack, players_count, hero_ko_this_hand, pre_ft_ko,
-                hero_ko_attempts, session_id, is_early_final
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                hero_ko_attempts, session_id, is_early_final, pre_ft_raw_ko
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             ON CONFLICT(tournament_id, hand_id) DO NOTHING
         """
 
@@ -91,6 +93,7 @@ class FinalTableHandRepository:
                 hand.hero_ko_attempts,
                 hand.session_id,
                 hand.is_early_final,
+                hand.pre_ft_raw_ko,
             )
             for hand in hands
         ]
@@ -106,6 +109,85 @@ class FinalTableHandRepository:
             raise
 
 
+    def update_ko_values(self, values: List[Tuple[float, float, int, int, str, str]]) -> int:
+        """
+        Пакетно перезаписывает KO-показатели раздач одной транзакцией.
+
+        Args:
+            values: Кортежи (hero_ko_this_hand, pre_ft_ko, hero_ko_attempts,
+                pre_ft_raw_ko, tournament_id, hand_id)
+
+        Returns:
+            Количество изменённых строк
+        """
+        if not values:
+            return 0
+
+        # Неизменившиеся строки не перезаписываются
+        query = """
+            UPDATE hero_final_table_hands
+            SET hero_ko_this_hand = ?1, pre_ft_ko = ?2, hero_ko_attempts = ?3, pre_ft_raw_ko = ?4
+            WHERE tournament_id = ?5 AND hand_id = ?6
+              AND (hero_ko_this_hand IS NOT ?1 OR pre_ft_ko IS NOT ?2
+                   OR hero_ko_attempts IS NOT ?3 OR pre_ft_raw_ko IS NOT ?4)
+        """
+        conn = self.db.get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.executemany(query, values)
+            conn.commit()
+            return cursor.rowcount
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"Ошибка пакетного обновления KO раздач: {e}")
+            raise
+
+    def apply_ko_coeff(self, ko_coeff: Dict[int, float]) -> int:
+        """
+        Пересчитывает pre_ft_ko и hero_ko_this_hand под новые коэффициенты
+        одним проходом по раздачам с KO перед финалкой, затем ko_count
+        затронутых турниров. Всё выполняется одной транзакцией.
+
+        Собственные KO раздачи - целое число, поэтому они восстанавливаются
+        как ROUND(hero_ko_this_hand - pre_ft_ko) без накопления ошибки.
+
+        Returns:
+            Количество изменённых раздач
+        """
+        cte, params = ko_coeff_cte(ko_coeff)
+        new_pre_ft_ko = "pre_ft_raw_ko * COALESCE((SELECT value FROM ko_coeff WHERE players = players_count), 0)"
+        hands_query = f"""
+            {cte}
+            UPDATE hero_final_table_hands
+            SET pre_ft_ko = {new_pre_ft_ko},
+                hero_ko_this_hand = ROUND(hero_ko_this_hand - pre_ft_ko) + {new_pre_ft_ko}
+            WHERE pre_ft_raw_ko > 0 AND pre_ft_ko IS NOT {new_pre_ft_ko}
+        """
+        tournaments_query = """
+            UPDATE tournaments
+            SET ko_count = (
+                SELECT COALESCE(SUM(h.hero_ko_this_hand), 0)
+                FROM hero_final_table_hands h
+                WHERE h.tournament_id = tournaments.tournament_id
+            )
+            WHERE tournament_id IN (
+                SELECT tournament_id FROM hero_final_table_hands WHERE pre_ft_raw_ko > 0
+            )
+        """
+        conn = self.db.get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(hands_query, params)
+            changed = cursor.rowcount
+            if changed:
+                cursor.execute(tournaments_query)
+            conn.commit()
+            return changed
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"Ошибка пересчёта KO под новые коэффициенты: {e}")
+            raise
+
     def get_hands_by_tournament(self, tournament_id: str) -> List[FinalTableHand]:
         """
         Возвращает все раздачи финального стола для указанного турнира.
@@ -115,7 +197,7 @@ class FinalTableHandRepository:
             SELECT
                 id, tournament_id, hand_id, hand_number, table_size, bb,
                 hero_stack, players_count, hero_ko_this_hand, pre_ft_ko,
-                hero_ko_attempts, session_id, is_early_final
+                hero_ko_attempts, session_id, is_early_final, pre_ft_raw_ko
             FROM hero_final_table_hands
             WHERE tournament_id = ?
             ORDER BY hand_number ASC
@@ -131,7 +213,7 @@ class FinalTableHandRepository:
             SELECT
                 id, tournament_id, hand_id, hand_number, table_size, bb,
                 hero_stack, players_count, hero_ko_this_hand, pre_ft_ko,
-                hero_ko_attempts, session_id, is_early_final
+                hero_ko_attempts, session_id, is_early_final, pre_ft_raw_ko
             FROM hero_final_table_hands
             WHERE session_id = ?
             ORDER BY hand_number ASC
@@ -147,7 +229,7 @@ class FinalTableHandRepository:
             SELECT
                 id, tournament_id, hand_id, hand_number, table_size, bb,
                 hero_stack, players_count, hero_ko_this_hand, pre_ft_ko,
-                hero_ko_attempts, session_id, is_early_final
+                hero_ko_attempts, session_id, is_early_final, pre_ft_raw_ko
             FROM hero_final_table_hands
             ORDER BY hand_number ASC -- Порядок важен для определения первой руки
          """
@@ -164,7 +246,7 @@ class FinalTableHandRepository:
             SELECT
                 id, tournament_id, hand_id, hand_number, table_size, bb,
                 hero_stack, players_count, hero_ko_this_hand, pre_ft_ko,
-                hero_ko_attempts, session_id, is_early_final
+                hero_ko_attempts, session_id, is_early_final, pre_ft_raw_ko
             FROM hero_final_table_hands
             WHERE is_early_final = 1
         """
@@ -193,7 +275,7 @@ class FinalTableHandRepository:
             SELECT
                 id, tournament_id, hand_id, hand_number, table_size, bb,
                 hero_stack, players_count, hero_ko_this_hand, pre_ft_ko,
-                hero_ko_attempts, session_id, is_early_final
+                hero_ko_attempts, session_id, is_early_final, pre_ft_raw_ko
             FROM hero_final_table_hands
             WHERE 1=1
         """
@@ -219,7 +301,7 @@ class FinalTableHandRepository:
             SELECT
                 id, tournament_id, hand_id, hand_number, table_size, bb,
                 hero_stack, players_count, hero_ko_this_hand, pre_ft_ko,
-                hero_ko_attempts, session_id, is_early_final
+                hero_ko_attempts, session_id, is_early_final, pre_ft_raw_ko
             FROM hero_final_table_hands
             WHERE tournament_id = ? AND table_size = ?
             ORDER BY hand_number ASC
@@ -233,23 +315,61 @@ class FinalTableHandRepository:
             return FinalTableHand.from_dict(dict(result[0]))
         return None
     
-    def get_ko_counts_for_tournaments(self, tournament_ids: List[str]) -> dict[str, float]:
+    def get_existing_hand_keys(self, tournament_ids: List[str]) -> Set[Tuple[str, str]]:
+        """
+        Возвращает множество ключей (tournament_id, hand_id) уже сохранённых
+        раздач указанных турниров.
+        """
+        if not tournament_ids:
+            return set()
+
+        placeholders = ','.join(['?' for _ in tournament_ids])
+        query = f"""
+            SELECT tournament_id, hand_id
+            FROM hero_final_table_hands
+            WHERE tournament_id IN ({placeholders})
+        """
+
+        results = self.db.execute_query(query, tournament_ids)
+        return {(row[0], row[1]) for row in results}
+
+    def get_cross_session_tournament_ids(self, session_id: str) -> List[str]:
+        """
+        Возвращает ID турниров других сессий, у которых есть руки с данным
+        session_id (турнир догружен в другой сессии). Такие турниры
+        переживают удаление сессии, но теряют часть рук.
+        """
+        query = """
+            SELECT DISTINCT h.tournament_id
+            FROM hero_final_table_hands h
+            JOIN tournaments t ON t.tournament_id = h.tournament_id
+            WHERE h.session_id = ? AND (t.session_id IS NULL OR t.session_id != ?)
+        """
+        results = self.db.execute_query(query, (session_id, session_id))
+        return [row[0] for row in results]
+
+    def get_ko_counts_for_tournaments(self, tournament_ids: Optional[List[str]]) -> dict[str, float]:
         """
         Эффективно получает суммарное количество KO для списка турниров одним запросом.
+        При tournament_ids=None возвращает значения для всех турниров с руками.
         Возвращает словарь {tournament_id: total_ko}.
         """
-        if not tournament_ids:
+        if tournament_ids is not None and not tournament_ids:
             return {}
         
-        placeholders = ','.join(['?' for _ in tournament_ids])
+        where = ""
+        params: List[str] = []
+        if tournament_ids is not None:
+            where = f"WHERE tournament_id IN ({','.join(['?' for _ in tournament_ids])})"
+            params = tournament_ids
         query = f"""
             SELECT tournament_id, SUM(hero_ko_this_hand) as total_ko
             FROM hero_final_table_hands
-            WHERE tournament_id IN ({placeholders})
+            {where}
             GROUP BY tournament_id
         """
         
-        results = self.db.execute_query(query, tournament_ids)
+        results = self.db.execute_query(query, params)
         return {row[0]: row[1] if row[1] is not None else 0.0 for row in results}
     
     def get_early_ft_ko_count(self, tournament_ids: Optional[List[str]] = None) -> float:
@@ -286,4 +406,60 @@ class FinalTableHandRepository:
             params.extend(tournament_ids)
         
         result = self.db.execute_query(query, params)
-        return result[0][0] if result and result[0][0] is not None else 0.0
\ No newline at end of file
+        return result[0][0] if result and result[0][0] is not None else 0.0
+
+    def get_hand_totals(
+        self,
+        tournament_ids: Optional[List[str]] = None,
+        session_id: Optional[str] = None,
+        final_table_size: int = 9,
+    ) -> FinalTableHandTotals:
+        """
+        Суммы раздач, которые удалит каскад при удалении турниров
+        tournament_ids или сессии session_id (раздачи сессии и раздачи её
+        турниров), без загрузки самих раздач. Неполный старт финалки
+        определяется, как в статистике, по первой раздаче за столом
+        final_table_size.
+        """
+        conditions = []
+        params: List = []
+        if tournament_ids is not None:
+            if not tournament_ids:
+                return FinalTableHandTotals()
+            conditions.append(f"tournament_id IN ({','.join('?' for _ in tournament_ids)})")
+            params.extend(tournament_ids)
+        if session_id is not None:
+            conditions.append(
+                "(session_id = ? OR tournament_id IN (SELECT tournament_id FROM tournaments WHERE session_id = ?))"
+            )
+            params.extend([session_id, session_id])
+        where = " AND ".join(conditions) or "1"
+
+        row = self.db.execute_query(f"""
+            SELECT
+                COUNT(*),
+                COALESCE(SUM(hero_ko_this_hand), 0),
+                COALESCE(SUM(CASE WHEN is_early_final = 1 THEN hero_ko_this_hand ELSE 0 END), 0),
+                COALESCE(SUM(pre_ft_ko), 0)
+            FROM hero_final_table_hands
+            WHERE {where}
+        """, params)[0]
+        incomplete = self.db.execute_query(f"""
+            SELECT COUNT(*)
+            FROM hero_final_table_hands h
+            JOIN (
+                SELECT tournament_id, MIN(hand_number) AS first_hand
+                FROM hero_final_table_hands
+                WHERE table_size = ? AND {where}
+                GROUP BY tournament_id
+            ) f ON h.tournament_id = f.tournament_id AND h.hand_number = f.first_hand
+            WHERE h.table_size = ? AND h.players_count < ?
+        """, [final_table_size, *params, final_table_size, final_table_size])[0][0]
+
+        return FinalTableHandTotals(
+            hands=row[0],
+            knockouts=row[1],
+            early_ft_knockouts=row[2],
+            pre_ft_ko=row[3],
+            incomplete_ft_count=incomplete,
+        )
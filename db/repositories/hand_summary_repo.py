@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+
+"""
+Репозиторий бинарных сводок раздач (таблица hand_action_summaries).
+"""
+
+import logging
+from itertools import groupby
+from typing import Any, Dict, Iterator, List, Tuple
+from db.manager import DatabaseManager, database_manager  # Используем синглтон менеджер БД
+
+logger = logging.getLogger('ROYAL_Stats.HandSummaryRepository')
+
+
+class HandSummaryRepository:
+    """
+    Хранит сводки раздач, по которым KO-показатели пересчитываются
+    без повторного чтения HH-файлов.
+    """
+
+    def __init__(self, db_manager: DatabaseManager = database_manager):
+        """Initialize repository with the shared database manager."""
+        self.db = db_manager
+
+    def add_summaries(self, summaries: List[Dict[str, Any]]) -> int:
+        """
+        Сохраняет сводки одной транзакцией. Повторный импорт раздачи
+        перезаписывает сводку (например, в более новом формате).
+        """
+        if not summaries:
+            return 0
+
+        query = """
+            INSERT INTO hand_action_summaries (
+                tournament_id, hand_id, hand_number, role, format_version, data
+            ) VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(tournament_id, hand_id) DO UPDATE SET
+                hand_number = excluded.hand_number,
+                role = excluded.role,
+                format_version = excluded.format_version,
+                data = excluded.data
+        """
+        params_list = [
+            (
+                summary['tournament_id'],
+                summary['hand_id'],
+                summary['hand_number'],
+                summary['role'],
+                summary['format_version'],
+                summary['data'],
+            )
+            for summary in summaries
+        ]
+
+        conn = self.db.get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.executemany(query, params_list)
+            conn.commit()
+            return cursor.rowcount
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"Ошибка пакетного сохранения сводок раздач: {e}")
+            raise
+
+    def count_tournaments(self) -> int:
+        """Количество турниров, для которых есть сводки."""
+        result = self.db.execute_query(
+            "SELECT COUNT(DISTINCT tournament_id) FROM hand_action_summaries"
+        )
+        return result[0][0] if result else 0
+
+    def iter_tournament_summaries(self) -> Iterator[Tuple[str, List[Tuple[str, int, int, bytes]]]]:
+        """
+        Последовательно отдаёт сводки по турнирам: (tournament_id,
+        [(hand_id, hand_number, role, data), ...]) в порядке номеров раздач.
+        Строки читаются курсором, поэтому вся таблица не загружается в память.
+        """
+        query = """
+            SELECT tournament_id, hand_id, hand_number, role, data
+            FROM hand_action_summaries
+            ORDER BY tournament_id, hand_number
+        """
+        cursor = self.db.get_connection().cursor()
+        try:
+            cursor.execute(query)
+            for tournament_id, rows in groupby(cursor, key=lambda row: row[0]):
+                yield tournament_id, [(row[1], row[2], row[3], bytes(row[4])) for row in rows]
+        finally:
+            cursor.close()
@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+
+"""
+Репозиторий служебных параметров БД (таблица db_meta).
+"""
+
+from typing import Optional
+from db.manager import DatabaseManager, database_manager  # Используем синглтон менеджер БД
+
+
+class MetaRepository:
+    """
+    Хранит служебные параметры конкретной БД в виде пар ключ-значение.
+    """
+
+    def __init__(self, db_manager: DatabaseManager = database_manager):
+        """Initialize repository with the shared database manager."""
+        self.db = db_manager
+
+    def get_value(self, key: str, default: Optional[str] = None) -> Optional[str]:
+        """Возвращает значение параметра или default, если его нет."""
+        result = self.db.execute_query("SELECT value FROM db_meta WHERE key = ?", (key,))
+        return result[0][0] if result else default
+
+    def set_value(self, key: str, value: str) -> None:
+        """Записывает значение параметра."""
+        self.db.execute_update(
+            """
+            INSERT INTO db_meta (key, value) VALUES (?, ?)
+            ON CONFLICT(key) DO UPDATE SET value = excluded.value
+            """,
+            (key, value),
+        )
@@ -83,6 +83,19 @@ class OverallStatsRepository:
                 pre_ft_chipev = ?,
                 incomplete_ft_count = ?,
                 incomplete_ft_percent = ?,
+                aggregates_version = ?,
+                all_tournaments_count = ?,
+                finish_place_sum = ?,
+                finish_place_count = ?,
+                ft_finish_place_sum = ?,
+                ft_finish_place_count = ?,
+                no_ft_finish_place_sum = ?,
+                no_ft_finish_place_count = ?,
+                ft_stack_chips_sum = ?,
+                ft_stack_chips_count = ?,
+                ft_stack_bb_sum = ?,
+                ft_stack_bb_count = ?,
+                chipev_stack_sum = ?,
                 last_updated = ?
             WHERE id = 1
         """
@@ -112,6 +125,19 @@ class OverallStatsRepository:
             stats.pre_ft_chipev,
             stats.incomplete_ft_count,
             stats.incomplete_ft_percent,
+            stats.aggregates_version,
+            stats.all_tournaments_count,
+            stats.finish_place_sum,
+            stats.finish_place_count,
+            stats.ft_finish_place_sum,
+            stats.ft_finish_place_count,
+            stats.no_ft_finish_place_sum,
+            stats.no_ft_finish_place_count,
+            stats.ft_stack_chips_sum,
+            stats.ft_stack_chips_count,
+            stats.ft_stack_bb_sum,
+            stats.ft_stack_bb_count,
+            stats.chipev_stack_sum,
             datetime.now().isoformat(), # Обновляем метку времени
         )
         self.db.execute_update(query, params)
\ No newline at end of file
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+
+"""
+Репозиторий скетчей квантилей (таблица stat_sketches).
+"""
+
+import logging
+from typing import Dict, Iterable, Optional
+from db.manager import DatabaseManager, database_manager  # Используем синглтон менеджер БД
+from analytics.quantile_sketch import QuantileSketch
+
+logger = logging.getLogger('ROYAL_Stats.StatSketchRepository')
+
+# Разрезы, по которым хранятся скетчи
+SKETCH_SCOPE_SESSION = "session"
+SKETCH_SCOPE_BUYIN = "buyin"
+
+
+def buyin_scope_key(buyin: Optional[float]) -> str:
+    """Ключ разреза по бай-ину ('' - турниры без бай-ина)."""
+    return "" if buyin is None else repr(float(buyin))
+
+
+class StatSketchRepository:
+    """
+    Хранит скетчи метрик по сессиям и бай-инам, из которых медианы
+    для любого объединения этих фильтров получаются слиянием.
+    """
+
+    def __init__(self, db_manager: DatabaseManager = database_manager):
+        """Initialize repository with the shared database manager."""
+        self.db = db_manager
+
+    def get_sketches(
+        self,
+        metric: str,
+        scope: str,
+        keys: Optional[Iterable[str]] = None,
+    ) -> Dict[str, QuantileSketch]:
+        """
+        Возвращает скетчи метрики в разрезе {scope_key: скетч}.
+        keys=None - все ключи разреза.
+        """
+        query = "SELECT scope_key, data FROM stat_sketches WHERE metric = ? AND scope = ?"
+        params = [metric, scope]
+        if keys is not None:
+            keys = list(keys)
+            if not keys:
+                return {}
+            query += f" AND scope_key IN ({', '.join('?' for _ in keys)})"
+            params.extend(keys)
+        return {
+            row[0]: QuantileSketch.from_bytes(bytes(row[1]))
+            for row in self.db.execute_query(query, params)
+        }
+
+    def save_sketches(self, metric: str, scope: str, sketches: Dict[str, QuantileSketch]) -> None:
+        """Сохраняет скетчи одной транзакцией; пустые скетчи удаляются."""
+        if not sketches:
+            return
+        conn = self.db.get_connection()
+        try:
+            cursor = conn.cursor()
+            self._write(cursor, metric, scope, sketches)
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"Ошибка сохранения скетчей {metric}/{scope}: {e}")
+            raise
+
+    def replace_metric(self, metric: str, sketches_by_scope: Dict[str, Dict[str, QuantileSketch]]) -> None:
+        """Полностью заменяет скетчи метрики во всех разрезах одной транзакцией."""
+        conn = self.db.get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM stat_sketches WHERE metric = ?", (metric,))
+            for scope, sketches in sketches_by_scope.items():
+                self._write(cursor, metric, scope, sketches)
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"Ошибка пересоздания скетчей {metric}: {e}")
+            raise
+
+    @staticmethod
+    def _write(cursor, metric: str, scope: str, sketches: Dict[str, QuantileSketch]) -> None:
+        cursor.executemany(
+            """
+            INSERT INTO stat_sketches (metric, scope, scope_key, data) VALUES (?, ?, ?, ?)
+            ON CONFLICT(metric, scope, scope_key) DO UPDATE SET data = excluded.data
+            """,
+            [(metric, scope, key, sketch.to_bytes()) for key, sketch in sketches.items() if sketch.count],
+        )
+        empty = [(metric, scope, key) for key, sketch in sketches.items() if not sketch.count]
+        if empty:
+            cursor.executemany(
+                "DELETE FROM stat_sketches WHERE metric = ? AND scope = ? AND scope_key = ?",
+                empty,
+            )
@@ -6,10 +6,39 @@
 """
 
 import sqlite3
-from typing import List, Optional, Dict, Any, Tuple
+from typing import List, Optional, Dict, Any, Tuple, Iterable
 from db.manager import DatabaseManager, database_manager  # Используем синглтон менеджер БД
 from models import Tournament
 from dataclasses import dataclass
+from db.schema import start_time_epoch, epoch_day
+
+
+def _start_columns(start_time: Optional[str]) -> Tuple[Optional[int], Optional[int]]:
+    """Значения start_epoch и start_day для вставки турнира."""
+    start_epoch = start_time_epoch(start_time)
+    return start_epoch, epoch_day(start_epoch)
+
+
+def _date_conditions(start_time_from: Optional[str], start_time_to: Optional[str]) -> Tuple[List[str], list]:
+    """
+    Условия WHERE по диапазону дат. Границы переводятся в start_epoch,
+    чтобы фильтр шёл по целочисленным индексам; нераспознанная граница
+    сравнивается со строкой start_time, как раньше.
+    """
+    conditions: List[str] = []
+    params: list = []
+    for bound, op in ((start_time_from, ">="), (start_time_to, "<=")):
+        if not bound:
+            continue
+        bound_epoch = start_time_epoch(bound)
+        if bound_epoch is not None:
+            conditions.append(f"start_epoch {op} ?")
+            params.append(bound_epoch)
+        else:
+            conditions.append(f"start_time {op} ?")
+            params.append(bound)
+    return conditions, params
+
 
 @dataclass
 class PaginationResult:
@@ -54,12 +83,15 @@ class TournamentRepository:
                 tournament_id, tournament_name, start_time, buyin, payout,
                 finish_place, ko_count, session_id, has_ts, has_hh,
                 reached_final_table, final_table_initial_stack_chips,
-                final_table_initial_stack_bb, final_table_start_players
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                final_table_initial_stack_bb, final_table_start_players,
+                start_epoch, start_day
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             ON CONFLICT(tournament_id)
             DO UPDATE SET
                 tournament_name = COALESCE(excluded.tournament_name, tournaments.tournament_name),
                 start_time = COALESCE(excluded.start_time, tournaments.start_time),
+                start_epoch = CASE WHEN excluded.start_time IS NOT NULL THEN excluded.start_epoch ELSE tournaments.start_epoch END,
+                start_day = CASE WHEN excluded.start_time IS NOT NULL THEN excluded.start_day ELSE tournaments.start_day END,
                 buyin = COALESCE(excluded.buyin, tournaments.buyin),
                 payout = COALESCE(excluded.payout, tournaments.payout),
                 finish_place = COALESCE(excluded.finish_place, tournaments.finish_place),
@@ -88,7 +120,7 @@ class TournamentRepository:
             tournament.final_table_initial_stack_chips,
             tournament.final_table_initial_stack_bb,
             tournament.final_table_start_players,
-        )
+        ) + _start_columns(tournament.start_time)
 
         self.db.execute_update(query, params)
 
@@ -102,12 +134,15 @@ class TournamentRepository:
                 tournament_id, tournament_name, start_time, buyin, payout,
                 finish_place, ko_count, session_id, has_ts, has_hh,
                 reached_final_table, final_table_initial_stack_chips,
-                final_table_initial_stack_bb, final_table_start_players
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                final_table_initial_stack_bb, final_table_start_players,
+                start_epoch, start_day
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             ON CONFLICT(tournament_id)
             DO UPDATE SET
                 tournament_name = COALESCE(excluded.tournament_name, tournaments.tournament_name),
                 start_time = COALESCE(excluded.start_time, tournaments.start_time),
+                start_epoch = CASE WHEN excluded.start_time IS NOT NULL THEN excluded.start_epoch ELSE tournaments.start_epoch END,
+                start_day = CASE WHEN excluded.start_time IS NOT NULL THEN excluded.start_day ELSE tournaments.start_day END,
                 buyin = COALESCE(excluded.buyin, tournaments.buyin),
                 payout = COALESCE(excluded.payout, tournaments.payout),
                 finish_place = COALESCE(excluded.finish_place, tournaments.finish_place),
@@ -137,7 +172,7 @@ class TournamentRepository:
                 t.final_table_initial_stack_chips,
                 t.final_table_initial_stack_bb,
                 t.final_table_start_players,
-            )
+            ) + _start_columns(t.start_time)
             for t in tournaments
         ]
 
@@ -152,6 +187,39 @@ class TournamentRepository:
             raise
 
 
+    def set_ko_counts(self, ko_counts: Dict[str, float], reset_ids: Iterable[str] = ()) -> int:
+        """
+        Пакетно записывает ko_count турниров одной транзакцией.
+
+        Args:
+            ko_counts: Словарь {tournament_id: ko_count}
+            reset_ids: ID турниров без рук финального стола - им ставится 0
+
+        Returns:
+            Количество обновлённых строк
+        """
+        values = {tournament_id: ko_count or 0 for tournament_id, ko_count in ko_counts.items()}
+        for tournament_id in reset_ids:
+            values.setdefault(tournament_id, 0)
+        if not values:
+            return 0
+
+        # Строки с неизменившимся значением не перезаписываются,
+        # чтобы не менять файл БД без необходимости
+        query = "UPDATE tournaments SET ko_count = ? WHERE tournament_id = ? AND ko_count IS NOT ?"
+        params_list = [(ko_count, tournament_id, ko_count) for tournament_id, ko_count in values.items()]
+
+        conn = self.db.get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.executemany(query, params_list)
+            conn.commit()
+            return cursor.rowcount
+        except Exception as e:
+            conn.rollback()
+            print(f"Ошибка пакетного обновления ko_count: {e}")
+            raise
+
     def get_tournament_by_id(self, tournament_id: str) -> Optional[Tournament]:
         """
         Возвращает данные Hero по одному турниру по ID.
@@ -226,19 +294,15 @@ class TournamentRepository:
             conditions.append("buyin = ?")
             params.append(buyin_filter)
 
-        if start_time_from:
-            conditions.append("start_time >= ?")
-            params.append(start_time_from)
-
-        if start_time_to:
-            conditions.append("start_time <= ?")
-            params.append(start_time_to)
+        date_conditions, date_params = _date_conditions(start_time_from, start_time_to)
+        conditions.extend(date_conditions)
+        params.extend(date_params)
 
         if conditions:
             query += " WHERE " + " AND ".join(conditions)
 
         # Сортируем по времени начала турнира для хронологического порядка
-        query += " ORDER BY start_time ASC"
+        query += " ORDER BY start_epoch ASC"
 
         results = self.db.execute_query(query, params)
         return [Tournament.from_dict(dict(row)) for row in results]
@@ -471,6 +535,70 @@ class TournamentRepository:
         results = self.db.execute_query(query)
         return [row[0] for row in results if row[0] is not None]
 
+    def get_time_series_rows(
+        self,
+        session_id: Optional[str] = None,
+        buyin_filter: Optional[float] = None,
+        start_time_from: Optional[str] = None,
+        start_time_to: Optional[str] = None,
+    ) -> List[Tuple[int, float, float, float, int]]:
+        """
+        Строки для временных рядов (analytics.time_series): кортежи
+        (start_epoch, buyin, payout, ko_count, finish_place) без NULL в
+        порядке start_epoch. Турниры без распознанной даты не входят.
+        Фильтры те же, что у get_all_tournaments; выборка и порядок идут
+        по индексам с start_epoch.
+        """
+        query = """
+            SELECT start_epoch, COALESCE(buyin, 0), COALESCE(payout, 0),
+                   COALESCE(ko_count, 0), COALESCE(finish_place, 0)
+            FROM tournaments
+        """
+        conditions = ["start_epoch IS NOT NULL"]
+        params: list = []
+        if session_id:
+            conditions.append("session_id = ?")
+            params.append(session_id)
+        if buyin_filter is not None:
+            conditions.append("buyin = ?")
+            params.append(buyin_filter)
+        date_conditions, date_params = _date_conditions(start_time_from, start_time_to)
+        conditions.extend(date_conditions)
+        params.extend(date_params)
+        query += " WHERE " + " AND ".join(conditions) + " ORDER BY start_epoch ASC"
+
+        # Кортежи вместо sqlite3.Row: сотни тысяч строк сразу идут в numpy
+        cursor = self.db.get_connection().cursor()
+        cursor.row_factory = None
+        cursor.execute(query, params)
+        return cursor.fetchall()
+
+    def get_start_time_range(self) -> Tuple[Optional[str], Optional[str], int]:
+        """
+        Возвращает диапазон дат турниров Hero.
+
+        Returns:
+            (минимальное start_time, максимальное start_time,
+             количество турниров без start_time)
+        """
+        # Подзапросы вместо одного агрегата: каждый - поиск по индексу
+        # idx_tournaments_start_epoch, а не просмотр всей таблицы. Турнир с
+        # нераспознанной датой не попадает под фильтр по датам, поэтому
+        # считается турниром без start_time.
+        query = """
+            SELECT
+                (SELECT start_time FROM tournaments WHERE start_epoch IS NOT NULL
+                 ORDER BY start_epoch ASC LIMIT 1) AS min_start,
+                (SELECT start_time FROM tournaments WHERE start_epoch IS NOT NULL
+                 ORDER BY start_epoch DESC LIMIT 1) AS max_start,
+                (SELECT COUNT(*) FROM tournaments WHERE start_epoch IS NULL) AS without_start
+        """
+        results = self.db.execute_query(query)
+        if not results:
+            return None, None, 0
+        row = results[0]
+        return row['min_start'], row['max_start'], row['without_start'] or 0
+
     def get_avg_finish_place_no_ft(self, session_id: Optional[str] = None, buyin_filter: Optional[float] = None) -> float:
         """
         Рассчитывает среднее финишное место только по турнирам, где НЕ достиг финального стола,
@@ -560,7 +688,7 @@ class TournamentRepository:
         page_size = max(1, min(500, page_size))
         allowed_sort_columns = {
             "tournament_id": "tournament_id",
-            "start_time": "start_time",
+            "start_time": "start_epoch",
             "buyin": "buyin",
             "finish_place": "finish_place",
             "payout": "payout",
@@ -589,12 +717,9 @@ class TournamentRepository:
         if buyin_filter is not None:
             conditions.append("buyin = ?")
             params.append(buyin_filter)
-        if start_time_from:
-            conditions.append("start_time >= ?")
-            params.append(start_time_from)
-        if start_time_to:
-            conditions.append("start_time <= ?")
-            params.append(start_time_to)
+        date_conditions, date_params = _date_conditions(start_time_from, start_time_to)
+        conditions.extend(date_conditions)
+        params.extend(date_params)
         if result_filter:
             if result_filter == "prizes":
                 conditions.append("finish_place IS NOT NULL AND finish_place BETWEEN 1 AND 3")
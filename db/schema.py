@@ -4,6 +4,10 @@
 Модуль, содержащий схемы таблиц базы данных для ROYAL_Stats (Hero-only).
 """
 
+import calendar
+from datetime import datetime
+from typing import Optional
+
 # SQL-запросы для создания таблиц
 
 # Таблица для хранения информации о сессиях импорта
@@ -39,6 +43,8 @@ CREATE TABLE IF NOT EXISTS tournaments (
     final_table_initial_stack_chips REAL,
     final_table_initial_stack_bb REAL,
     final_table_start_players INTEGER,
+    start_epoch INTEGER,
+    start_day INTEGER,
     FOREIGN KEY (session_id) REFERENCES sessions(session_id) ON DELETE CASCADE
 )
 """
@@ -56,6 +62,7 @@ CREATE TABLE IF NOT EXISTS hero_final_table_hands (
     players_count INTEGER, -- Фактическое число игроков за столом
     hero_ko_this_hand REAL DEFAULT 0, -- KO, сделанные Hero в этой раздаче
     pre_ft_ko REAL DEFAULT 0, -- KO, сделанные в последней 5-max раздаче
+    pre_ft_raw_ko INTEGER DEFAULT 0, -- Те же KO без коэффициента ko_coeff (для пересчёта)
     hero_ko_attempts INTEGER DEFAULT 0, -- Количество попыток выбить соперников в этой раздаче
     session_id TEXT,
     is_early_final BOOLEAN DEFAULT 0, -- Флаг для стадии 9-6 игроков
@@ -65,6 +72,100 @@ CREATE TABLE IF NOT EXISTS hero_final_table_hands (
 )
 """
 
+# Бинарные сводки раздач (стеки, вклады, сборы, all-in, действия) для
+# пересчёта KO без исходных HH-файлов. role: 0 - раздача финального стола,
+# 1 - последняя раздача Hero перед финалкой
+CREATE_HAND_ACTION_SUMMARIES_TABLE = """
+CREATE TABLE IF NOT EXISTS hand_action_summaries (
+    tournament_id TEXT NOT NULL,
+    hand_id TEXT NOT NULL,
+    hand_number INTEGER,
+    role INTEGER DEFAULT 0,
+    format_version INTEGER NOT NULL,
+    data BLOB NOT NULL,
+    PRIMARY KEY (tournament_id, hand_id),
+    FOREIGN KEY (tournament_id) REFERENCES tournaments(tournament_id) ON DELETE CASCADE
+)
+"""
+
+# Служебные параметры БД (например, ko_coeff, с которым посчитан pre_ft_ko)
+CREATE_DB_META_TABLE = """
+CREATE TABLE IF NOT EXISTS db_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+)
+"""
+
+# Ключ db_meta с отпечатком коэффициентов ko_coeff
+DB_META_KO_COEFF = "ko_coeff"
+# Ключ db_meta с версией скетчей квантилей (нет ключа - скетчи не построены)
+DB_META_STAT_SKETCHES = "stat_sketches"
+# Ключ db_meta с версией данных, записанной в сводку рядом с файлом БД
+# (services.db_summary)
+DB_META_SUMMARY_VERSION = "summary_version"
+# Ключ db_meta, присутствующий, пока индексы удалены на время массовой
+# загрузки (db.bulk_load)
+DB_META_DEFERRED_INDEXES = "deferred_indexes"
+
+# Слияемые скетчи квантилей (analytics.quantile_sketch) по сессиям и
+# бай-инам: медиана для объединения фильтров считается слиянием скетчей.
+# scope: 'session' или 'buyin', scope_key: session_id или бай-ин
+CREATE_STAT_SKETCHES_TABLE = """
+CREATE TABLE IF NOT EXISTS stat_sketches (
+    metric TEXT NOT NULL,
+    scope TEXT NOT NULL,
+    scope_key TEXT NOT NULL,
+    data BLOB NOT NULL,
+    PRIMARY KEY (metric, scope, scope_key)
+)
+"""
+
+
+def ko_coeff_fingerprint(ko_coeff) -> str:
+    """Строковый отпечаток коэффициентов ko_coeff для db_meta."""
+    return ",".join(f"{players}:{coeff!r}" for players, coeff in sorted(ko_coeff.items()))
+
+
+def ko_coeff_cte(ko_coeff):
+    """
+    CTE ko_coeff(players, value) с коэффициентами для set-based запросов.
+    Возвращает пару (SQL, параметры).
+    """
+    items = sorted(ko_coeff.items()) or [(0, 0.0)]
+    values = ", ".join("(?, ?)" for _ in items)
+    params = [value for item in items for value in item]
+    return f"WITH ko_coeff(players, value) AS (VALUES {values})", params
+
+
+# start_time хранится текстом "YYYY/MM/DD HH:MM:SS" (время рума, без зоны).
+# Рядом хранятся start_epoch - те же дата и время как секунды от 1970-01-01
+# (время трактуется как UTC, без перевода зон) и start_day - номер дня
+# (start_epoch // 86400) для группировки по дням. Фильтры и сортировка по
+# дате идут по целочисленному start_epoch.
+START_TIME_FORMATS = ("%Y/%m/%d %H:%M:%S", "%Y/%m/%d %H:%M", "%Y/%m/%d")
+SECONDS_PER_DAY = 86400
+
+# То же вычисление start_epoch в SQL (для заполнения существующих строк)
+START_EPOCH_SQL = "CAST(strftime('%s', replace(start_time, '/', '-')) AS INTEGER)"
+
+
+def start_time_epoch(start_time: Optional[str]) -> Optional[int]:
+    """start_epoch для строки start_time; None, если дата не распознана."""
+    if not start_time:
+        return None
+    for fmt in START_TIME_FORMATS:
+        try:
+            return calendar.timegm(datetime.strptime(start_time, fmt).timetuple())
+        except ValueError:
+            continue
+    return None
+
+
+def epoch_day(start_epoch: Optional[int]) -> Optional[int]:
+    """start_day для start_epoch."""
+    return start_epoch // SECONDS_PER_DAY if start_epoch is not None else None
+
+
 # Таблица для хранения общей статистики Hero (одна строка)
 CREATE_OVERALL_STATS_TABLE = """
 CREATE TABLE IF NOT EXISTS overall_stats (
@@ -94,10 +195,41 @@ CREATE TABLE IF NOT EXISTS overall_stats (
     pre_ft_chipev REAL DEFAULT 0,
     incomplete_ft_count INTEGER DEFAULT 0,
     incomplete_ft_percent INTEGER DEFAULT 0,
+    -- Накопительные суммы для инкрементального обновления средних
+    aggregates_version INTEGER DEFAULT 0,
+    all_tournaments_count INTEGER DEFAULT 0,
+    finish_place_sum INTEGER DEFAULT 0,
+    finish_place_count INTEGER DEFAULT 0,
+    ft_finish_place_sum INTEGER DEFAULT 0,
+    ft_finish_place_count INTEGER DEFAULT 0,
+    no_ft_finish_place_sum INTEGER DEFAULT 0,
+    no_ft_finish_place_count INTEGER DEFAULT 0,
+    ft_stack_chips_sum REAL DEFAULT 0,
+    ft_stack_chips_count INTEGER DEFAULT 0,
+    ft_stack_bb_sum REAL DEFAULT 0,
+    ft_stack_bb_count INTEGER DEFAULT 0,
+    chipev_stack_sum REAL DEFAULT 0,
     last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 )
 """
 
+# Колонки накопительных сумм overall_stats (добавляются миграцией в существующие БД)
+OVERALL_STATS_AGGREGATE_COLUMNS = [
+    ("aggregates_version", "INTEGER DEFAULT 0"),
+    ("all_tournaments_count", "INTEGER DEFAULT 0"),
+    ("finish_place_sum", "INTEGER DEFAULT 0"),
+    ("finish_place_count", "INTEGER DEFAULT 0"),
+    ("ft_finish_place_sum", "INTEGER DEFAULT 0"),
+    ("ft_finish_place_count", "INTEGER DEFAULT 0"),
+    ("no_ft_finish_place_sum", "INTEGER DEFAULT 0"),
+    ("no_ft_finish_place_count", "INTEGER DEFAULT 0"),
+    ("ft_stack_chips_sum", "REAL DEFAULT 0"),
+    ("ft_stack_chips_count", "INTEGER DEFAULT 0"),
+    ("ft_stack_bb_sum", "REAL DEFAULT 0"),
+    ("ft_stack_bb_count", "INTEGER DEFAULT 0"),
+    ("chipev_stack_sum", "REAL DEFAULT 0"),
+]
+
 # Таблица для хранения распределения мест на финальном столе
 CREATE_PLACES_DISTRIBUTION_TABLE = """
 CREATE TABLE IF NOT EXISTS places_distribution (
@@ -129,28 +261,24 @@ CREATE TABLE IF NOT EXISTS module_settings (
 )
 """
 
-# Индексы для оптимизации производительности
+# Индексы под фактический набор запросов (проверяется
+# python -m benchmarks.query_plan_audit). Фильтры StatsGrid и TournamentView -
+# равенство по сессии или бай-ину плюс диапазон дат с сортировкой по
+# времени начала, поэтому start_epoch идёт в индексе после колонки равенства:
+# и фильтр, и ORDER BY обслуживаются индексом без временной сортировки,
+# а COUNT(*) по тем же фильтрам читает только индекс. Руки выбираются по
+# турниру или сессии в порядке hand_number. Каждый индекс замедляет
+# массовую вставку, поэтому индексов, не нужных ни одному запросу, нет.
 CREATE_INDEXES = [
-    # Базовые индексы
-    "CREATE INDEX IF NOT EXISTS idx_tournaments_session ON tournaments(session_id)",
-    "CREATE INDEX IF NOT EXISTS idx_tournaments_buyin ON tournaments(buyin)",
-    "CREATE INDEX IF NOT EXISTS idx_tournaments_reached_ft ON tournaments(reached_final_table)",
+    "CREATE INDEX IF NOT EXISTS idx_tournaments_start_epoch ON tournaments(start_epoch)",
+    "CREATE INDEX IF NOT EXISTS idx_tournaments_session_epoch ON tournaments(session_id, start_epoch)",
+    "CREATE INDEX IF NOT EXISTS idx_tournaments_buyin_epoch ON tournaments(buyin, start_epoch)",
+    # Фильтр "в призах"/"вне призов" и сортировка по месту в TournamentView
     "CREATE INDEX IF NOT EXISTS idx_tournaments_finish_place ON tournaments(finish_place)",
-    "CREATE INDEX IF NOT EXISTS idx_ft_hands_tournament ON hero_final_table_hands(tournament_id)",
-    "CREATE INDEX IF NOT EXISTS idx_ft_hands_session ON hero_final_table_hands(session_id)",
-    "CREATE INDEX IF NOT EXISTS idx_ft_hands_is_early ON hero_final_table_hands(is_early_final)",
-    "CREATE INDEX IF NOT EXISTS idx_ft_hands_ko ON hero_final_table_hands(hero_ko_this_hand)",
-    
-    # Составные индексы для оптимизации статистики
-    "CREATE INDEX IF NOT EXISTS idx_tournaments_ft_place ON tournaments(reached_final_table, finish_place)",
-    "CREATE INDEX IF NOT EXISTS idx_tournaments_ft_stacks ON tournaments(reached_final_table, final_table_initial_stack_chips, final_table_initial_stack_bb)",
-    "CREATE INDEX IF NOT EXISTS idx_tournaments_session_place ON tournaments(session_id, finish_place)",
-    "CREATE INDEX IF NOT EXISTS idx_tournaments_buyin_payout ON tournaments(buyin, payout)",
-    "CREATE INDEX IF NOT EXISTS idx_ft_hands_early_ko ON hero_final_table_hands(is_early_final, hero_ko_this_hand)",
-    "CREATE INDEX IF NOT EXISTS idx_tournaments_id_ko ON tournaments(tournament_id, ko_count)",
-    
-    # Индексы для ускорения агрегатных запросов
-    "CREATE INDEX IF NOT EXISTS idx_tournaments_stats ON tournaments(reached_final_table, finish_place, buyin, payout) WHERE finish_place IS NOT NULL",
+    # Фильтр "финальный стол" в TournamentView
+    "CREATE INDEX IF NOT EXISTS idx_tournaments_ft_epoch ON tournaments(reached_final_table, start_epoch)",
+    "CREATE INDEX IF NOT EXISTS idx_ft_hands_tournament_number ON hero_final_table_hands(tournament_id, hand_number)",
+    "CREATE INDEX IF NOT EXISTS idx_ft_hands_session_number ON hero_final_table_hands(session_id, hand_number)",
 ]
 
 # Список всех SQL-запросов для создания таблиц
@@ -158,11 +286,14 @@ CREATE_TABLES_QUERIES = [
     CREATE_SESSIONS_TABLE,
     CREATE_TOURNAMENTS_TABLE,
     CREATE_HERO_FINAL_TABLE_HANDS_TABLE,
+    CREATE_HAND_ACTION_SUMMARIES_TABLE,
+    CREATE_DB_META_TABLE,
+    CREATE_STAT_SKETCHES_TABLE,
     CREATE_OVERALL_STATS_TABLE,
     CREATE_PLACES_DISTRIBUTION_TABLE,
     CREATE_STAT_MODULES_TABLE,
     CREATE_MODULE_SETTINGS_TABLE,
-] + CREATE_INDEXES  # Добавляем индексы к списку создания
+]  # Индексы создаются миграциями (db.migrations.ensure_indexes)
 
 # Запрос для вставки/игнорирования начальной строки в overall_stats
 INSERT_INITIAL_OVERALL_STATS = """
@@ -8,7 +8,7 @@ from .base_model import BaseModel
 from .tournament import Tournament
 from .session import Session
 from .overall_stats import OverallStats
-from .final_table_hand import FinalTableHand # Новая модель
+from .final_table_hand import FinalTableHand, FinalTableHandTotals
 
 # Импортируем все модели для удобства
 __all__ = [
@@ -17,4 +17,5 @@ __all__ = [
     'Session',
     'OverallStats',
     'FinalTableHand',
+    'FinalTableHandTotals',
 ]
\ No newline at end of file
@@ -28,5 +28,20 @@ class FinalTableHand(BaseModel):
     hero_ko_attempts: int = 0  # Количество попыток выбить соперников в этой руке
     session_id: Optional[str] = None
     is_early_final: bool = False # Стадия 9-6 игроков
+    pre_ft_raw_ko: int = 0  # KO в раздаче перед неполной финалкой без коэффициента
     id: Optional[int] = None # ID из БД, опционально
 
+
+
+@dataclass
+class FinalTableHandTotals:
+    """
+    Суммарный вклад набора раздач финального стола в общую статистику.
+    Заменяет список раздач в дельте статистики, когда раздачи удаляются
+    целиком (турнир, сессия) и их суммы можно получить одним SQL-запросом.
+    """
+    hands: int = 0
+    knockouts: float = 0.0
+    early_ft_knockouts: float = 0.0  # KO в раздачах ранней стадии финалки
+    pre_ft_ko: float = 0.0
+    incomplete_ft_count: int = 0  # финальных столов, начавшихся неполным составом
@@ -42,6 +42,20 @@ class OverallStats(BaseModel):
     pre_ft_chipev: float = 0.0  # Средний результат в фишках до финального стола
     incomplete_ft_count: int = 0  # Сколько финалок стартовало с <9 игроков
     incomplete_ft_percent: int = 0  # Процент таких финалок от общего числа
+    # Накопительные суммы и счётчики для инкрементального пересчёта средних
+    aggregates_version: int = 0  # 0 - суммы не рассчитаны, нужен полный пересчёт
+    all_tournaments_count: int = 0  # Все турниры, включая без TS (знаменатель Pre-FT ChipEV)
+    finish_place_sum: int = 0
+    finish_place_count: int = 0
+    ft_finish_place_sum: int = 0
+    ft_finish_place_count: int = 0
+    no_ft_finish_place_sum: int = 0
+    no_ft_finish_place_count: int = 0
+    ft_stack_chips_sum: float = 0.0
+    ft_stack_chips_count: int = 0
+    ft_stack_bb_sum: float = 0.0
+    ft_stack_bb_count: int = 0
+    chipev_stack_sum: float = 0.0  # Стеки на старте FT по всем турнирам (числитель Pre-FT ChipEV)
     last_updated: Optional[str] = None
     id: Optional[int] = 1 # ID из БД, всегда 1
 
@@ -7,6 +7,7 @@
 from abc import ABC, abstractmethod
 from typing import Any, TypeVar, Generic
 from services.app_config import app_config
+from services.progress import ImportCancelled, never_cancelled
 
 # Тип для результата парсера
 T = TypeVar('T')
@@ -21,6 +22,13 @@ class BaseParser(ABC, Generic[T]):
     def __init__(self, hero_name: str = app_config.hero_name):
         # Имя Hero берется из конфигурации
         self.hero_name = hero_name
+        # Проверка отмены импорта (подменяется ImportService на время разбора)
+        self.cancel_check = never_cancelled
+
+    def check_cancelled(self) -> None:
+        """Бросает ImportCancelled, если импорт отменен. Вызывается в циклах по раздачам."""
+        if self.cancel_check():
+            raise ImportCancelled()
 
     @abstractmethod
     def parse(self, file_content: str, filename: str = "") -> T:
@@ -10,13 +10,26 @@
 - Корректно считает KO Hero в каждой раздаче финалки.
 """
 
+import os
 import re
+import time
 import logging
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 from typing import Dict, List, Set, Tuple, Optional, Any
 from services.app_config import app_config
 from models import Tournament, FinalTableHand # Импортируем модели
 from .base_plugin import BaseParserPlugin  # Базовый класс плагина-парсера
 from .parse_results import HandHistoryResult
+from .hand_summary import (
+    HandSummary,
+    ROLE_FINAL_TABLE,
+    ROLE_PRE_FINAL_TABLE,
+    SUMMARY_FORMAT_VERSION,
+    decode_hand_summary,
+    encode_hand_summary,
+)
+from services.profiling import NULL_PROFILER
+from services.progress import ImportCancelled
 
 logger = logging.getLogger('ROYAL_Stats.HandHistoryParser')
 logger.setLevel(logging.DEBUG if app_config.debug else logging.INFO)
@@ -34,26 +47,59 @@ RE_RAISE_TO = re.compile(r'raises [\d,]+ to ([\d,]+)')
 RE_UNCALLED = re.compile(r'^Uncalled bet \(([\d,]+)\) returned to ([^\n]+)')
 RE_COLLECTED = re.compile(r'^([^:]+) collected ([\d,]+) from pot')
 RE_SUMMARY = re.compile(r'^\*\*\* SUMMARY \*\*\*')
+# Единый классификатор строк раздачи: одна попытка сопоставления на строку.
+# Альтернативы повторяют RE_SEAT, RE_TABLE_INFO, RE_UNCALLED, RE_ACTION (+RE_RAISE_TO)
+# и RE_COLLECTED; сработавшую ветку определяет m.lastgroup.
+RE_HH_LINE = re.compile(
+    r"Seat \d+: (?P<seat_player>[^()]+?) \((?P<seat_stack>[-\d,]+) in chips\)(?P<seat>)"
+    r"|Table '\d+' (?P<table_size>\d+)-max Seat #\d+ is the button(?P<table>)"
+    r"|Uncalled bet \((?P<uncalled_amount>[\d,]+)\) returned to (?P<uncalled_player>.+)(?P<uncalled>)"
+    r"|(?P<player>[^:]+): (?P<action>posts|bets|calls|raises|all-in|checks|folds|shows)\b"
+    r"(?:.*?(?P<amount>[\d,]+))?(?: to (?P<raise_to>[\d,]+))?.*(?P<act>)"
+    r"|(?P<collector>[^:]+) collected (?P<collected_amount>[\d,]+) from pot(?P<collected>)"
+)
+LINE_SEAT, LINE_TABLE, LINE_UNCALLED, LINE_ACTION, LINE_COLLECTED = (
+    'seat', 'table', 'uncalled', 'act', 'collected'
+)
 RE_DATE = re.compile(r"(\d{4}/\d{2}/\d{2} \d{2}:\d{2}:\d{2})") # Для поиска даты/времени турнира
 
+# Параллельный разбор: предельный размер пачки раздач и период проверки отмены, с.
+# После отмены парсер возвращается не позже чем через PARALLEL_CANCEL_POLL_S,
+# а уже запущенные пачки (не больше PARALLEL_BATCH_MAX_HANDS раздач на процесс)
+# дорабатывают в фоне и отбрасываются.
+PARALLEL_BATCH_MAX_HANDS = 64
+PARALLEL_CANCEL_POLL_S = 0.1
+
 CHIP = lambda s: int(s.replace(',', '')) if s else 0
 NAME = lambda s: s.strip()
 
 class Pot:
-    """Внутреннее представление банка для подсчета KO."""
-    __slots__ = ('size', 'eligible', 'winners')
-    def __init__(self, size: int, eligible: Set[str]):
+    """
+    Внутреннее представление банка (слоя) для подсчета KO.
+
+    Участники слоя - суффикс общего для раздачи кортежа игроков,
+    отсортированного по вкладу, начиная с позиции start. Множество
+    eligible строится только по запросу.
+    """
+    __slots__ = ('size', 'ordered', 'start', 'winners')
+    def __init__(self, size: int, ordered: Tuple[str, ...], start: int = 0):
         self.size = size
-        self.eligible: Set[str] = eligible.copy()
+        self.ordered = ordered
+        self.start = start
         self.winners: Set[str] = set()
 
+    @property
+    def eligible(self) -> Set[str]:
+        return set(self.ordered[self.start:])
+
 class HandData:
     """Внутреннее представление данных раздачи для парсинга KO."""
     __slots__ = ('hand_id', 'hand_number', 'tournament_id', 'table_size',
-                 'bb', 'seats', 'contrib', 'collects', 'pots',
+                 'bb', 'seats', 'contrib', 'collects', 'pots', 'pot_index',
                  'final_stacks', 'all_in_players',
-                 'hero_stack', 'players_count', 'hero_ko_this_hand', 'pre_ft_ko',
-                 'hero_ko_attempts', 'is_early_final', 'timestamp', 'players', 'eliminated_players')
+                 'hero_stack', 'players_count', 'hero_ko_this_hand', 'pre_ft_ko', 'pre_ft_raw_ko',
+                 'hero_ko_attempts', 'is_early_final', 'timestamp', 'players', 'eliminated_players',
+                 'summary')
 
     def __init__(self, hand_id: str, hand_number: int, tournament_id: str, table_size: int, bb: float, seats: Dict[str, int], timestamp: str = None):
         self.hand_id = hand_id
@@ -65,17 +111,42 @@ class HandData:
         self.contrib: Dict[str, int] = {}
         self.collects: Dict[str, int] = {}
         self.pots: List[Pot] = []
+        self.pot_index: Dict[str, int] = {}  # игрок -> индекс последнего банка с его фишками
         self.final_stacks: Dict[str, int] = {}  # final_stack для каждого игрока
         self.all_in_players: Set[str] = set()  # игроки, которые пошли all-in
         self.hero_stack = seats.get(app_config.hero_name) # Стек Hero в начале раздачи
         self.players_count = len(seats)
         self.hero_ko_this_hand = 0 # KO Hero в этой раздаче
         self.pre_ft_ko = 0.0
+        self.pre_ft_raw_ko = 0  # KO перед неполной финалкой без коэффициента
         self.hero_ko_attempts = 0  # Попытки КО Hero в этой раздаче
         self.is_early_final = False # Флаг ранней стадии финалки
         self.timestamp = timestamp  # Время начала раздачи
         self.players = list(seats.keys())  # Список игроков за столом в этой раздаче
         self.eliminated_players = set()  # Игроки, выбывшие в этой раздаче
+        self.summary: Optional[bytes] = None  # Бинарная сводка для пересчёта KO без HH
+
+def _parse_hand_chunk_batch(
+    hero_name: str,
+    tournament_id: str,
+    batch: List[Tuple[int, List[str]]],
+) -> Tuple[List[Tuple[int, Optional[HandData], Optional[str]]], float, float]:
+    """
+    Разбирает пачку раздач в дочернем процессе.
+    Возвращает список (индекс, HandData или None, текст ошибки) для каждой
+    раздачи и затраченное время пачки (wall, CPU) для профилирования.
+    """
+    wall_start = time.perf_counter()
+    cpu_start = time.thread_time()
+    parser = HandHistoryParser(hero_name)
+    results = []
+    for index, lines in batch:
+        try:
+            results.append((index, parser._parse_hand_chunk(lines, tournament_id, index + 1), None))
+        except Exception as e:
+            results.append((index, None, str(e)))
+    return results, time.perf_counter() - wall_start, time.thread_time() - cpu_start
+
 
 class HandHistoryParser(BaseParserPlugin[HandHistoryResult]):
     """Плагин-парсер hand history."""
@@ -86,8 +157,9 @@ class HandHistoryParser(BaseParserPlugin[HandHistoryResult]):
         super().__init__(hero_name)
         self._tournament_id: Optional[str] = None
         self._start_time: Optional[str] = None
-        self._hands: List[HandData] = [] # Все раздачи из файла
+        self._hands: List[HandData] = [] # Полностью разобранные раздачи начиная с первой раздачи финального стола (ft_index)
         self._final_table_hands: List[HandData] = [] # Только раздачи финального стола (9-max, без учёта блайндов)
+        self.profiler = NULL_PROFILER  # Подменяется ImportService при включённом профилировании
 
 
     def parse(self, file_content: str, filename: str = "") -> HandHistoryResult:
@@ -103,11 +175,13 @@ class HandHistoryParser(BaseParserPlugin[HandHistoryResult]):
             'final_table_initial_stack_bb': float,
             'final_table_hands_data': List[Dict[str, Any]] # Список данных по рукам финалки
         """
-        lines = file_content.splitlines()
         self._reset() # Сброс состояния парсера для нового файла
 
         # Сначала определим все начала раздач в файле
-        hand_chunks = self._split_file_into_hand_chunks(lines)
+        with self.profiler.stage("split"):
+            lines = file_content.splitlines()
+            hand_chunks = self._split_file_into_hand_chunks(lines)
+        self.profiler.count("hands", len(hand_chunks))
         
         # Если не нашли ни одной руки, вернем пустой результат
         if not hand_chunks:
@@ -151,8 +225,8 @@ class HandHistoryParser(BaseParserPlugin[HandHistoryResult]):
         
         # Обрабатываем раздачи в хронологическом порядке (от первой к последней)
         # Поскольку в файле они идут в ОБРАТНОМ порядке, мы обрабатываем chunks в обратном порядке
-        hand_number_counter = 0
         first_ft_hand_data: Optional[HandData] = None
+        pre_ft_hand_data: Optional[HandData] = None  # Раздача Hero перед стартом финалки
         
         # Получаем хронологически первую раздачу для определения start_time турнира
         first_chunk = hand_chunks[-1]  # Последний chunk в массиве - это первая раздача хронологически
@@ -162,54 +236,72 @@ class HandHistoryParser(BaseParserPlugin[HandHistoryResult]):
                 self._start_time = m_dt.group(1)
                 break
         
-        # Теперь обрабатываем раздачи в хронологическом порядке (от первой к последней)
-        final_table_started = False
-        prev_hand_data: Optional[HandData] = None
+        # Раздачи в хронологическом порядке: номер раздачи = позиция + 1
+        chronological_chunks = list(reversed(hand_chunks))
+
+        # Фаза 1: дешёвый проход по заголовкам - находим начало финального стола.
+        # Раздачи до финалки полностью не разбираются, кроме последней раздачи
+        # Hero перед ней (нужна для pre_ft_ko при неполном старте финалки).
+        with self.profiler.stage("split"):
+            headers = self._scan_hand_headers(chronological_chunks)
+        ft_index = next(
+            (i for i, (table_size, hero_seated) in enumerate(headers)
+             if hero_seated and table_size == app_config.final_table_size),
+            None,
+        )
+
+        if ft_index is not None:
+            prev_index = next(
+                (i for i in range(ft_index - 1, -1, -1) if headers[i][1]),
+                None,
+            )
+            indices = list(range(ft_index, len(chronological_chunks)))
+            if prev_index is not None:
+                indices.insert(0, prev_index)
+
+            # Фаза 2: независимый разбор раздач (параллельно для больших файлов)
+            parsed = self._parse_hand_chunks(chronological_chunks, indices, filename)
+
+            final_table_started = False
+            prev_hand_data: Optional[HandData] = parsed.get(prev_index) if prev_index is not None else None
+
+            for index in range(ft_index, len(chronological_chunks)):
+                hand_data = parsed.get(index)
+                if not hand_data:
+                    continue
+
+                self._hands.append(hand_data)
+                actual_players_count = len(hand_data.seats)
+
+                if not final_table_started:
+                    # Проверяем условия старта финального стола
+                    if hand_data.table_size == app_config.final_table_size:
+                        final_table_started = True
+                        pre_ft_hand_data = prev_hand_data
+                        # Если финальный стол начинается неполным составом, учитываем KO из предыдущей раздачи
+                        self._apply_pre_ft_ko(hand_data, prev_hand_data)
 
-        for hand_chunk in reversed(hand_chunks):  # Обрабатываем от последней в файле (первой хронологически)
-            hand_number_counter += 1
-            try:
-                hand_data = self._parse_hand_chunk(hand_chunk, self._tournament_id, hand_number_counter)
-
-                if hand_data:
-                    self._hands.append(hand_data)  # Сохраняем все раздачи
-
-                    actual_players_count = len(hand_data.seats)
-
-                    if not final_table_started:
-                        # Проверяем условия старта финального стола
-                        if hand_data.table_size == app_config.final_table_size:
-                            final_table_started = True
-                            # Если финальный стол начинается неполным составом, учитываем KO из предыдущей раздачи
-                            if prev_hand_data and actual_players_count < app_config.final_table_size:
-                                prev_ko = self._count_ko_in_hand_from_data(prev_hand_data)
-                                coeff = app_config.ko_coeff.get(actual_players_count, 0)
-                                hand_data.pre_ft_ko = prev_ko * coeff
-                                hand_data.hero_ko_this_hand += hand_data.pre_ft_ko
-
-                            self._final_table_hands.append(hand_data)
-                            first_ft_hand_data = hand_data
-
-                            if 6 <= actual_players_count <= app_config.final_table_size:
-                                hand_data.is_early_final = True
-                    else:
-                        # Финальный стол уже начался - добавляем все последующие раздачи
-                        hand_data.is_early_final = actual_players_count >= 6
                         self._final_table_hands.append(hand_data)
+                        first_ft_hand_data = hand_data
 
-                    prev_hand_data = hand_data
-                            
-            except Exception as e:
-                logger.error(f"Ошибка парсинга раздачи в файле {filename}: {e}")
-                continue  # Переходим к следующей раздаче
+                        if 6 <= actual_players_count <= app_config.final_table_size:
+                            hand_data.is_early_final = True
+                else:
+                    # Финальный стол уже начался - добавляем все последующие раздачи
+                    hand_data.is_early_final = actual_players_count >= 6
+                    self._final_table_hands.append(hand_data)
+
+                prev_hand_data = hand_data
         
         # Подсчитываем KO Hero для всех раздач финального стола
         final_table_data_for_db: List[Dict[str, Any]] = []
         
         for hand_data in self._final_table_hands:
+            self.check_cancelled()
             try:
                 # Подсчитываем количество KO для руки
-                ko_this_hand = self._count_ko_in_hand_from_data(hand_data)
+                with self.profiler.stage("pots_ko"):
+                    ko_this_hand = self._count_ko_in_hand_from_data(hand_data)
                 # Не перезаписываем hero_ko_this_hand, так как для первой руки
                 # финального стола он может уже содержать дробное значение,
                 # начисленное за KO в предыдущей 5-max раздаче.
@@ -233,12 +325,23 @@ class HandHistoryParser(BaseParserPlugin[HandHistoryResult]):
                         'players_count': hand_data.players_count,
                         'hero_ko_this_hand': hand_data.hero_ko_this_hand,
                         'pre_ft_ko': hand_data.pre_ft_ko,
+                        'pre_ft_raw_ko': hand_data.pre_ft_raw_ko,
                         'hero_ko_attempts': hand_data.hero_ko_attempts,
                         'is_early_final': hand_data.is_early_final,
                         # session_id будет добавлен в ImportService
                     }
                 )
         
+        # Сводки раздач для пересчёта KO без повторного чтения файлов
+        hand_summaries: List[Dict[str, Any]] = []
+        if self._final_table_hands:
+            if pre_ft_hand_data is not None:
+                hand_summaries.append(self._summary_record(pre_ft_hand_data, ROLE_PRE_FINAL_TABLE))
+            hand_summaries.extend(
+                self._summary_record(hand_data, ROLE_FINAL_TABLE)
+                for hand_data in self._final_table_hands
+            )
+
         # Собираем итоговый результат для ImportService
         return HandHistoryResult(
             tournament_id=self._tournament_id,
@@ -248,8 +351,101 @@ class HandHistoryParser(BaseParserPlugin[HandHistoryResult]):
             final_table_initial_stack_bb=(first_ft_hand_data.hero_stack / first_ft_hand_data.bb) if first_ft_hand_data and first_ft_hand_data.bb > 0 else None,
             final_table_start_players=first_ft_hand_data.players_count if first_ft_hand_data else None,
             final_table_hands_data=final_table_data_for_db, # Список данных по рукам финалки для сохранения
+            hand_summaries=[record for record in hand_summaries if record['data'] is not None],
         )
 
+    @staticmethod
+    def _summary_record(hand_data: HandData, role: int) -> Dict[str, Any]:
+        """Запись сводки раздачи для таблицы hand_action_summaries."""
+        return {
+            'tournament_id': hand_data.tournament_id,
+            'hand_id': hand_data.hand_id,
+            'hand_number': hand_data.hand_number,
+            'role': role,
+            'format_version': SUMMARY_FORMAT_VERSION,
+            'data': hand_data.summary,
+        }
+
+    def _apply_pre_ft_ko(self, hand_data: HandData, prev_hand_data: Optional[HandData]):
+        """
+        Начисляет первой раздаче финалки KO из предыдущей раздачи Hero, если
+        финальный стол стартовал неполным составом. Сырое число KO хранится
+        отдельно, чтобы смена ko_coeff пересчитывалась без повторного импорта.
+        """
+        players_count = len(hand_data.seats)
+        if not prev_hand_data or players_count >= app_config.final_table_size:
+            return
+        hand_data.pre_ft_raw_ko = self._count_ko_in_hand_from_data(prev_hand_data)
+        hand_data.pre_ft_ko = hand_data.pre_ft_raw_ko * app_config.ko_coeff.get(players_count, 0)
+        hand_data.hero_ko_this_hand += hand_data.pre_ft_ko
+
+    def rederive_tournament(
+        self,
+        tournament_id: str,
+        summaries: List[Tuple[str, int, int, bytes]],
+    ) -> List[Dict[str, Any]]:
+        """
+        Пересчитывает KO-показатели раздач финалки турнира по сохранённым сводкам.
+
+        Args:
+            tournament_id: ID турнира
+            summaries: Кортежи (hand_id, hand_number, role, data) одного турнира
+                в порядке номеров раздач
+
+        Returns:
+            Для каждой раздачи финалки словарь с ключами hand_id,
+            hero_ko_this_hand, pre_ft_ko, pre_ft_raw_ko и hero_ko_attempts
+        """
+        results: List[Dict[str, Any]] = []
+        prev_hand_data: Optional[HandData] = None
+        first_hand = True
+        for hand_id, hand_number, role, data in summaries:
+            summary = decode_hand_summary(data)
+            hand_data = self._hand_data_from_summary(summary, tournament_id, hand_id, hand_number)
+            if role == ROLE_PRE_FINAL_TABLE:
+                prev_hand_data = hand_data
+                continue
+
+            if first_hand:
+                self._apply_pre_ft_ko(hand_data, prev_hand_data)
+                first_hand = False
+            hand_data.hero_ko_attempts = self._count_ko_attempts_in_hand(hand_data, summary.detailed_actions())
+            try:
+                hand_data.hero_ko_this_hand += self._count_ko_in_hand_from_data(hand_data)
+            except Exception as e:
+                logger.error(f"Ошибка пересчёта KO раздачи {hand_id} в турнире {tournament_id}: {e}")
+                hand_data.hero_ko_this_hand = 0
+            results.append({
+                'hand_id': hand_id,
+                'hero_ko_this_hand': hand_data.hero_ko_this_hand,
+                'pre_ft_ko': hand_data.pre_ft_ko,
+                'pre_ft_raw_ko': hand_data.pre_ft_raw_ko,
+                'hero_ko_attempts': hand_data.hero_ko_attempts,
+            })
+        return results
+
+    def _hand_data_from_summary(
+        self,
+        summary: HandSummary,
+        tournament_id: str,
+        hand_id: str,
+        hand_number: int,
+    ) -> HandData:
+        """Восстанавливает HandData по сводке так же, как _parse_hand_chunk."""
+        hand_data = HandData(hand_id, hand_number, tournament_id, summary.table_size, summary.bb, summary.seats)
+        hand_data.contrib = summary.contrib
+        hand_data.collects = summary.collects
+        hand_data.all_in_players = summary.all_in_players
+        hand_data.final_stacks = {
+            pl: stack - summary.contrib.get(pl, 0) + summary.collects.get(pl, 0)
+            for pl, stack in summary.seats.items()
+        }
+        hand_data.eliminated_players = {pl for pl, stk in hand_data.final_stacks.items() if stk <= 0}
+        if hand_data.contrib:
+            hand_data.pots, hand_data.pot_index = self._build_pots(hand_data.contrib)
+            self._assign_winners(hand_data.pots, hand_data.collects, hand_data.pot_index)
+        return hand_data
+
     def _reset(self):
         """Сбрасывает состояние парсера для нового файла."""
         self._tournament_id = None
@@ -257,6 +453,107 @@ class HandHistoryParser(BaseParserPlugin[HandHistoryResult]):
         self._hands = []
         self._final_table_hands = []
 
+    def _scan_hand_headers(self, chunks: List[List[str]]) -> List[Tuple[int, bool]]:
+        """
+        Быстро просматривает заголовки раздач (до *** HOLE CARDS ***).
+        Возвращает для каждого chunk пару (размер стола, участвовал ли Hero)
+        по тем же правилам, что и _parse_hand_chunk.
+        """
+        headers: List[Tuple[int, bool]] = []
+        for lines in chunks:
+            table_size = 0
+            hero_seated = False
+            if lines and RE_HAND_START.match(lines[0]):
+                for line in lines:
+                    if line.startswith('*** HOLE'):
+                        break
+                    m_table_info = RE_TABLE_INFO.match(line)
+                    if m_table_info:
+                        table_size = int(m_table_info.group('table_size'))
+                    elif not hero_seated:
+                        m_seat = RE_SEAT.match(line)
+                        if m_seat and NAME(m_seat.group('player_name')) == app_config.hero_name:
+                            hero_seated = True
+            headers.append((table_size, hero_seated))
+        return headers
+
+    def _parse_hand_chunks(
+        self,
+        chunks: List[List[str]],
+        indices: List[int],
+        filename: str = "",
+    ) -> Dict[int, Optional[HandData]]:
+        """
+        Разбирает раздачи с указанными индексами (хронологический порядок).
+        Раздачи не зависят друг от друга, поэтому для больших файлов разбор
+        распределяется по пулу процессов; порядок восстанавливается по индексу.
+        """
+        self.profiler.count("hands_parsed", len(indices))
+        workers = app_config.hh_parallel_workers or os.cpu_count() or 1
+        if workers > 1 and len(indices) >= app_config.hh_parallel_min_hands:
+            try:
+                return self._parse_hand_chunks_parallel(chunks, indices, workers, filename)
+            except ImportCancelled:
+                raise
+            except Exception as e:
+                # Пул процессов недоступен (например, в замороженной сборке) - разбираем последовательно
+                logger.warning(f"Параллельный разбор {filename} не удался, используем последовательный: {e}")
+
+        parsed: Dict[int, Optional[HandData]] = {}
+        for index in indices:
+            self.check_cancelled()
+            try:
+                with self.profiler.stage("hand_parse"):
+                    parsed[index] = self._parse_hand_chunk(chunks[index], self._tournament_id, index + 1)
+            except Exception as e:
+                logger.error(f"Ошибка парсинга раздачи в файле {filename}: {e}")
+                parsed[index] = None
+        return parsed
+
+    def _parse_hand_chunks_parallel(
+        self,
+        chunks: List[List[str]],
+        indices: List[int],
+        workers: int,
+        filename: str,
+    ) -> Dict[int, Optional[HandData]]:
+        """
+        Разбирает раздачи пачками в ProcessPoolExecutor. Отмена проверяется
+        каждые PARALLEL_CANCEL_POLL_S секунд, а не только по готовности пачки.
+        """
+        batch_size = min(PARALLEL_BATCH_MAX_HANDS, max(1, -(-len(indices) // (workers * 4))))
+        batches = [
+            [(index, chunks[index]) for index in indices[start:start + batch_size]]
+            for start in range(0, len(indices), batch_size)
+        ]
+
+        parsed: Dict[int, Optional[HandData]] = {}
+        executor = ProcessPoolExecutor(max_workers=workers)
+        try:
+            pending = {
+                executor.submit(_parse_hand_chunk_batch, self.hero_name, self._tournament_id, batch)
+                for batch in batches
+            }
+            while pending:
+                done, pending = wait(pending, timeout=PARALLEL_CANCEL_POLL_S, return_when=FIRST_COMPLETED)
+                if self.cancel_check():
+                    raise ImportCancelled()
+                for future in done:
+                    results, wall, cpu = future.result()
+                    # В дочерних процессах pots_ko и ko_attempts входят в hand_parse
+                    self.profiler.add_time("hand_parse", wall, cpu)
+                    for index, hand_data, error in results:
+                        if error:
+                            logger.error(f"Ошибка парсинга раздачи в файле {filename}: {error}")
+                        parsed[index] = hand_data
+        except BaseException:
+            # Не ждём оставшиеся пачки
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+        executor.shutdown()
+        logger.debug(f"Параллельный разбор {filename}: {len(indices)} раздач, {len(batches)} пачек, {workers} процессов")
+        return parsed
+
     def _split_file_into_hand_chunks(self, lines: List[str]) -> List[List[str]]:
         """
         Разбивает файл на chunks, каждый из которых содержит одну раздачу.
@@ -269,6 +566,7 @@ class HandHistoryParser(BaseParserPlugin[HandHistoryResult]):
         for line in lines:
             if RE_HAND_START.match(line) and current_chunk:
                 # Нашли начало новой раздачи, сохраняем предыдущую
+                self.check_cancelled()
                 chunks.append(current_chunk)
                 current_chunk = [line]
             else:
@@ -306,57 +604,61 @@ class HandHistoryParser(BaseParserPlugin[HandHistoryResult]):
         table_size: int = 0
         bb: float = 0.0
         hero_participated = False
-        
-        # Ищем информацию о столе, блайндах и стеках
+
+        # --- стол, блайнды, стеки и ante / SB / BB до HOLE CARDS ---
+        preflop_contrib: Dict[str, int] = {}
+        preflop_blinds: Dict[str, int] = {}  # Отдельно отслеживаем блайнды для рейзов
+        # Обязательные ставки для авто-олл-инов (как и прежде: цифры до первой запятой)
+        forced_antes: Dict[str, int] = {}
+        forced_blinds: Dict[str, int] = {}
         idx = 0
         while idx < len(lines) and not lines[idx].startswith('*** HOLE'):
             line = lines[idx]
-            m_table_info = RE_TABLE_INFO.match(line)
-            if m_table_info:
-                table_size = int(m_table_info.group('table_size'))
-                
-            m_blinds = RE_BLINDS_HEADER.search(line)
-            if m_blinds:
-                # Значение BB может содержать разделители тысяч вида "1,000".
-                # Заменяем запятую на пустую строку, чтобы корректно обработать
-                # как значения "0.5", так и "1,000" → 1000.0
-                bb_str = m_blinds.group(2).replace(',', '')
-                bb = float(bb_str)
-                
-            m_seat = RE_SEAT.match(line)
-            if m_seat:
-                name, stack_str = m_seat.groups()
-                player_name = NAME(name)
-                seats[player_name] = CHIP(stack_str)
+            idx += 1
+            m_line = RE_HH_LINE.match(line)
+            kind = m_line.lastgroup if m_line else None
+            if kind == LINE_SEAT:
+                player_name = NAME(m_line.group('seat_player'))
+                seats[player_name] = CHIP(m_line.group('seat_stack'))
                 if player_name == app_config.hero_name:
                     hero_participated = True
-                    
-            idx += 1
-            
+            elif kind == LINE_TABLE:
+                table_size = int(m_line.group('table_size'))
+            elif kind == LINE_ACTION:
+                if m_line.group('action') != 'posts':
+                    continue
+                pl = NAME(m_line.group('player'))
+                amount_str = m_line.group('amount')
+                amount = CHIP(amount_str) if amount_str else 0
+                if amount > 0:
+                    preflop_contrib[pl] = preflop_contrib.get(pl, 0) + amount
+                    # Если это блайнд (не анте), сохраняем для учета в рейзах
+                    if 'blind' in line.lower():
+                        preflop_blinds[pl] = preflop_blinds.get(pl, 0) + amount
+                leading_digits = amount_str.split(',', 1)[0] if amount_str else ''
+                if leading_digits:
+                    if 'posts the ante' in line:
+                        forced_antes[pl] = int(leading_digits)
+                    elif 'posts small blind' in line or 'posts big blind' in line:
+                        forced_blinds[pl] = int(leading_digits)
+            else:
+                m_blinds = RE_BLINDS_HEADER.search(line)
+                if m_blinds:
+                    # Значение BB может содержать разделители тысяч вида "1,000".
+                    # Заменяем запятую на пустую строку, чтобы корректно обработать
+                    # как значения "0.5", так и "1,000" → 1000.0
+                    bb = float(m_blinds.group(2).replace(',', ''))
+
         # Если Hero не участвовал, пропускаем раздачу
         if not hero_participated:
             return None
             
         # Создаем HandData
         hand_data = HandData(hand_id, hand_number, tournament_id, table_size, bb, seats, timestamp)
-        
-        # --- ante / SB / BB до HOLE CARDS ---
-        preflop_contrib: Dict[str, int] = {}
-        preflop_blinds: Dict[str, int] = {}  # Отдельно отслеживаем блайнды для рейзов
-        for pre_line in lines[:idx]:
-            m_post = RE_ACTION.match(pre_line.strip())
-            if m_post and m_post.group('action') == 'posts':
-                pl = NAME(m_post.group('player_name'))
-                # Get amount from the third group (index 2)
-                amount_str = m_post.group(3) if len(m_post.groups()) > 2 else None
-                amount = CHIP(amount_str) if amount_str else 0
-                if amount > 0:
-                    preflop_contrib[pl] = preflop_contrib.get(pl, 0) + amount
-                    # Если это блайнд (не анте), сохраняем для учета в рейзах
-                    if 'blind' in pre_line.lower():
-                        preflop_blinds[pl] = preflop_blinds.get(pl, 0) + amount
 
-        contrib_act, collects, detailed_actions = self._parse_actions_and_collects(lines[idx:], preflop_blinds, seats)
+        contrib_act, collects, detailed_actions, explicit_all_ins = self._parse_actions_and_collects(
+            lines[idx:], preflop_blinds, seats
+        )
 
         # объединяем
         contrib = contrib_act.copy()  # Start with a copy to avoid modifying contrib_act
@@ -371,36 +673,9 @@ class HandHistoryParser(BaseParserPlugin[HandHistoryResult]):
         all_in_players = set()
         auto_all_ins = set()
         
-        # Проверяем авто-олл-ины
+        # Проверяем авто-олл-ины: стек не больше обязательной ставки (анте + блайнд)
         for pl, stack in seats.items():
-            forced_bet = 0
-            ante_amount = 0
-            blind_amount = 0
-            
-            # Ищем анте и блайнды для этого игрока
-            for line in lines[:idx]:
-                if f"{pl}: posts the ante" in line:
-                    m = re.search(r'ante (\d+)', line)
-                    if m:
-                        ante_amount = int(m.group(1))
-                elif f"{pl}: posts small blind" in line:
-                    m = re.search(r'blind (\d+)', line)
-                    if m:
-                        blind_amount = int(m.group(1))
-                elif f"{pl}: posts big blind" in line:
-                    m = re.search(r'blind (\d+)', line)
-                    if m:
-                        blind_amount = int(m.group(1))
-            
-            # Определяем обязательную ставку в зависимости от позиции
-            if blind_amount > 0:
-                # Игрок на SB или BB
-                forced_bet = blind_amount + ante_amount
-            else:
-                # Игрок на других позициях - только анте
-                forced_bet = ante_amount
-            
-            # Если стек <= обязательной ставки - это авто-олл-ин
+            forced_bet = forced_antes.get(pl, 0) + forced_blinds.get(pl, 0)
             if forced_bet > 0 and stack <= forced_bet:
                 auto_all_ins.add(pl)
         
@@ -413,12 +688,8 @@ class HandHistoryParser(BaseParserPlugin[HandHistoryResult]):
         # Объединяем с авто-олл-инами
         all_in_players.update(auto_all_ins)
 
-        # Дополнительно проверяем явные all-in действия из истории
-        for line in lines[idx:]:
-            if ": all-in" in line:
-                m = re.match(r'^([^:]+): all-in', line.strip())
-                if m:
-                    all_in_players.add(NAME(m.group(1)))
+        # Дополнительно учитываем явные all-in действия из истории
+        all_in_players.update(explicit_all_ins)
 
         hand_data.contrib = contrib
         hand_data.collects = collects
@@ -436,30 +707,47 @@ class HandHistoryParser(BaseParserPlugin[HandHistoryResult]):
                 all_in_players.add(eliminated)
         
         if hand_data.contrib:  # Строим банки только если были вклады
-            hand_data.pots = self._build_pots(hand_data.contrib)
-            self._assign_winners(hand_data.pots, hand_data.collects)
+            with self.profiler.stage("pots_ko"):
+                hand_data.pots, hand_data.pot_index = self._build_pots(hand_data.contrib)
+                self._assign_winners(hand_data.pots, hand_data.collects, hand_data.pot_index)
         
         # Подсчитываем попытки КО
-        hand_data.hero_ko_attempts = self._count_ko_attempts_in_hand(hand_data, detailed_actions)
-            
+        with self.profiler.stage("ko_attempts"):
+            hand_data.hero_ko_attempts = self._count_ko_attempts_in_hand(hand_data, detailed_actions)
+
+        with self.profiler.stage("hand_summary"):
+            try:
+                hand_data.summary = encode_hand_summary(hand_data, detailed_actions)
+            except Exception as e:
+                # Раздача за пределами формата сводки (длина имени, число действий)
+                # сохраняется без сводки: её KO пересчитываются только повторным импортом
+                logger.error(f"Не удалось закодировать сводку раздачи {hand_id}: {e}")
+                hand_data.summary = None
+
         return hand_data
         
-    def _parse_actions_and_collects(self, lines: List[str], preflop_blinds: Dict[str, int] = None, seats: Dict[str, int] = None) -> Tuple[Dict[str, int], Dict[str, int], Dict[str, List[Tuple[str, str, int, Dict[str, int]]]]]:
+    def _parse_actions_and_collects(self, lines: List[str], preflop_blinds: Dict[str, int] = None, seats: Dict[str, int] = None) -> Tuple[Dict[str, int], Dict[str, int], Dict[str, List[Tuple[str, str, int, Dict[str, int], int]]], Set[str]]:
         """
         Парсит действия и сборы из части раздачи, начиная с *** HOLE CARDS ***.
         
         ВАЖНО: preflop_blinds содержит ТОЛЬКО блайнды (не анте!)
         Анте уже учтены в preflop_contrib в вызывающем методе.
+
+        Строки улиц распознаются по префиксу '***', остальные - одним
+        сопоставлением RE_HH_LINE. Действия учитываются до *** SHOWDOWN /
+        *** SUMMARY, сборы (collected) - после.
         
         Returns:
             contrib: вклады игроков
             collects: выигрыши игроков
             detailed_actions: словарь с детальными действиями каждого игрока
+            explicit_all_ins: игроки с явным действием "all-in"
         """
         contrib: Dict[str, int] = {}
         street_contrib: Dict[str, int] = {}  # Вклады на текущей улице
         collects: Dict[str, int] = {}
         detailed_actions: Dict[str, List[Tuple[str, str, int, Dict[str, int], int]]] = {}  # player -> [(street, action, amount, street_stacks, order)]
+        explicit_all_ins: Set[str] = set()
         
         # Стеки игроков для отслеживания на каждой улице
         current_stacks = seats.copy() if seats else {}
@@ -468,192 +756,175 @@ class HandHistoryParser(BaseParserPlugin[HandHistoryResult]):
         if preflop_blinds:
             street_contrib = preflop_blinds.copy()
         
-        idx = 0
         current_street = 'PREFLOP'
         action_index = 0  # Порядковый номер действия для определения очередности
+        actions_done = False  # Достигнут *** SHOWDOWN / *** SUMMARY
         
-        while idx < len(lines) and not lines[idx].strip().startswith(('*** SHOWDOWN', '*** SUMMARY')):
-            line = lines[idx].strip()
-            
-            # Новая улица - сбрасываем street_contrib
-            if line.startswith('*** FLOP ***'):
-                street_contrib.clear()
-                current_street = 'FLOP'
-            elif line.startswith('*** TURN ***'):
-                street_contrib.clear()
-                current_street = 'TURN'
-            elif line.startswith('*** RIVER ***'):
-                street_contrib.clear()
-                current_street = 'RIVER'
+        for line in lines:
+            if line.startswith('***'):
+                if actions_done:
+                    continue
+                # Новая улица - сбрасываем street_contrib
+                if line.startswith(('*** SHOWDOWN', '*** SUMMARY')):
+                    actions_done = True
+                elif line.startswith('*** FLOP ***'):
+                    street_contrib.clear()
+                    current_street = 'FLOP'
+                elif line.startswith('*** TURN ***'):
+                    street_contrib.clear()
+                    current_street = 'TURN'
+                elif line.startswith('*** RIVER ***'):
+                    street_contrib.clear()
+                    current_street = 'RIVER'
+                continue
+
+            m_line = RE_HH_LINE.match(line)
+            if m_line is None:
+                continue
+            kind = m_line.lastgroup
+
+            if kind == LINE_COLLECTED:
+                if actions_done:
+                    pl = NAME(m_line.group('collector'))
+                    collects[pl] = collects.get(pl, 0) + CHIP(m_line.group('collected_amount'))
+                continue
+
+            if kind == LINE_UNCALLED:
+                if not actions_done:
+                    pl = NAME(m_line.group('uncalled_player'))
+                    val = CHIP(m_line.group('uncalled_amount'))
+                    contrib[pl] = max(0, contrib.get(pl, 0) - val)
+                    street_contrib[pl] = max(0, street_contrib.get(pl, 0) - val)
+                continue
+
+            if kind != LINE_ACTION:
+                continue
+            pl = NAME(m_line.group('player'))
+            act = m_line.group('action')
+            if act == 'all-in':
+                explicit_all_ins.add(pl)
+            if actions_done:
+                continue
+            amt_str = m_line.group('amount')
+
+            # Обновляем текущие стеки после вкладов
+            action_amount = 0
+            street_stacks_snapshot = current_stacks.copy()
             
-            m_action = RE_ACTION.match(line)
-            if m_action:
-                pl = NAME(m_action.group('player_name'))
-                act = m_action.group('action')
-                amt_str = m_action.group(3) if len(m_action.groups()) > 2 else None
-
-                # Обновляем текущие стеки после вкладов
-                action_amount = 0
-                street_stacks_snapshot = current_stacks.copy()
-                
-                if act in ('posts', 'bets', 'calls', 'all-in'):
-                    amt = CHIP(amt_str) if amt_str else 0
-                    action_amount = amt
-                    contrib[pl] = contrib.get(pl, 0) + amt
-                    street_contrib[pl] = street_contrib.get(pl, 0) + amt
+            if act in ('posts', 'bets', 'calls', 'all-in'):
+                amt = CHIP(amt_str) if amt_str else 0
+                action_amount = amt
+                contrib[pl] = contrib.get(pl, 0) + amt
+                street_contrib[pl] = street_contrib.get(pl, 0) + amt
+                # Обновляем стек
+                if pl in current_stacks:
+                    current_stacks[pl] = max(0, current_stacks[pl] - amt)
+                    
+            elif act == 'raises':
+                # Пример: "d16ad03f: raises 2,846 to 3,146"
+                # В GG Poker это значит: рейз ДО 3,146 (total amount)
+                raise_to = m_line.group('raise_to')
+                if raise_to:
+                    total_to = CHIP(raise_to)
+                    # Сколько игрок уже поставил на этой улице
+                    already_on_street = street_contrib.get(pl, 0)
+                    # Сколько нужно доставить
+                    to_add = total_to - already_on_street
+                    action_amount = total_to  # Для попыток КО важен общий размер ставки
+                    
+                    if to_add < 0:
+                        logger.warning(f"Negative raise amount in {current_street}: {pl} raises to {total_to}, but already has {already_on_street}")
+                        to_add = 0
+                    elif to_add == 0:
+                        logger.warning(f"Zero raise amount in {current_street}: {pl} raises to {total_to}, already has {already_on_street}")
+                    
+                    contrib[pl] = contrib.get(pl, 0) + to_add
+                    street_contrib[pl] = total_to
                     # Обновляем стек
                     if pl in current_stacks:
-                        current_stacks[pl] = max(0, current_stacks[pl] - amt)
-                        
-                elif act == 'raises':
-                    amt = CHIP(amt_str) if amt_str else 0
-                    # Пример: "d16ad03f: raises 2,846 to 3,146"
-                    # В GG Poker это значит: рейз ДО 3,146 (total amount)
-                    m_raise_to = RE_RAISE_TO.search(line)
-                    if m_raise_to:
-                        total_to = CHIP(m_raise_to.group(1))
-                        # Сколько игрок уже поставил на этой улице
-                        already_on_street = street_contrib.get(pl, 0)
-                        # Сколько нужно доставить
-                        to_add = total_to - already_on_street
-                        action_amount = total_to  # Для попыток КО важен общий размер ставки
-                        
-                        if to_add < 0:
-                            logger.warning(f"Negative raise amount in {current_street}: {pl} raises to {total_to}, but already has {already_on_street}")
-                            to_add = 0
-                        elif to_add == 0:
-                            logger.warning(f"Zero raise amount in {current_street}: {pl} raises to {total_to}, already has {already_on_street}")
-                        
-                        contrib[pl] = contrib.get(pl, 0) + to_add
-                        street_contrib[pl] = total_to
-                        # Обновляем стек
-                        if pl in current_stacks:
-                            current_stacks[pl] = max(0, current_stacks[pl] - to_add)
-                        
-                        # Можно логировать значительные рейзы при необходимости
-                
-                # Записываем детальное действие (не записываем posts)
-                if act != 'posts':
-                    if pl not in detailed_actions:
-                        detailed_actions[pl] = []
-                    detailed_actions[pl].append((current_street, act, action_amount, street_stacks_snapshot, action_index))
-                    action_index += 1
-            
-            # Uncalled bet
-            m_unc = RE_UNCALLED.match(line)
-            if m_unc:
-                amt_str, pl_name = m_unc.groups()
-                pl = NAME(pl_name)
-                val = CHIP(amt_str)
-                contrib[pl] = max(0, contrib.get(pl, 0) - val)
-                street_contrib[pl] = max(0, street_contrib.get(pl, 0) - val)
+                        current_stacks[pl] = max(0, current_stacks[pl] - to_add)
             
-            idx += 1
-        
-        # Парсим collected
-        for j in range(idx, len(lines)):
-            line = lines[j].strip()
-            m_collected = RE_COLLECTED.match(line)
-            if m_collected:
-                pl, amt_str = m_collected.groups()
-                collects[NAME(pl)] = collects.get(NAME(pl), 0) + CHIP(amt_str)
+            # Записываем детальное действие (не записываем posts)
+            if act != 'posts':
+                if pl not in detailed_actions:
+                    detailed_actions[pl] = []
+                detailed_actions[pl].append((current_street, act, action_amount, street_stacks_snapshot, action_index))
+                action_index += 1
         
         # Добавляем исходные строки для анализа авто олл-инов
         detailed_actions['raw_lines'] = lines
         
-        return contrib, collects, detailed_actions
+        return contrib, collects, detailed_actions, explicit_all_ins
 
-    def _build_pots(self, contrib: Dict[str, int]) -> List[Pot]:
-        """Строит структуру банков (главный и сайд-поты) из вкладов игроков."""
-        pots = []
-        if not contrib:
-            return pots # Нет вкладов, нет банков
+    def _build_pots(self, contrib: Dict[str, int]) -> Tuple[List[Pot], Dict[str, int]]:
+        """
+        Строит структуру банков (главный и сайд-поты) из вкладов игроков.
 
-        # Получаем уникальные уровни вкладов, сортируем по возрастанию
-        levels = sorted(set(v for v in contrib.values() if v > 0))
+        Вклады сортируются один раз: участники слоя - все игроки, начиная
+        с первого вложившего не меньше уровня слоя, поэтому размер слоя равен
+        приращению уровня, умноженному на длину этого суффикса.
 
+        Returns:
+            Список банков по возрастанию уровня и отображение
+            игрок -> индекс последнего банка, в котором есть его фишки.
+        """
+        ordered = sorted((amount, player) for player, amount in contrib.items() if amount > 0)
+        players = tuple(player for _, player in ordered)
+        pots: List[Pot] = []
+        pot_index: Dict[str, int] = {}
+        total = len(ordered)
         prev_level = 0
-        for current_level in levels:
-            # Игроки, которые вложили >= текущего уровня, участвуют в текущем "слое" банка
-            eligible_players = {p for p, amount in contrib.items() if amount >= current_level}
-            # Размер текущего "слоя" банка
-            layer_size = current_level - prev_level
-            # Общий размер банка на этом уровне (слой * количество участвующих игроков)
-            pot_size_at_level = layer_size * len(eligible_players)
-
-            if pot_size_at_level > 0:
-                 # Создаем Pot для этого слоя
-                 pots.append(Pot(pot_size_at_level, eligible_players))
-
-            prev_level = current_level
+        for i, (level, player) in enumerate(ordered):
+            if level != prev_level:
+                pots.append(Pot((level - prev_level) * (total - i), players, i))
+                prev_level = level
+            pot_index[player] = len(pots) - 1
+        return pots, pot_index
 
-        return pots
-
-    def _assign_winners(self, pots: List[Pot], collects: Dict[str, int]):
+    def _assign_winners(self, pots: List[Pot], collects: Dict[str, int], pot_index: Dict[str, int]):
         """Назначает победителей банкам на основе информации о сборах."""
-        remaining = collects.copy()
+        # Претендуют только собиравшие фишки игроки с вкладом в банк
+        remaining = {p: amount for p, amount in collects.items() if amount > 0 and p in pot_index}
         # Обрабатываем поты в обратном порядке: сначала сайд-поты, затем основной.
         # Это нужно, чтобы корректно определить победителей, когда игроки получают
         # фишки только из сайд-потов, не претендуя на основной банк.
-        for pot in reversed(pots):  # side2 → side1 → main
-            elig = {p for p in pot.eligible if remaining.get(p, 0) > 0}
+        for index in range(len(pots) - 1, -1, -1):  # side2 → side1 → main
+            elig = [p for p, left in remaining.items() if left > 0 and pot_index[p] >= index]
             if not elig:
                 continue
+            pot = pots[index]
             pot.winners.update(elig)
             share = pot.size // len(elig)
             for p in elig:
                 remaining[p] = max(0, remaining[p] - share)
 
-
     def _count_ko_in_hand_from_data(self, hand: HandData) -> int:
         """
         Подсчитывает количество нокаутов Hero в данной раздаче.
         Логика: если игрок выбыл И Hero выиграл пот с его фишками = KO
         """
-        if app_config.hero_name not in hand.seats:
+        hero = app_config.hero_name
+        if hero not in hand.seats or not hand.eliminated_players:
             return 0
 
         ko_count = 0
-        
-        # Дополнительная проверка: если нет выбывших, нет и KO
-        if not hand.eliminated_players:
-            return 0
-            
-        
-        # Показываем математику стеков для выбывших
-        for pl in hand.eliminated_players:
-            initial = hand.seats.get(pl, 0)
-            put_in = hand.contrib.get(pl, 0)
-            got_back = hand.collects.get(pl, 0)
-            final = hand.final_stacks.get(pl, 0)
-        
-        # Проходим по всем выбывшим игрокам
         for knocked_out_player in hand.eliminated_players:
-            if knocked_out_player == app_config.hero_name:
+            if knocked_out_player == hero:
                 continue
 
-            # Находим поты, в которых участвовал выбывший
-            relevant_pots = [pot for pot in hand.pots if knocked_out_player in pot.eligible]
-
-            if not relevant_pots:
+            # Последний пот, где были фишки выбывшего – именно он определяет выбившего
+            index = hand.pot_index.get(knocked_out_player)
+            if index is None:
                 logger.warning(f"ERROR: No pots found for eliminated player {knocked_out_player}")
                 continue
 
-            # Последний пот, где были фишки выбывшего – именно он определяет выбившего
-            last_pot = relevant_pots[-1]
-
-            if app_config.hero_name in last_pot.winners:
+            if hero in hand.pots[index].winners:
                 ko_count += 1
                 # Подробный лог сохраняем только в режиме DEBUG
-                logger.debug(
-                    f"*** KO! {app_config.hero_name} knocked out {knocked_out_player} ***"
-                )
-            else:
-                # Логируем кто выбил, если не Hero
-                pass
-        
+                logger.debug(f"*** KO! {hero} knocked out {knocked_out_player} ***")
+
         return ko_count
-    
+
     def _count_ko_attempts_in_hand(self, hand: HandData, detailed_actions: Dict[str, List[Tuple[str, str, int, Dict[str, int], int]]]) -> int:
         """
         Подсчитывает количество попыток КО со стороны Hero в данной раздаче.
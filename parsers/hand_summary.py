@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+
+"""
+Компактное бинарное представление раздачи для пересчёта KO без HH-файлов.
+
+Сводка хранит всё, что нужно правилам подсчёта KO и попыток KO: стеки,
+вклады, сборы, признаки all-in и действия игроков по порядку. По ней
+HandHistoryParser восстанавливает раздачу и пересчитывает
+hero_ko_this_hand, pre_ft_ko и hero_ko_attempts.
+
+Формат (little-endian):
+    заголовок  B версия, B размер стола, H число игроков, d BB
+    игрок      B длина имени, имя в UTF-8, q стек, q вклад, q сбор, B флаги
+    действия   H число, далее B игрок, B улица, B действие, q сумма
+    строки     H число, далее H длина, строка в UTF-8 (ставки "posts"
+               после HOLE CARDS, которые проверяет подсчёт попыток KO)
+"""
+
+import struct
+from dataclasses import dataclass, field
+from typing import Dict, List, Set, Tuple
+
+# Текущая версия формата сводки
+SUMMARY_FORMAT_VERSION = 1
+
+# Роль сводки в турнире
+ROLE_FINAL_TABLE = 0      # раздача финального стола
+ROLE_PRE_FINAL_TABLE = 1  # последняя раздача Hero перед финалкой
+
+STREETS = ('PREFLOP', 'FLOP', 'TURN', 'RIVER')
+ACTIONS = ('bets', 'calls', 'raises', 'all-in', 'checks', 'folds', 'shows')
+
+FLAG_SEATED = 0x01
+FLAG_ALL_IN = 0x02
+
+_HEADER = struct.Struct('<BBHd')
+_PLAYER = struct.Struct('<qqqB')
+_ACTION = struct.Struct('<BBBq')
+_COUNT = struct.Struct('<H')
+_NAME_LENGTH = struct.Struct('<B')
+
+_STREET_CODES = {street: code for code, street in enumerate(STREETS)}
+_ACTION_CODES = {action: code for code, action in enumerate(ACTIONS)}
+
+
+@dataclass
+class HandSummary:
+    """Раскодированная сводка раздачи."""
+
+    table_size: int
+    bb: float
+    seats: Dict[str, int] = field(default_factory=dict)
+    contrib: Dict[str, int] = field(default_factory=dict)
+    collects: Dict[str, int] = field(default_factory=dict)
+    all_in_players: Set[str] = field(default_factory=set)
+    # Действия в порядке совершения: (игрок, улица, действие, сумма)
+    actions: List[Tuple[str, str, str, int]] = field(default_factory=list)
+    raw_lines: List[str] = field(default_factory=list)
+
+    def detailed_actions(self) -> Dict[str, list]:
+        """Действия в формате HandHistoryParser._parse_actions_and_collects."""
+        detailed: Dict[str, list] = {}
+        for order, (player, street, action, amount) in enumerate(self.actions):
+            detailed.setdefault(player, []).append((street, action, amount, None, order))
+        detailed['raw_lines'] = self.raw_lines
+        return detailed
+
+
+def _pack_text(text: str, length_format: struct.Struct) -> bytes:
+    data = text.encode('utf-8')
+    return length_format.pack(len(data)) + data
+
+
+def encode_hand_summary(hand, detailed_actions: Dict[str, list]) -> bytes:
+    """
+    Кодирует разобранную раздачу (HandData) и её детальные действия.
+    """
+    players: Dict[str, int] = {}
+    for source in (hand.seats, hand.contrib, hand.collects, detailed_actions):
+        for player in source:
+            if player != 'raw_lines' and player not in players:
+                players[player] = len(players)
+
+    parts = [_HEADER.pack(SUMMARY_FORMAT_VERSION, hand.table_size, len(players), float(hand.bb))]
+    for player in players:
+        flags = 0
+        if player in hand.seats:
+            flags |= FLAG_SEATED
+        if player in hand.all_in_players:
+            flags |= FLAG_ALL_IN
+        parts.append(_pack_text(player, _NAME_LENGTH))
+        parts.append(_PLAYER.pack(
+            hand.seats.get(player, 0),
+            hand.contrib.get(player, 0),
+            hand.collects.get(player, 0),
+            flags,
+        ))
+
+    actions = sorted(
+        (order, players[player], street, action, amount)
+        for player, player_actions in detailed_actions.items()
+        if player != 'raw_lines'
+        for street, action, amount, _, order in player_actions
+    )
+    parts.append(_COUNT.pack(len(actions)))
+    for _, player_code, street, action, amount in actions:
+        parts.append(_ACTION.pack(player_code, _STREET_CODES[street], _ACTION_CODES[action], amount))
+
+    raw_lines = [line for line in detailed_actions.get('raw_lines', ()) if ': posts ' in line]
+    parts.append(_COUNT.pack(len(raw_lines)))
+    for line in raw_lines:
+        parts.append(_pack_text(line, _COUNT))
+    return b''.join(parts)
+
+
+def decode_hand_summary(data: bytes) -> HandSummary:
+    """Раскодирует сводку, созданную encode_hand_summary."""
+    version, table_size, player_count, bb = _HEADER.unpack_from(data, 0)
+    if version != SUMMARY_FORMAT_VERSION:
+        raise ValueError(f"Неподдерживаемая версия сводки раздачи: {version}")
+    offset = _HEADER.size
+    summary = HandSummary(table_size=table_size, bb=bb)
+
+    names: List[str] = []
+    for _ in range(player_count):
+        length = data[offset]
+        offset += 1
+        name = data[offset:offset + length].decode('utf-8')
+        offset += length
+        stack, contrib, collect, flags = _PLAYER.unpack_from(data, offset)
+        offset += _PLAYER.size
+        names.append(name)
+        if flags & FLAG_SEATED:
+            summary.seats[name] = stack
+        if contrib:
+            summary.contrib[name] = contrib
+        if collect:
+            summary.collects[name] = collect
+        if flags & FLAG_ALL_IN:
+            summary.all_in_players.add(name)
+
+    (action_count,) = _COUNT.unpack_from(data, offset)
+    offset += _COUNT.size
+    for _ in range(action_count):
+        player_code, street_code, action_code, amount = _ACTION.unpack_from(data, offset)
+        offset += _ACTION.size
+        summary.actions.append((names[player_code], STREETS[street_code], ACTIONS[action_code], amount))
+
+    (line_count,) = _COUNT.unpack_from(data, offset)
+    offset += _COUNT.size
+    for _ in range(line_count):
+        (length,) = _COUNT.unpack_from(data, offset)
+        offset += _COUNT.size
+        summary.raw_lines.append(data[offset:offset + length].decode('utf-8'))
+        offset += length
+    return summary
@@ -5,7 +5,7 @@
 Содержит dataclass'ы для структурированного представления результатов.
 """
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import List, Optional
 
 
@@ -20,6 +20,8 @@ class HandHistoryResult:
     final_table_initial_stack_bb: Optional[float]
     final_table_start_players: Optional[int]
     final_table_hands_data: List[dict]  # Временно оставляем как список словарей
+    # Бинарные сводки раздач финалки и последней раздачи перед ней
+    hand_summaries: List[dict] = field(default_factory=list)
     
     def is_valid(self) -> bool:
         """Проверяет валидность результата парсинга."""
@@ -1,12 +1,25 @@
 # -*- coding: utf-8 -*-
 """Utility for discovering and loading plugins."""
 
+import os
+import sys
+import json
+import hashlib
 import logging
 from importlib import metadata
-from typing import Dict, List, Type
+from typing import Dict, List, Optional, Tuple, Type
 
 logger = logging.getLogger(__name__)
 
+#: On-disk cache of entry point metadata (name, value) per group
+ENTRY_POINTS_CACHE_FILE = os.path.join(os.path.dirname(__file__), "__pycache__", "entry_points.json")
+#: Bump when the cache layout changes
+ENTRY_POINTS_CACHE_VERSION = 1
+
+# Entry points already resolved in this process: {group: [(name, value), ...]}
+_memory_cache: Dict[str, List[Tuple[str, str]]] = {}
+_memory_fingerprint: Optional[str] = None
+
 
 class Plugin:
     """Base class for all plugins."""
@@ -17,6 +30,98 @@ class Plugin:
     category: str = "default"
 
 
+def environment_fingerprint() -> str:
+    """Fingerprint of the places installed distributions are found in.
+
+    Installing, upgrading or removing a distribution adds or removes its
+    ``*.dist-info`` directory, which changes the mtime of the containing
+    ``sys.path`` entry, so the fingerprint covers every change that can
+    affect entry points without reading any distribution metadata.
+    """
+    digest = hashlib.md5(sys.version.encode("utf-8"))
+    for entry in sys.path:
+        path = os.path.abspath(entry or os.curdir)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            mtime = None
+        digest.update(f"{path}\0{mtime}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _read_cache(path: str, fingerprint: str) -> Dict[str, List[Tuple[str, str]]]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if data.get("version") != ENTRY_POINTS_CACHE_VERSION or data.get("fingerprint") != fingerprint:
+        return {}
+    return {group: [tuple(item) for item in items] for group, items in data.get("groups", {}).items()}
+
+
+def _write_cache(path: str, fingerprint: str, groups: Dict[str, List[Tuple[str, str]]]) -> None:
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"version": ENTRY_POINTS_CACHE_VERSION, "fingerprint": fingerprint, "groups": groups},
+                f,
+                ensure_ascii=False,
+            )
+        os.replace(tmp_path, path)
+    except OSError as exc:
+        # Read-only install: discovery still works, just without the disk cache
+        logger.debug("Failed to write entry point cache %s: %s", path, exc)
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+
+def _scan_entry_points(entry_point_group: str) -> List[Tuple[str, str]]:
+    """Reads entry points of a group from all installed distributions (slow)."""
+    eps = metadata.entry_points()
+    selected = eps.select(group=entry_point_group) if hasattr(eps, "select") else eps.get(entry_point_group, [])
+    return [(ep.name, ep.value) for ep in selected]
+
+
+def cached_entry_points(entry_point_group: str, cache_file: Optional[str] = None) -> List[metadata.EntryPoint]:
+    """Return entry points of a group, scanning distributions only on a cache miss.
+
+    The result is cached in memory for the process and on disk keyed by
+    :func:`environment_fingerprint`, so a regular startup costs one file
+    read instead of a scan of every installed distribution.
+    """
+    global _memory_fingerprint
+
+    fingerprint = environment_fingerprint()
+    if fingerprint != _memory_fingerprint:
+        _memory_cache.clear()
+        _memory_fingerprint = fingerprint
+
+    if entry_point_group not in _memory_cache:
+        path = cache_file or ENTRY_POINTS_CACHE_FILE
+        groups = _read_cache(path, fingerprint)
+        if entry_point_group not in groups:
+            groups[entry_point_group] = _scan_entry_points(entry_point_group)
+            _write_cache(path, fingerprint, groups)
+        _memory_cache.update(groups)
+
+    return [
+        metadata.EntryPoint(name=name, value=value, group=entry_point_group)
+        for name, value in _memory_cache[entry_point_group]
+    ]
+
+
+def clear_entry_point_cache() -> None:
+    """Forget entry points resolved in this process."""
+    global _memory_fingerprint
+    _memory_cache.clear()
+    _memory_fingerprint = None
+
+
 def discover_plugins(entry_point_group: str = "royal_stats") -> Dict[str, List[Type[Plugin]]]:
     """Discover plugins registered via entry points.
 
@@ -29,9 +134,7 @@ def discover_plugins(entry_point_group: str = "royal_stats") -> Dict[str, List[T
     """
     discovered: Dict[str, List[Type[Plugin]]] = {}
     try:
-        eps = metadata.entry_points()
-        selected = eps.select(group=entry_point_group) if hasattr(eps, "select") else eps.get(entry_point_group, [])
-        for ep in selected:
+        for ep in cached_entry_points(entry_point_group):
             try:
                 plugin_cls = ep.load()
                 category = getattr(plugin_cls, "category", "default")
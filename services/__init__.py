@@ -5,6 +5,8 @@
 
 from .import_service import ImportService
 from .statistics_service import StatisticsService
+from .rederive_service import RederiveService
+from .federated_stats_service import FederatedStatsService
 from .event_bus import EventBus, get_event_bus
 from .events import (
     Event,
@@ -21,6 +23,8 @@ from .app_facade import AppFacade
 __all__ = [
     'ImportService',
     'StatisticsService',
+    'RederiveService',
+    'FederatedStatsService',
     'EventBus',
     'get_event_bus',
     'Event',
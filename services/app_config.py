@@ -70,6 +70,14 @@ class AppConfig:
     ui_scale: float = 1.0
     chart_type: str = "bar"  # bar / pie / line
 
+    # Настройки производительности
+    stats_grid_cache_mb: int = 32  # бюджет кеша результатов StatsGrid, МБ
+    hh_parallel_min_hands: int = 3000  # с какого числа раздач HH-файл разбирается параллельно
+    hh_parallel_workers: int = 0  # процессов для разбора HH (0 - по числу ядер)
+    import_profiling: bool = False  # отчёт о времени этапов импорта в лог и DataImportedEvent
+    bulk_import_min_rows: int = 0  # с какого пакета строк индексы строятся после вставки (0 - никогда)
+    import_progress_hz: float = 20.0  # частота обновления прогресса импорта в UI (0 - без ограничения)
+
     # Прочее
     debug: bool = False
 
@@ -160,6 +168,28 @@ class AppConfig:
                 for k in parser["buyin_avg_ko_map"]
             }
 
+        stats_grid_cache_mb = parser.getint(
+            "performance", "stats_grid_cache_mb", fallback=base.stats_grid_cache_mb
+        )
+
+        hh_parallel_min_hands = parser.getint(
+            "performance", "hh_parallel_min_hands", fallback=base.hh_parallel_min_hands
+        )
+        hh_parallel_workers = parser.getint(
+            "performance", "hh_parallel_workers", fallback=base.hh_parallel_workers
+        )
+
+        import_profiling = parser.getboolean(
+            "performance", "import_profiling", fallback=base.import_profiling
+        )
+
+        bulk_import_min_rows = parser.getint(
+            "performance", "bulk_import_min_rows", fallback=base.bulk_import_min_rows
+        )
+        import_progress_hz = parser.getfloat(
+            "performance", "import_progress_hz", fallback=base.import_progress_hz
+        )
+
         service_classes = base.services.copy()
         if parser.has_section("services"):
             service_classes.update(parser["services"])
@@ -171,6 +201,12 @@ class AppConfig:
             min_ko_blind_level_bb=min_ko_blind_level_bb,
             ko_coeff=ko_coeff,
             buyin_avg_ko_map=buyin_avg_ko_map,
+            stats_grid_cache_mb=stats_grid_cache_mb,
+            hh_parallel_min_hands=hh_parallel_min_hands,
+            hh_parallel_workers=hh_parallel_workers,
+            import_profiling=import_profiling,
+            bulk_import_min_rows=bulk_import_min_rows,
+            import_progress_hz=import_progress_hz,
             services=service_classes,
         )
 
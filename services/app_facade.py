@@ -19,12 +19,18 @@ from db.repositories import (
     OverallStatsRepository,
     PlaceDistributionRepository,
     FinalTableHandRepository,
+    HandSummaryRepository,
 )
 
 from .import_service import ImportService
-from .statistics_service import StatisticsService
+from .statistics_service import StatisticsService, FINAL_TABLE_SIZE
+from .rederive_service import RederiveService
+from .db_summary import DatabaseSummary, read_summaries, move_summary, remove_summary
+from .federated_stats_service import FederatedStatsService, database_signature, load_filtered_dataset
 from .app_config import AppConfig
 from .event_bus import EventBus
+from .result_cache import LRUResultCache
+from .profiling import NULL_PROFILER
 from .events import (
     DataImportedEvent,
     StatisticsUpdatedEvent,
@@ -33,7 +39,13 @@ from .events import (
     TournamentDeletedEvent,
     CacheInvalidatedEvent
 )
-from viewmodels import StatsGridViewModel
+from analytics.time_series import TournamentTimeSeries
+from viewmodels import (
+    StatsGridViewModel,
+    StatsGridDataset,
+    StatsGridChartData,
+    StatsGridResult,
+)
 
 logger = logging.getLogger('ROYAL_Stats.AppFacade')
 
@@ -71,6 +83,21 @@ class AppFacade:
         # Репозитории для прямого доступа к данным
         self._tournament_repo = TournamentRepository(db_manager)
         self._session_repo = SessionRepository(db_manager)
+        self._ft_hand_repo = FinalTableHandRepository(db_manager)
+        self._federated_stats_service = FederatedStatsService()
+        self._rederive_service = RederiveService(
+            self._tournament_repo,
+            self._ft_hand_repo,
+            HandSummaryRepository(db_manager),
+        )
+
+        # Кеш готовых результатов StatsGrid. Ключ включает версию данных,
+        # которая увеличивается при любом изменении БД через фасад.
+        self._data_version = 0
+        self._data_time_range: Optional[tuple] = None
+        self._stats_grid_cache = LRUResultCache(
+            max_bytes=config.stats_grid_cache_mb * 1024 * 1024
+        )
         
         logger.debug("AppFacade инициализирован")
     
@@ -84,6 +111,13 @@ class AppFacade:
     def get_available_databases(self) -> List[str]:
         """Возвращает список доступных файлов баз данных."""
         return self.db_manager.get_available_databases()
+
+    def get_database_summaries(self, db_paths: List[str]) -> Dict[str, Optional[DatabaseSummary]]:
+        """
+        Возвращает сводки БД из файлов рядом с ними, не подключаясь к БД.
+        None - сводки ещё нет (БД не открывалась этой версией программы).
+        """
+        return read_summaries(db_paths)
     
     def switch_database(self, db_path: str, load_stats: bool = True):
         """
@@ -167,6 +201,7 @@ class AppFacade:
         # Закрываем соединение перед переименованием
         self.db_manager.close_all_connections()
         os.rename(old_path, new_path)
+        move_summary(old_path, new_path)
         
         # Обновляем кеши в сервисе статистики
         self.statistics_service.update_cache_for_renamed_db(old_path, new_path)
@@ -177,6 +212,18 @@ class AppFacade:
         
         return new_path
     
+    def delete_database(self, db_path: str):
+        """
+        Удаляет файл базы данных вместе с его сводкой.
+
+        Args:
+            db_path: Путь к БД (не текущей)
+        """
+        if db_path == self.db_manager.db_path:
+            raise ValueError("Нельзя удалить текущую базу данных.")
+        os.remove(db_path)
+        remove_summary(db_path)
+
     # === Импорт данных ===
     
     def import_files(
@@ -211,8 +258,26 @@ class AppFacade:
             imported_tournaments = import_result['imported_tournaments']
             imported_hands = import_result['imported_hands']
             updated_tournament_ids = import_result['updated_tournament_ids']
+            updated_tournaments = import_result.get('updated_tournaments', [])
+            replaced_tournaments = import_result.get('replaced_tournaments', [])
+            profiler = import_result.get('profiler') or NULL_PROFILER
+            
+            # Обновляем статистику с использованием инкрементального обновления.
+            # Изменённые турниры учитываются как замена прежней версии новой.
+            with profiler.stage("stats_update"):
+                self.statistics_service.update_all_statistics(
+                    session_id=imported_session_id,
+                    db_path=self.db_path,
+                    progress_callback=progress_callback,
+                    added_tournaments=imported_tournaments + updated_tournaments,
+                    added_hands=imported_hands,
+                    use_incremental=True,
+                    removed_tournaments=replaced_tournaments
+                )
+            if profiler.enabled:
+                logger.info(profiler.format_report())
             
-            # Публикуем событие об импорте
+            # Публикуем событие об импорте (с полным профилем, включая обновление статистики)
             all_tournament_ids = [t.tournament_id for t in imported_tournaments] + updated_tournament_ids
             self.event_bus.publish(DataImportedEvent(
                 timestamp=datetime.now(),
@@ -221,19 +286,10 @@ class AppFacade:
                 imported_tournament_ids=all_tournament_ids,
                 files_processed=len(paths),  # Упрощение
                 tournaments_saved=len(imported_tournaments),
-                hands_saved=len(imported_hands)
+                hands_saved=len(imported_hands),
+                profile=profiler.report() if profiler.enabled else None
             ))
             
-            # Обновляем статистику с использованием инкрементального обновления
-            self.statistics_service.update_all_statistics(
-                session_id=imported_session_id,
-                db_path=self.db_path,
-                progress_callback=progress_callback,
-                added_tournaments=imported_tournaments,
-                added_hands=imported_hands,
-                use_incremental=True
-            )
-            
             # Публикуем событие об обновлении статистики
             self.event_bus.publish(StatisticsUpdatedEvent(
                 timestamp=datetime.now(),
@@ -244,6 +300,8 @@ class AppFacade:
                 is_session=True,
                 is_incremental=True
             ))
+
+        self._bump_data_version()
     
     # === Работа с данными ===
     
@@ -338,14 +396,22 @@ class AppFacade:
         """
         Обеспечивает наличие кешированной общей статистики.
         Делегирует вызов к StatisticsService.
+
+        Если ko_coeff в config.ini изменился с прошлого пересчёта БД,
+        KO раздач переводятся на новые коэффициенты и статистика
+        пересчитывается полностью.
         
         Args:
             progress_callback: Callback для отслеживания прогресса
         """
+        if self._rederive_service.apply_ko_coeff_if_changed():
+            self.update_all_statistics(progress_callback)
+            return
         self.statistics_service.ensure_overall_stats_cached(
             db_path=self.db_path,
             progress_callback=progress_callback
         )
+        self.statistics_service.ensure_database_summary(self.db_path)
 
     def update_all_statistics(
         self,
@@ -358,18 +424,50 @@ class AppFacade:
             progress_callback=progress_callback,
             use_incremental=False,
         )
+        self._bump_data_version()
     
+    def rederive_hand_stats(
+        self,
+        progress_callback: Optional[Callable[[int, int, str], None]] = None,
+        is_canceled_callback: Optional[Callable[[], bool]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Пересчитывает KO раздач финалки по сохранённым сводкам (без HH-файлов)
+        после изменения правил KO, затем полностью пересчитывает статистику.
+        """
+        result = self._rederive_service.rederive(progress_callback, is_canceled_callback)
+        self.update_all_statistics(progress_callback)
+        return result
+
     # === Управление данными ===
     
     def delete_session(self, session_id: str):
         """
-        Удаляет сессию и все связанные данные.
+        Удаляет сессию и все связанные данные. Статистика обновляется
+        вычитанием вклада удалённых турниров и рук, без полного пересчёта.
         
         Args:
             session_id: ID сессии для удаления
         """
+        # Вклад сессии фиксируем до каскадного удаления: турниры - строками
+        # (нужны для распределения мест, Big KO и скетчей), руки - суммами в SQL
+        removed_tournaments = self._tournament_repo.get_all_tournaments(session_id=session_id)
+        removed_hands = self._ft_hand_repo.get_hand_totals(
+            session_id=session_id, final_table_size=FINAL_TABLE_SIZE
+        )
+        # Турниры других сессий теряют руки этой сессии - их ko_count пересчитываем
+        affected_tournament_ids = self._ft_hand_repo.get_cross_session_tournament_ids(session_id)
+
         # Удаляем сессию (каскадное удаление удалит связанные данные)
         self._session_repo.delete_session_by_id(session_id)
+        self.statistics_service.update_statistics_incremental(
+            session_id="",
+            db_path=self.db_path,
+            removed_tournaments=removed_tournaments,
+            removed_hands=removed_hands,
+            affected_tournament_ids=affected_tournament_ids,
+        )
+        self._bump_data_version()
         
         # Публикуем событие
         self.event_bus.publish(SessionDeletedEvent(
@@ -379,10 +477,7 @@ class AppFacade:
             db_path=self.db_path
         ))
         
-        # Инвалидируем кеш статистики
-        self.statistics_service.invalidate_cache(self.db_path)
-        
-        # Публикуем событие об инвалидации кеша
+        # Публикуем событие об инвалидации кеша (кеш статистики уже обновлён дельтой)
         self.event_bus.publish(CacheInvalidatedEvent(
             timestamp=datetime.now(),
             source="AppFacade",
@@ -402,7 +497,8 @@ class AppFacade:
     
     def delete_tournament(self, tournament_id: str):
         """
-        Удаляет турнир и связанные с ним данные.
+        Удаляет турнир и связанные с ним данные. Статистика обновляется
+        вычитанием вклада турнира и его рук, без полного пересчёта.
         
         Args:
             tournament_id: ID турнира для удаления
@@ -411,9 +507,20 @@ class AppFacade:
         tournament = self._tournament_repo.get_tournament_by_id(tournament_id)
         if tournament:
             session_id = tournament.session_id
+            # Суммы рук фиксируем до каскадного удаления
+            removed_hands = self._ft_hand_repo.get_hand_totals(
+                tournament_ids=[tournament_id], final_table_size=FINAL_TABLE_SIZE
+            )
             
             # Удаляем турнир
             self._tournament_repo.delete_tournament_by_id(tournament_id)
+            self.statistics_service.update_statistics_incremental(
+                session_id=session_id or "",
+                db_path=self.db_path,
+                removed_tournaments=[tournament],
+                removed_hands=removed_hands,
+            )
+            self._bump_data_version()
             
             # Публикуем событие
             self.event_bus.publish(TournamentDeletedEvent(
@@ -424,10 +531,7 @@ class AppFacade:
                 db_path=self.db_path
             ))
             
-            # Инвалидируем кеш статистики
-            self.statistics_service.invalidate_cache(self.db_path)
-            
-            # Публикуем событие об инвалидации кеша
+            # Публикуем событие об инвалидации кеша (кеш статистики уже обновлён дельтой)
             self.event_bus.publish(CacheInvalidatedEvent(
                 timestamp=datetime.now(),
                 source="AppFacade",
@@ -437,12 +541,229 @@ class AppFacade:
     
     # === ViewModel методы для UI ===
     
-    def create_stats_grid_viewmodel(
+    def get_stats_grid_result(
+        self,
+        session_id: Optional[str] = None,
+        buyin_filter: Optional[float] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None
+    ) -> StatsGridResult:
+        """
+        Возвращает ViewModel и данные графиков StatsGrid, используя LRU-кеш.
+
+        Фильтры нормализуются (границы дат, выходящие за диапазон данных,
+        отбрасываются), поэтому повторные переключения фильтров
+        обслуживаются из кеша без обращения к БД.
+
+        Args:
+            session_id: ID сессии для фильтрации
+            buyin_filter: Фильтр по байину
+            date_from: Начальная дата (формат YYYY/MM/DD HH:MM:SS)
+            date_to: Конечная дата (формат YYYY/MM/DD HH:MM:SS)
+
+        Returns:
+            StatsGridResult с ViewModel и компактными данными графиков
+        """
+        session_id, buyin_filter, date_from, date_to = self._normalize_stats_grid_filters(
+            session_id, buyin_filter, date_from, date_to
+        )
+        cache_key = (
+            self.db_path,
+            self._data_version,
+            session_id,
+            buyin_filter,
+            date_from,
+            date_to,
+        )
+        result = self._stats_grid_cache.get(cache_key)
+        if result is not None:
+            logger.debug("Используем кешированный результат StatsGrid")
+            return result
+
+        dataset = self.load_stats_grid_dataset(
+            session_id=session_id,
+            buyin_filter=buyin_filter,
+            date_from=date_from,
+            date_to=date_to
+        )
+        result = StatsGridResult(
+            viewmodel=self.create_stats_grid_viewmodel(
+                session_id=session_id,
+                buyin_filter=buyin_filter,
+                date_from=date_from,
+                date_to=date_to,
+                dataset=dataset,
+            ),
+            chart_data=StatsGridChartData.from_dataset(dataset),
+        )
+        self._stats_grid_cache.put(cache_key, result)
+        return result
+
+    def get_time_series(
+        self,
+        session_id: Optional[str] = None,
+        buyin_filter: Optional[float] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None
+    ) -> TournamentTimeSeries:
+        """
+        Возвращает временной ряд турниров для графиков (накопленный профит,
+        скользящие ROI/ITM/KO, агрегаты по дням). Ряд кешируется вместе с
+        результатами StatsGrid; скользящие окна кешируются внутри ряда.
+
+        Args:
+            session_id: ID сессии для фильтрации
+            buyin_filter: Фильтр по байину
+            date_from: Начальная дата (формат YYYY/MM/DD HH:MM:SS)
+            date_to: Конечная дата (формат YYYY/MM/DD HH:MM:SS)
+        """
+        session_id, buyin_filter, date_from, date_to = self._normalize_stats_grid_filters(
+            session_id, buyin_filter, date_from, date_to
+        )
+        cache_key = (
+            'time_series',
+            self.db_path,
+            self._data_version,
+            session_id,
+            buyin_filter,
+            date_from,
+            date_to,
+        )
+        series = self._stats_grid_cache.get(cache_key)
+        if series is None:
+            series = TournamentTimeSeries.from_rows(self._tournament_repo.get_time_series_rows(
+                session_id=session_id,
+                buyin_filter=buyin_filter,
+                start_time_from=date_from,
+                start_time_to=date_to,
+            ))
+            self._stats_grid_cache.put(cache_key, series)
+        return series
+
+    def _normalize_stats_grid_filters(
+        self,
+        session_id: Optional[str],
+        buyin_filter: Optional[float],
+        date_from: Optional[str],
+        date_to: Optional[str]
+    ) -> tuple:
+        """
+        Приводит фильтры к каноническому виду для ключа кеша.
+
+        Граница дат, которая не отсекает ни одного турнира, заменяется на None.
+        Это возможно только если у всех турниров заполнено start_time,
+        иначе снятие фильтра изменило бы результат.
+        """
+        session_id = session_id or None
+        buyin_filter = float(buyin_filter) if buyin_filter is not None else None
+
+        min_start, max_start, without_start = self._get_data_time_range()
+        if not without_start:
+            if date_from and (min_start is None or date_from <= min_start):
+                date_from = None
+            if date_to and (max_start is None or date_to >= max_start):
+                date_to = None
+        return session_id, buyin_filter, date_from or None, date_to or None
+
+    def _get_data_time_range(self) -> tuple:
+        """Возвращает диапазон дат турниров, кешируя его до изменения данных."""
+        key = (self.db_path, self._data_version)
+        if self._data_time_range is None or self._data_time_range[0] != key:
+            self._data_time_range = (key, self._tournament_repo.get_start_time_range())
+        return self._data_time_range[1]
+
+    def _bump_data_version(self):
+        """Отмечает изменение данных в БД и сбрасывает кеш результатов."""
+        self._data_version += 1
+        self._stats_grid_cache.clear()
+
+    def load_stats_grid_dataset(
         self,
         session_id: Optional[str] = None,
         buyin_filter: Optional[float] = None,
         date_from: Optional[str] = None,
         date_to: Optional[str] = None
+    ) -> StatsGridDataset:
+        """
+        Загружает отфильтрованный снимок данных для StatsGrid.
+
+        Турниры и руки финального стола читаются из БД ровно один раз,
+        после чего снимок используется и для ViewModel, и для графиков.
+
+        Args:
+            session_id: ID сессии для фильтрации
+            buyin_filter: Фильтр по байину
+            date_from: Начальная дата (формат YYYY/MM/DD HH:MM:SS)
+            date_to: Конечная дата (формат YYYY/MM/DD HH:MM:SS)
+
+        Returns:
+            StatsGridDataset с турнирами и руками финального стола
+        """
+        return load_filtered_dataset(
+            self._tournament_repo,
+            FinalTableHandRepository(self.db_manager),
+            session_id=session_id,
+            buyin_filter=buyin_filter,
+            date_from=date_from,
+            date_to=date_to
+        )
+
+    def get_federated_stats_grid_result(
+        self,
+        db_paths: List[str],
+        buyin_filter: Optional[float] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None
+    ) -> StatsGridResult:
+        """
+        Возвращает ViewModel и графики StatsGrid по объединению нескольких БД.
+
+        БД читаются параллельно только для чтения, текущая БД приложения
+        не переключается и статистика не пересчитывается. Результат
+        кешируется, пока файлы БД не изменились.
+
+        Args:
+            db_paths: Пути к БД (турнир из нескольких БД берётся из первой)
+            buyin_filter: Фильтр по байину
+            date_from: Начальная дата (формат YYYY/MM/DD HH:MM:SS)
+            date_to: Конечная дата (формат YYYY/MM/DD HH:MM:SS)
+
+        Returns:
+            StatsGridResult; нечитаемые БД перечислены в failed_databases
+        """
+        buyin_filter = float(buyin_filter) if buyin_filter is not None else None
+        cache_key = (
+            'federated',
+            tuple(database_signature(path) for path in db_paths),
+            buyin_filter,
+            date_from or None,
+            date_to or None,
+        )
+        result = self._stats_grid_cache.get(cache_key)
+        if result is not None:
+            logger.debug("Используем кешированный сводный результат StatsGrid")
+            return result
+
+        federated = self._federated_stats_service.load_dataset(
+            db_paths, buyin_filter=buyin_filter, date_from=date_from, date_to=date_to
+        )
+        result = StatsGridResult(
+            # Скетчи описывают текущую БД приложения - медиана берётся из снимка
+            viewmodel=self.create_stats_grid_viewmodel(dataset=federated.dataset, use_stat_sketches=False),
+            chart_data=StatsGridChartData.from_dataset(federated.dataset),
+            failed_databases=federated.failed,
+        )
+        self._stats_grid_cache.put(cache_key, result)
+        return result
+
+    def create_stats_grid_viewmodel(
+        self,
+        session_id: Optional[str] = None,
+        buyin_filter: Optional[float] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        dataset: Optional[StatsGridDataset] = None,
+        use_stat_sketches: bool = True
     ) -> StatsGridViewModel:
         """
         Создает ViewModel для StatsGrid с учетом фильтров.
@@ -452,31 +773,24 @@ class AppFacade:
             buyin_filter: Фильтр по байину
             date_from: Начальная дата (формат YYYY/MM/DD HH:MM:SS)
             date_to: Конечная дата (формат YYYY/MM/DD HH:MM:SS)
+            dataset: Уже загруженный снимок данных (если не указан -
+                загружается по фильтрам)
+            use_stat_sketches: Брать медиану стека FT из скетчей текущей БД.
+                False - плагины считают её по турнирам снимка (снимок не
+                из текущей БД, например сводный по нескольким БД)
             
         Returns:
             StatsGridViewModel с готовыми для отображения данными
         """
-        # Получаем отфильтрованные турниры
-        tournaments = self._tournament_repo.get_all_tournaments(
-            session_id=session_id,
-            buyin_filter=buyin_filter,
-            start_time_from=date_from,
-            start_time_to=date_to
-        )
-        
-        # Получаем руки финального стола
-        if buyin_filter is not None:
-            # Если есть фильтр по байину, получаем список tournament_id
-            tournament_ids = [t.tournament_id for t in tournaments]
-            ft_hand_repo = FinalTableHandRepository(self.db_manager)
-            ft_hands = ft_hand_repo.get_hands_by_filters(
+        if dataset is None:
+            dataset = self.load_stats_grid_dataset(
                 session_id=session_id,
-                tournament_ids=tournament_ids if tournament_ids else None
+                buyin_filter=buyin_filter,
+                date_from=date_from,
+                date_to=date_to
             )
-        else:
-            # Если нет фильтра по байину, фильтруем только по сессии
-            ft_hand_repo = FinalTableHandRepository(self.db_manager)
-            ft_hands = ft_hand_repo.get_hands_by_filters(session_id=session_id)
+        tournaments = dataset.tournaments
+        ft_hands = dataset.final_table_hands
         
         # Вычисляем общую статистику для отфильтрованных данных
         overall_stats = self._compute_overall_stats_filtered(tournaments, ft_hands)
@@ -489,6 +803,12 @@ class AppFacade:
             'total_knockouts': overall_stats.total_knockouts,
             'total_final_tables': overall_stats.total_final_tables,
         }
+        ft_stack_median = (
+            self._get_ft_stack_median(session_id, buyin_filter, date_from, date_to)
+            if use_stat_sketches else None
+        )
+        if ft_stack_median is not None:
+            precomputed_stats['ft_stack_median_chips'] = ft_stack_median
         
         # Создаем ViewModel
         return StatsGridViewModel.create_from_data(
@@ -498,6 +818,26 @@ class AppFacade:
             precomputed_stats=precomputed_stats
         )
     
+    def _get_ft_stack_median(
+        self,
+        session_id: Optional[str],
+        buyin_filter: Optional[float],
+        date_from: Optional[str],
+        date_to: Optional[str]
+    ) -> Optional[float]:
+        """
+        Медиана стеков выхода на FT из слитых скетчей сессий/бай-инов.
+        None, если фильтр скетчами не покрывается (даты или сессия
+        вместе с бай-ином) - тогда медиана считается по турнирам.
+        """
+        if date_from or date_to or (session_id and buyin_filter is not None):
+            return None
+        sketch = self.statistics_service.get_ft_stack_sketch(
+            session_ids=[session_id] if session_id else None,
+            buyins=[buyin_filter] if buyin_filter is not None else None,
+        )
+        return sketch.median() if sketch is not None else None
+
     def _compute_overall_stats_filtered(self, tournaments, ft_hands) -> OverallStats:
         """
         Вычисляет агрегированную статистику по отфильтрованным данным.
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+
+"""
+Сводка по файлу БД, хранящаяся рядом с ним (<имя>.db.summary.json).
+
+Сводка обновляется после каждого пересчёта статистики, поэтому диалог
+управления БД показывает число турниров, период и ROI любой БД без
+подключения к ней, миграций и пересчёта кеша статистики.
+
+Номер версии данных хранится и в сводке, и в db_meta самой БД. При
+открытии БД несовпадение (сводки нет, файл скопирован без неё или БД
+менялась старой версией программы) означает, что сводку надо собрать
+заново.
+"""
+
+import os
+import json
+import logging
+from dataclasses import dataclass, asdict, fields
+from typing import Dict, Iterable, Optional
+
+logger = logging.getLogger('ROYAL_Stats.DatabaseSummary')
+
+# Суффикс файла сводки: не заканчивается на .db, поэтому не попадает
+# в список доступных БД
+SUMMARY_SUFFIX = ".summary.json"
+# Версия формата файла сводки
+SUMMARY_FORMAT_VERSION = 1
+
+
+@dataclass
+class DatabaseSummary:
+    """Краткие показатели одной БД."""
+
+    tournaments: int = 0
+    final_tables: int = 0
+    sessions: int = 0
+    knockouts: float = 0.0
+    total_buy_in: float = 0.0
+    total_prize: float = 0.0
+    first_start_time: Optional[str] = None
+    last_start_time: Optional[str] = None
+    data_version: int = 0  # Совпадает с db_meta, пока сводка актуальна
+    updated_at: Optional[str] = None
+
+    @property
+    def profit(self) -> float:
+        return self.total_prize - self.total_buy_in
+
+    @property
+    def roi(self) -> Optional[float]:
+        """ROI в процентах (как у плагина ROI); None, если бай-инов нет."""
+        if not self.total_buy_in:
+            return None
+        return round(self.profit / self.total_buy_in * 100.0, 2)
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        data["format_version"] = SUMMARY_FORMAT_VERSION
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "DatabaseSummary":
+        known = {f.name for f in fields(cls)}
+        return cls(**{key: value for key, value in data.items() if key in known})
+
+
+def summary_path(db_path: str) -> str:
+    """Путь к файлу сводки для файла БД."""
+    return db_path + SUMMARY_SUFFIX
+
+
+def read_summary(db_path: str) -> Optional[DatabaseSummary]:
+    """Читает сводку БД; None, если её нет или она в неизвестном формате."""
+    try:
+        with open(summary_path(db_path), "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning(f"Не удалось прочитать сводку {db_path}: {e}")
+        return None
+    if not isinstance(data, dict) or data.get("format_version") != SUMMARY_FORMAT_VERSION:
+        return None
+    try:
+        return DatabaseSummary.from_dict(data)
+    except TypeError:
+        return None
+
+
+def read_summaries(db_paths: Iterable[str]) -> Dict[str, Optional[DatabaseSummary]]:
+    """Читает сводки нескольких БД: {путь: сводка или None}."""
+    return {path: read_summary(path) for path in db_paths}
+
+
+def write_summary(db_path: str, summary: DatabaseSummary) -> None:
+    """Атомарно записывает сводку рядом с файлом БД."""
+    path = summary_path(db_path)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(summary.to_dict(), f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def move_summary(old_db_path: str, new_db_path: str) -> None:
+    """Переносит сводку вслед за переименованным файлом БД."""
+    try:
+        os.replace(summary_path(old_db_path), summary_path(new_db_path))
+    except FileNotFoundError:
+        pass
+
+
+def remove_summary(db_path: str) -> None:
+    """Удаляет сводку удалённой БД."""
+    try:
+        os.remove(summary_path(db_path))
+    except FileNotFoundError:
+        pass
@@ -7,7 +7,7 @@
 
 from dataclasses import dataclass
 from datetime import datetime
-from typing import List, Optional, Any
+from typing import List, Optional, Any, Dict
 
 
 @dataclass
@@ -32,12 +32,14 @@ class DataImportedEvent(Event):
         files_processed: Количество обработанных файлов
         tournaments_saved: Количество сохраненных турниров
         hands_saved: Количество сохраненных рук
+        profile: Отчёт ImportProfiler по этапам импорта (None, если профилирование выключено)
     """
     session_id: str
     imported_tournament_ids: List[str]
     files_processed: int
     tournaments_saved: int
     hands_saved: int
+    profile: Optional[Dict[str, Any]] = None
 
 
 @dataclass
@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+
+"""
+Сводная статистика по нескольким БД без переключения текущей БД.
+
+Каждая БД открывается только для чтения в своём рабочем потоке и
+отфильтрованные турниры и руки финального стола читаются параллельно
+(sqlite3 отпускает GIL на время выполнения запроса). Снимки БД
+объединяются в один StatsGridDataset, по которому строится обычный
+ViewModel StatsGrid.
+
+БД со схемой старее текущей (архивы, которые эта версия программы ещё
+не открывала) не меняются: запросы выполняются по временной копии,
+приведённой к актуальной схеме миграциями.
+"""
+
+import os
+import shutil
+import sqlite3
+import logging
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Set
+
+from db import migrations
+from db.manager import ReadOnlyDatabaseManager
+from db.repositories import TournamentRepository, FinalTableHandRepository
+from viewmodels import StatsGridDataset
+
+logger = logging.getLogger('ROYAL_Stats.FederatedStatsService')
+
+
+def load_filtered_dataset(
+    tournament_repo: TournamentRepository,
+    ft_hand_repo: FinalTableHandRepository,
+    session_id: Optional[str] = None,
+    buyin_filter: Optional[float] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+) -> StatsGridDataset:
+    """
+    Загружает отфильтрованные турниры и руки финального стола одной БД.
+    """
+    tournaments = tournament_repo.get_all_tournaments(
+        session_id=session_id,
+        buyin_filter=buyin_filter,
+        start_time_from=date_from,
+        start_time_to=date_to
+    )
+
+    if buyin_filter is not None or date_from or date_to:
+        # Турниры отфильтрованы не только по сессии - ограничиваем руки
+        # списком найденных tournament_id
+        tournament_ids = [t.tournament_id for t in tournaments]
+        ft_hands = ft_hand_repo.get_hands_by_filters(
+            session_id=session_id,
+            tournament_ids=tournament_ids
+        ) if tournament_ids else []
+    else:
+        # Если фильтр только по сессии, не передаем длинный список ID
+        ft_hands = ft_hand_repo.get_hands_by_filters(session_id=session_id)
+
+    return StatsGridDataset(tournaments=tournaments, final_table_hands=ft_hands)
+
+
+def _migrated_copy(db_path: str, work_dir: str) -> str:
+    """
+    Копирует БД в work_dir (backup API - согласованный снимок вместе с WAL)
+    и мигрирует копию до актуальной схемы. Returns: путь к копии.
+    """
+    copy_path = os.path.join(work_dir, os.path.basename(db_path))
+    source = ReadOnlyDatabaseManager(db_path)
+    target = sqlite3.connect(copy_path)
+    try:
+        source.get_connection().backup(target)
+        migrations.migrate(target)
+    finally:
+        target.close()
+        source.close_connection()
+    return copy_path
+
+
+def database_signature(db_path: str) -> tuple:
+    """
+    (mtime, размер) файла БД и её WAL-журнала: меняется при любой записи,
+    поэтому годится в ключ кеша сводного результата. Пустой WAL, который
+    SQLite создаёт при открытии на чтение, считается отсутствующим.
+    """
+    signature = [db_path]
+    for path in (db_path, db_path + "-wal"):
+        try:
+            st = os.stat(path)
+        except OSError:
+            st = None
+        if st is not None and (st.st_size or path == db_path):
+            signature.extend((st.st_mtime_ns, st.st_size))
+        else:
+            signature.extend((None, None))
+    return tuple(signature)
+
+
+@dataclass
+class FederatedDataset:
+    """Объединённый снимок нескольких БД."""
+
+    dataset: StatsGridDataset
+    # БД, попавшие в снимок, в порядке приоритета
+    databases: List[str] = field(default_factory=list)
+    # БД, которые не удалось прочитать: путь -> причина
+    failed: Dict[str, str] = field(default_factory=dict)
+    # Турниры, встретившиеся в нескольких БД (учтены один раз)
+    duplicate_tournaments: int = 0
+
+
+class FederatedStatsService:
+    """Чтение и объединение данных нескольких БД для StatsGrid."""
+
+    def __init__(self, max_workers: Optional[int] = None):
+        """
+        Args:
+            max_workers: Число рабочих потоков (по умолчанию - по числу БД,
+                но не больше чем ThreadPoolExecutor выбирает сам)
+        """
+        self.max_workers = max_workers
+
+    @staticmethod
+    def _load_database(
+        db_path: str,
+        buyin_filter: Optional[float],
+        date_from: Optional[str],
+        date_to: Optional[str],
+    ) -> StatsGridDataset:
+        db = ReadOnlyDatabaseManager(db_path)
+        work_dir = None
+        try:
+            if migrations.get_schema_version(db.get_connection()) < migrations.latest_schema_version():
+                logger.info(f"Схема БД {db_path} устарела, читаем мигрированную копию")
+                db.close_connection()
+                work_dir = tempfile.mkdtemp(prefix="royal_stats_federated_")
+                db = ReadOnlyDatabaseManager(_migrated_copy(db_path, work_dir))
+            return load_filtered_dataset(
+                TournamentRepository(db),
+                FinalTableHandRepository(db),
+                buyin_filter=buyin_filter,
+                date_from=date_from,
+                date_to=date_to,
+            )
+        finally:
+            db.close_connection()
+            if work_dir:
+                shutil.rmtree(work_dir, ignore_errors=True)
+
+    def load_dataset(
+        self,
+        db_paths: Sequence[str],
+        buyin_filter: Optional[float] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+    ) -> FederatedDataset:
+        """
+        Читает БД параллельно и объединяет их снимки.
+
+        Турнир, найденный в нескольких БД, берётся из первой по порядку
+        db_paths вместе с её руками финального стола. Фильтр по сессии
+        не поддерживается: ID сессий у каждой БД свои.
+        """
+        db_paths = list(dict.fromkeys(db_paths))
+        result = FederatedDataset(dataset=StatsGridDataset())
+        if not db_paths:
+            return result
+
+        workers = self.max_workers or min(len(db_paths), (os.cpu_count() or 1) + 4)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="federated-db") as executor:
+            futures = [
+                executor.submit(self._load_database, path, buyin_filter, date_from, date_to)
+                for path in db_paths
+            ]
+
+        seen: Set[str] = set()
+        for path, future in zip(db_paths, futures):
+            try:
+                dataset = future.result()
+            except Exception as e:
+                logger.error(f"Не удалось прочитать БД {path}: {e}")
+                result.failed[path] = str(e)
+                continue
+
+            own_ids = set()
+            for tournament in dataset.tournaments:
+                if tournament.tournament_id in seen:
+                    result.duplicate_tournaments += 1
+                    continue
+                own_ids.add(tournament.tournament_id)
+                result.dataset.tournaments.append(tournament)
+            seen.update(own_ids)
+            result.dataset.final_table_hands.extend(
+                hand for hand in dataset.final_table_hands if hand.tournament_id in own_ids
+            )
+            result.databases.append(path)
+
+        # Сохраняем хронологический порядок, как у снимка одной БД
+        result.dataset.tournaments.sort(key=lambda t: t.start_time or "")
+        logger.info(
+            f"Сводный снимок: БД {len(result.databases)}, турниров {len(result.dataset.tournaments)}, "
+            f"дубликатов {result.duplicate_tournaments}, ошибок {len(result.failed)}"
+        )
+        return result
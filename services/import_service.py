@@ -7,9 +7,11 @@
 """
 
 import os
+import time
 import logging
 from typing import List, Dict, Any, Optional, Callable, TYPE_CHECKING
 from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from contextlib import nullcontext
 from datetime import datetime
 
 from models import Tournament, Session, FinalTableHand
@@ -21,23 +23,35 @@ if TYPE_CHECKING:
 from db.repositories import (
     TournamentRepository,
     SessionRepository,
-    FinalTableHandRepository
+    FinalTableHandRepository,
+    HandSummaryRepository,
 )
+from db import bulk_load
 from .event_bus import EventBus
 from .events import DataImportedEvent
+from .app_config import app_config
+from .profiling import ImportProfiler, NULL_PROFILER
+from .progress import ImportCancelled, ProgressReporter, never_cancelled
 
 logger = logging.getLogger('ROYAL_Stats.ImportService')
 
 
 def _read_file(file_path: str, file_type: str):
-    """Читает файл и возвращает его содержимое."""
+    """
+    Читает файл в дочернем процессе и возвращает его содержимое, размер
+    в байтах и время чтения (wall, CPU) для профилирования импорта.
+    """
+    wall_start = time.perf_counter()
+    cpu_start = time.thread_time()
     try:
         with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+            size = os.fstat(f.fileno()).st_size
             content = f.read()
-        return file_path, content, True
+        success = True
     except Exception as e:
         logger.error(f"Ошибка обработки файла {file_path}: {e}")
-        return file_path, "", False
+        content, size, success = "", 0, False
+    return file_path, content, success, size, time.perf_counter() - wall_start, time.thread_time() - cpu_start
 
 
 class ImportService:
@@ -52,7 +66,8 @@ class ImportService:
         session_repo: SessionRepository,
         ft_hand_repo: FinalTableHandRepository,
         parser_plugins: Optional[List['BaseParserPlugin']] = None,
-        event_bus: Optional[EventBus] = None
+        event_bus: Optional[EventBus] = None,
+        hand_summary_repo: Optional[HandSummaryRepository] = None,
     ):
         """
         Инициализация сервиса импорта.
@@ -63,11 +78,14 @@ class ImportService:
             ft_hand_repo: Репозиторий для работы с руками финального стола
             parser_plugins: Список парсеров или None для автозагрузки
             event_bus: Шина событий для публикации событий импорта
+            hand_summary_repo: Репозиторий сводок раздач (по умолчанию - в той же БД)
         """
         self.tournament_repo = tournament_repo
         self.session_repo = session_repo
         self.ft_hand_repo = ft_hand_repo
+        self.hand_summary_repo = hand_summary_repo or HandSummaryRepository(ft_hand_repo.db)
         self.event_bus = event_bus
+        self._profiler: ImportProfiler = NULL_PROFILER
 
         self.parsers = self._init_parsers(parser_plugins)
 
@@ -109,8 +127,13 @@ class ImportService:
                 'session_id': str,
                 'imported_tournaments': List[Tournament],
                 'imported_hands': List[FinalTableHand],
-                'updated_tournament_ids': List[str]
+                'updated_tournament_ids': List[str],
+                'updated_tournaments': List[Tournament],
+                'replaced_tournaments': List[Tournament],
+                'profiler': ImportProfiler
             }
+            updated_tournaments - новые версии изменённых турниров,
+            replaced_tournaments - их версии до импорта (для дельты статистики).
         """
         logger.info(f"=== НАЧАЛО ИМПОРТА ===")
         logger.debug(f"is_canceled_callback передан: {is_canceled_callback is not None}")
@@ -118,6 +141,12 @@ class ImportService:
         def _cancelled() -> bool:
             """Проверяет, запрошена ли отмена импорта."""
             return bool(is_canceled_callback and is_canceled_callback())
+
+        # Профилирование этапов импорта (включается в config.ini)
+        profiler = ImportProfiler(enabled=app_config.import_profiling)
+        self._profiler = profiler
+        # Промежуточный прогресс уходит в UI не чаще import_progress_hz
+        progress_callback = ProgressReporter.wrap(progress_callback, app_config.import_progress_hz)
         
         # Инициализируем прогресс-бар и оцениваем количество файлов
         if progress_callback:
@@ -128,7 +157,8 @@ class ImportService:
             return None
 
         # Подсчет общего количества файлов-кандидатов
-        total_candidates = self._count_candidate_files(paths, is_canceled_callback)
+        with profiler.stage("discovery"):
+            total_candidates = self._count_candidate_files(paths, is_canceled_callback)
         if total_candidates == 0:
             logger.info("Нет файлов для обработки.")
             if progress_callback:
@@ -142,14 +172,16 @@ class ImportService:
             return None
         
         # Сбор и фильтрация покерных файлов
-        all_files_to_process, filtered_count = self._collect_poker_files(
-            paths, total_candidates, progress_callback, is_canceled_callback
-        )
+        with profiler.stage("classification"):
+            all_files_to_process, filtered_count = self._collect_poker_files(
+                paths, total_candidates, progress_callback, is_canceled_callback
+            )
 
         if filtered_count > 0:
             logger.debug(f"Отфильтровано {filtered_count} файлов без покерных шаблонов")
 
         total_files = len(all_files_to_process)
+        profiler.count("files", total_files)
         if total_files == 0:
             logger.info("Нет файлов для обработки.")
             if progress_callback:
@@ -208,15 +240,17 @@ class ImportService:
         current_progress = PARSING_WEIGHT
         
         # Сохранение данных в БД
-        saved_data = self._save_parsed_data(
-            parsed_data['tournaments'],
-            parsed_data['hands'],
-            current_progress,
-            total_steps,
-            SAVING_WEIGHT,
-            progress_callback,
-            is_canceled_callback
-        )
+        with profiler.stage("db_save"):
+            saved_data = self._save_parsed_data(
+                parsed_data['tournaments'],
+                parsed_data['hands'],
+                current_progress,
+                total_steps,
+                SAVING_WEIGHT,
+                progress_callback,
+                is_canceled_callback,
+                hand_summaries=parsed_data.get('hand_summaries'),
+            )
         
         if not saved_data:
             return None  # Импорт был отменен или произошла ошибка
@@ -235,7 +269,8 @@ class ImportService:
                 imported_tournament_ids=imported_tournament_ids,
                 files_processed=total_files,
                 tournaments_saved=len(parsed_data['tournaments']),
-                hands_saved=len(parsed_data['hands'])
+                hands_saved=len(parsed_data['hands']),
+                profile=profiler.report() if profiler.enabled else None
             ))
         
         # Завершение импорта
@@ -243,13 +278,19 @@ class ImportService:
             progress_callback(total_steps, total_steps, "Импорт завершен успешно!")
         
         logger.info(f"=== ИМПОРТ ЗАВЕРШЕН ===")
+        if profiler.enabled:
+            # Итоговый отчёт с этапом stats_update пишет AppFacade
+            logger.debug(profiler.format_report())
         
         # Возвращаем результаты импорта
         return {
             'session_id': session_id,
             'imported_tournaments': saved_data['tournaments'],
             'imported_hands': saved_data['hands'],
-            'updated_tournament_ids': saved_data['updated_tournament_ids']
+            'updated_tournament_ids': saved_data['updated_tournament_ids'],
+            'updated_tournaments': saved_data['updated_tournaments'],
+            'replaced_tournaments': saved_data['replaced_tournaments'],
+            'profiler': profiler
         }
     
     def _count_candidate_files(
@@ -282,6 +323,7 @@ class ImportService:
 
         Возвращает список кортежей (путь, тип, первые строки).
         """
+        progress = ProgressReporter.wrap(progress_callback, app_config.import_progress_hz)
         all_files_to_process: List[tuple[str, str, List[str]]] = []
         filtered_files_count = 0
         processed_candidates = 0
@@ -291,8 +333,8 @@ class ImportService:
             for path in paths:
                 if is_canceled_callback and is_canceled_callback():
                     logger.info("Импорт отменен пользователем при подготовке файлов.")
-                    if progress_callback:
-                        progress_callback(processed_candidates, total_candidates, "Импорт отменен пользователем")
+                    if progress:
+                        progress(processed_candidates, total_candidates, "Импорт отменен пользователем")
                     return [], 0
 
                 if os.path.isdir(path):
@@ -316,12 +358,15 @@ class ImportService:
                     all_files_to_process.append((file_path, file_type, header_lines))
                 else:
                     filtered_files_count += 1
-                if progress_callback and total_candidates:
-                    progress_callback(processed_candidates, total_candidates, "Подготовка файлов...")
+                if progress and total_candidates:
+                    progress.update(processed_candidates, total_candidates, "Подготовка файлов...")
                 if is_canceled_callback and is_canceled_callback():
                     logger.info("Импорт отменен пользователем при подготовке файлов.")
                     return [], 0
 
+        if progress:
+            progress.flush()
+
         return all_files_to_process, filtered_files_count
     
     def _get_or_create_session(
@@ -356,14 +401,41 @@ class ImportService:
         is_canceled_callback: Optional[Callable[[], bool]]
     ) -> Optional[Dict[str, Any]]:
         """Парсит файлы и возвращает структурированные данные."""
-        parsed_tournaments_data: Dict[str, Dict[str, Any]] = {}
-        all_final_table_hands_data: List[Dict[str, Any]] = []
-        
         if progress_callback:
             progress_callback(current_progress, total_steps, "Начинаем обработку файлов...")
-        
+
+        # Парсеры пишут замеры в профайлер текущего импорта и проверяют
+        # отмену в циклах по раздачам
+        for parser in self.parsers.values():
+            parser.profiler = self._profiler
+            parser.cancel_check = is_canceled_callback or never_cancelled
+        try:
+            return self._parse_files_in_pool(
+                file_infos, session_id, total_steps, parsing_weight,
+                progress_callback, is_canceled_callback,
+            )
+        finally:
+            for parser in self.parsers.values():
+                parser.profiler = NULL_PROFILER
+                parser.cancel_check = never_cancelled
+
+    def _parse_files_in_pool(
+        self,
+        file_infos: List[tuple[str, str, List[str]]],
+        session_id: str,
+        total_steps: int,
+        parsing_weight: int,
+        progress_callback: Optional[Callable[[int, int, str], None]],
+        is_canceled_callback: Optional[Callable[[], bool]]
+    ) -> Optional[Dict[str, Any]]:
+        """Читает файлы в пуле процессов и парсит их по мере готовности."""
+        progress = ProgressReporter.wrap(progress_callback, app_config.import_progress_hz)
+        parsed_tournaments_data: Dict[str, Dict[str, Any]] = {}
+        all_final_table_hands_data: List[Dict[str, Any]] = []
+        all_hand_summaries: List[Dict[str, Any]] = []
         files_processed = 0
         total_files = len(file_infos)
+        profiler = self._profiler
 
         with ProcessPoolExecutor() as executor:
             futures = {
@@ -377,27 +449,40 @@ class ImportService:
                     executor.shutdown(wait=False, cancel_futures=True)
                     return None
 
-                file_path, content, success = future.result()
+                # Файл прочитан в дочернем процессе - время чтения приходит вместе с содержимым
+                file_path, content, success, size, read_wall, read_cpu = future.result()
+                profiler.add_time("read", read_wall, read_cpu)
                 file_type, header_lines = futures[future]
 
                 if success:
-                    self._parse_single_file(
-                        file_path,
-                        file_type,
-                        header_lines,
-                        content,
-                        session_id,
-                        parsed_tournaments_data,
-                        all_final_table_hands_data,
-                    )
+                    profiler.count("bytes", size)
+                    try:
+                        with profiler.stage("parse"):
+                            self._parse_single_file(
+                                file_path,
+                                file_type,
+                                header_lines,
+                                content,
+                                session_id,
+                                parsed_tournaments_data,
+                                all_final_table_hands_data,
+                                all_hand_summaries,
+                            )
+                    except ImportCancelled:
+                        logger.warning(f"=== ИМПОРТ ОТМЕНЕН при разборе {os.path.basename(file_path)} ===")
+                        executor.shutdown(wait=False, cancel_futures=True)
+                        return None
                     files_processed += 1
                     file_progress = int((files_processed / total_files) * parsing_weight)
-                    if progress_callback:
-                        progress_callback(file_progress, total_steps, f"Обработка: {os.path.basename(file_path)}")
-        
+                    if progress:
+                        progress.update(file_progress, total_steps, f"Обработка: {os.path.basename(file_path)}")
+
+        if progress:
+            progress.flush()
         return {
             'tournaments': parsed_tournaments_data,
-            'hands': all_final_table_hands_data
+            'hands': all_final_table_hands_data,
+            'hand_summaries': all_hand_summaries,
         }
     
     def _parse_single_file(
@@ -408,7 +493,8 @@ class ImportService:
         content: str,
         session_id: str,
         parsed_tournaments_data: Dict[str, Dict[str, Any]],
-        all_final_table_hands_data: List[Dict[str, Any]]
+        all_final_table_hands_data: List[Dict[str, Any]],
+        all_hand_summaries: Optional[List[Dict[str, Any]]] = None,
     ):
         """Парсит отдельный файл и добавляет данные в общие структуры."""
 
@@ -425,7 +511,8 @@ class ImportService:
                 file_path,
                 session_id,
                 parsed_tournaments_data,
-                all_final_table_hands_data
+                all_final_table_hands_data,
+                all_hand_summaries,
             )
         elif file_type == 'ts':
             self._parse_tournament_summary(
@@ -443,7 +530,8 @@ class ImportService:
         file_path: str,
         session_id: str,
         parsed_tournaments_data: Dict[str, Dict[str, Any]],
-        all_final_table_hands_data: List[Dict[str, Any]]
+        all_final_table_hands_data: List[Dict[str, Any]],
+        all_hand_summaries: Optional[List[Dict[str, Any]]] = None,
     ):
         """Обрабатывает файл истории рук."""
         hh_result = parser.parse(content, filename=os.path.basename(file_path))
@@ -485,6 +573,8 @@ class ImportService:
             for hand_data in ft_hands_data:
                 hand_data['session_id'] = session_id
                 all_final_table_hands_data.append(hand_data)
+            if all_hand_summaries is not None:
+                all_hand_summaries.extend(hh_result.hand_summaries)
 
             # Если по сводке место <= 9, но финальные раздачи отсутствуют,
             # не считаем, что финальный стол достигнут.
@@ -582,7 +672,8 @@ class ImportService:
         total_steps: int,
         saving_weight: int,
         progress_callback: Optional[Callable[[int, int, str], None]],
-        is_canceled_callback: Optional[Callable[[], bool]]
+        is_canceled_callback: Optional[Callable[[], bool]],
+        hand_summaries: Optional[List[Dict[str, Any]]] = None,
     ) -> Optional[Dict[str, Any]]:
         """
         Сохраняет распарсенные данные в БД.
@@ -604,30 +695,45 @@ class ImportService:
         saved_hands = []
         updated_tournament_ids = []
         
-        # Сохраняем турниры
-        tournaments_saved, tournament_objects, updated_ids = self._save_tournaments(
-            parsed_tournaments_data,
-            current_progress,
-            total_steps,
-            saving_weight * 0.4,
-            progress_callback
-        )
-        saved_tournaments.extend(tournament_objects)
-        updated_tournament_ids.extend(updated_ids)
-        
-        logger.debug(f"Сохранено/обновлено {tournaments_saved} турниров.")
-        
-        # Сохраняем руки финального стола
-        hands_saved, hand_objects = self._save_final_table_hands(
-            all_final_table_hands_data,
-            current_progress + int(saving_weight * 0.4),
-            total_steps,
-            saving_weight * 0.4,
-            progress_callback
+        # Большой пакет относительно уже загруженных данных (первый импорт
+        # архива) вставляется без неуникальных индексов, индексы строятся
+        # после вставки
+        conn = self.tournament_repo.db.get_connection()
+        bulk_load.restore_deferred_indexes(conn)
+        defer_indexes = bulk_load.should_defer_indexes(
+            bulk_load.estimate_rows(conn),
+            len(parsed_tournaments_data) + len(all_final_table_hands_data),
+            app_config.bulk_import_min_rows,
         )
-        saved_hands.extend(hand_objects)
+
+        with bulk_load.deferred_indexes(conn) if defer_indexes else nullcontext():
+            # Сохраняем турниры
+            tournaments_saved, tournament_objects, updated_ids, updated_objects, replaced_objects = self._save_tournaments(
+                parsed_tournaments_data,
+                current_progress,
+                total_steps,
+                saving_weight * 0.4,
+                progress_callback
+            )
+            saved_tournaments.extend(tournament_objects)
+            updated_tournament_ids.extend(updated_ids)
+
+            logger.debug(f"Сохранено/обновлено {tournaments_saved} турниров.")
+
+            # Сохраняем руки финального стола
+            hands_saved, hand_objects = self._save_final_table_hands(
+                all_final_table_hands_data,
+                current_progress + int(saving_weight * 0.4),
+                total_steps,
+                saving_weight * 0.4,
+                progress_callback
+            )
+            saved_hands.extend(hand_objects)
         
         logger.debug(f"Сохранение рук завершено: {hands_saved} из {len(all_final_table_hands_data)}")
+
+        # Сводки раздач для пересчёта KO без HH-файлов
+        self._save_hand_summaries(hand_summaries or [])
         
         # Обновляем ko_count для турниров
         self._update_ko_counts(
@@ -644,7 +750,9 @@ class ImportService:
         return {
             'tournaments': saved_tournaments,
             'hands': saved_hands,
-            'updated_tournament_ids': updated_tournament_ids
+            'updated_tournament_ids': updated_tournament_ids,
+            'updated_tournaments': updated_objects,
+            'replaced_tournaments': replaced_objects
         }
     
     def _save_tournaments(
@@ -654,17 +762,20 @@ class ImportService:
         total_steps: int,
         weight: float,
         progress_callback: Optional[Callable[[int, int, str], None]]
-    ) -> tuple[int, List[Tournament], List[str]]:
+    ) -> tuple[int, List[Tournament], List[str], List[Tournament], List[Tournament]]:
         """
         Сохраняет или обновляет турниры в БД.
         
         Returns:
-            Кортеж из (количество сохраненных, список объектов Tournament, список обновленных ID)
+            Кортеж из (количество сохраненных, список новых объектов Tournament,
+            список обновленных ID, обновленные турниры, их версии до обновления)
         """
         tournaments_saved = 0
         total_tournaments = len(parsed_tournaments_data)
         saved_objects: List[Tournament] = []
         updated_ids: List[str] = []
+        updated_objects: List[Tournament] = []
+        replaced_objects: List[Tournament] = []
         tournaments_to_save: List[Tournament] = []
 
         existing_tournaments = self.tournament_repo.get_tournaments_by_ids(
@@ -720,6 +831,8 @@ class ImportService:
                     if _strip(existing_tourney) == _strip(merged_tournament):
                         continue
                     updated_ids.append(tourney_id)
+                    updated_objects.append(merged_tournament)
+                    replaced_objects.append(existing_tourney)
                 else:
                     saved_objects.append(merged_tournament)
 
@@ -735,7 +848,7 @@ class ImportService:
             progress_callback(current_progress + int(weight), total_steps,
                              f"Сохранено турниров: {tournaments_saved}/{total_tournaments}")
 
-        return tournaments_saved, saved_objects, updated_ids
+        return tournaments_saved, saved_objects, updated_ids, updated_objects, replaced_objects
     
     def _save_final_table_hands(
         self,
@@ -748,6 +861,9 @@ class ImportService:
         """
         Сохраняет руки финального стола в БД.
         
+        Раздачи, уже имеющиеся в БД (повторный импорт того же файла), не
+        возвращаются, чтобы инкрементальная статистика не учла их дважды.
+
         Returns:
             Кортеж из (количество сохраненных, список объектов FinalTableHand)
         """
@@ -755,9 +871,16 @@ class ImportService:
         
         total_hands_to_save = len(all_final_table_hands_data)
         saved_objects: List[FinalTableHand] = []
+        seen_keys = self.ft_hand_repo.get_existing_hand_keys(
+            list({h.get('tournament_id') for h in all_final_table_hands_data})
+        )
 
         for hand_data in all_final_table_hands_data:
             try:
+                key = (hand_data.get('tournament_id'), hand_data.get('hand_id'))
+                if key in seen_keys:
+                    continue
+                seen_keys.add(key)
                 saved_objects.append(FinalTableHand.from_dict(hand_data))
             except Exception as e:
                 logger.error(
@@ -774,6 +897,18 @@ class ImportService:
 
         return len(saved_objects), saved_objects
     
+    def _save_hand_summaries(self, hand_summaries: List[Dict[str, Any]]):
+        """
+        Сохраняет бинарные сводки раздач. Ошибка здесь не прерывает импорт:
+        сводки нужны только для последующего пересчёта KO.
+        """
+        if not hand_summaries:
+            return
+        try:
+            self.hand_summary_repo.add_summaries(hand_summaries)
+        except Exception as e:
+            logger.error(f"Ошибка сохранения сводок раздач: {e}")
+
     def _update_ko_counts(
         self,
         parsed_tournaments_data: Dict[str, Dict[str, Any]],
@@ -784,8 +919,9 @@ class ImportService:
     ):
         """Обновляет ko_count для турниров на основе сохраненных рук."""
         logger.debug("Подсчет ko_count для турниров...")
-        if progress_callback:
-            progress_callback(current_progress, total_steps, "Подсчет нокаутов...")
+        progress = ProgressReporter.wrap(progress_callback, app_config.import_progress_hz)
+        if progress:
+            progress(current_progress, total_steps, "Подсчет нокаутов...")
         
         tournament_ids = list(parsed_tournaments_data.keys())
         total_tournaments = len(tournament_ids)
@@ -802,12 +938,14 @@ class ImportService:
             parsed_tournaments_data[tourney_id]['ko_count'] = ko_counts.get(tourney_id, 0)
             tournaments_processed += 1
 
-            # Обновляем прогресс
-            if tournaments_processed % 5 == 0 or tournaments_processed == total_tournaments:
+            # Обновляем прогресс (частоту ограничивает ProgressReporter)
+            if progress:
                 ko_progress = current_progress + int((tournaments_processed / max(total_tournaments, 1)) * weight)
-                if progress_callback:
-                    progress_callback(
-                        ko_progress,
-                        total_steps,
-                        f"Обработано турниров: {tournaments_processed}/{total_tournaments}"
-                    )
+                progress.update(
+                    ko_progress,
+                    total_steps,
+                    f"Обработано турниров: {tournaments_processed}/{total_tournaments}"
+                )
+
+        if progress:
+            progress.flush()
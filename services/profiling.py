@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+
+"""
+Профилирование импорта Royal Stats.
+
+ImportProfiler накапливает по этапам время (wall и CPU потока) и счётчики
+(файлы, раздачи, байты). При выключенном профилировании stage() возвращает
+общий пустой контекстный менеджер, поэтому накладные расходы минимальны.
+"""
+
+import time
+import threading
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator, List
+
+# Порядок этапов в отчёте
+IMPORT_STAGES = (
+    "discovery",
+    "classification",
+    "read",
+    "parse",
+    "split",
+    "hand_parse",
+    "pots_ko",
+    "ko_attempts",
+    "hand_summary",
+    "db_save",
+    "stats_update",
+)
+
+
+class _NullStage:
+    """Пустой контекстный менеджер для выключенного профилирования."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class ImportProfiler:
+    """
+    Сборщик времени по этапам импорта.
+
+    Вложенные этапы учитываются независимо: время "parse" включает
+    время "split", "hand_parse" и т.д.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._stages: Dict[str, Dict[str, float]] = {}
+        self._counters: Dict[str, int] = {}
+        self._started = time.perf_counter()
+
+    def stage(self, name: str):
+        """Контекстный менеджер, замеряющий этап name."""
+        if not self.enabled:
+            return _NULL_STAGE
+        return self._measure(name)
+
+    @contextmanager
+    def _measure(self, name: str) -> Iterator[None]:
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        try:
+            yield
+        finally:
+            self.add_time(
+                name,
+                time.perf_counter() - wall_start,
+                time.thread_time() - cpu_start,
+            )
+
+    def add_time(self, name: str, wall: float, cpu: float = 0.0) -> None:
+        """Добавляет замер этапа (например, полученный из дочернего процесса)."""
+        if not self.enabled:
+            return
+        with self._lock:
+            entry = self._stages.setdefault(name, {"calls": 0, "wall_s": 0.0, "cpu_s": 0.0})
+            entry["calls"] += 1
+            entry["wall_s"] += wall
+            entry["cpu_s"] += cpu
+
+    def count(self, name: str, value: int = 1) -> None:
+        """Увеличивает счётчик name (files, hands, bytes...)."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def report(self) -> Dict[str, Any]:
+        """Возвращает отчёт в виде словаря, пригодного для JSON."""
+        with self._lock:
+            order = {name: i for i, name in enumerate(IMPORT_STAGES)}
+            stages: List[Dict[str, Any]] = [
+                {
+                    "stage": name,
+                    "calls": int(entry["calls"]),
+                    "wall_s": round(entry["wall_s"], 6),
+                    "cpu_s": round(entry["cpu_s"], 6),
+                }
+                for name, entry in sorted(
+                    self._stages.items(), key=lambda item: order.get(item[0], len(order))
+                )
+            ]
+            return {
+                "total_wall_s": round(time.perf_counter() - self._started, 6),
+                "stages": stages,
+                "counters": dict(self._counters),
+            }
+
+    def format_report(self) -> str:
+        """Человекочитаемый отчёт для лога."""
+        data = self.report()
+        lines = [f"Профиль импорта: всего {data['total_wall_s']:.3f} с"]
+        for entry in data["stages"]:
+            lines.append(
+                f"  {entry['stage']:<14} wall={entry['wall_s']:.3f} с "
+                f"cpu={entry['cpu_s']:.3f} с calls={entry['calls']}"
+            )
+        if data["counters"]:
+            counters = ", ".join(f"{k}={v}" for k, v in sorted(data["counters"].items()))
+            lines.append(f"  счётчики: {counters}")
+        return "\n".join(lines)
+
+
+# Общий выключенный профайлер: значение по умолчанию для парсеров
+NULL_PROFILER = ImportProfiler(enabled=False)
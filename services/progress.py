@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+
+"""
+Прогресс и отмена импорта Royal Stats.
+
+progress_callback импорта в UI - это сигнал из ImportThread в главный
+поток: каждый вызов означает межпоточную доставку и перерисовку меток.
+ProgressReporter пропускает промежуточный прогресс (update) не чаще
+заданной частоты, а между отправками хранит только последнее значение,
+так что счётчики обработанных файлов копятся без лишних сигналов.
+Статусы (смена этапа, отмена, завершение) передаются сразу.
+
+ImportCancelled бросают парсеры из циклов по раздачам, чтобы отмена
+срабатывала и внутри одного большого файла.
+"""
+
+import time
+from typing import Callable, Optional, Tuple
+
+ProgressCallback = Callable[[int, int, str], None]
+
+# Частота промежуточных обновлений прогресса по умолчанию, Гц
+DEFAULT_PROGRESS_RATE_HZ = 20.0
+
+
+class ImportCancelled(Exception):
+    """Импорт отменён пользователем во время разбора файла."""
+
+
+def never_cancelled() -> bool:
+    """Проверка отмены по умолчанию для парсеров вне импорта."""
+    return False
+
+
+class ProgressReporter:
+    """Ограничивает частоту вызовов progress_callback(current, total, text)."""
+
+    def __init__(
+        self,
+        callback: ProgressCallback,
+        rate_hz: float = DEFAULT_PROGRESS_RATE_HZ,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._callback = callback
+        self._interval = 1.0 / rate_hz if rate_hz > 0 else 0.0
+        self._clock = clock
+        self._last_emit = float("-inf")
+        self._pending: Optional[Tuple[int, int, str]] = None
+
+    @classmethod
+    def wrap(
+        cls, callback: Optional[ProgressCallback], rate_hz: float = DEFAULT_PROGRESS_RATE_HZ
+    ) -> Optional["ProgressReporter"]:
+        """Оборачивает callback (None и уже обёрнутый возвращаются как есть)."""
+        if callback is None or isinstance(callback, cls):
+            return callback
+        return cls(callback, rate_hz)
+
+    def __call__(self, current: int, total: int, text: str) -> None:
+        """Передаёт статус сразу; отложенный промежуточный прогресс отбрасывается."""
+        self._pending = None
+        self._emit(current, total, text, self._clock())
+
+    def update(self, current: int, total: int, text: str) -> None:
+        """Промежуточный прогресс: не чаще rate_hz, иначе запоминается последнее значение."""
+        now = self._clock()
+        if now - self._last_emit >= self._interval:
+            self._pending = None
+            self._emit(current, total, text, now)
+        else:
+            self._pending = (current, total, text)
+
+    def flush(self) -> None:
+        """Передаёт отложенный прогресс (конец цикла, чтобы счётчик не отставал)."""
+        if self._pending is not None:
+            current, total, text = self._pending
+            self._pending = None
+            self._emit(current, total, text, self._clock())
+
+    def _emit(self, current: int, total: int, text: str, now: float) -> None:
+        self._last_emit = now
+        self._callback(current, total, text)
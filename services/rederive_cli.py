@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+
+"""
+Командная строка пересчёта KO по сохранённым сводкам раздач.
+
+Запуск из корня проекта:
+    python -m services.rederive_cli [--db путь_к_бд] [--workers N]
+"""
+
+import os
+import argparse
+import logging
+from typing import List, Optional
+
+from db.manager import DatabaseManager, database_manager
+from db.repositories import (
+    TournamentRepository,
+    SessionRepository,
+    OverallStatsRepository,
+    PlaceDistributionRepository,
+    FinalTableHandRepository,
+    HandSummaryRepository,
+)
+from .rederive_service import RederiveService
+from .statistics_service import StatisticsService
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Точка входа командной строки: пересчёт KO и полной статистики в БД."""
+    parser = argparse.ArgumentParser(
+        description="Пересчёт KO-показателей по сохранённым сводкам раздач без чтения HH-файлов"
+    )
+    parser.add_argument("--db", default=None, help="Путь к базе данных (по умолчанию - текущая)")
+    parser.add_argument("--workers", type=int, default=None, help="Число процессов")
+    parser.add_argument(
+        "--ko-coeff-only",
+        action="store_true",
+        help="Только применить текущие ko_coeff (set-based UPDATE без разбора сводок)",
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    # Отдельный менеджер для --db: путь не сохраняется как текущая БД приложения
+    db_manager = DatabaseManager(os.path.abspath(args.db)) if args.db else database_manager
+
+    tournament_repo = TournamentRepository(db_manager)
+    ft_hand_repo = FinalTableHandRepository(db_manager)
+    service = RederiveService(tournament_repo, ft_hand_repo, HandSummaryRepository(db_manager))
+    if args.ko_coeff_only:
+        if not service.apply_ko_coeff_if_changed():
+            print("Коэффициенты ko_coeff не изменились")
+            db_manager.close_all_connections()
+            return 0
+        result = None
+    else:
+        result = service.rederive(workers=args.workers)
+
+    # Без файла кеша: запись кеша приложения сверяется с контрольной суммой БД
+    # и после пересчёта сама станет устаревшей
+    statistics_service = StatisticsService(
+        tournament_repo=tournament_repo,
+        session_repo=SessionRepository(db_manager),
+        overall_stats_repo=OverallStatsRepository(db_manager),
+        place_dist_repo=PlaceDistributionRepository(db_manager),
+        ft_hand_repo=ft_hand_repo,
+    )
+    statistics_service.update_all_statistics(
+        session_id="", db_path=db_manager.db_path, use_incremental=False
+    )
+    db_manager.close_all_connections()
+
+    if result is None:
+        print("KO пересчитаны под текущие ko_coeff")
+        return 0
+    print(
+        f"Турниров: {result['tournaments']}, раздач: {result['hands']}, "
+        f"изменено: {result['updated_hands']}, ошибок: {result['errors']}"
+    )
+    return 1 if result['errors'] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+
+"""
+Сервис пересчёта KO-показателей по сохранённым сводкам раздач.
+
+После изменения правил KO (ko_coeff, правила попыток KO) пересчитывает
+hero_ko_this_hand, pre_ft_ko и hero_ko_attempts всех раздач финалки
+и ko_count турниров только по данным БД, без чтения HH-файлов.
+Турниры обрабатываются пачками в пуле процессов.
+
+Смена одних коэффициентов ko_coeff применяется дешевле - одним
+set-based UPDATE по сохранённому сырому числу KO перед финалкой.
+
+Запуск из командной строки - services/rederive_cli.py.
+"""
+
+import os
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from db.repositories import (
+    TournamentRepository,
+    FinalTableHandRepository,
+    HandSummaryRepository,
+    MetaRepository,
+)
+from db.schema import DB_META_KO_COEFF, ko_coeff_fingerprint
+from .app_config import app_config
+
+logger = logging.getLogger('ROYAL_Stats.RederiveService')
+
+TournamentSummaries = Tuple[str, List[Tuple[str, int, int, bytes]]]
+
+# Число турниров в одной пачке для дочернего процесса
+REDERIVE_BATCH_TOURNAMENTS = 200
+
+
+def _rederive_batch(hero_name: str, batch: List[TournamentSummaries]) -> Tuple[List[tuple], int]:
+    """
+    Пересчитывает пачку турниров (в том числе в дочернем процессе).
+    Возвращает параметры UPDATE для раздач и число турниров с ошибкой.
+    """
+    from parsers.hand_history import HandHistoryParser
+
+    parser = HandHistoryParser(hero_name)
+    values: List[tuple] = []
+    errors = 0
+    for tournament_id, summaries in batch:
+        try:
+            for hand in parser.rederive_tournament(tournament_id, summaries):
+                values.append((
+                    hand['hero_ko_this_hand'],
+                    hand['pre_ft_ko'],
+                    hand['hero_ko_attempts'],
+                    hand['pre_ft_raw_ko'],
+                    tournament_id,
+                    hand['hand_id'],
+                ))
+        except Exception as e:
+            errors += 1
+            logger.error(f"Ошибка пересчёта турнира {tournament_id}: {e}")
+    return values, errors
+
+
+class RederiveService:
+    """Пересчёт KO-показателей раздач финального стола из сводок в БД."""
+
+    def __init__(
+        self,
+        tournament_repo: TournamentRepository,
+        ft_hand_repo: FinalTableHandRepository,
+        hand_summary_repo: HandSummaryRepository,
+        meta_repo: Optional[MetaRepository] = None,
+    ):
+        self.tournament_repo = tournament_repo
+        self.ft_hand_repo = ft_hand_repo
+        self.hand_summary_repo = hand_summary_repo
+        self.meta_repo = meta_repo or MetaRepository(ft_hand_repo.db)
+
+    def apply_ko_coeff_if_changed(self) -> bool:
+        """
+        Применяет текущие app_config.ko_coeff к данным БД, если они
+        посчитаны с другими коэффициентами.
+
+        Returns:
+            True, если данные пересчитаны и статистику нужно обновить
+        """
+        fingerprint = ko_coeff_fingerprint(app_config.ko_coeff)
+        if self.meta_repo.get_value(DB_META_KO_COEFF) == fingerprint:
+            return False
+        changed = self.ft_hand_repo.apply_ko_coeff(app_config.ko_coeff)
+        self.meta_repo.set_value(DB_META_KO_COEFF, fingerprint)
+        logger.info(f"Коэффициенты ko_coeff изменились, пересчитано раздач: {changed}")
+        return True
+
+    def rederive(
+        self,
+        progress_callback: Optional[Callable[[int, int, str], None]] = None,
+        is_canceled_callback: Optional[Callable[[], bool]] = None,
+        workers: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Пересчитывает KO всех турниров, для которых есть сводки.
+
+        Args:
+            progress_callback: function(current, total, text) для прогресса
+            is_canceled_callback: function() -> True, если пересчёт нужно прервать
+            workers: Число процессов (по умолчанию hh_parallel_workers или число CPU)
+
+        Returns:
+            Словарь: tournaments, hands, updated_hands, errors, canceled
+        """
+        total = self.hand_summary_repo.count_tournaments()
+        workers = workers or app_config.hh_parallel_workers or os.cpu_count() or 1
+        result = {'tournaments': 0, 'hands': 0, 'updated_hands': 0, 'errors': 0, 'canceled': False}
+
+        if progress_callback:
+            progress_callback(0, total, "Пересчёт KO по сводкам раздач...")
+
+        batches = self._iter_batches()
+        if workers > 1 and total > REDERIVE_BATCH_TOURNAMENTS:
+            executor = ProcessPoolExecutor(max_workers=workers)
+            outputs = self._map_parallel(executor, batches, workers)
+        else:
+            executor = None
+            outputs = ((batch, _rederive_batch(app_config.hero_name, batch)) for batch in batches)
+
+        try:
+            for batch, (values, errors) in outputs:
+                result['tournaments'] += len(batch)
+                result['hands'] += len(values)
+                result['errors'] += errors
+                result['updated_hands'] += self.ft_hand_repo.update_ko_values(values)
+                if progress_callback:
+                    progress_callback(
+                        result['tournaments'], total,
+                        f"Пересчитано турниров: {result['tournaments']}/{total}",
+                    )
+                if is_canceled_callback and is_canceled_callback():
+                    logger.warning("Пересчёт KO прерван пользователем")
+                    result['canceled'] = True
+                    break
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True, cancel_futures=True)
+
+        # ko_count турнира - сумма KO его раздач (для непересчитанных не меняется)
+        ko_counts = self.ft_hand_repo.get_ko_counts_for_tournaments(None)
+        self.tournament_repo.set_ko_counts(ko_counts)
+        # Турниры без сводок переводятся на текущие коэффициенты отдельно
+        self.apply_ko_coeff_if_changed()
+
+        logger.info(
+            f"Пересчёт KO завершён: турниров {result['tournaments']}, раздач {result['hands']}, "
+            f"изменено {result['updated_hands']}, ошибок {result['errors']}"
+        )
+        return result
+
+    def _iter_batches(self) -> Iterator[List[TournamentSummaries]]:
+        """Нарезает поток сводок на пачки по REDERIVE_BATCH_TOURNAMENTS турниров."""
+        summaries = self.hand_summary_repo.iter_tournament_summaries()
+        while True:
+            batch = list(islice(summaries, REDERIVE_BATCH_TOURNAMENTS))
+            if not batch:
+                return
+            yield batch
+
+    @staticmethod
+    def _map_parallel(
+        executor: ProcessPoolExecutor,
+        batches: Iterator[List[TournamentSummaries]],
+        workers: int,
+    ) -> Iterator[Tuple[List[TournamentSummaries], Tuple[List[tuple], int]]]:
+        """
+        Отдаёт результаты пачек по порядку, держа в работе не больше
+        2 * workers пачек, чтобы не читать всю таблицу сводок в память.
+        """
+        pending = []
+        for batch in batches:
+            pending.append((batch, executor.submit(_rederive_batch, app_config.hero_name, batch)))
+            if len(pending) >= workers * 2:
+                batch, future = pending.pop(0)
+                yield batch, future.result()
+        for batch, future in pending:
+            yield batch, future.result()
+
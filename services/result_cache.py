@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+
+"""
+LRU-кеш готовых результатов с ограничением по объему памяти.
+Используется фасадом для хранения ViewModel по комбинациям фильтров.
+"""
+
+import pickle
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Tuple
+
+logger = logging.getLogger('ROYAL_Stats.ResultCache')
+
+
+class LRUResultCache:
+    """
+    Потокобезопасный LRU-кеш с бюджетом в байтах.
+
+    Размер записи оценивается по длине её pickle-представления.
+    При превышении бюджета вытесняются наиболее давно использованные записи.
+    Запись, которая сама по себе больше бюджета, не кешируется.
+    """
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024):
+        """
+        Args:
+            max_bytes: Максимальный суммарный объем записей в байтах
+        """
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, Tuple[Any, int]]" = OrderedDict()
+        self._current_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def estimate_size(value: Any) -> int:
+        """Оценивает объем значения в байтах."""
+        try:
+            return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+        except Exception:
+            # Непиклируемые объекты считаем занимающими весь бюджет
+            return -1
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Возвращает значение по ключу и помечает его как недавно использованное."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: Any) -> bool:
+        """
+        Сохраняет значение в кеше.
+
+        Returns:
+            True, если значение помещено в кеш
+        """
+        size = self.estimate_size(value)
+        if size < 0 or size > self.max_bytes:
+            logger.debug(f"Результат размером {size} байт не помещается в кеш")
+            return False
+
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._current_bytes -= old[1]
+            self._entries[key] = (value, size)
+            self._current_bytes += size
+            while self._current_bytes > self.max_bytes and self._entries:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._current_bytes -= evicted_size
+        return True
+
+    def clear(self) -> None:
+        """Полностью очищает кеш."""
+        with self._lock:
+            self._entries.clear()
+            self._current_bytes = 0
+
+    @property
+    def current_bytes(self) -> int:
+        """Текущий суммарный объем записей в байтах."""
+        return self._current_bytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
@@ -11,23 +11,51 @@ import json
 import hashlib
 import logging
 import threading
-from typing import List, Dict, Any, Optional, Callable
+from typing import List, Dict, Any, Optional, Callable, Union
 from datetime import datetime
 
-from models import Tournament, Session, OverallStats, FinalTableHand
+from models import Tournament, Session, OverallStats, FinalTableHand, FinalTableHandTotals
 from db.repositories import (
     TournamentRepository,
     SessionRepository,
     OverallStatsRepository,
     PlaceDistributionRepository,
     FinalTableHandRepository,
+    MetaRepository,
+    StatSketchRepository,
 )
-from stats import BaseStat, discover_plugins
+from db.repositories.stat_sketch_repo import SKETCH_SCOPE_BUYIN, SKETCH_SCOPE_SESSION, buyin_scope_key
+from db.schema import DB_META_STAT_SKETCHES, DB_META_SUMMARY_VERSION
+from analytics.quantile_sketch import QuantileSketch, merge_sketches
+from stats import BaseStat, create_stat_plugins
+from .db_summary import DatabaseSummary, read_summary, write_summary
 from .event_bus import EventBus
 from .events import StatisticsUpdatedEvent, CacheInvalidatedEvent
 
 logger = logging.getLogger('ROYAL_Stats.StatisticsService')
 
+# Размер полного финального стола
+FINAL_TABLE_SIZE = 9
+
+# Версия набора накопительных сумм OverallStats. При изменении состава сумм
+# увеличивается, и первая инкрементальная операция выполняет полный пересчет.
+OVERALL_STATS_AGGREGATES_VERSION = 1
+
+# Метрика скетча стеков выхода на FT (медиана для FT Stack Conversion)
+FT_STACK_SKETCH_METRIC = "ft_stack_chips"
+# Версия состава скетчей: при изменении скетчи пересоздаются из турниров
+STAT_SKETCHES_VERSION = "1"
+
+# Соответствие ключей плагина Big KO полям OverallStats
+BIG_KO_FIELDS = {
+    "x1.5": "big_ko_x1_5",
+    "x2": "big_ko_x2",
+    "x10": "big_ko_x10",
+    "x100": "big_ko_x100",
+    "x1000": "big_ko_x1000",
+    "x10000": "big_ko_x10000",
+}
+
 
 class StatisticsService:
     """
@@ -43,7 +71,8 @@ class StatisticsService:
         ft_hand_repo: FinalTableHandRepository,
         cache_file_path: str = None,
         stat_plugins: List[BaseStat] = None,
-        event_bus: Optional[EventBus] = None
+        event_bus: Optional[EventBus] = None,
+        sketch_repo: Optional[StatSketchRepository] = None
     ):
         """
         Инициализация сервиса статистики.
@@ -58,12 +87,15 @@ class StatisticsService:
             stat_plugins: Список плагинов статистики. Если None, плагины
                 автоматически загружаются из пакета ``stats`` и entry points
             event_bus: Шина событий для публикации событий статистики
+            sketch_repo: Репозиторий скетчей квантилей (по умолчанию - в той же БД)
         """
         self.tournament_repo = tournament_repo
         self.session_repo = session_repo
         self.overall_stats_repo = overall_stats_repo
         self.place_dist_repo = place_dist_repo
         self.ft_hand_repo = ft_hand_repo
+        self.sketch_repo = sketch_repo or StatSketchRepository(ft_hand_repo.db)
+        self.meta_repo = MetaRepository(ft_hand_repo.db)
         self.event_bus = event_bus
         
         # Кеш статистики по БД. Ключ - путь к БД, значение - OverallStats
@@ -89,14 +121,11 @@ class StatisticsService:
         self.stat_plugins = stat_plugins or self._get_default_stat_plugins()
     
     def _get_default_stat_plugins(self) -> List[BaseStat]:
-        """Возвращает список стандартных плагинов статистики."""
-        plugins = []
-        for plugin_cls in discover_plugins():
-            try:
-                plugins.append(plugin_cls())
-            except Exception as e:  # pragma: no cover - защитная логика
-                logger.error(f"Не удалось инициализировать плагин {plugin_cls}: {e}")
-        return plugins
+        """
+        Возвращает список стандартных плагинов статистики. Модули
+        встроенных плагинов импортируются при первом расчёте.
+        """
+        return create_stat_plugins()
     
     def calculate_stats_with_plugins(
         self,
@@ -215,7 +244,8 @@ class StatisticsService:
         progress_callback: Optional[Callable[[int, int, str], None]] = None,
         added_tournaments: Optional[List[Tournament]] = None,
         added_hands: Optional[List[FinalTableHand]] = None,
-        use_incremental: bool = True
+        use_incremental: bool = True,
+        removed_tournaments: Optional[List[Tournament]] = None
     ):
         """
         Пересчитывает и обновляет все агрегированные статистики (общие и по сессии).
@@ -228,6 +258,7 @@ class StatisticsService:
             added_tournaments: Список добавленных турниров (для инкрементального обновления)
             added_hands: Список добавленных рук (для инкрементального обновления)
             use_incremental: Использовать инкрементальное обновление если возможно
+            removed_tournaments: Прежние версии изменённых/удалённых турниров
         """
         
         # Если переданы данные для инкрементального обновления и флаг разрешает
@@ -241,6 +272,7 @@ class StatisticsService:
                 db_path=db_path,
                 added_tournaments=added_tournaments,
                 added_hands=added_hands,
+                removed_tournaments=removed_tournaments,
                 affected_tournament_ids=affected_tournament_ids,
                 progress_callback=progress_callback
             )
@@ -294,14 +326,12 @@ class StatisticsService:
         
         # --- Обновление KO count для турниров ---
         try:
-            for tournament in all_tournaments:
-                tournament_ft_hands = self.ft_hand_repo.get_hands_by_tournament(tournament.tournament_id)
-                total_ko = sum(hand.hero_ko_this_hand for hand in tournament_ft_hands)
-                tournament.ko_count = total_ko
-                self.tournament_repo.add_or_update_tournament(tournament)
-                current_step += 1
-                if progress_callback:
-                    progress_callback(current_step, total_steps, f"Обновлено турниров: {current_step - 1 - len(all_final_tournaments)}/{len(all_tournaments)}")
+            all_tournament_ids = [t.tournament_id for t in all_tournaments]
+            ko_counts = self.ft_hand_repo.get_ko_counts_for_tournaments(None)
+            self.tournament_repo.set_ko_counts(ko_counts, reset_ids=all_tournament_ids)
+            current_step += len(all_tournaments)
+            if progress_callback:
+                progress_callback(current_step, total_steps, f"Обновлено турниров: {len(all_tournaments)}/{len(all_tournaments)}")
             logger.debug(
                 f"KO count обновлен для {len(all_tournaments)} турниров."
             )
@@ -310,6 +340,12 @@ class StatisticsService:
             import traceback
             logger.error(f"Traceback: {traceback.format_exc()}")
         
+        # --- Скетчи квантилей по сессиям и бай-инам ---
+        try:
+            self._rebuild_stat_sketches(all_tournaments)
+        except Exception as e:
+            logger.error(f"Ошибка при обновлении скетчей статистики: {e}")
+
         # --- Обновление Session Stats ---
         try:
             for session in sessions_to_update:
@@ -344,6 +380,7 @@ class StatisticsService:
             "place_distribution": current_dist,
         }
         self._save_persistent_cache()
+        self.refresh_database_summary(db_path, self._overall_stats_cache.get(db_path))
         
         # Публикуем событие об обновлении статистики
         if self.event_bus:
@@ -407,6 +444,48 @@ class StatisticsService:
                 reason="Manual cache invalidation"
             ))
     
+    def refresh_database_summary(
+        self,
+        db_path: str,
+        overall_stats: Optional[OverallStats] = None
+    ) -> Optional[DatabaseSummary]:
+        """
+        Пересобирает сводку БД для диалога управления БД и увеличивает
+        версию данных в db_meta. Ошибки не прерывают обновление статистики.
+        """
+        try:
+            stats = overall_stats or self.overall_stats_repo.get_overall_stats()
+            first_start, last_start, _ = self.tournament_repo.get_start_time_range()
+            version = int(self.meta_repo.get_value(DB_META_SUMMARY_VERSION) or 0) + 1
+            summary = DatabaseSummary(
+                tournaments=stats.total_tournaments,
+                final_tables=stats.total_final_tables,
+                sessions=len(self.session_repo.get_all_sessions()),
+                knockouts=stats.total_knockouts,
+                total_buy_in=stats.total_buy_in,
+                total_prize=stats.total_prize,
+                first_start_time=first_start,
+                last_start_time=last_start,
+                data_version=version,
+                updated_at=datetime.now().isoformat(timespec="seconds"),
+            )
+            # Сначала версия в БД: если сводку записать не удастся, при
+            # следующем открытии БД версии не совпадут и сводка пересоберётся
+            self.meta_repo.set_value(DB_META_SUMMARY_VERSION, str(version))
+            write_summary(db_path, summary)
+            return summary
+        except Exception as e:
+            logger.error(f"Ошибка обновления сводки БД {db_path}: {e}")
+            return None
+
+    def ensure_database_summary(self, db_path: str) -> Optional[DatabaseSummary]:
+        """Пересобирает сводку открытой БД, если она отсутствует или устарела."""
+        summary = read_summary(db_path)
+        version = self.meta_repo.get_value(DB_META_SUMMARY_VERSION)
+        if summary is not None and version is not None and str(summary.data_version) == version:
+            return summary
+        return self.refresh_database_summary(db_path)
+
     def update_cache_for_renamed_db(self, old_path: str, new_path: str):
         """Обновляет кеши при переименовании БД."""
         if old_path in self._overall_stats_cache:
@@ -493,8 +572,6 @@ class StatisticsService:
         )
         
         # Финальные столы, начавшиеся неполным составом
-        # Используем константу 9 для размера финального стола
-        FINAL_TABLE_SIZE = 9
         first_ft_hands: dict[str, FinalTableHand] = {}
         for hand in all_ft_hands:
             if hand.table_size == FINAL_TABLE_SIZE:
@@ -579,6 +656,25 @@ class StatisticsService:
         ]
         stats.avg_finish_place_no_ft = sum(no_ft_places) / len(no_ft_places) if no_ft_places else 0.0
         stats.avg_finish_place_no_ft = round(stats.avg_finish_place_no_ft, 2)
+
+        # Накопительные суммы для последующих инкрементальных обновлений
+        stats.aggregates_version = OVERALL_STATS_AGGREGATES_VERSION
+        stats.all_tournaments_count = len(all_tournaments)
+        stats.finish_place_sum = sum(all_places)
+        stats.finish_place_count = len(all_places)
+        stats.ft_finish_place_sum = sum(ft_places)
+        stats.ft_finish_place_count = len(ft_places)
+        stats.no_ft_finish_place_sum = sum(no_ft_places)
+        stats.no_ft_finish_place_count = len(no_ft_places)
+        stats.ft_stack_chips_sum = sum(ft_initial_stacks_chips)
+        stats.ft_stack_chips_count = len(ft_initial_stacks_chips)
+        stats.ft_stack_bb_sum = sum(ft_initial_stacks_bb)
+        stats.ft_stack_bb_count = len(ft_initial_stacks_bb)
+        stats.chipev_stack_sum = sum(
+            t.final_table_initial_stack_chips
+            for t in all_tournaments
+            if t.reached_final_table and t.final_table_initial_stack_chips is not None
+        )
         
         # Округляем значения для хранения
         stats.avg_finish_place = round(stats.avg_finish_place, 2)
@@ -606,7 +702,8 @@ class StatisticsService:
         """
         session = self.session_repo.get_session_by_id(session_id)
         if not session:
-            logger.warning(f"Сессия с ID {session_id} не найдена для обновления статистики.")
+            # Штатно для дельты удалённой сессии: её турниры уже вычтены из общей статистики
+            logger.debug(f"Сессия с ID {session_id} не найдена для обновления статистики.")
             return
         
         # Эффективно получаем все необходимые статистики одним вызовом
@@ -621,6 +718,83 @@ class StatisticsService:
         
         self.session_repo.update_session_stats(session)
     
+    @staticmethod
+    def _ft_stack_sketch_value(tournament: Tournament) -> Optional[float]:
+        """Стек выхода на FT для скетча (отбор как в FT Stack Conversion)."""
+        t = tournament
+        if (t.reached_final_table and t.final_table_initial_stack_chips is not None
+                and t.final_table_start_players is not None):
+            return t.final_table_initial_stack_chips
+        return None
+
+    def _rebuild_stat_sketches(self, tournaments: List[Tournament]) -> None:
+        """Пересоздаёт скетчи по сессиям и бай-инам из полного списка турниров."""
+        by_session: Dict[str, QuantileSketch] = {}
+        by_buyin: Dict[str, QuantileSketch] = {}
+        for t in tournaments:
+            value = self._ft_stack_sketch_value(t)
+            if value is None:
+                continue
+            by_session.setdefault(t.session_id or "", QuantileSketch()).add(value)
+            by_buyin.setdefault(buyin_scope_key(t.buyin), QuantileSketch()).add(value)
+        self.sketch_repo.replace_metric(
+            FT_STACK_SKETCH_METRIC,
+            {SKETCH_SCOPE_SESSION: by_session, SKETCH_SCOPE_BUYIN: by_buyin},
+        )
+        self.meta_repo.set_value(DB_META_STAT_SKETCHES, STAT_SKETCHES_VERSION)
+
+    def _update_stat_sketches(
+        self,
+        added_tournaments: List[Tournament],
+        removed_tournaments: List[Tournament],
+    ) -> None:
+        """
+        Применяет дельту турниров к скетчам затронутых сессий и бай-инов.
+        Если скетчи ещё не построены (старая БД), строит их по всем турнирам.
+        """
+        if self.meta_repo.get_value(DB_META_STAT_SKETCHES) != STAT_SKETCHES_VERSION:
+            self._rebuild_stat_sketches(self.tournament_repo.get_all_tournaments())
+            return
+
+        deltas = [(t, -1) for t in removed_tournaments] + [(t, 1) for t in added_tournaments]
+        deltas = [(t, self._ft_stack_sketch_value(t), sign) for t, sign in deltas]
+        deltas = [(t, value, sign) for t, value, sign in deltas if value is not None]
+        if not deltas:
+            return
+
+        for scope, key_of in (
+            (SKETCH_SCOPE_SESSION, lambda t: t.session_id or ""),
+            (SKETCH_SCOPE_BUYIN, lambda t: buyin_scope_key(t.buyin)),
+        ):
+            sketches = self.sketch_repo.get_sketches(
+                FT_STACK_SKETCH_METRIC, scope, {key_of(t) for t, _, _ in deltas}
+            )
+            for t, value, sign in deltas:
+                sketches.setdefault(key_of(t), QuantileSketch()).add(value, sign)
+            self.sketch_repo.save_sketches(FT_STACK_SKETCH_METRIC, scope, sketches)
+
+    def get_ft_stack_sketch(
+        self,
+        session_ids: Optional[List[str]] = None,
+        buyins: Optional[List[Optional[float]]] = None,
+    ) -> Optional[QuantileSketch]:
+        """
+        Скетч стеков выхода на FT для объединения сессий или бай-инов
+        (без фильтров - по всем турнирам), собранный слиянием хранимых
+        скетчей. None, если скетчи не построены или фильтр задан и по
+        сессиям, и по бай-инам (такое пересечение скетчами не покрыто).
+        """
+        if session_ids is not None and buyins is not None:
+            return None
+        if self.meta_repo.get_value(DB_META_STAT_SKETCHES) != STAT_SKETCHES_VERSION:
+            return None
+        if session_ids is not None:
+            sketches = self.sketch_repo.get_sketches(FT_STACK_SKETCH_METRIC, SKETCH_SCOPE_SESSION, session_ids)
+        else:
+            keys = [buyin_scope_key(b) for b in buyins] if buyins is not None else None
+            sketches = self.sketch_repo.get_sketches(FT_STACK_SKETCH_METRIC, SKETCH_SCOPE_BUYIN, keys)
+        return merge_sketches(sketches.values()) or QuantileSketch()
+
     def _compute_db_checksum(self, path: str) -> str:
         """Возвращает MD5-хеш файла БД."""
         try:
@@ -680,17 +854,23 @@ class StatisticsService:
         added_tournaments: List[Tournament],
         added_hands: List[FinalTableHand],
         removed_tournaments: Optional[List[Tournament]] = None,
-        removed_hands: Optional[List[FinalTableHand]] = None
+        removed_hands: Optional[Union[List[FinalTableHand], FinalTableHandTotals]] = None
     ) -> OverallStats:
         """
         Инкрементально обновляет общую статистику.
+
+        Работает за O(размер дельты): средние пересчитываются из накопительных
+        сумм OverallStats, полные списки турниров из БД не загружаются.
+        Изменённый турнир передаётся как удаление старой версии и добавление новой.
+        Если сохранённая статистика не содержит накопительных сумм (старая БД),
+        выполняется однократный полный пересчёт.
         
         Args:
             db_path: Путь к БД
             added_tournaments: Добавленные турниры
             added_hands: Добавленные руки финального стола
             removed_tournaments: Удаленные турниры (опционально)
-            removed_hands: Удаленные руки (опционально)
+            removed_hands: Удаленные руки или их суммы (опционально)
             
         Returns:
             Обновленный объект OverallStats
@@ -699,125 +879,155 @@ class StatisticsService:
         current_stats = self._overall_stats_cache.get(db_path)
         if current_stats is None:
             current_stats = self.overall_stats_repo.get_overall_stats()
-            if current_stats is None:
-                current_stats = OverallStats()
-        
+
+        if current_stats is None or current_stats.aggregates_version != OVERALL_STATS_AGGREGATES_VERSION:
+            logger.info("Накопительные суммы overall_stats отсутствуют, выполняется полный пересчет")
+            return self._calculate_overall_stats()
+
+        # Работаем с копией, чтобы ошибка на середине не испортила кеш
+        stats = OverallStats.from_dict(current_stats.as_dict())
+
         removed_tournaments = removed_tournaments or []
         removed_hands = removed_hands or []
-        
-        # Обновляем счетчики турниров
-        delta_tournaments = len(added_tournaments) - len(removed_tournaments)
-        current_stats.total_tournaments += delta_tournaments
-        
-        # Обновляем счетчики финальных столов
-        added_ft = [t for t in added_tournaments if t.reached_final_table]
-        removed_ft = [t for t in removed_tournaments if t.reached_final_table]
-        delta_ft = len(added_ft) - len(removed_ft)
-        current_stats.total_final_tables += delta_ft
-        
-        # Обновляем суммы байинов и выплат
-        added_buyin = sum(t.buyin for t in added_tournaments if t.buyin is not None)
-        removed_buyin = sum(t.buyin for t in removed_tournaments if t.buyin is not None)
-        current_stats.total_buy_in += added_buyin - removed_buyin
-        
-        added_prize = sum(t.payout if t.payout is not None else 0 for t in added_tournaments)
-        removed_prize = sum(t.payout if t.payout is not None else 0 for t in removed_tournaments)
-        current_stats.total_prize += added_prize - removed_prize
-        
-        # Обновляем количество нокаутов
-        added_ko = sum(hand.hero_ko_this_hand for hand in added_hands)
-        removed_ko = sum(hand.hero_ko_this_hand for hand in removed_hands)
-        current_stats.total_knockouts += added_ko - removed_ko
-        
-        # Обновляем KO в ранней стадии финалки
-        added_early_ko = sum(hand.hero_ko_this_hand for hand in added_hands if hand.is_early_final)
-        removed_early_ko = sum(hand.hero_ko_this_hand for hand in removed_hands if hand.is_early_final)
-        current_stats.early_ft_ko_count += added_early_ko - removed_early_ko
-        
-        # Обновляем Pre-FT KO
-        added_pre_ft_ko = sum(hand.pre_ft_ko for hand in added_hands)
-        removed_pre_ft_ko = sum(hand.pre_ft_ko for hand in removed_hands)
-        current_stats.pre_ft_ko_count += added_pre_ft_ko - removed_pre_ft_ko
-        
-        # Пересчитываем средние значения на основе обновленных счетчиков
-        if current_stats.total_tournaments > 0:
-            # Для среднего места нужны все турниры - инкрементальный подход сложен
-            # Поэтому загружаем только места для расчета
-            all_places = self.tournament_repo.get_all_finish_places()
-            current_stats.avg_finish_place = sum(all_places) / len(all_places) if all_places else 0.0
-            
-            # Avg KO per tournament
-            current_stats.avg_ko_per_tournament = current_stats.total_knockouts / current_stats.total_tournaments
-            
-            # % Reach FT
-            current_stats.final_table_reach_percent = (current_stats.total_final_tables / current_stats.total_tournaments * 100)
-        
-        if current_stats.total_final_tables > 0:
-            # Среднее место на финалке
-            ft_places = self.tournament_repo.get_final_table_finish_places()
-            current_stats.avg_finish_place_ft = sum(ft_places) / len(ft_places) if ft_places else 0.0
-            
-            # Avg early FT KO per tournament
-            current_stats.early_ft_ko_per_tournament = current_stats.early_ft_ko_count / current_stats.total_final_tables
-            
-            # Early FT bust
-            early_bust_count = len([t for t in added_ft if t.finish_place is not None and 6 <= t.finish_place <= 9])
-            early_bust_count -= len([t for t in removed_ft if t.finish_place is not None and 6 <= t.finish_place <= 9])
-            current_stats.early_ft_bust_count += early_bust_count
-            current_stats.early_ft_bust_per_tournament = current_stats.early_ft_bust_count / current_stats.total_final_tables
-        
-        # Обновляем стеки финального стола (требует полного пересчета средних)
-        ft_stacks_chips = [t.final_table_initial_stack_chips for t in added_ft if t.final_table_initial_stack_chips is not None]
-        ft_stacks_bb = [t.final_table_initial_stack_bb for t in added_ft if t.final_table_initial_stack_bb is not None]
-        
-        if ft_stacks_chips or ft_stacks_bb:
-            # Для точного среднего нужно пересчитать полностью
-            all_ft_stacks = self.tournament_repo.get_final_table_initial_stacks()
-            if all_ft_stacks['chips']:
-                current_stats.avg_ft_initial_stack_chips = sum(all_ft_stacks['chips']) / len(all_ft_stacks['chips'])
-            if all_ft_stacks['bb']:
-                current_stats.avg_ft_initial_stack_bb = sum(all_ft_stacks['bb']) / len(all_ft_stacks['bb'])
-
-        # Пересчитываем средний ChipEV до финалки
-        all_ft_stacks = self.tournament_repo.get_final_table_initial_stacks()
-        ft_stack_sum = sum(all_ft_stacks['chips']) if all_ft_stacks['chips'] else 0.0
-        not_ft_count = current_stats.total_tournaments - current_stats.total_final_tables
-        if current_stats.total_tournaments > 0:
-            current_stats.pre_ft_chipev = (ft_stack_sum - not_ft_count * 1000) / current_stats.total_tournaments
-        else:
-            current_stats.pre_ft_chipev = 0.0
-        
-        # Обновляем статистику Big KO через плагин
-        all_tournaments = list(added_tournaments)  # Только новые для инкрементального расчета
-        precomputed = {
-            'total_tournaments': current_stats.total_tournaments,
-            'total_buy_in': current_stats.total_buy_in,
-            'total_prize': current_stats.total_prize,
-        }
-        
+
+        for tournament in removed_tournaments:
+            self._apply_tournament_delta(stats, tournament, -1)
+        for tournament in added_tournaments:
+            self._apply_tournament_delta(stats, tournament, 1)
+
+        self._apply_hands_delta(stats, removed_hands, -1)
+        self._apply_hands_delta(stats, added_hands, 1)
+
+        # Big KO раскладывается по каждому турниру отдельно, поэтому аддитивен
         big_ko_plugin = next((p for p in self.stat_plugins if p.name == "Big KO"), None)
         if big_ko_plugin:
-            big_ko_delta = big_ko_plugin.compute(all_tournaments, [], precomputed_stats=precomputed)
-            # Добавляем дельту к текущим значениям
-            current_stats.big_ko_x1_5 += big_ko_delta.get("x1.5", 0)
-            current_stats.big_ko_x2 += big_ko_delta.get("x2", 0)
-            current_stats.big_ko_x10 += big_ko_delta.get("x10", 0)
-            current_stats.big_ko_x100 += big_ko_delta.get("x100", 0)
-            current_stats.big_ko_x1000 += big_ko_delta.get("x1000", 0)
-            current_stats.big_ko_x10000 += big_ko_delta.get("x10000", 0)
-        
-        # Округляем значения
-        current_stats.avg_finish_place = round(current_stats.avg_finish_place, 2)
-        current_stats.avg_finish_place_ft = round(current_stats.avg_finish_place_ft, 2)
-        current_stats.avg_ko_per_tournament = round(current_stats.avg_ko_per_tournament, 2)
-        current_stats.avg_ft_initial_stack_chips = round(current_stats.avg_ft_initial_stack_chips, 2)
-        current_stats.avg_ft_initial_stack_bb = round(current_stats.avg_ft_initial_stack_bb, 2)
-        current_stats.early_ft_ko_per_tournament = round(current_stats.early_ft_ko_per_tournament, 2)
-        current_stats.early_ft_bust_per_tournament = round(current_stats.early_ft_bust_per_tournament, 2)
-        current_stats.final_table_reach_percent = round(current_stats.final_table_reach_percent, 2)
-        current_stats.pre_ft_chipev = round(current_stats.pre_ft_chipev, 2)
-
-        return current_stats
+            added_big_ko = big_ko_plugin.compute(added_tournaments, []) if added_tournaments else {}
+            removed_big_ko = big_ko_plugin.compute(removed_tournaments, []) if removed_tournaments else {}
+            for key, field_name in BIG_KO_FIELDS.items():
+                delta = added_big_ko.get(key, 0) - removed_big_ko.get(key, 0)
+                setattr(stats, field_name, getattr(stats, field_name) + delta)
+
+        self._finalize_overall_stats(stats)
+        return stats
+
+    @staticmethod
+    def _apply_tournament_delta(stats: OverallStats, tournament: Tournament, sign: int) -> None:
+        """
+        Добавляет (sign=1) или вычитает (sign=-1) вклад турнира в накопительные
+        суммы и счётчики. Условия отбора совпадают с _calculate_overall_stats.
+        """
+        t = tournament
+        stats.all_tournaments_count += sign
+
+        if t.reached_final_table and t.final_table_initial_stack_chips is not None:
+            stats.chipev_stack_sum += sign * t.final_table_initial_stack_chips
+
+        is_final_table = bool(t.has_hh and t.reached_final_table)
+        if is_final_table:
+            stats.total_final_tables += sign
+            if t.final_table_initial_stack_chips is not None:
+                stats.ft_stack_chips_sum += sign * t.final_table_initial_stack_chips
+                stats.ft_stack_chips_count += sign
+            if t.final_table_initial_stack_bb is not None:
+                stats.ft_stack_bb_sum += sign * t.final_table_initial_stack_bb
+                stats.ft_stack_bb_count += sign
+
+        if not t.has_ts:
+            return
+
+        stats.total_tournaments += sign
+        if t.buyin is not None:
+            stats.total_buy_in += sign * t.buyin
+        if t.payout is not None:
+            stats.total_prize += sign * t.payout
+
+        place = t.finish_place
+        if place is None:
+            return
+
+        stats.finish_place_sum += sign * place
+        stats.finish_place_count += sign
+
+        if not t.reached_final_table:
+            stats.no_ft_finish_place_sum += sign * place
+            stats.no_ft_finish_place_count += sign
+        elif is_final_table and 1 <= place <= 9:
+            stats.ft_finish_place_sum += sign * place
+            stats.ft_finish_place_count += sign
+            if place >= 6:
+                stats.early_ft_bust_count += sign
+
+    @staticmethod
+    def _hand_totals(hands: List[FinalTableHand]) -> FinalTableHandTotals:
+        """
+        Суммирует вклад рук финального стола.
+        Руки одного турнира приходят вместе (один файл HH), поэтому
+        неполный старт финалки определяется по первой 9-max руке из списка.
+        """
+        totals = FinalTableHandTotals(hands=len(hands))
+        first_ft_hands: Dict[str, FinalTableHand] = {}
+        for hand in hands:
+            totals.knockouts += hand.hero_ko_this_hand
+            totals.pre_ft_ko += hand.pre_ft_ko
+            if hand.is_early_final:
+                totals.early_ft_knockouts += hand.hero_ko_this_hand
+            if hand.table_size == FINAL_TABLE_SIZE:
+                saved = first_ft_hands.get(hand.tournament_id)
+                if saved is None or hand.hand_number < saved.hand_number:
+                    first_ft_hands[hand.tournament_id] = hand
+
+        totals.incomplete_ft_count = sum(
+            1 for h in first_ft_hands.values() if h.players_count < FINAL_TABLE_SIZE
+        )
+        return totals
+
+    @staticmethod
+    def _apply_hands_delta(
+        stats: OverallStats,
+        hands: Union[List[FinalTableHand], FinalTableHandTotals],
+        sign: int,
+    ) -> None:
+        """
+        Добавляет или вычитает вклад рук финального стола: списка рук
+        или их сумм, посчитанных в SQL (FinalTableHandRepository.get_hand_totals).
+        """
+        if not isinstance(hands, FinalTableHandTotals):
+            hands = StatisticsService._hand_totals(hands)
+        stats.total_knockouts += sign * hands.knockouts
+        stats.pre_ft_ko_count += sign * hands.pre_ft_ko
+        stats.early_ft_ko_count += sign * hands.early_ft_knockouts
+        stats.incomplete_ft_count += sign * hands.incomplete_ft_count
+
+    def _finalize_overall_stats(self, stats: OverallStats) -> None:
+        """Пересчитывает средние и проценты из накопительных сумм."""
+
+        def _avg(total: float, count: int) -> float:
+            return round(total / count, 2) if count > 0 else 0.0
+
+        total = stats.total_tournaments
+        final_tables = stats.total_final_tables
+
+        stats.avg_finish_place = _avg(stats.finish_place_sum, stats.finish_place_count)
+        stats.avg_finish_place_ft = _avg(stats.ft_finish_place_sum, stats.ft_finish_place_count)
+        stats.avg_finish_place_no_ft = _avg(stats.no_ft_finish_place_sum, stats.no_ft_finish_place_count)
+        stats.avg_ft_initial_stack_chips = _avg(stats.ft_stack_chips_sum, stats.ft_stack_chips_count)
+        stats.avg_ft_initial_stack_bb = _avg(stats.ft_stack_bb_sum, stats.ft_stack_bb_count)
+        stats.avg_ko_per_tournament = _avg(stats.total_knockouts, total)
+        stats.final_table_reach_percent = (
+            round(final_tables / total * 100, 2) if total > 0 else 0.0
+        )
+        stats.early_ft_ko_per_tournament = _avg(stats.early_ft_ko_count, final_tables)
+        stats.early_ft_bust_per_tournament = _avg(stats.early_ft_bust_count, final_tables)
+        stats.pre_ft_ko_count = round(stats.pre_ft_ko_count, 2)
+
+        if any(p.name == "Pre-FT ChipEV" for p in self.stat_plugins):
+            # Та же формула, что в плагине: сумма стеков FT / все турниры - 1000
+            if stats.all_tournaments_count > 0:
+                stats.pre_ft_chipev = round(
+                    stats.chipev_stack_sum / stats.all_tournaments_count - 1000, 2
+                )
+            else:
+                stats.pre_ft_chipev = 0.0
     
     def update_statistics_incremental(
         self,
@@ -826,7 +1036,7 @@ class StatisticsService:
         added_tournaments: Optional[List[Tournament]] = None,
         added_hands: Optional[List[FinalTableHand]] = None,
         removed_tournaments: Optional[List[Tournament]] = None,
-        removed_hands: Optional[List[FinalTableHand]] = None,
+        removed_hands: Optional[Union[List[FinalTableHand], FinalTableHandTotals]] = None,
         affected_tournament_ids: Optional[List[str]] = None,
         progress_callback: Optional[Callable[[int, int, str], None]] = None
     ):
@@ -839,7 +1049,7 @@ class StatisticsService:
             added_tournaments: Добавленные турниры
             added_hands: Добавленные руки
             removed_tournaments: Удаленные турниры
-            removed_hands: Удаленные руки
+            removed_hands: Удаленные руки или их суммы (FinalTableHandTotals)
             affected_tournament_ids: ID турниров, требующих обновления KO count
             progress_callback: Callback для отслеживания прогресса
         """
@@ -873,7 +1083,9 @@ class StatisticsService:
             if progress_callback:
                 progress_callback(current_step, total_steps, "Обновление распределения мест...")
                 
-            current_distribution = self._place_distribution_cache.get(db_path, {i: 0 for i in range(1, 10)})
+            current_distribution = dict(
+                self._place_distribution_cache.get(db_path) or self.place_dist_repo.get_distribution()
+            )
             
             # Добавляем места новых турниров
             for t in added_tournaments:
@@ -902,19 +1114,9 @@ class StatisticsService:
                 # Эффективно получаем KO counts для всех затронутых турниров одним запросом
                 ko_counts = self.ft_hand_repo.get_ko_counts_for_tournaments(list(all_affected_ids))
                 
-                # Обновляем только те турниры, для которых есть данные
-                for tournament_id, ko_count in ko_counts.items():
-                    tournament = self.tournament_repo.get_tournament_by_id(tournament_id)
-                    if tournament:
-                        tournament.ko_count = ko_count
-                        self.tournament_repo.add_or_update_tournament(tournament)
-                
-                # Обновляем турниры без KO (новые турниры без рук финального стола)
-                for tournament_id in all_affected_ids - set(ko_counts.keys()):
-                    tournament = self.tournament_repo.get_tournament_by_id(tournament_id)
-                    if tournament:
-                        tournament.ko_count = 0
-                        self.tournament_repo.add_or_update_tournament(tournament)
+                # Записываем все значения одной транзакцией; турниры без рук
+                # финального стола получают 0
+                self.tournament_repo.set_ko_counts(ko_counts, reset_ids=all_affected_ids)
                     
             current_step += 1
             
@@ -932,6 +1134,8 @@ class StatisticsService:
             for sess_id in affected_sessions:
                 if sess_id:
                     self._calculate_and_update_session_stats(sess_id)
+
+            self._update_stat_sketches(added_tournaments, removed_tournaments)
                     
             current_step += 1
             
@@ -943,6 +1147,7 @@ class StatisticsService:
                 "place_distribution": current_distribution,
             }
             self._save_persistent_cache()
+            self.refresh_database_summary(db_path, updated_stats)
             
             if progress_callback:
                 progress_callback(total_steps, total_steps, "Статистика обновлена")
@@ -961,7 +1166,10 @@ class StatisticsService:
                     added_hands=len(added_hands)
                 ))
                 
-            logger.info(f"Инкрементальное обновление завершено: +{len(added_tournaments)} турниров, +{len(added_hands)} рук")
+            logger.info(
+                f"Инкрементальное обновление завершено: +{len(added_tournaments)} турниров, "
+                f"+{len(added_hands)} рук, -{len(removed_tournaments)} турниров"
+            )
             
         except Exception as e:
             logger.error(f"Ошибка при инкрементальном обновлении статистики: {e}")
@@ -2,69 +2,107 @@
 
 """
 Пакет стат-плагинов Royal Stats.
-Автоматически импортирует все плагины, унаследованные от BaseStat.
+
+Плагины, унаследованные от BaseStat, находятся по индексу метаданных
+(см. registry.py) без импорта их модулей. Класс плагина загружается
+при первом обращении, например `from stats import BigKOStat`, а
+экземпляры из create_stat_plugins() импортируют модуль при первом
+расчёте.
 """
 
-import pkgutil
-import importlib
 import os
 import logging
-from typing import List, Type
-
-from plugins import discover_plugins as _discover_external_plugins
+from typing import Dict, List, Optional, Type
 
 from .base import BaseStat
-# Импортируем базовый класс явно
+from .registry import LazyStat, StatPluginInfo, load_plugin_class, load_plugin_index
 
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG)  # Уровень логирования для инициализации плагинов
 
-# Автоматический импорт всех модулей в папке stats, кроме base и __init__
-__all__ = []
-# Указываем путь к текущему пакету для iter_modules
+# Указываем путь к текущему пакету для поиска модулей плагинов
 package_dir = os.path.dirname(__file__)
 if package_dir == '': # Handle case where __file__ might not be a full path
     package_dir = '.'
 
+_PLUGIN_INDEX: List[StatPluginInfo] = load_plugin_index(package_dir, __name__)
+_PLUGINS_BY_CLASS: Dict[str, StatPluginInfo] = {info.class_name: info for info in _PLUGIN_INDEX}
 
-for loader, module_name, is_pkg in pkgutil.iter_modules([package_dir]):
-    if module_name not in ("base", "__init__"):
-        try:
-            # Импортируем модуль
-            full_module_name = f".{module_name}"
-            mod = importlib.import_module(full_module_name, package=__name__)
-
-            # Ищем в модуле классы, которые являются подклассами BaseStat (кроме самого BaseStat)
-            for attr_name in dir(mod):
-                attr = getattr(mod, attr_name)
-                if isinstance(attr, type) and issubclass(attr, BaseStat) and attr is not BaseStat:
-                    # Добавляем имя класса в __all__
-                    __all__.append(attr_name)
-                    # Можно также сохранить ссылку на класс в глобальном пространстве пакета,
-                    # чтобы их можно было импортировать напрямую, например, from stats import BigKOStat
-                    globals()[attr_name] = attr
+__all__ = [info.class_name for info in _PLUGIN_INDEX]
 
-        except Exception as e:
-            # Логируем ошибку импорта плагина, но не прерываем работу
-            logger.error(f"Ошибка при импорте стат-плагина '{module_name}': {e}")
 
+def __getattr__(attr_name: str):
+    """Импортирует модуль плагина при первом обращении к его классу."""
+    info = _PLUGINS_BY_CLASS.get(attr_name)
+    if info is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {attr_name!r}")
+    plugin_cls = load_plugin_class(info)
+    # Дальнейшие обращения идут мимо __getattr__
+    globals()[attr_name] = plugin_cls
+    return plugin_cls
 
-def discover_plugins(entry_point_group: str = "royal_stats") -> List[Type[BaseStat]]:
-    """Возвращает все классы стат-плагинов из пакета и entry points."""
-    plugins: List[Type[BaseStat]] = []
 
-    # Сначала добавляем плагины из пакета stats
-    for name in __all__:
-        attr = globals().get(name)
-        if isinstance(attr, type) and issubclass(attr, BaseStat) and attr is not BaseStat:
-            plugins.append(attr)
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
 
-    # Затем пробуем загрузить плагины через plugin_manager
+
+def get_plugin_index() -> List[StatPluginInfo]:
+    """Метаданные встроенных стат-плагинов без импорта их модулей."""
+    return list(_PLUGIN_INDEX)
+
+
+def _external_plugin_classes(entry_point_group: str) -> List[Type[BaseStat]]:
+    """Классы стат-плагинов, зарегистрированные через entry points."""
+    from plugins import discover_plugins as _discover_external_plugins
+
+    plugins: List[Type[BaseStat]] = []
     discovered = _discover_external_plugins(entry_point_group)
     for plugin_cls in discovered.get("stats", []):
         if isinstance(plugin_cls, type) and issubclass(plugin_cls, BaseStat):
             plugins.append(plugin_cls)
+    return plugins
+
+
+def discover_plugins(entry_point_group: str = "royal_stats") -> List[Type[BaseStat]]:
+    """
+    Возвращает все классы стат-плагинов из пакета и entry points.
+    Импортирует модули всех плагинов; для отложенной загрузки
+    используйте create_stat_plugins().
+    """
+    plugins: List[Type[BaseStat]] = []
+
+    # Сначала добавляем плагины из пакета stats
+    for info in _PLUGIN_INDEX:
+        try:
+            plugins.append(__getattr__(info.class_name))
+        except Exception as e:
+            # Логируем ошибку импорта плагина, но не прерываем работу
+            logger.error(f"Ошибка при импорте стат-плагина '{info.module}': {e}")
 
+    # Затем пробуем загрузить плагины через plugin_manager
+    plugins.extend(_external_plugin_classes(entry_point_group))
     return plugins
 
 
+def create_stat_plugins(entry_point_group: Optional[str] = "royal_stats") -> List[BaseStat]:
+    """
+    Возвращает экземпляры всех стат-плагинов. Встроенные плагины
+    представлены LazyStat и импортируются при первом расчёте.
+
+    Args:
+        entry_point_group: Группа entry points внешних плагинов
+            (None - только встроенные плагины)
+    """
+    plugins: List[BaseStat] = []
+    for info in _PLUGIN_INDEX:
+        try:
+            plugins.append(LazyStat(info))
+        except Exception as e:  # pragma: no cover - защитная логика
+            logger.error(f"Ошибка при загрузке стат-плагина '{info.module}': {e}")
+
+    if entry_point_group:
+        for plugin_cls in _external_plugin_classes(entry_point_group):
+            try:
+                plugins.append(plugin_cls())
+            except Exception as e:  # pragma: no cover - защитная логика
+                logger.error(f"Не удалось инициализировать плагин {plugin_cls}: {e}")
+    return plugins
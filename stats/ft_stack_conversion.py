@@ -81,8 +81,12 @@ class FTStackConversionStat(BaseStat):
         if not ft_data:
             return {"ft_stack_conversion": 0.0}
 
-        # Рассчитываем медианный стек в фишках
-        median_stack_chips = median([d['stack_chips'] for d in ft_data])
+        # Медианный стек в фишках: из скетча сессий/бай-инов, если он
+        # передан, иначе по списку турниров
+        precomputed_stats = kwargs.get('precomputed_stats') or {}
+        median_stack_chips = precomputed_stats.get('ft_stack_median_chips')
+        if median_stack_chips is None:
+            median_stack_chips = median([d['stack_chips'] for d in ft_data])
         
         # Общее количество фишек на финальном столе всегда равно 18000
         total_chips_at_ft = 18000
@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+
+"""
+Реестр стат-плагинов пакета stats без их импорта.
+
+Метаданные плагинов (класс, модуль, name, description) извлекаются
+разбором исходников через ast и кешируются в JSON-индексе рядом с
+байткодом пакета. Модуль плагина импортируется только тогда, когда
+стат впервые считается или его класс запрашивается явно.
+"""
+
+import os
+import ast
+import json
+import logging
+import importlib
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, List, Optional, Type
+
+from .base import BaseStat
+
+logger = logging.getLogger('ROYAL_Stats.StatRegistry')
+
+# Версия формата индекса: при изменении разбора старый индекс игнорируется
+INDEX_FORMAT_VERSION = 1
+INDEX_FILE_NAME = "stat_plugin_index.json"
+
+# Модули пакета, не содержащие плагинов
+_SKIP_MODULES = {"__init__", "base", "registry"}
+
+
+@dataclass
+class StatPluginInfo:
+    """Метаданные стат-плагина из индекса."""
+
+    class_name: str
+    module: str
+    name: Optional[str] = None
+    description: Optional[str] = None
+
+
+def _literal_attribute(node: ast.stmt, attr_name: str) -> Optional[str]:
+    """Строковое значение присваивания `attr_name = "..."` в теле класса."""
+    if isinstance(node, ast.Assign):
+        targets = node.targets
+    elif isinstance(node, ast.AnnAssign) and node.value is not None:
+        targets = [node.target]
+    else:
+        return None
+    if not any(isinstance(t, ast.Name) and t.id == attr_name for t in targets):
+        return None
+    try:
+        value = ast.literal_eval(node.value)
+    except (ValueError, SyntaxError):
+        return None
+    return value if isinstance(value, str) else None
+
+
+def scan_module(path: str, module: str) -> List[StatPluginInfo]:
+    """
+    Находит в исходнике классы-наследники BaseStat (прямые или через
+    другой класс того же модуля) и их литеральные name/description.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=path)
+
+    stat_classes = {"BaseStat"}
+    plugins: List[StatPluginInfo] = []
+    for node in tree.body:
+        if not isinstance(node, ast.ClassDef):
+            continue
+        bases = {b.id if isinstance(b, ast.Name) else getattr(b, "attr", None) for b in node.bases}
+        if not bases & stat_classes:
+            continue
+        stat_classes.add(node.name)
+        info = StatPluginInfo(class_name=node.name, module=module)
+        for stmt in node.body:
+            name = _literal_attribute(stmt, "name")
+            if name is not None:
+                info.name = name
+            description = _literal_attribute(stmt, "description")
+            if description is not None:
+                info.description = description
+        plugins.append(info)
+    return plugins
+
+
+def _index_path(package_dir: str) -> str:
+    return os.path.join(package_dir, "__pycache__", INDEX_FILE_NAME)
+
+
+def _read_index(path: str) -> Dict[str, Any]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") == INDEX_FORMAT_VERSION:
+            return data.get("modules", {})
+    except (OSError, ValueError):
+        pass
+    return {}
+
+
+def _write_index(path: str, modules: Dict[str, Any]) -> None:
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": INDEX_FORMAT_VERSION, "modules": modules}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        # Пакет может лежать в каталоге только для чтения - индекс тогда живёт в памяти
+        logger.debug(f"Не удалось сохранить индекс стат-плагинов: {e}")
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+
+def load_plugin_index(package_dir: str, package: str) -> List[StatPluginInfo]:
+    """
+    Возвращает метаданные плагинов пакета в порядке имён модулей.
+    Модули, чьи (mtime, размер) совпадают с закешированными, повторно
+    не разбираются; индекс переписывается только при изменениях.
+    """
+    path = _index_path(package_dir)
+    cached = _read_index(path)
+    modules: Dict[str, Any] = {}
+    changed = False
+
+    for file_name in sorted(os.listdir(package_dir)):
+        module_name, ext = os.path.splitext(file_name)
+        if ext != ".py" or module_name in _SKIP_MODULES:
+            continue
+        file_path = os.path.join(package_dir, file_name)
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            continue
+        key = [st.st_mtime_ns, st.st_size]
+        entry = cached.get(module_name)
+        if entry is None or entry.get("key") != key:
+            try:
+                plugins = scan_module(file_path, f"{package}.{module_name}")
+            except (OSError, SyntaxError, UnicodeDecodeError) as e:
+                logger.error(f"Ошибка разбора стат-плагина '{module_name}': {e}")
+                plugins = []
+            entry = {"key": key, "plugins": [asdict(p) for p in plugins]}
+            changed = True
+        modules[module_name] = entry
+
+    if changed or modules.keys() != cached.keys():
+        _write_index(path, modules)
+
+    return [
+        StatPluginInfo(**plugin)
+        for entry in modules.values()
+        for plugin in entry["plugins"]
+    ]
+
+
+def load_plugin_class(info: StatPluginInfo) -> Type[BaseStat]:
+    """Импортирует модуль плагина и возвращает его класс."""
+    module = importlib.import_module(info.module)
+    return getattr(module, info.class_name)
+
+
+class LazyStat(BaseStat):
+    """
+    Заместитель стат-плагина: name и description берутся из индекса,
+    а модуль плагина импортируется при первом обращении к compute
+    или к другим атрибутам настоящего плагина.
+    """
+
+    def __init__(self, info: StatPluginInfo):
+        self.info = info
+        self._plugin: Optional[BaseStat] = None
+
+    @property
+    def name(self) -> str:
+        # name задан не литералом - узнать его можно только из самого плагина
+        return self.info.name if self.info.name is not None else self.plugin.name
+
+    @property
+    def description(self) -> str:
+        # Описание может вычисляться (например, из app_config) при каждом обращении
+        return self.info.description if self.info.description is not None else self.plugin.description
+
+    @property
+    def plugin(self) -> BaseStat:
+        """Экземпляр настоящего плагина (создаётся при первом обращении)."""
+        if self._plugin is None:
+            self._plugin = load_plugin_class(self.info)()
+        return self._plugin
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._plugin is not None
+
+    def __getattr__(self, attr: str) -> Any:
+        # Вызывается только для атрибутов, которых нет у заместителя
+        if attr.startswith("_") or attr in ("info", "plugin"):
+            raise AttributeError(attr)
+        return getattr(self.plugin, attr)
+
+    def compute(self, *args: Any, **kwargs: Any) -> Dict[str, Any]:
+        return self.plugin.compute(*args, **kwargs)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.is_loaded else "lazy"
+        return f"<LazyStat {self.info.module}.{self.info.class_name} ({state})>"
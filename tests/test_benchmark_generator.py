@@ -0,0 +1,49 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from benchmarks.generator import GeneratorConfig, generate_tournaments, write_dataset
+from parsers.file_classifier import FileClassifier
+from parsers.hand_history import HandHistoryParser
+from parsers.tournament_summary import TournamentSummaryParser
+
+
+class TestBenchmarkGenerator(unittest.TestCase):
+    def test_same_seed_gives_identical_files(self):
+        config = GeneratorConfig(tournaments=5, seed=11)
+        first = [(t.hh_text, t.ts_text) for t in generate_tournaments(config)]
+        second = [(t.hh_text, t.ts_text) for t in generate_tournaments(config)]
+        self.assertEqual(first, second)
+        other = [(t.hh_text, t.ts_text) for t in generate_tournaments(GeneratorConfig(tournaments=5, seed=12))]
+        self.assertNotEqual(first, other)
+
+    def test_parsers_read_generated_tournaments(self):
+        config = GeneratorConfig(tournaments=20, ft_reach_rate=0.5, side_pot_rate=0.5, split_pot_rate=0.3)
+        tournaments = generate_tournaments(config)
+        self.assertTrue(any(t.reached_final_table for t in tournaments))
+        for t in tournaments:
+            hh = HandHistoryParser("Hero").parse(t.hh_text, "hh.txt")
+            ts = TournamentSummaryParser("Hero").parse(t.ts_text, "ts.txt")
+            self.assertEqual(hh.tournament_id, t.tournament_id)
+            self.assertEqual(hh.reached_final_table, t.reached_final_table)
+            self.assertEqual(ts.finish_place, t.finish_place)
+            self.assertEqual(ts.buyin, t.buyin)
+        texts = "\n".join(t.hh_text for t in tournaments)
+        self.assertIn("and is all-in", texts)
+        self.assertIn("Uncalled bet", texts)
+
+    def test_written_files_are_classified(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            dataset = write_dataset(tmp_dir, GeneratorConfig(tournaments=3))
+            self.assertEqual(len(dataset["hh_files"]), 3)
+            for path in dataset["hh_files"]:
+                self.assertEqual(FileClassifier.determine_file_type(path)[0], "hh")
+            for path in dataset["ts_files"]:
+                self.assertEqual(FileClassifier.determine_file_type(path)[0], "ts")
+
+
+if __name__ == "__main__":
+    unittest.main()
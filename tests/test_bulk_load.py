@@ -0,0 +1,70 @@
+import os
+import sys
+import sqlite3
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from services import app_config  # noqa: F401  (services до db, как в приложении)
+from db import bulk_load, migrations
+import db.schema
+
+
+class TestBulkLoad(unittest.TestCase):
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        self.addCleanup(self.conn.close)
+        migrations.migrate(self.conn)
+
+    def _indexes(self):
+        return {row[0] for row in self.conn.execute(
+            "SELECT name FROM sqlite_master WHERE type='index' AND name NOT LIKE 'sqlite_autoindex%'"
+        )}
+
+    def _marker(self):
+        return self.conn.execute(
+            "SELECT value FROM db_meta WHERE key = ?", (db.schema.DB_META_DEFERRED_INDEXES,)
+        ).fetchone()
+
+    def test_heuristic(self):
+        self.assertTrue(bulk_load.should_defer_indexes(0, 6000, 5000))
+        self.assertFalse(bulk_load.should_defer_indexes(0, 100, 5000))
+        self.assertFalse(bulk_load.should_defer_indexes(50000, 6000, 5000))
+        self.assertFalse(bulk_load.should_defer_indexes(0, 6000, 0))
+
+    def test_indexes_are_rebuilt_and_analyzed(self):
+        all_indexes = self._indexes()
+        with bulk_load.deferred_indexes(self.conn):
+            self.assertFalse(self._indexes() & set(bulk_load.deferrable_indexes()))
+            self.conn.executemany(
+                "INSERT INTO tournaments (tournament_id, start_time) VALUES (?, ?)",
+                [(f"T{i}", f"2024/01/{i % 28 + 1:02d} 12:00:00") for i in range(100)],
+            )
+        self.assertEqual(self._indexes(), all_indexes)
+        self.assertIsNone(self._marker())
+        analyzed = {row[0] for row in self.conn.execute("SELECT tbl FROM sqlite_stat1")}
+        self.assertIn("tournaments", analyzed)
+        self.assertEqual(bulk_load.estimate_rows(self.conn), 100)
+
+    def test_failed_load_is_rolled_back_and_indexes_restored(self):
+        all_indexes = self._indexes()
+        with self.assertRaises(RuntimeError):
+            with bulk_load.deferred_indexes(self.conn):
+                self.conn.execute("INSERT INTO tournaments (tournament_id) VALUES ('T1')")
+                raise RuntimeError("import failed")
+        self.assertEqual(self._indexes(), all_indexes)
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM tournaments").fetchone()[0], 0)
+
+    def test_interrupted_load_is_restored(self):
+        # Процесс упал внутри массовой загрузки: отметка есть, индексов нет
+        context = bulk_load.deferred_indexes(self.conn)
+        context.__enter__()
+        self.assertIsNotNone(self._marker())
+
+        self.assertTrue(bulk_load.restore_deferred_indexes(self.conn))
+        self.assertTrue(set(bulk_load.deferrable_indexes()) <= self._indexes())
+        self.assertFalse(bulk_load.restore_deferred_indexes(self.conn))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from services import StatisticsService
+from services.db_summary import read_summary, read_summaries, summary_path
+from db.manager import DatabaseManager
+from db.repositories import (
+    TournamentRepository,
+    SessionRepository,
+    OverallStatsRepository,
+    PlaceDistributionRepository,
+    FinalTableHandRepository,
+)
+from models import Tournament
+
+
+class TestDatabaseSummary(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.tmp_dir, "summary.db")
+        self.db = DatabaseManager(self.db_path)
+        self.tournament_repo = TournamentRepository(self.db)
+        self.session_repo = SessionRepository(self.db)
+        self.service = StatisticsService(
+            self.tournament_repo,
+            self.session_repo,
+            OverallStatsRepository(self.db),
+            PlaceDistributionRepository(self.db),
+            FinalTableHandRepository(self.db),
+            cache_file_path=os.path.join(self.tmp_dir, "cache.json"),
+        )
+        self.session_id = self.session_repo.create_session("S").session_id
+
+    def tearDown(self):
+        self.db.close_all_connections()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def _tournament(self, tournament_id, day, payout):
+        return Tournament(
+            tournament_id=tournament_id,
+            session_id=self.session_id,
+            buyin=10.0,
+            payout=payout,
+            finish_place=1 if payout else 12,
+            start_time=f"2024/03/{day:02d} 18:00:00",
+            has_ts=True,
+        )
+
+    def test_summary_follows_imports_and_is_rebuilt_when_missing(self):
+        first = [self._tournament("T1", 5, 40.0), self._tournament("T2", 9, 0.0)]
+        self.tournament_repo.add_or_update_many(first)
+        self.service.update_all_statistics("", self.db_path, use_incremental=False)
+
+        summary = read_summaries([self.db_path, os.path.join(self.tmp_dir, "other.db")])
+        self.assertIsNone(summary[os.path.join(self.tmp_dir, "other.db")])
+        summary = summary[self.db_path]
+        self.assertEqual((summary.tournaments, summary.sessions), (2, 1))
+        self.assertEqual((summary.first_start_time, summary.last_start_time),
+                         ("2024/03/05 18:00:00", "2024/03/09 18:00:00"))
+        self.assertEqual(summary.roi, 100.0)
+
+        # Инкрементальное обновление после импорта
+        added = [self._tournament("T3", 12, 0.0)]
+        self.tournament_repo.add_or_update_many(added)
+        self.service.update_all_statistics(self.session_id, self.db_path, added_tournaments=added, added_hands=[])
+        updated = read_summary(self.db_path)
+        self.assertEqual(updated.tournaments, 3)
+        self.assertEqual(updated.last_start_time, "2024/03/12 18:00:00")
+        self.assertEqual(updated.data_version, summary.data_version + 1)
+        self.assertEqual(self.service.ensure_database_summary(self.db_path).data_version, updated.data_version)
+
+        # БД скопирована без сводки - сводка собирается при открытии
+        os.remove(summary_path(self.db_path))
+        self.assertEqual(self.service.ensure_database_summary(self.db_path).tournaments, 3)
+        self.assertTrue(os.path.exists(summary_path(self.db_path)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+
+from analytics.downsampling import (
+    MAX_CHART_POINTS,
+    chart_points_for_width,
+    downsample,
+    lttb_indices,
+    min_max_indices,
+    visible_slice,
+)
+
+
+class TestDownsampling(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(5)
+        # Неравномерная ось времени: плотные сессии и паузы между ними
+        self.x = np.cumsum(rng.choice([1.0, 1.0, 1.0, 500.0], size=50_000))
+        self.y = np.cumsum(rng.normal(size=50_000))
+
+    def test_min_max_keeps_extremes_of_every_bucket(self):
+        buckets = 200
+        indices = min_max_indices(self.x, self.y, buckets)
+        self.assertLessEqual(len(indices), 2 * buckets + 2)
+        self.assertTrue(np.all(np.diff(indices) > 0))
+        self.assertEqual((indices[0], indices[-1]), (0, len(self.x) - 1))
+
+        bucket = np.minimum(
+            ((self.x - self.x[0]) * (buckets / (self.x[-1] - self.x[0]))).astype(int), buckets - 1
+        )
+        kept = set(self.y[indices])
+        for b in np.unique(bucket)[::17]:
+            values = self.y[bucket == b]
+            self.assertIn(values.min(), kept)
+            self.assertIn(values.max(), kept)
+
+    def test_lttb_selects_requested_number_of_points(self):
+        indices = lttb_indices(self.x, self.y, 500)
+        self.assertEqual(len(indices), 500)
+        self.assertTrue(np.all(np.diff(indices) > 0))
+        self.assertEqual((indices[0], indices[-1]), (0, len(self.x) - 1))
+        # Одиночный выброс - самый большой треугольник в своём интервале
+        y = np.zeros(10_000)
+        y[4321] = 100.0
+        self.assertIn(4321, lttb_indices(np.arange(10_000.0), y, 50))
+
+    def test_short_series_are_returned_as_is(self):
+        x, y = downsample(self.x[:100], self.y[:100], 1000)
+        np.testing.assert_array_equal(x, self.x[:100])
+        for method in ("minmax", "lttb"):
+            x, y = downsample(self.x, self.y, 1000, method)
+            self.assertLessEqual(len(x), 1000)
+        with self.assertRaises(ValueError):
+            downsample(self.x, self.y, 1000, "mean")
+
+    def test_visible_slice_and_point_budget(self):
+        x = np.arange(10.0)
+        self.assertEqual(visible_slice(x, 3.5, 6.0), slice(3, 8))
+        self.assertEqual(visible_slice(x, -5, 100), slice(0, 10))
+        self.assertEqual(chart_points_for_width(800), 1600)
+        self.assertEqual(chart_points_for_width(10_000), MAX_CHART_POINTS)
+        self.assertEqual(chart_points_for_width(0), 100)
+
+
+if __name__ == "__main__":
+    unittest.main()
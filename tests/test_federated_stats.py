@@ -0,0 +1,116 @@
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from services import FederatedStatsService
+from db.manager import DatabaseManager, database_manager
+from db.repositories import TournamentRepository, SessionRepository, FinalTableHandRepository
+from models import Tournament, FinalTableHand
+
+
+class TestFederatedStats(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        # Текущая БД приложения не должна меняться федеративной загрузкой
+        self.current_db = database_manager.db_path
+        self.db_paths = [self._create_db("a.db", ["A1", "A2", "SHARED"]), self._create_db("b.db", ["B1", "SHARED"])]
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def _create_db(self, name, tournament_ids):
+        path = os.path.join(self.tmp_dir, name)
+        db = DatabaseManager(path)
+        session_id = SessionRepository(db).create_session(name).session_id
+        TournamentRepository(db).add_or_update_many([
+            Tournament(
+                tournament_id=tournament_id,
+                session_id=session_id,
+                buyin=10.0 if i % 2 == 0 else 1.0,
+                start_time=f"2024/01/0{i + 1} 12:00:00",
+                finish_place=i + 1,
+            )
+            for i, tournament_id in enumerate(tournament_ids)
+        ])
+        FinalTableHandRepository(db).add_hands([
+            FinalTableHand(tournament_id=tournament_id, hand_id=f"{name}-{tournament_id}",
+                           hand_number=1, session_id=session_id, table_size=9,
+                           bb=100.0, hero_stack=2000.0)
+            for tournament_id in tournament_ids
+        ])
+        db.close_all_connections()
+        return path
+
+    def test_union_deduplicates_and_reports_broken_db(self):
+        broken = os.path.join(self.tmp_dir, "broken.db")
+        with open(broken, "wb") as f:
+            f.write(b"not a database" * 100)
+
+        federated = FederatedStatsService(max_workers=2).load_dataset(self.db_paths + [broken])
+
+        tournaments = federated.dataset.tournaments
+        self.assertEqual(sorted(t.tournament_id for t in tournaments), ["A1", "A2", "B1", "SHARED"])
+        self.assertEqual([t.start_time for t in tournaments], sorted(t.start_time for t in tournaments))
+        self.assertEqual(federated.duplicate_tournaments, 1)
+        # Общий турнир берётся из первой БД вместе с её руками
+        self.assertEqual(
+            sorted(h.hand_id for h in federated.dataset.final_table_hands),
+            ["a.db-A1", "a.db-A2", "a.db-SHARED", "b.db-B1"],
+        )
+        self.assertEqual(federated.databases, self.db_paths)
+        self.assertEqual(list(federated.failed), [broken])
+        self.assertEqual(database_manager.db_path, self.current_db)
+
+    def test_buyin_filter_applies_to_every_db(self):
+        federated = FederatedStatsService().load_dataset(self.db_paths, buyin_filter=10.0)
+        self.assertEqual(sorted(t.tournament_id for t in federated.dataset.tournaments), ["A1", "B1", "SHARED"])
+        self.assertEqual(len(federated.dataset.final_table_hands), 3)
+
+    def _downgrade_to_baseline(self, path):
+        """Схема до user_version: без start_epoch/start_day и pre_ft_raw_ko."""
+        conn = sqlite3.connect(path)
+        for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL").fetchall():
+            conn.execute(f"DROP INDEX {name}")
+        conn.execute("ALTER TABLE tournaments DROP COLUMN start_epoch")
+        conn.execute("ALTER TABLE tournaments DROP COLUMN start_day")
+        conn.execute("ALTER TABLE hero_final_table_hands DROP COLUMN pre_ft_raw_ko")
+        conn.execute("PRAGMA user_version = 0")
+        conn.commit()
+        conn.close()
+
+    def test_old_schema_db_is_read_from_migrated_copy(self):
+        old_db = self._create_db("old.db", ["O1", "O2"])
+        self._downgrade_to_baseline(old_db)
+
+        federated = FederatedStatsService().load_dataset(self.db_paths + [old_db], buyin_filter=10.0)
+
+        self.assertEqual(federated.failed, {})
+        self.assertEqual(federated.databases, self.db_paths + [old_db])
+        self.assertEqual(sorted(t.tournament_id for t in federated.dataset.tournaments), ["A1", "B1", "O1", "SHARED"])
+        self.assertIn("old.db-O1", {h.hand_id for h in federated.dataset.final_table_hands})
+        # Архивный файл не мигрируется на месте
+        conn = sqlite3.connect(old_db)
+        self.addCleanup(conn.close)
+        self.assertEqual(conn.execute("PRAGMA user_version").fetchone()[0], 0)
+
+    def test_federated_viewmodel_ignores_current_db_sketches(self):
+        from benchmarks.suite import _create_facade
+
+        facade = _create_facade(os.path.join(self.tmp_dir, "app.db"), os.path.join(self.tmp_dir, "cache.json"))
+        self.addCleanup(facade.db_manager.close_all_connections)
+        with patch.object(facade.statistics_service, "get_ft_stack_sketch") as get_sketch:
+            result = facade.get_federated_stats_grid_result(self.db_paths)
+            facade.create_stats_grid_viewmodel()
+        self.assertEqual(result.failed_databases, {})
+        # Скетч запрашивается только для ViewModel текущей БД
+        get_sketch.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from analytics import FTStackDistributions, ft_stack_bucket_labels, ko_attempts_distribution
+
+
+# (стек в фишках, бай-ин, выплата, игроков на старте FT, ранние KO Hero)
+ROWS = [
+    (700.0, 10.0, 0.0, 9, 0.0),
+    (800.0, 10.0, None, 9, 0.0),
+    (1000.0, 10.0, 40.0, 9, 1.0),
+    (1100.0, None, 20.0, None, 0.0),
+    (3900.0, 25.0, 100.0, 8, 2.0),
+    (4500.0, 25.0, 0.0, 9, 1.0),
+]
+
+
+class TestFTStackDistributions(unittest.TestCase):
+    def test_bucket_labels(self):
+        labels = ft_stack_bucket_labels(1000)
+        self.assertEqual(labels, ["≤800", "800-1.8k", "1.8k-2.8k", "2.8k-3.8k", "≥4k"])
+        self.assertEqual(len(ft_stack_bucket_labels(200)), 18)
+
+    def test_stack_distribution(self):
+        dist, median = FTStackDistributions(ROWS).stack_distribution(200)
+        self.assertEqual(dist["≤800"], 2)
+        self.assertEqual(dist["1.0k-1.2k"], 2)
+        self.assertEqual(dist["3.8k-4.0k"], 1)
+        self.assertEqual(dist["≥4k"], 1)
+        self.assertEqual(sum(dist.values()), len(ROWS))
+        self.assertEqual(median, 1050.0)
+
+    def test_partial_tail_interval_goes_to_last_bucket(self):
+        dist, _ = FTStackDistributions(ROWS).stack_distribution(1000)
+        # 3900 не помещается в полный интервал 3.8k-4.8k
+        self.assertEqual(dist["≥4k"], 2)
+
+    def test_roi_distribution_skips_missing_buyin(self):
+        roi, _ = FTStackDistributions(ROWS).roi_distribution(200)
+        self.assertAlmostEqual(roi["≤800"], -100.0)
+        # Турнир без бай-ина в интервале 1.0k-1.2k не учитывается
+        self.assertAlmostEqual(roi["1.0k-1.2k"], 300.0)
+        self.assertAlmostEqual(roi["3.8k-4.0k"], 300.0)
+        self.assertEqual(roi["2.0k-2.2k"], 0)
+
+    def test_conversion_distribution(self):
+        conv, median = FTStackDistributions(ROWS).conversion_distribution(200)
+        self.assertAlmostEqual(conv["1.0k-1.2k"], 1.0 / (1000 / 18000 * 4))
+        self.assertAlmostEqual(conv["3.8k-4.0k"], 2.0 / (3900 / 18000 * 3))
+        # Турнир без числа игроков на старте FT исключается и из медианы
+        self.assertEqual(median, 1000.0)
+
+    def test_results_are_cached_per_step(self):
+        distributions = FTStackDistributions(ROWS)
+        first = distributions.stack_distribution(400)
+        self.assertIs(distributions.stack_distribution(400), first)
+        self.assertIsNot(distributions.stack_distribution(200), first)
+
+    def test_empty_input(self):
+        distributions = FTStackDistributions([])
+        dist, median = distributions.stack_distribution(200)
+        self.assertEqual(sum(dist.values()), 0)
+        self.assertIsNone(median)
+        self.assertIsNone(distributions.conversion_distribution(200)[1])
+
+    def test_ko_attempts_distribution(self):
+        dist = ko_attempts_distribution([0, None, 1, 1, 2, 4, 5, 7])
+        self.assertEqual(dist, {1: 2, 2: 1, 3: 0, 4: 1, 5: 2})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from parsers.hand_history import (
+    RE_HH_LINE,
+    LINE_SEAT,
+    LINE_TABLE,
+    LINE_UNCALLED,
+    LINE_ACTION,
+    LINE_COLLECTED,
+)
+
+
+class TestHandHistoryLineClassifier(unittest.TestCase):
+    def _classify(self, line):
+        m = RE_HH_LINE.match(line)
+        return (m.lastgroup, m) if m else (None, None)
+
+    def test_line_kinds(self):
+        cases = {
+            "Seat 3: Player 3 (12,500 in chips)": LINE_SEAT,
+            "Table '7' 9-max Seat #1 is the button": LINE_TABLE,
+            "Uncalled bet (2,500) returned to Player3": LINE_UNCALLED,
+            "Player3: folds": LINE_ACTION,
+            "Hero collected 11,522 from pot": LINE_COLLECTED,
+            "Seat 3: Player3 collected (1250)": None,
+            "Dealt to Hero [Kc Kd]": None,
+        }
+        for line, expected in cases.items():
+            self.assertEqual(self._classify(line)[0], expected, line)
+
+    def test_action_groups(self):
+        kind, m = self._classify("Victim: raises 4,921 to 5,321 and is all-in")
+        self.assertEqual(kind, LINE_ACTION)
+        self.assertEqual(
+            (m.group("player"), m.group("action"), m.group("amount"), m.group("raise_to")),
+            ("Victim", "raises", "4,921", "5,321"),
+        )
+        _, m = self._classify("Hero: posts the ante 80")
+        self.assertEqual((m.group("action"), m.group("amount"), m.group("raise_to")), ("posts", "80", None))
+        _, m = self._classify("Player 3: calls 1,000")
+        self.assertEqual((m.group("player"), m.group("amount")), ("Player 3", "1,000"))
+
+
+if __name__ == "__main__":
+    unittest.main()
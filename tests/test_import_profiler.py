@@ -0,0 +1,69 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from services.profiling import ImportProfiler, NULL_PROFILER
+from services.import_service import _read_file
+from parsers.hand_history import HandHistoryParser
+from tests.test_parallel_hand_history import build_hand_history
+
+
+class TestImportProfiler(unittest.TestCase):
+    def test_disabled_profiler_records_nothing(self):
+        profiler = ImportProfiler(enabled=False)
+        with profiler.stage("parse"):
+            pass
+        profiler.count("files")
+        report = profiler.report()
+        self.assertEqual(report["stages"], [])
+        self.assertEqual(report["counters"], {})
+
+    def test_stages_are_reported_in_pipeline_order(self):
+        profiler = ImportProfiler()
+        with profiler.stage("db_save"):
+            pass
+        with profiler.stage("discovery"):
+            pass
+        with profiler.stage("discovery"):
+            pass
+        profiler.count("bytes", 100)
+        profiler.count("bytes", 20)
+
+        report = profiler.report()
+        self.assertEqual([s["stage"] for s in report["stages"]], ["discovery", "db_save"])
+        self.assertEqual(report["stages"][0]["calls"], 2)
+        self.assertEqual(report["counters"], {"bytes": 120})
+
+    def test_hand_history_parser_reports_hot_path_stages(self):
+        parser = HandHistoryParser("Hero")
+        parser.profiler = ImportProfiler()
+        parser.parse(build_hand_history(pre_ft_hands=5, ft_hands=10), "hh.txt")
+
+        report = parser.profiler.report()
+        stages = {s["stage"]: s for s in report["stages"]}
+        self.assertTrue({"split", "hand_parse", "pots_ko", "ko_attempts"} <= set(stages))
+        self.assertEqual(report["counters"]["hands"], 15)
+        self.assertEqual(stages["hand_parse"]["calls"], report["counters"]["hands_parsed"])
+
+    def test_read_file_reports_bytes_and_own_time(self):
+        with tempfile.NamedTemporaryFile("wb", suffix=".txt", delete=False) as f:
+            f.write("Турнир #1\r\n".encode("utf-8") + b"\xff\xfe")
+        self.addCleanup(os.remove, f.name)
+
+        file_path, content, success, size, wall, cpu = _read_file(f.name, "hh")
+        self.assertTrue(success)
+        # Размер - байты файла, а не символы после декодирования
+        self.assertEqual(size, os.path.getsize(f.name))
+        self.assertGreater(size, len(content))
+        self.assertGreaterEqual(wall, 0.0)
+        self.assertGreaterEqual(cpu, 0.0)
+
+    def test_parser_defaults_to_shared_null_profiler(self):
+        self.assertIs(HandHistoryParser("Hero").profiler, NULL_PROFILER)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+import os
+import sys
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from services.app_config import app_config
+from services.progress import ImportCancelled, ProgressReporter
+from parsers.hand_history import HandHistoryParser
+from tests.test_parallel_hand_history import build_hand_history
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestProgressReporter(unittest.TestCase):
+    def setUp(self):
+        self.calls = []
+        self.clock = FakeClock()
+        self.progress = ProgressReporter(
+            lambda *args: self.calls.append(args), rate_hz=20, clock=self.clock
+        )
+
+    def test_updates_are_throttled_and_flushed(self):
+        # 1000 файлов за секунду - не больше 20 обновлений в UI
+        for i in range(1, 1001):
+            self.clock.now = i / 1000
+            self.progress.update(i, 1000, f"Обработка: {i}")
+        self.assertLessEqual(len(self.calls), 21)
+        self.assertNotEqual(self.calls[-1][0], 1000)
+
+        self.progress.flush()
+        self.assertEqual(self.calls[-1], (1000, 1000, "Обработка: 1000"))
+        count = len(self.calls)
+        self.progress.flush()
+        self.assertEqual(len(self.calls), count)
+
+    def test_status_is_sent_immediately_and_drops_pending(self):
+        self.progress.update(1, 10, "Подготовка файлов...")
+        self.progress.update(2, 10, "Подготовка файлов...")
+        self.progress(0, 0, "Импорт отменен")
+        self.progress.flush()
+        self.assertEqual(self.calls, [(1, 10, "Подготовка файлов..."), (0, 0, "Импорт отменен")])
+
+    def test_wrap(self):
+        self.assertIsNone(ProgressReporter.wrap(None))
+        self.assertIs(ProgressReporter.wrap(self.progress), self.progress)
+        self.assertIsInstance(ProgressReporter.wrap(print), ProgressReporter)
+
+
+class TestParserCancellation(unittest.TestCase):
+    def test_cancel_inside_single_file(self):
+        content = build_hand_history(pre_ft_hands=30, ft_hands=200)
+        parser = HandHistoryParser("Hero")
+        checks = []
+
+        def cancel_check():
+            checks.append(1)
+            return len(checks) > 50
+
+        parser.cancel_check = cancel_check
+        with patch.object(app_config, "hero_name", "Hero"), \
+                patch.object(app_config, "hh_parallel_workers", 1):
+            with self.assertRaises(ImportCancelled):
+                parser.parse(content, filename="big.txt")
+        self.assertEqual(len(checks), 51)
+
+    def test_cancel_during_parallel_parse(self):
+        content = build_hand_history(pre_ft_hands=30, ft_hands=200)
+        parser = HandHistoryParser("Hero")
+        cancelled = []
+        parser.cancel_check = lambda: bool(cancelled)
+        parallel = parser._parse_hand_chunks_parallel
+
+        def cancel_after_start(*args):
+            cancelled.append(True)
+            return parallel(*args)
+
+        with patch.object(app_config, "hero_name", "Hero"), \
+                patch.object(app_config, "hh_parallel_workers", 2), \
+                patch.object(app_config, "hh_parallel_min_hands", 1), \
+                patch.object(parser, "_parse_hand_chunks_parallel", cancel_after_start):
+            # Отмена не должна выглядеть как сбой пула с откатом на последовательный разбор
+            with self.assertNoLogs("ROYAL_Stats.HandHistoryParser", level="WARNING"):
+                with self.assertRaises(ImportCancelled):
+                    parser.parse(content, filename="big.txt")
+
+
+if __name__ == "__main__":
+    unittest.main()
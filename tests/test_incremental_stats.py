@@ -0,0 +1,215 @@
+import os
+import shutil
+import sys
+import random
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from services import StatisticsService
+from db.manager import DatabaseManager
+from db.repositories import (
+    TournamentRepository,
+    SessionRepository,
+    OverallStatsRepository,
+    PlaceDistributionRepository,
+    FinalTableHandRepository,
+)
+from models import Tournament, FinalTableHand, FinalTableHandTotals, OverallStats
+
+
+def _random_tournament(rng: random.Random, tournament_id: str) -> Tournament:
+    reached_ft = rng.random() < 0.5
+    has_hh = reached_ft or rng.random() < 0.5
+    has_ts = rng.random() < 0.8
+    place = rng.choice([None, *range(1, 19)]) if has_ts else None
+    if reached_ft and place is not None:
+        place = rng.randint(1, 9)
+    stack = rng.randint(1, 80) * 100 if reached_ft and rng.random() < 0.9 else None
+    return Tournament(
+        tournament_id=tournament_id,
+        buyin=rng.choice([0.25, 1.0, 3.0, 10.0]) if has_ts else 0.0,
+        payout=rng.choice([0.0, 0.5, 4.0, 20.0, 150.0]) if has_ts else 0.0,
+        finish_place=place,
+        has_ts=has_ts,
+        has_hh=has_hh,
+        reached_final_table=reached_ft,
+        final_table_initial_stack_chips=stack,
+        final_table_initial_stack_bb=stack / 50 if stack is not None else None,
+    )
+
+
+def _random_hands(rng: random.Random, tournament: Tournament) -> list:
+    if not tournament.reached_final_table:
+        return []
+    players = rng.randint(6, 9)
+    hands = []
+    for number in range(1, rng.randint(2, 6)):
+        hands.append(FinalTableHand(
+            tournament_id=tournament.tournament_id,
+            hand_id=f"{tournament.tournament_id}-{number}",
+            hand_number=number,
+            table_size=9,
+            bb=100.0,
+            hero_stack=1000.0,
+            players_count=players,
+            hero_ko_this_hand=rng.choice([0.0, 0.0, 1.0, 2.0]),
+            pre_ft_ko=rng.choice([0.0, 0.5, 1.0]) if number == 1 else 0.0,
+            is_early_final=players >= 6,
+        ))
+    return hands
+
+
+class TestIncrementalOverallStats(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db = DatabaseManager(os.path.join(self.tmp_dir, "stats.db"))
+        self.tournament_repo = TournamentRepository(self.db)
+        self.hand_repo = FinalTableHandRepository(self.db)
+        self.overall_repo = OverallStatsRepository(self.db)
+        self.service = StatisticsService(
+            self.tournament_repo,
+            SessionRepository(self.db),
+            self.overall_repo,
+            PlaceDistributionRepository(self.db),
+            self.hand_repo,
+            cache_file_path=os.path.join(self.tmp_dir, "cache.json"),
+        )
+        self.db_path = self.db.db_path
+
+    def tearDown(self):
+        self.db.close_all_connections()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def _apply(self, added=(), hands=(), removed=(), removed_hands=()):
+        if not isinstance(removed_hands, FinalTableHandTotals):
+            removed_hands = list(removed_hands)
+        stats = self.service.increment_overall_stats(
+            self.db_path, list(added), list(hands), list(removed), removed_hands
+        )
+        self.overall_repo.update_overall_stats(stats)
+        # Следующий шаг читает суммы из БД, а не из памяти
+        self.service._overall_stats_cache.pop(self.db_path, None)
+
+    def _assert_matches_full_recompute(self):
+        full = self.service._calculate_overall_stats().as_dict()
+        stored = self.overall_repo.get_overall_stats().as_dict()
+        for key, expected in full.items():
+            if key in ("last_updated", "id"):
+                continue
+            self.assertAlmostEqual(stored[key], expected, places=6, msg=key)
+
+    def test_random_import_update_delete_sequences(self):
+        rng = random.Random(20240521)
+        # Стартовая запись с накопительными суммами
+        self.overall_repo.update_overall_stats(self.service._calculate_overall_stats())
+        next_id = 0
+
+        for _ in range(60):
+            existing = self.tournament_repo.get_all_tournaments()
+            op = rng.random()
+            if op < 0.5 or not existing:
+                new = []
+                for _ in range(rng.randint(1, 4)):
+                    next_id += 1
+                    new.append(_random_tournament(rng, f"T{next_id}"))
+                hands = [h for t in new for h in _random_hands(rng, t)]
+                self.tournament_repo.add_or_update_many(new)
+                self.hand_repo.add_hands(hands)
+                self._apply(added=new, hands=hands)
+            elif op < 0.75:
+                # Догрузка TS для уже импортированного турнира
+                old = rng.choice(existing)
+                new = Tournament.from_dict(old.as_dict())
+                new.has_ts = True
+                new.buyin = rng.choice([1.0, 3.0])
+                new.payout = rng.choice([0.0, 12.0])
+                new.finish_place = rng.randint(1, 9) if new.reached_final_table else rng.randint(10, 18)
+                self.tournament_repo.add_or_update_many([new])
+                self._apply(added=[new], removed=[old])
+            else:
+                old = rng.choice(existing)
+                old_hands = self.hand_repo.get_hands_by_tournament(old.tournament_id)
+                self.tournament_repo.delete_tournament_by_id(old.tournament_id)
+                self._apply(removed=[old], removed_hands=old_hands)
+
+            self._assert_matches_full_recompute()
+
+    def test_deletes_with_hand_totals_from_sql(self):
+        rng = random.Random(77)
+        session_repo = SessionRepository(self.db)
+        sessions = [session_repo.create_session(f"S{i}").session_id for i in range(3)]
+        tournaments, hands = [], []
+        for i in range(60):
+            tournament = _random_tournament(rng, f"T{i}")
+            tournament.session_id = sessions[i % 3]
+            tournaments.append(tournament)
+            for hand in _random_hands(rng, tournament):
+                hand.session_id = tournament.session_id
+                hands.append(hand)
+        # Турнир сессии S0, часть рук которого догружена в сессии S1
+        cross = [t for t in tournaments if t.session_id == sessions[0] and t.reached_final_table][-1]
+        cross_hands = [h for h in hands if h.tournament_id == cross.tournament_id]
+        for hand in cross_hands[::2]:
+            hand.session_id = sessions[1]
+            hand.hero_ko_this_hand = 1.0
+        self.tournament_repo.add_or_update_many(tournaments)
+        self.hand_repo.add_hands(hands)
+        self.tournament_repo.set_ko_counts(self.hand_repo.get_ko_counts_for_tournaments(None))
+        self.overall_repo.update_overall_stats(self.service._calculate_overall_stats())
+
+        # Суммы из SQL совпадают с суммами по загруженным рукам
+        for tournament in tournaments[:10]:
+            sql_totals = self.hand_repo.get_hand_totals(tournament_ids=[tournament.tournament_id])
+            py_totals = StatisticsService._hand_totals(
+                self.hand_repo.get_hands_by_tournament(tournament.tournament_id)
+            )
+            self.assertEqual(sql_totals, py_totals)
+
+        # Удаление турнира
+        victim = next(t for t in tournaments if t.reached_final_table)
+        removed_hands = self.hand_repo.get_hand_totals(tournament_ids=[victim.tournament_id])
+        self.assertGreater(removed_hands.hands, 0)
+        self.tournament_repo.delete_tournament_by_id(victim.tournament_id)
+        self._apply(removed=[victim], removed_hands=removed_hands)
+        self._assert_matches_full_recompute()
+
+        # Удаление сессии: каскад удаляет её турниры и руки
+        removed = self.tournament_repo.get_all_tournaments(session_id=sessions[1])
+        removed_hands = self.hand_repo.get_hand_totals(session_id=sessions[1])
+        affected = self.hand_repo.get_cross_session_tournament_ids(sessions[1])
+        self.assertEqual(affected, [cross.tournament_id])
+        session_repo.delete_session_by_id(sessions[1])
+        self.service.update_statistics_incremental(
+            session_id="", db_path=self.db_path, removed_tournaments=removed, removed_hands=removed_hands,
+            affected_tournament_ids=affected,
+        )
+        self.assertEqual(self.hand_repo.get_hand_totals(session_id=sessions[1]), FinalTableHandTotals())
+        self._assert_matches_full_recompute()
+        # ko_count турнира другой сессии учитывает только оставшиеся руки
+        remaining_ko = sum(h.hero_ko_this_hand for h in cross_hands[1::2])
+        self.assertAlmostEqual(
+            self.tournament_repo.get_tournament_by_id(cross.tournament_id).ko_count, remaining_ko
+        )
+
+    def test_stats_without_aggregates_fall_back_to_full_recompute(self):
+        tournament = Tournament(
+            tournament_id="T1", buyin=1.0, payout=5.0, finish_place=3,
+            has_ts=True, has_hh=True, reached_final_table=True,
+            final_table_initial_stack_chips=2000.0, final_table_initial_stack_bb=40.0,
+        )
+        self.tournament_repo.add_or_update_many([tournament])
+        # Статистика старого формата: итоги есть, накопительных сумм нет
+        self.service._overall_stats_cache[self.db_path] = OverallStats(total_tournaments=1)
+
+        stats = self.service.increment_overall_stats(self.db_path, [tournament], [])
+
+        self.assertEqual(stats.aggregates_version, 1)
+        self.assertEqual(stats.total_tournaments, 1)
+        self.assertEqual(stats.ft_finish_place_count, 1)
+        self.assertEqual(stats.avg_ft_initial_stack_chips, 2000.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+import os
+import sys
+import random
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from services.app_config import app_config
+from parsers.hand_history import HandHistoryParser
+
+
+def _hand_text(number, table_size, stacks, level, victim=None):
+    """Одна раздача: Hero на BB; victim (если задан) пушит, Hero коллирует и выигрывает."""
+    bb, ante = level * 100, level * 10
+    players = list(stacks)
+    lines = [
+        f"Poker Hand #HD{number:06d}: Tournament #555000111, Mystery Battle Royale $10 "
+        f"Hold'em No Limit - Level{level}({bb // 2}/{bb}) - 2025/01/01 {10 + number // 3600:02d}:"
+        f"{number // 60 % 60:02d}:{number % 60:02d}",
+        f"Table '7' {table_size}-max Seat #1 is the button",
+    ]
+    lines += [f"Seat {i + 1}: {name} ({stacks[name]:,} in chips)" for i, name in enumerate(players)]
+    contrib = {}
+    for name in players:
+        lines.append(f"{name}: posts the ante {ante}")
+        contrib[name] = ante
+    sb_player = next(p for p in players if p not in ("Hero", victim))
+    lines.append(f"{sb_player}: posts small blind {bb // 2}")
+    lines.append(f"Hero: posts big blind {bb}")
+    contrib[sb_player] += bb // 2
+    contrib["Hero"] += bb
+    lines.append("*** HOLE CARDS ***")
+    if victim:
+        total = stacks[victim] - ante
+        lines.append(f"{victim}: raises {total - bb:,} to {total:,} and is all-in")
+        contrib[victim] += total
+        for name in players:
+            if name not in ("Hero", victim):
+                lines.append(f"{name}: folds")
+        lines.append(f"Hero: calls {total - bb:,}")
+        contrib["Hero"] += total - bb
+        lines += ["*** SHOWDOWN ***", f"Hero collected {sum(contrib.values()):,} from pot"]
+    else:
+        for name in players:
+            if name != "Hero":
+                lines.append(f"{name}: folds")
+        lines.append(f"Hero collected {sum(contrib.values()):,} from pot")
+    lines += ["*** SUMMARY ***", ""]
+    for name in players:
+        stacks[name] -= contrib[name]
+    stacks["Hero"] += sum(contrib.values())
+    if victim:
+        del stacks[victim]
+    return "\n".join(lines)
+
+
+def build_hand_history(pre_ft_hands=30, ft_hands=80, ft_players=8, seed=7):
+    """Файл HH в формате GG (новые раздачи сверху) с выходом Hero на финалку."""
+    rng = random.Random(seed)
+    hands = []
+    number = 0
+    stacks = {"Hero": 3000, **{f"P{i}": 2000 for i in range(2, 7)}}
+    for _ in range(pre_ft_hands):
+        number += 1
+        victim = rng.choice([p for p in stacks if p != "Hero"]) if rng.random() < 0.1 and len(stacks) > 3 else None
+        hands.append(_hand_text(number, 6, stacks, 5, victim))
+    stacks = {"Hero": stacks["Hero"], **{f"F{i}": rng.randint(8, 40) * 100 for i in range(2, ft_players + 1)}}
+    for _ in range(ft_hands):
+        number += 1
+        victim = rng.choice([p for p in stacks if p != "Hero"]) if rng.random() < 0.15 and len(stacks) > 2 else None
+        hands.append(_hand_text(number, 9, stacks, 8, victim))
+    return "\n\n".join(reversed(hands))
+
+
+class TestParallelHandHistoryParsing(unittest.TestCase):
+    def _parse(self, content, min_hands, workers):
+        with patch.object(app_config, "hh_parallel_min_hands", min_hands), \
+                patch.object(app_config, "hh_parallel_workers", workers):
+            return HandHistoryParser("Hero").parse(content, "test.txt")
+
+    def test_parallel_matches_sequential(self):
+        content = build_hand_history()
+        sequential = self._parse(content, min_hands=10 ** 9, workers=1)
+        parallel = self._parse(content, min_hands=1, workers=2)
+
+        self.assertTrue(sequential.reached_final_table)
+        self.assertEqual(sequential.final_table_start_players, 8)
+        self.assertGreater(sum(h["hero_ko_this_hand"] for h in sequential.final_table_hands_data), 0)
+        self.assertEqual(parallel, sequential)
+
+    def test_incomplete_final_table_uses_previous_hand_ko(self):
+        # seed=16: в последней раздаче до финалки Hero выбивает игрока
+        content = build_hand_history(pre_ft_hands=20, ft_hands=5, ft_players=7, seed=16)
+        sequential = self._parse(content, min_hands=10 ** 9, workers=1)
+        result = self._parse(content, min_hands=1, workers=2)
+        first_hand = result.final_table_hands_data[0]
+        self.assertEqual(first_hand["players_count"], 7)
+        self.assertEqual(first_hand["hand_number"], 21)
+        # Предыдущая раздача разбирается во второй фазе вместе с финалкой
+        expected = sequential.final_table_hands_data[0]
+        self.assertGreater(expected["pre_ft_raw_ko"], 0)
+        self.assertEqual(first_hand["pre_ft_raw_ko"], expected["pre_ft_raw_ko"])
+        self.assertEqual(first_hand["pre_ft_ko"], expected["pre_ft_ko"])
+
+    def test_no_final_table(self):
+        content = build_hand_history(pre_ft_hands=15, ft_hands=0)
+        result = self._parse(content, min_hands=1, workers=2)
+        self.assertFalse(result.reached_final_table)
+        self.assertEqual(result.final_table_hands_data, [])
+        self.assertEqual(result.tournament_id, "555000111")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from plugins import plugin_manager
+
+GROUP = "royal_stats_test"
+
+
+class TestEntryPointCache(unittest.TestCase):
+    def setUp(self):
+        self.site_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.site_dir, ignore_errors=True)
+        # Кеш вне каталога дистрибутивов: иначе его запись меняет отпечаток
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir, ignore_errors=True)
+        self.cache_file = os.path.join(cache_dir, "entry_points.json")
+        sys.path.insert(0, self.site_dir)
+        self.addCleanup(sys.path.remove, self.site_dir)
+        plugin_manager.clear_entry_point_cache()
+        self.addCleanup(plugin_manager.clear_entry_point_cache)
+        self._install("sample_plugin", "sample = sample_plugin:SampleStat")
+
+    def _install(self, dist_name, entry_point):
+        dist_info = os.path.join(self.site_dir, f"{dist_name}-1.0.dist-info")
+        os.makedirs(dist_info)
+        with open(os.path.join(dist_info, "METADATA"), "w", encoding="utf-8") as f:
+            f.write(f"Metadata-Version: 2.1\nName: {dist_name}\nVersion: 1.0\n")
+        with open(os.path.join(dist_info, "entry_points.txt"), "w", encoding="utf-8") as f:
+            f.write(f"[{GROUP}]\n{entry_point}\n")
+
+    def _entry_points(self):
+        return [(ep.name, ep.value) for ep in plugin_manager.cached_entry_points(GROUP, self.cache_file)]
+
+    def test_second_startup_reads_cache_file_only(self):
+        self.assertEqual(self._entry_points(), [("sample", "sample_plugin:SampleStat")])
+        self.assertTrue(os.path.exists(self.cache_file))
+
+        # Новый "запуск": кеш в памяти пуст, метаданные дистрибутивов не читаются
+        plugin_manager.clear_entry_point_cache()
+        with patch.object(plugin_manager.metadata, "entry_points", side_effect=AssertionError("scan")):
+            self.assertEqual(self._entry_points(), [("sample", "sample_plugin:SampleStat")])
+
+    def test_installing_distribution_invalidates_cache(self):
+        self._entry_points()
+        self._install("other_plugin", "other = other_plugin:OtherStat")
+        plugin_manager.clear_entry_point_cache()
+        self.assertEqual(
+            sorted(self._entry_points()),
+            [("other", "other_plugin:OtherStat"), ("sample", "sample_plugin:SampleStat")],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import os
+import sys
+import random
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from parsers.hand_history import HandData, HandHistoryParser
+
+
+def _reference_pots(contrib):
+    """Прямолинейный расчёт слоёв: участники каждого уровня пересчитываются заново."""
+    pots, prev = [], 0
+    for level in sorted({v for v in contrib.values() if v > 0}):
+        eligible = {p for p, amount in contrib.items() if amount >= level}
+        pots.append(((level - prev) * len(eligible), eligible))
+        prev = level
+    return pots
+
+
+class TestPotEngine(unittest.TestCase):
+    def setUp(self):
+        self.parser = HandHistoryParser("Hero")
+
+    def _ko(self, seats, contrib, collects):
+        hand = HandData("H1", 1, "1", 9, 100.0, seats)
+        hand.contrib = contrib
+        hand.collects = collects
+        hand.eliminated_players = {
+            p for p in seats if seats[p] - contrib.get(p, 0) + collects.get(p, 0) <= 0
+        }
+        hand.pots, hand.pot_index = self.parser._build_pots(contrib)
+        self.parser._assign_winners(hand.pots, collects, hand.pot_index)
+        return self.parser._count_ko_in_hand_from_data(hand), hand
+
+    def test_layers_match_reference_on_random_contributions(self):
+        rng = random.Random(5)
+        for _ in range(2000):
+            contrib = {f"P{i}": rng.choice([0, 50, rng.randint(1, 80) * 100]) for i in range(rng.randint(2, 9))}
+            pots, pot_index = self.parser._build_pots(contrib)
+            self.assertEqual([(pot.size, pot.eligible) for pot in pots], _reference_pots(contrib))
+            for player, amount in contrib.items():
+                eligible_in = [i for i, (_, elig) in enumerate(_reference_pots(contrib)) if player in elig]
+                self.assertEqual(pot_index.get(player), eligible_in[-1] if eligible_in else None)
+
+    def test_hero_wins_side_pot_and_loses_main(self):
+        # A (2000) выигрывает основной банк, Hero забирает сайд-пот у B (5000)
+        seats = {"Hero": 10000, "A": 2000, "B": 5000}
+        contrib = {"Hero": 5000, "A": 2000, "B": 5000}
+        ko, hand = self._ko(seats, contrib, {"A": 6000, "Hero": 6000})
+        self.assertEqual(ko, 1)
+        self.assertEqual(hand.eliminated_players, {"B"})
+        self.assertEqual([pot.winners for pot in hand.pots], [{"A"}, {"Hero"}])
+
+    def test_split_pot_counts_ko_for_hero(self):
+        seats = {"Hero": 10000, "A": 3000, "C": 9000}
+        contrib = {"Hero": 3000, "A": 3000, "C": 3000}
+        ko, _ = self._ko(seats, contrib, {"Hero": 4500, "C": 4500})
+        self.assertEqual(ko, 1)
+
+    def test_knockout_by_other_player_is_not_counted(self):
+        seats = {"Hero": 10000, "A": 3000, "C": 9000}
+        contrib = {"Hero": 3000, "A": 3000, "C": 3000}
+        ko, _ = self._ko(seats, contrib, {"C": 9000})
+        self.assertEqual(ko, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+import os
+import shutil
+import sys
+import random
+import statistics
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from services import StatisticsService
+from db.manager import DatabaseManager
+from db.repositories import (
+    TournamentRepository,
+    SessionRepository,
+    OverallStatsRepository,
+    PlaceDistributionRepository,
+    FinalTableHandRepository,
+)
+from models import Tournament
+from analytics.quantile_sketch import QuantileSketch, merge_sketches
+
+
+class TestQuantileSketch(unittest.TestCase):
+    def test_quantiles_within_relative_accuracy(self):
+        rng = random.Random(7)
+        values = [rng.randint(300, 6000) for _ in range(2001)]
+        sketch = QuantileSketch.from_values(values, relative_accuracy=0.001)
+
+        self.assertEqual(sketch.count, len(values))
+        self.assertAlmostEqual(sketch.median(), statistics.median(values), delta=statistics.median(values) * 0.001)
+        ordered = sorted(values)
+        for q in (0.0, 0.1, 0.9, 1.0):
+            expected = ordered[int(q * (len(values) - 1))]
+            self.assertAlmostEqual(sketch.quantile(q), expected, delta=expected * 0.001)
+        self.assertIsNone(QuantileSketch().median())
+
+    def test_merge_remove_and_serialization(self):
+        values = [0, 0.5, -12, 1500, 1500, 2200, 3100, 18000]
+        whole = QuantileSketch.from_values(values)
+        left = QuantileSketch.from_values(values[:3])
+        right = QuantileSketch.from_values(values[3:])
+
+        self.assertEqual(merge_sketches([left, right]), whole)
+        self.assertEqual(QuantileSketch.from_bytes(whole.to_bytes()), whole)
+
+        for value in values[:3]:
+            whole.remove(value)
+        self.assertEqual(whole, right)
+        with self.assertRaises(ValueError):
+            whole.remove(-12)
+        with self.assertRaises(ValueError):
+            whole.merge(QuantileSketch(relative_accuracy=0.01))
+
+
+class TestStatSketchMaintenance(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db = DatabaseManager(os.path.join(self.tmp_dir, "sketch.db"))
+        self.tournament_repo = TournamentRepository(self.db)
+        self.session_repo = SessionRepository(self.db)
+        self.service = StatisticsService(
+            self.tournament_repo,
+            self.session_repo,
+            OverallStatsRepository(self.db),
+            PlaceDistributionRepository(self.db),
+            FinalTableHandRepository(self.db),
+            cache_file_path=os.path.join(self.tmp_dir, "cache.json"),
+        )
+        self.sessions = [self.session_repo.create_session(f"S{i}").session_id for i in range(3)]
+
+    def tearDown(self):
+        self.db.close_all_connections()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def _random_tournament(self, rng, tournament_id):
+        reached_ft = rng.random() < 0.6
+        return Tournament(
+            tournament_id=tournament_id,
+            session_id=rng.choice(self.sessions),
+            buyin=rng.choice([None, 1.0, 3.0, 10.0]),
+            reached_final_table=reached_ft,
+            final_table_initial_stack_chips=rng.randint(4, 80) * 50 if reached_ft else None,
+            final_table_start_players=rng.choice([None, 7, 9]) if reached_ft else None,
+        )
+
+    def _ft_stacks(self, tournaments):
+        return [
+            t.final_table_initial_stack_chips for t in tournaments
+            if t.reached_final_table and t.final_table_initial_stack_chips is not None
+            and t.final_table_start_players is not None
+        ]
+
+    def test_incremental_updates_match_rebuild_and_merge_by_filter(self):
+        rng = random.Random(3)
+        next_id = 0
+        for _ in range(40):
+            existing = self.tournament_repo.get_all_tournaments()
+            if rng.random() < 0.6 or not existing:
+                new = []
+                for _ in range(rng.randint(1, 5)):
+                    next_id += 1
+                    new.append(self._random_tournament(rng, f"T{next_id}"))
+                self.tournament_repo.add_or_update_many(new)
+                self.service._update_stat_sketches(new, [])
+            else:
+                old = rng.choice(existing)
+                self.tournament_repo.delete_tournament_by_id(old.tournament_id)
+                self.service._update_stat_sketches([], [old])
+
+        tournaments = self.tournament_repo.get_all_tournaments()
+        incremental = {
+            scope: self.service.sketch_repo.get_sketches("ft_stack_chips", scope)
+            for scope in ("session", "buyin")
+        }
+        self.service._rebuild_stat_sketches(tournaments)
+        for scope, sketches in incremental.items():
+            self.assertEqual(sketches, self.service.sketch_repo.get_sketches("ft_stack_chips", scope))
+
+        all_stacks = self._ft_stacks(tournaments)
+        self.assertEqual(self.service.get_ft_stack_sketch().count, len(all_stacks))
+        self.assertAlmostEqual(
+            self.service.get_ft_stack_sketch().median(), statistics.median(all_stacks),
+            delta=statistics.median(all_stacks) * 0.001,
+        )
+        union = self._ft_stacks(t for t in tournaments if t.session_id in self.sessions[:2])
+        sketch = self.service.get_ft_stack_sketch(session_ids=self.sessions[:2])
+        self.assertAlmostEqual(sketch.median(), statistics.median(union), delta=statistics.median(union) * 0.001)
+        buyin_stacks = self._ft_stacks(t for t in tournaments if t.buyin in (1.0, None))
+        self.assertEqual(self.service.get_ft_stack_sketch(buyins=[1.0, None]).count, len(buyin_stacks))
+        self.assertIsNone(self.service.get_ft_stack_sketch(session_ids=self.sessions[:1], buyins=[1.0]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,144 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from services import ImportService, RederiveService, app_config
+from services import rederive_service
+from db.manager import DatabaseManager
+from db.repositories import (
+    TournamentRepository,
+    SessionRepository,
+    FinalTableHandRepository,
+    HandSummaryRepository,
+)
+from benchmarks.generator import GeneratorConfig, write_dataset
+from parsers.hand_history import HandHistoryParser
+from tests.test_parallel_hand_history import build_hand_history
+
+
+class TestRederiveService(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db = DatabaseManager(os.path.join(self.tmp_dir, "rederive.db"))
+        self.tournament_repo = TournamentRepository(self.db)
+        self.ft_hand_repo = FinalTableHandRepository(self.db)
+        self.summary_repo = HandSummaryRepository(self.db)
+        config = GeneratorConfig(tournaments=12, ft_reach_rate=1.0, incomplete_ft_rate=0.7, seed=11)
+        data_dir = os.path.join(self.tmp_dir, "hh")
+        write_dataset(data_dir, config)
+        ImportService(
+            tournament_repo=self.tournament_repo,
+            session_repo=SessionRepository(self.db),
+            ft_hand_repo=self.ft_hand_repo,
+        ).import_files([data_dir], "rederive")
+        # ko_count турниров после импорта синхронизирует StatisticsService
+        self.tournament_repo.set_ko_counts(self.ft_hand_repo.get_ko_counts_for_tournaments(None))
+        self.service = RederiveService(self.tournament_repo, self.ft_hand_repo, self.summary_repo)
+
+    def tearDown(self):
+        self.db.close_all_connections()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def _snapshot(self):
+        return {
+            (h.tournament_id, h.hand_id): (h.hero_ko_this_hand, h.pre_ft_ko, h.hero_ko_attempts)
+            for h in self.ft_hand_repo.get_all_hands()
+        }
+
+    def _assert_ko_counts_match_hands(self, hands):
+        for tournament in self.tournament_repo.get_all_tournaments():
+            expected = sum(v[0] for (tid, _), v in hands.items() if tid == tournament.tournament_id)
+            self.assertAlmostEqual(tournament.ko_count, expected)
+
+    def _corrupt(self):
+        self.db.execute_update(
+            "UPDATE hero_final_table_hands SET hero_ko_this_hand = 7, pre_ft_ko = 7, hero_ko_attempts = 7"
+        )
+        self.db.execute_update("UPDATE tournaments SET ko_count = 99")
+
+    def test_rederive_restores_imported_values(self):
+        imported_hands = self._snapshot()
+        self.assertEqual(self.summary_repo.count_tournaments(), 12)
+        self.assertGreater(sum(ko for ko, _, _ in imported_hands.values()), 0)
+
+        self._corrupt()
+        result = self.service.rederive(workers=1)
+
+        self.assertEqual(result["tournaments"], 12)
+        self.assertEqual(result["hands"], len(imported_hands))
+        self.assertEqual(result["errors"], 0)
+        self.assertEqual(self._snapshot(), imported_hands)
+        self._assert_ko_counts_match_hands(imported_hands)
+
+    def test_parallel_rederive_matches_sequential(self):
+        expected = self._snapshot()
+        self._corrupt()
+        with patch.object(rederive_service, "REDERIVE_BATCH_TOURNAMENTS", 5):
+            result = self.service.rederive(workers=2)
+        self.assertEqual(result["tournaments"], 12)
+        self.assertEqual(self._snapshot(), expected)
+        self._assert_ko_counts_match_hands(expected)
+
+    def test_rederive_applies_new_ko_coeff(self):
+        imported_hands = self._snapshot()
+        doubled = {players: coeff * 2 for players, coeff in app_config.ko_coeff.items()}
+        with patch.object(app_config, "ko_coeff", doubled):
+            self.service.rederive(workers=1)
+
+        hands = self._snapshot()
+        self.assertTrue(any(pre for _, pre, _ in imported_hands.values()))
+        for key, (ko, pre, attempts) in imported_hands.items():
+            self.assertAlmostEqual(hands[key][1], pre * 2)
+            self.assertAlmostEqual(hands[key][0], ko + pre)
+            self.assertEqual(hands[key][2], attempts)
+        self._assert_ko_counts_match_hands(hands)
+
+    def test_ko_coeff_change_is_applied_without_summaries(self):
+        imported_hands = self._snapshot()
+        self.db.execute_update("DELETE FROM hand_action_summaries")
+        self.assertFalse(self.service.apply_ko_coeff_if_changed())
+
+        doubled = {players: coeff * 2 for players, coeff in app_config.ko_coeff.items()}
+        with patch.object(app_config, "ko_coeff", doubled):
+            self.assertTrue(self.service.apply_ko_coeff_if_changed())
+            self.assertFalse(self.service.apply_ko_coeff_if_changed())
+
+        hands = self._snapshot()
+        for key, (ko, pre, attempts) in imported_hands.items():
+            self.assertAlmostEqual(hands[key][1], pre * 2)
+            self.assertAlmostEqual(hands[key][0], ko + pre)
+        self._assert_ko_counts_match_hands(hands)
+
+        # Возврат к исходным коэффициентам восстанавливает импортированные значения
+        self.assertTrue(self.service.apply_ko_coeff_if_changed())
+        self.assertEqual(self._snapshot(), imported_hands)
+
+
+class TestHandSummaryEncodingErrors(unittest.TestCase):
+    def _parse(self, content):
+        with patch.object(app_config, "hero_name", "Hero"), \
+                patch.object(app_config, "hh_parallel_workers", 1):
+            return HandHistoryParser("Hero").parse(content, "test.txt")
+
+    def test_hand_without_summary_is_kept(self):
+        content = build_hand_history()
+        expected = self._parse(content)
+        # Имя длиннее 255 байт не помещается в формат сводки
+        with self.assertLogs("ROYAL_Stats.HandHistoryParser", level="ERROR"):
+            result = self._parse(content.replace("F2", "F" * 300))
+
+        self.assertEqual(
+            [h["hero_ko_this_hand"] for h in result.final_table_hands_data],
+            [h["hero_ko_this_hand"] for h in expected.final_table_hands_data],
+        )
+        self.assertLess(len(result.hand_summaries), len(expected.hand_summaries))
+        self.assertTrue(all(record["data"] is not None for record in result.hand_summaries))
+
+
+if __name__ == "__main__":
+    unittest.main()
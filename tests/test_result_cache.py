@@ -0,0 +1,49 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from services.result_cache import LRUResultCache
+
+
+class TestLRUResultCache(unittest.TestCase):
+    def test_get_returns_stored_value(self):
+        cache = LRUResultCache(max_bytes=10_000)
+        self.assertTrue(cache.put(("a", 1), {"value": 42}))
+        self.assertEqual(cache.get(("a", 1)), {"value": 42})
+        self.assertIsNone(cache.get(("a", 2)))
+        self.assertEqual(cache.hits, 1)
+        self.assertEqual(cache.misses, 1)
+
+    def test_evicts_least_recently_used_within_budget(self):
+        item = list(range(100))
+        size = LRUResultCache.estimate_size(item)
+        cache = LRUResultCache(max_bytes=size * 2)
+        cache.put("first", item)
+        cache.put("second", item)
+        # Обращение делает "first" недавно использованным
+        cache.get("first")
+        cache.put("third", item)
+
+        self.assertIn("first", cache)
+        self.assertNotIn("second", cache)
+        self.assertIn("third", cache)
+        self.assertLessEqual(cache.current_bytes, cache.max_bytes)
+
+    def test_oversized_value_is_not_cached(self):
+        cache = LRUResultCache(max_bytes=16)
+        self.assertFalse(cache.put("big", "x" * 1000))
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.current_bytes, 0)
+
+    def test_replacing_key_updates_size(self):
+        cache = LRUResultCache(max_bytes=10_000)
+        cache.put("k", "x" * 100)
+        cache.put("k", "x" * 10)
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.current_bytes, LRUResultCache.estimate_size("x" * 10))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+import os
+import sys
+import sqlite3
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from services import app_config  # noqa: F401  (services до db, как в приложении)
+from db import migrations
+import db.schema
+
+
+class TestSchemaMigrations(unittest.TestCase):
+    def setUp(self):
+        self.db_path = os.path.join(tempfile.mkdtemp(), "schema.db")
+        self.conn = sqlite3.connect(self.db_path)
+        self.addCleanup(self.conn.close)
+
+    def _columns(self, table):
+        return {row[1] for row in self.conn.execute(f"PRAGMA table_info({table})")}
+
+    def test_up_to_date_database_costs_one_pragma_read(self):
+        self.assertEqual(migrations.migrate(self.conn), len(migrations.MIGRATIONS))
+        self.assertEqual(migrations.get_schema_version(self.conn), migrations.latest_schema_version())
+
+        statements = []
+        self.conn.set_trace_callback(statements.append)
+        self.assertEqual(migrations.migrate(self.conn), 0)
+        self.conn.set_trace_callback(None)
+        self.assertEqual(statements, ["PRAGMA user_version"])
+
+    def test_legacy_database_gets_missing_columns(self):
+        # БД ранней версии: без user_version и без поздних колонок
+        self.conn.executescript("""
+            CREATE TABLE tournaments (id INTEGER PRIMARY KEY AUTOINCREMENT, tournament_id TEXT UNIQUE NOT NULL,
+                tournament_name TEXT, start_time TEXT, buyin REAL, payout REAL, finish_place INTEGER,
+                ko_count REAL DEFAULT 0, session_id TEXT, has_ts BOOLEAN DEFAULT 0, has_hh BOOLEAN DEFAULT 0,
+                reached_final_table BOOLEAN DEFAULT 0, final_table_initial_stack_chips REAL,
+                final_table_initial_stack_bb REAL);
+            CREATE TABLE overall_stats (id INTEGER PRIMARY KEY, total_tournaments INTEGER DEFAULT 0);
+            INSERT INTO tournaments (tournament_id, buyin) VALUES ('T1', 10.0);
+        """)
+        self.assertEqual(migrations.get_schema_version(self.conn), 0)
+
+        migrations.migrate(self.conn)
+
+        self.assertIn("final_table_start_players", self._columns("tournaments"))
+        self.assertIn("pre_ft_chipev", self._columns("overall_stats"))
+        self.assertEqual(self.conn.execute("SELECT tournament_id FROM tournaments").fetchall(), [("T1",)])
+        self.assertEqual(migrations.get_schema_version(self.conn), migrations.latest_schema_version())
+
+    def test_redundant_indexes_are_replaced(self):
+        # БД версии 1 с индексами прежнего набора
+        migrations.migrate(self.conn)
+        self.conn.executescript("""
+            CREATE INDEX idx_tournaments_session ON tournaments(session_id);
+            CREATE INDEX idx_ft_hands_tournament ON hero_final_table_hands(tournament_id);
+            CREATE INDEX idx_tournaments_session_start ON tournaments(session_id, start_time);
+            DROP INDEX idx_tournaments_session_epoch;
+            PRAGMA user_version = 1;
+        """)
+
+        migrations.migrate(self.conn)
+
+        indexes = {row[0] for row in self.conn.execute("SELECT name FROM sqlite_master WHERE type='index'")}
+        self.assertNotIn("idx_tournaments_session", indexes)
+        self.assertNotIn("idx_ft_hands_tournament", indexes)
+        self.assertNotIn("idx_tournaments_session_start", indexes)
+        self.assertIn("idx_tournaments_session_epoch", indexes)
+        plan = self.conn.execute(
+            "EXPLAIN QUERY PLAN SELECT * FROM tournaments WHERE session_id = ? ORDER BY start_epoch DESC", ("S",)
+        ).fetchall()
+        self.assertIn("idx_tournaments_session_epoch", " ".join(row[-1] for row in plan))
+
+    def test_start_epoch_is_backfilled(self):
+        # БД версии 2: колонок start_epoch/start_day ещё нет
+        self.conn.executescript("""
+            CREATE TABLE tournaments (id INTEGER PRIMARY KEY AUTOINCREMENT, tournament_id TEXT UNIQUE NOT NULL,
+                tournament_name TEXT, start_time TEXT, buyin REAL, payout REAL, finish_place INTEGER,
+                ko_count REAL DEFAULT 0, session_id TEXT, has_ts BOOLEAN DEFAULT 0, has_hh BOOLEAN DEFAULT 0,
+                reached_final_table BOOLEAN DEFAULT 0, final_table_initial_stack_chips REAL,
+                final_table_initial_stack_bb REAL, final_table_start_players INTEGER);
+            CREATE INDEX idx_tournaments_start_time ON tournaments(start_time);
+            INSERT INTO tournaments (tournament_id, start_time) VALUES
+                ('T1', '2024/03/05 18:00:00'), ('T2', NULL), ('T3', 'не дата');
+            PRAGMA user_version = 2;
+        """)
+
+        migrations.migrate(self.conn)
+
+        rows = self.conn.execute(
+            "SELECT start_time, start_epoch, start_day FROM tournaments ORDER BY tournament_id"
+        ).fetchall()
+        epoch = db.schema.start_time_epoch("2024/03/05 18:00:00")
+        self.assertEqual(rows[0], ("2024/03/05 18:00:00", epoch, db.schema.epoch_day(epoch)))
+        self.assertEqual([row[1:] for row in rows[1:]], [(None, None), (None, None)])
+        indexes = {row[0] for row in self.conn.execute("SELECT name FROM sqlite_master WHERE type='index'")}
+        self.assertNotIn("idx_tournaments_start_time", indexes)
+        self.assertIn("idx_tournaments_start_epoch", indexes)
+
+    def test_newer_schema_is_left_untouched(self):
+        self.conn.execute(f"PRAGMA user_version = {migrations.latest_schema_version() + 1}")
+        self.assertEqual(migrations.migrate(self.conn), 0)
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()[0], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
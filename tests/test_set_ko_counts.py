@@ -0,0 +1,45 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from services import app_config  # noqa: F401  (инициализирует пакет services до db)
+from db.manager import DatabaseManager
+from db.repositories import TournamentRepository
+from models import Tournament
+
+
+class TestSetKoCounts(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db = DatabaseManager(os.path.join(self.tmp_dir, "ko.db"))
+        self.repo = TournamentRepository(self.db)
+        self.repo.add_or_update_many([
+            Tournament(tournament_id=f"T{i}", ko_count=5.0) for i in range(1, 5)
+        ])
+
+    def tearDown(self):
+        self.db.close_all_connections()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def _ko(self):
+        return {
+            tid: t.ko_count
+            for tid, t in self.repo.get_tournaments_by_ids(["T1", "T2", "T3", "T4"]).items()
+        }
+
+    def test_sets_values_and_resets_missing(self):
+        self.repo.set_ko_counts({"T1": 2.0, "T2": 1.5}, reset_ids=["T1", "T2", "T3"])
+        self.assertEqual(self._ko(), {"T1": 2.0, "T2": 1.5, "T3": 0, "T4": 5.0})
+
+    def test_unchanged_rows_are_not_rewritten(self):
+        updated = self.repo.set_ko_counts({"T1": 5.0, "T2": 3.0})
+        self.assertEqual(updated, 1)
+        self.assertEqual(self.repo.set_ko_counts({}), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import os
+import sys
+import json
+import shutil
+import tempfile
+import subprocess
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import services  # noqa: F401  (инициализирует пакеты в порядке приложения)
+import stats
+from stats.registry import INDEX_FILE_NAME, load_plugin_index
+
+REPO_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+PLUGIN_SOURCE = '''
+from stats.base import BaseStat
+
+
+class SampleStat(BaseStat):
+    name = "Sample"
+    description = ("Пример " "плагина")
+
+
+class DerivedStat(SampleStat):
+    name: str = "{derived}"
+
+
+class Helper:
+    name = "not a stat"
+'''
+
+
+class TestStatRegistry(unittest.TestCase):
+    def test_index_matches_plugin_classes(self):
+        classes = {cls.__name__: cls for cls in stats.discover_plugins()}
+        index = stats.get_plugin_index()
+        self.assertEqual({info.class_name for info in index}, set(classes))
+        for info in index:
+            cls = classes[info.class_name]
+            self.assertEqual(info.module, cls.__module__)
+            self.assertEqual(info.name, cls.name)
+            if info.description is not None:
+                self.assertEqual(info.description, cls.description)
+
+    def test_lazy_plugins_report_real_names(self):
+        for plugin in stats.create_stat_plugins(entry_point_group=None):
+            self.assertEqual(plugin.name, plugin.plugin.name)
+            self.assertEqual(plugin.description, plugin.plugin.description)
+
+    def test_plugin_modules_imported_on_first_compute(self):
+        script = (
+            "import sys, json\n"
+            "import services\n"
+            "from stats import create_stat_plugins\n"
+            "plugins = {p.name: p for p in create_stat_plugins()}\n"
+            "before = sorted(m for m in sys.modules if m.startswith('stats.') and m not in ('stats.base', 'stats.registry'))\n"
+            "plugins['Total KO'].compute([], [])\n"
+            "after = sorted(m for m in sys.modules if m.startswith('stats.') and m not in ('stats.base', 'stats.registry'))\n"
+            "print(json.dumps([before, after]))\n"
+        )
+        completed = subprocess.run(
+            [sys.executable, "-c", script], cwd=REPO_DIR, capture_output=True, text=True, check=True
+        )
+        before, after = json.loads(completed.stdout.strip().splitlines()[-1])
+        self.assertEqual(before, [])
+        self.assertEqual(after, ["stats.total_ko"])
+
+    def test_index_cache_is_refreshed_on_change(self):
+        package_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, package_dir, ignore_errors=True)
+        plugin_path = os.path.join(package_dir, "sample.py")
+        with open(plugin_path, "w", encoding="utf-8") as f:
+            f.write(PLUGIN_SOURCE.format(derived="Derived"))
+
+        index = load_plugin_index(package_dir, "sample_pkg")
+        self.assertEqual(
+            [(i.class_name, i.module, i.name, i.description) for i in index],
+            [
+                ("SampleStat", "sample_pkg.sample", "Sample", "Пример плагина"),
+                ("DerivedStat", "sample_pkg.sample", "Derived", None),
+            ],
+        )
+        self.assertTrue(os.path.exists(os.path.join(package_dir, "__pycache__", INDEX_FILE_NAME)))
+        self.assertEqual(load_plugin_index(package_dir, "sample_pkg"), index)
+
+        with open(plugin_path, "w", encoding="utf-8") as f:
+            f.write(PLUGIN_SOURCE.format(derived="Derived v2"))
+        index = load_plugin_index(package_dir, "sample_pkg")
+        self.assertEqual(index[1].name, "Derived v2")
+
+
+if __name__ == "__main__":
+    unittest.main()
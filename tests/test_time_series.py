@@ -0,0 +1,92 @@
+import os
+import shutil
+import sys
+import random
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+
+from services import app_config  # noqa: F401  (services до db, как в приложении)
+from db.manager import DatabaseManager
+from db.repositories import TournamentRepository, SessionRepository
+from db.schema import start_time_epoch
+from models import Tournament
+from analytics.time_series import TournamentTimeSeries
+
+
+class TestTournamentTimeSeries(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(3)
+        self.rows = []
+        epoch = 1_700_000_000
+        for _ in range(250):
+            epoch += rng.choice((600, 3600, 40000))
+            place = rng.randint(1, 18)
+            self.rows.append((
+                epoch, rng.choice((0.0, 1.0, 10.0)), rng.random() * 50 if place <= 3 else 0.0,
+                float(rng.randint(0, 3)), place,
+            ))
+        self.series = TournamentTimeSeries.from_rows(self.rows)
+
+    def test_rolling_matches_direct_window_sums(self):
+        window = 30
+        rolling = self.series.rolling(window)
+        for i in (0, 5, 29, 30, 149, 249):
+            chunk = self.rows[max(0, i + 1 - window):i + 1]
+            buyin = sum(r[1] for r in chunk)
+            profit = sum(r[2] - r[1] for r in chunk)
+            self.assertAlmostEqual(rolling.roi[i], profit / buyin * 100 if buyin else 0.0)
+            self.assertAlmostEqual(rolling.itm[i], sum(r[4] <= 3 for r in chunk) / len(chunk) * 100)
+            self.assertAlmostEqual(rolling.ko_per_tournament[i], sum(r[3] for r in chunk) / len(chunk))
+        self.assertIs(self.series.rolling(window), rolling)
+
+        cumulative = np.cumsum([r[2] - r[1] for r in self.rows])
+        np.testing.assert_allclose(self.series.cumulative_profit(), cumulative)
+
+    def test_daily_aggregates(self):
+        daily = self.series.daily()
+        by_day = {}
+        for row in self.rows:
+            by_day.setdefault(row[0] // 86400, []).append(row)
+        self.assertEqual(list(daily.day), sorted(by_day))
+        self.assertEqual(list(daily.tournaments), [len(by_day[d]) for d in sorted(by_day)])
+        np.testing.assert_allclose(daily.profit, [sum(r[2] - r[1] for r in by_day[d]) for d in sorted(by_day)])
+        self.assertAlmostEqual(daily.cumulative_profit[-1], self.series.cumulative_profit()[-1])
+
+    def test_empty_series(self):
+        series = TournamentTimeSeries.from_rows([])
+        self.assertEqual(len(series.cumulative_profit()), 0)
+        self.assertEqual(len(series.rolling(10).roi), 0)
+        self.assertEqual(len(series.daily().day), 0)
+
+
+class TestTimeSeriesRows(unittest.TestCase):
+    def setUp(self):
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir, ignore_errors=True)
+        self.db = DatabaseManager(os.path.join(tmp_dir, "series.db"))
+        self.addCleanup(self.db.close_all_connections)
+        self.repo = TournamentRepository(self.db)
+        session_id = SessionRepository(self.db).create_session("S").session_id
+        self.repo.add_or_update_many([
+            Tournament(tournament_id="T2", session_id=session_id, buyin=10.0, start_time="2024/03/09 18:00:00"),
+            Tournament(tournament_id="T1", session_id=session_id, buyin=10.0, payout=40.0, finish_place=1,
+                       start_time="2024/03/05 18:00:00"),
+            Tournament(tournament_id="T3", session_id=session_id, buyin=10.0),
+        ])
+
+    def test_rows_are_ordered_and_filtered_by_epoch(self):
+        rows = self.repo.get_time_series_rows()
+        self.assertEqual(rows, [
+            (start_time_epoch("2024/03/05 18:00:00"), 10.0, 40.0, 0.0, 1),
+            (start_time_epoch("2024/03/09 18:00:00"), 10.0, 0.0, 0.0, 0),
+        ])
+        rows = self.repo.get_time_series_rows(start_time_from="2024/03/06 00:00:00")
+        self.assertEqual([r[0] for r in rows], [start_time_epoch("2024/03/09 18:00:00")])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -8,9 +8,10 @@
 from PyQt6 import QtWidgets, QtCore, QtGui
 import os
 import logging
-from typing import Optional, List
+from typing import Optional, List, Dict
 
 from services import AppFacade
+from services.db_summary import DatabaseSummary
 
 logger = logging.getLogger('ROYAL_Stats.DatabaseDialog')
 
@@ -24,6 +25,7 @@ class DatabaseManagementDialog(QtWidgets.QDialog):
         self.selected_db_path = None
         self.sort_mode = "name"  # name or date
         self.all_db_paths: List[str] = []  # Храним полный список БД для фильтрации
+        self.summaries: Dict[str, Optional[DatabaseSummary]] = {}  # Сводки БД без подключения к ним
         self._init_ui()
         self._load_databases()
         
@@ -186,6 +188,7 @@ class DatabaseManagementDialog(QtWidgets.QDialog):
             other_dbs.sort(key=lambda x: os.path.basename(x).lower())
 
         self.all_db_paths = [current_db] + other_dbs if current_db in db_files else other_dbs
+        self.summaries = self.app_service.get_database_summaries(self.all_db_paths)
         self._apply_filter()
 
     def _on_sort_changed(self):
@@ -205,11 +208,14 @@ class DatabaseManagementDialog(QtWidgets.QDialog):
             if search in db_name.lower():
                 item = QtWidgets.QListWidgetItem(db_name)
                 item.setData(QtCore.Qt.ItemDataRole.UserRole, db_path)
+                summary = self.summaries.get(db_path)
                 if db_path == current_db:
                     item.setText(f"{db_name} (текущая)")
                     font = item.font()
                     font.setBold(True)
                     item.setFont(font)
+                if summary is not None:
+                    item.setText(f"{item.text()} — {summary.tournaments} турн.{self._format_roi(summary)}")
                 self.db_list.addItem(item)
 
         if self.db_list.count() > 0:
@@ -234,6 +240,7 @@ class DatabaseManagementDialog(QtWidgets.QDialog):
                     f"Путь: {db_path}\n"
                     f"Размер: {file_size:.2f} МБ\n"
                     f"Изменен: {mod_date}"
+                    + self._format_summary(self.summaries.get(db_path))
                 )
             except Exception as e:
                 self.info_label.setText(f"Ошибка получения информации: {e}")
@@ -258,6 +265,32 @@ class DatabaseManagementDialog(QtWidgets.QDialog):
             self.select_btn.setEnabled(False)
             self.delete_db_btn.setEnabled(False)
             
+    @staticmethod
+    def _format_roi(summary: DatabaseSummary) -> str:
+        """ROI для строки списка (пусто, если бай-инов нет)."""
+        roi = summary.roi
+        return "" if roi is None else f", ROI {roi:+.1f}%"
+
+    @staticmethod
+    def _format_summary(summary: Optional[DatabaseSummary]) -> str:
+        """Показатели БД из сводки для панели информации."""
+        if summary is None:
+            return "\nСводка появится после открытия БД"
+
+        def _date(value: Optional[str]) -> str:
+            # start_time хранится как YYYY/MM/DD HH:MM:SS
+            return value[:10].replace("/", ".") if value else "—"
+
+        roi = summary.roi
+        return (
+            f"\nТурниров: {summary.tournaments}, финалок: {summary.final_tables}, "
+            f"сессий: {summary.sessions}\n"
+            f"Период: {_date(summary.first_start_time)} — {_date(summary.last_start_time)}\n"
+            f"Бай-ины: ${summary.total_buy_in:.2f}, выплаты: ${summary.total_prize:.2f}, "
+            f"ROI: {'—' if roi is None else f'{roi:+.2f}%'}\n"
+            f"KO: {summary.knockouts:.1f}"
+        )
+
     def _on_db_double_clicked(self, item):
         """Обработчик двойного клика по БД."""
         if item:
@@ -356,7 +389,7 @@ class DatabaseManagementDialog(QtWidgets.QDialog):
             errors = []
             for path in db_paths:
                 try:
-                    os.remove(path)
+                    self.app_service.delete_database(path)
                 except Exception as e:
                     errors.append(f"{os.path.basename(path)}: {e}")
 
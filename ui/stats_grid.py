@@ -2,7 +2,8 @@
 
 """
 Компонент для отображения общей статистики и графиков.
-Отображает карточки с ключевыми показателями и гистограмму распределения мест.
+Отображает карточки с ключевыми показателями, гистограмму распределения мест
+и графики по времени (прореженные под ширину графика, см. analytics.downsampling).
 """
 
 from PyQt6 import QtWidgets, QtCore, QtGui
@@ -14,17 +15,17 @@ from PyQt6.QtCharts import (
     QBarCategoryAxis,
     QValueAxis,
     QStackedBarSeries,
+    QLineSeries,
+    QDateTimeAxis,
 )
 import logging
 from typing import Dict, List, Any
 import math
-from statistics import median
 from datetime import datetime
 
 from services.app_config import app_config
 from services import AppFacade
 from models import OverallStats
-from db.repositories import FinalTableHandRepository
 
 # Импортируем функции стилизации
 from ui.app_style import (
@@ -35,34 +36,18 @@ from ui.app_style import (
     apply_bigko_high_tier_color,
 )
 
-# Импортируем плагины для получения их результатов
-from stats import (
-    TotalKOStat,
-    ITMStat,
-    ROIStat,
-    BigKOStat,
-    AvgKOPerTournamentStat,
-    FinalTableReachStat,
-    AvgFTInitialStackStat,
-    EarlyFTKOStat,
-    EarlyFTBustStat,
-    FTStackConversionStat,
-    FTStackConversionAttemptsStat,
-    AvgFinishPlaceStat,
-    AvgFinishPlaceFTStat,
-    AvgFinishPlaceNoFTStat,
-    PreFTKOStat,
-    IncompleteFTPercentStat,
-    KOLuckStat,
-    ROIAdjustedStat,
-    KOContributionStat,
-)
-
 from ui.background import thread_manager
+from analytics import FTStackDistributions, chart_points_for_width, downsample, visible_slice
 
 logger = logging.getLogger('ROYAL_Stats.StatsGrid')
 logger.setLevel(logging.DEBUG if app_config.debug else logging.INFO)
 
+# Графики временных рядов и метод их прореживания (см. analytics.downsampling)
+TIME_SERIES_CHARTS = {'profit': 'minmax', 'rolling_roi': 'lttb'}
+ROLLING_ROI_WINDOW = 100  # турниров в окне скользящего ROI
+# При большем числе точек (столбцов) анимация серий отключается
+CHART_ANIMATION_MAX_POINTS = 500
+
 
 class StatCard(QtWidgets.QFrame):
     """Карточка для отображения одного показателя статистики."""
@@ -231,8 +216,6 @@ class StatsGrid(QtWidgets.QWidget):
     def __init__(self, app_service: AppFacade, parent=None):
         super().__init__(parent)
         self.app_service = app_service
-        self._data_cache = {}  # Кеш для данных
-        self._cache_valid = False  # Флаг валидности кеша
         self.current_buyin_filter = None
         self.current_session_id = None
         # По умолчанию показываем статистику начиная с 1 января 2024 года
@@ -247,12 +230,23 @@ class StatsGrid(QtWidgets.QWidget):
 
         # Настройки гистограммы стеков FT
         self.ft_stack_step = 200  # шаг интервалов в фишках
-        self._current_tournaments = []  # сохраненные турниры для перерасчета
-        self._current_ft_hands = []  # сохраненные руки финалок
+        self._ft_stack_distributions = None  # распределения по стекам FT (кеш по шагу)
         self.ft_stack_roi_dist = {}  # распределение ROI по стекам FT
         self.ft_stack_conv_dist = {}  # распределение конверсии по стекам FT
         self.ko_attempts_dist = {}  # распределение попыток KO за руку
 
+        # Временной ряд турниров загружается только для графиков по времени
+        self._time_series = None
+        self._ts_line = None
+        self._ts_x = None
+        self._ts_y = None
+        self._ts_axes = None
+        self._ts_method = 'minmax'
+        # Прореживание пересчитывается после изменения размера/масштаба (debounce)
+        self._ts_refresh_timer = QtCore.QTimer()
+        self._ts_refresh_timer.setSingleShot(True)
+        self._ts_refresh_timer.timeout.connect(self._refresh_time_series_points)
+
         self._init_ui()
         
     def _init_ui(self):
@@ -470,6 +464,8 @@ class StatsGrid(QtWidgets.QWidget):
             "ROI по стекам FT",
             "Конверсия по стекам FT",
             "Попытки KO",
+            "Профит по времени",
+            f"Скользящий ROI ({ROLLING_ROI_WINDOW} турниров)",
         ])
         self.chart_selector.currentIndexChanged.connect(self._on_chart_selector_changed)
         self.chart_type = 'ft'
@@ -800,9 +796,7 @@ class StatsGrid(QtWidgets.QWidget):
         self.reload()
             
     def invalidate_cache(self):
-        """Сбрасывает кеш данных."""
-        self._cache_valid = False
-        self._data_cache.clear()
+        """Сбрасывает отображаемые данные (кеш результатов хранится в AppFacade)."""
         # Сбрасываем отображаемые значения карточек
         for card in self.cards.values():
             card.update_value("-")
@@ -810,6 +804,8 @@ class StatsGrid(QtWidgets.QWidget):
             card.update_value("-")
         # Очищаем график
         self._clear_chart_overlays()
+        self._time_series = None
+        self._ts_line = None
         empty_chart = QChart()
         empty_chart.setTheme(QChart.ChartTheme.ChartThemeDark)
         self.chart_view.setChart(empty_chart)
@@ -849,80 +845,61 @@ class StatsGrid(QtWidgets.QWidget):
             self._session_map.get(session_name) if session_name and session_name != "Все" else None
         )
 
-        cache_key = (
-            self.current_buyin_filter,
-            self.current_session_id,
-            self.current_date_from,
-            self.current_date_to,
-        )
-        if self._cache_valid and cache_key in self._data_cache:
-            logger.debug("Используем кешированные данные StatsGrid")
-            self._on_data_loaded(self._data_cache[cache_key])
-            return
+        # Временной ряд загружаем вместе с остальными данными, только если
+        # выбран график по времени; иначе - при переключении на такой график
+        thread_manager.cancel(f"{id(self)}_time_series")
+        self._time_series = None
+        with_time_series = self.chart_type in TIME_SERIES_CHARTS
 
         def load_data(is_cancelled_callback=None):
             # Проверяем отмену перед загрузкой
             if is_cancelled_callback and is_cancelled_callback():
                 return None
 
-            # Создаем ViewModel через AppFacade
             date_from_str = self.current_date_from.strftime("%Y/%m/%d %H:%M:%S") if self.current_date_from else None
             date_to_str = self.current_date_to.strftime("%Y/%m/%d %H:%M:%S") if self.current_date_to else None
-            
-            viewmodel = self.app_service.create_stats_grid_viewmodel(
+
+            # AppFacade отдает результат из LRU-кеша или загружает снимок данных
+            # один раз и для ViewModel, и для распределений графиков
+            stats_result = self.app_service.get_stats_grid_result(
                 session_id=self.current_session_id,
                 buyin_filter=self.current_buyin_filter,
                 date_from=date_from_str,
                 date_to=date_to_str
             )
-            
-            # Проверяем отмену после создания ViewModel
+
+            # Проверяем отмену после загрузки данных
             if is_cancelled_callback and is_cancelled_callback():
                 return None
 
-            # Для совместимости с текущей логикой сохраняем доп. данные
-            # которые нужны для графиков (временно, пока не перенесем их в ViewModel)
-            tournaments = self.app_service.get_tournaments_filtered(
-                session_id=self.current_session_id,
-                buyin_filter=self.current_buyin_filter,
-                start_time_from=date_from_str,
-                start_time_to=date_to_str,
-            )
-
-            tournament_ids = [t.tournament_id for t in tournaments]
-            ft_repo = FinalTableHandRepository()
-            ft_hands = ft_repo.get_hands_by_filters(
-                session_id=self.current_session_id,
-                tournament_ids=tournament_ids if tournament_ids else None
-            )
-
-            # Новое распределение для стеков FT и медиана
-            ft_stack_dist, ft_stack_median = self._calculate_ft_stack_distribution(
-                tournaments, step=self.ft_stack_step
-            )
-            # Распределение среднего ROI по стекам FT
-            ft_stack_roi_dist, _ = self._calculate_ft_stack_roi_distribution(
-                tournaments, step=self.ft_stack_step
-            )
-            # Распределение конверсии по стекам FT
-            ft_stack_conv_dist, _ = self._calculate_ft_stack_conversion_distribution(
-                tournaments, ft_hands, step=self.ft_stack_step
-            )
-            # Распределение попыток KO за руку
-            ko_attempts_dist = self._calculate_ko_attempts_distribution(ft_hands)
+            chart_data = stats_result.chart_data
+
+            # Распределения по стекам FT кешируются по шагу внутри объекта,
+            # поэтому смена плотности графика не требует перерасчета
+            ft_stack_distributions = FTStackDistributions(chart_data.ft_stacks)
+            ft_stack_dist, ft_stack_median = ft_stack_distributions.stack_distribution(self.ft_stack_step)
+            ft_stack_roi_dist, _ = ft_stack_distributions.roi_distribution(self.ft_stack_step)
+            ft_stack_conv_dist, _ = ft_stack_distributions.conversion_distribution(self.ft_stack_step)
+
+            time_series = None
+            if with_time_series:
+                time_series = self.app_service.get_time_series(
+                    session_id=self.current_session_id,
+                    buyin_filter=self.current_buyin_filter,
+                    date_from=date_from_str,
+                    date_to=date_to_str
+                )
 
-            result = {
-                'viewmodel': viewmodel,
-                'all_tournaments': tournaments,
+            return {
+                'viewmodel': stats_result.viewmodel,
+                'ft_stack_distributions': ft_stack_distributions,
                 'ft_stack_dist': ft_stack_dist,
                 'ft_stack_median': ft_stack_median,
+                'ft_stack_roi_dist': ft_stack_roi_dist,
                 'ft_stack_conv_dist': ft_stack_conv_dist,
-                'ko_attempts_dist': ko_attempts_dist,
-                'ft_hands': ft_hands,
+                'ko_attempts_dist': chart_data.ko_attempts_dist,
+                'time_series': time_series,
             }
-            self._data_cache[cache_key] = result
-            self._cache_valid = True
-            return result
         thread_manager.run_in_thread(
             widget_id=str(id(self)),
             fn=load_data,
@@ -939,7 +916,6 @@ class StatsGrid(QtWidgets.QWidget):
             
         try:
             viewmodel = data['viewmodel']
-            all_tournaments = data['all_tournaments']
             
             # Обновляем карточки статистики из ViewModel
             for card_id, stat_card_vm in viewmodel.stat_cards.items():
@@ -1029,16 +1005,12 @@ class StatsGrid(QtWidgets.QWidget):
             self.place_dist_all = viewmodel.place_distributions.get('all', {}).place_distribution if 'all' in viewmodel.place_distributions else {}
 
             # Сохраняем данные для перерасчета распределений
-            self._current_tournaments = all_tournaments
-            self._current_ft_hands = data.get('ft_hands', [])
+            self._ft_stack_distributions = data['ft_stack_distributions']
             self.ft_stack_dist, self.ft_stack_median = data['ft_stack_dist'], data['ft_stack_median']
-            self.ft_stack_roi_dist, _ = self._calculate_ft_stack_roi_distribution(
-                self._current_tournaments, step=self.ft_stack_step
-            )
-            self.ft_stack_conv_dist, _ = self._calculate_ft_stack_conversion_distribution(
-                self._current_tournaments, self._current_ft_hands, step=self.ft_stack_step
-            )
+            self.ft_stack_roi_dist = data['ft_stack_roi_dist']
+            self.ft_stack_conv_dist = data['ft_stack_conv_dist']
             self.ko_attempts_dist = data.get('ko_attempts_dist', {})
+            self._time_series = data.get('time_series')
             self._update_chart(self._get_current_distribution())
             self.overallStatsChanged.emit(viewmodel.overall_stats)
 
@@ -1145,6 +1117,8 @@ class StatsGrid(QtWidgets.QWidget):
             if not t.reached_final_table and t.finish_place is not None
         ]
         stats.avg_finish_place_no_ft = sum(no_ft_places) / len(no_ft_places) if no_ft_places else 0.0
+        from stats import BigKOStat
+
         bigko = BigKOStat().compute(tournaments, ft_hands, [])
         stats.big_ko_x1_5 = bigko.get("x1.5", 0)
         stats.big_ko_x2 = bigko.get("x2", 0)
@@ -1185,241 +1159,6 @@ class StatsGrid(QtWidgets.QWidget):
         self.roi_adj_tooltip.move(tooltip_pos)
         self.roi_adj_tooltip.show()
     
-    def _calculate_ft_stack_distribution(self, tournaments, step: int = 200):
-        """Рассчитывает распределение стеков выхода на FT в фишках
-        и медиану значений.
-
-        :param tournaments: список турниров
-        :param step: величина интервала для баров
-        """
-        # Инициализируем словарь для распределения
-        ft_stack_dist = {}
-        stack_values = []
-        
-        # Форматирование чисел для отображения
-        def format_range(start, end):
-            if start >= 1000:
-                start_str = f"{start/1000:.1f}k".rstrip('0').rstrip('.')
-            else:
-                start_str = str(start)
-            if end >= 1000:
-                end_str = f"{end/1000:.1f}k".rstrip('0').rstrip('.')
-            else:
-                end_str = str(end)
-            return f"{start_str}-{end_str}"
-
-        # Края распределения  
-        ft_stack_dist["≤800"] = 0
-        
-        # Промежуточные интервалы с заданным шагом
-        current = 800
-        while current < 4000:
-            next_boundary = current + step
-            if next_boundary > 4000:
-                break
-            key = format_range(current, next_boundary)
-            ft_stack_dist[key] = 0
-            current = next_boundary
-            
-        ft_stack_dist["≥4k"] = 0
-
-        # Подсчитываем распределение
-        for t in tournaments:
-            if t.reached_final_table and t.final_table_initial_stack_chips is not None:
-                chips = t.final_table_initial_stack_chips
-                stack_values.append(chips)
-
-                if chips <= 800:
-                    ft_stack_dist["≤800"] += 1
-                elif chips >= 4000:
-                    ft_stack_dist["≥4k"] += 1
-                else:
-                    # Находим подходящий интервал
-                    interval_start = int((chips - 800) / step) * step + 800
-                    interval_end = interval_start + step
-                    if interval_end > 4000:
-                        ft_stack_dist["≥4k"] += 1
-                    else:
-                        key = format_range(interval_start, interval_end)
-                        if key in ft_stack_dist:
-                            ft_stack_dist[key] += 1
-
-        median_value = median(stack_values) if stack_values else None
-
-        return ft_stack_dist, median_value
-    
-    def _calculate_ft_stack_roi_distribution(self, tournaments, step: int = 200):
-        """Рассчитывает средний ROI для каждого интервала стеков на FT в фишках.
-        
-        :param tournaments: список турниров
-        :param step: величина интервала для баров
-        :returns: (словарь интервалов со средним ROI, медиана стеков)
-        """
-        # Инициализируем словари для хранения сумм прибыли и бай-инов
-        # для каждого интервала. Такой подход позволяет получить средний ROI
-        # с учетом размера бай-ина, а не простым средним арифметическим
-        # значений отдельных турниров.
-        roi_by_interval = {}
-        stack_values = []
-        
-        # Форматирование чисел для отображения
-        def format_range(start, end):
-            if start >= 1000:
-                start_str = f"{start/1000:.1f}k".rstrip('0').rstrip('.')
-            else:
-                start_str = str(start)
-            if end >= 1000:
-                end_str = f"{end/1000:.1f}k".rstrip('0').rstrip('.')
-            else:
-                end_str = str(end)
-            return f"{start_str}-{end_str}"
-        
-        # Создаём ключи интервалов
-        interval_keys = ["≤800"]
-        current = 800
-        while current < 4000:
-            next_boundary = current + step
-            if next_boundary > 4000:
-                break
-            key = format_range(current, next_boundary)
-            interval_keys.append(key)
-            current = next_boundary
-        interval_keys.append("≥4k")
-        
-        # Инициализируем словари для каждого интервала
-        for key in interval_keys:
-            roi_by_interval[key] = {
-                'profit_sum': 0.0,
-                'buyin_sum': 0.0,
-            }
-        
-        # Собираем данные по турнирам
-        for t in tournaments:
-            if t.reached_final_table and t.final_table_initial_stack_chips is not None:
-                chips = t.final_table_initial_stack_chips
-                stack_values.append(chips)
-                
-                # Вычисляем прибыль и учитываем бай-ин. Если бай-ин отсутствует,
-                # такой турнир пропускаем, так как ROI для него некорректен.
-                if not t.buyin or t.buyin <= 0:
-                    continue
-                profit = (t.payout - t.buyin) if t.payout else -t.buyin
-                
-                # Определяем интервал
-                if chips <= 800:
-                    roi_key = "≤800"
-                elif chips >= 4000:
-                    roi_key = "≥4k"
-                else:
-                    # Находим подходящий интервал
-                    interval_start = int((chips - 800) / step) * step + 800
-                    interval_end = interval_start + step
-                    if interval_end > 4000:
-                        roi_key = "≥4k"
-                    else:
-                        roi_key = format_range(interval_start, interval_end)
-                if roi_key in roi_by_interval:
-                    roi_by_interval[roi_key]['profit_sum'] += profit
-                    roi_by_interval[roi_key]['buyin_sum'] += t.buyin
-        
-        # Рассчитываем средний ROI для каждого интервала
-        avg_roi_by_interval = {}
-        for key in interval_keys:
-            data = roi_by_interval[key]
-            if data['buyin_sum'] > 0:
-                avg_roi_by_interval[key] = (data['profit_sum'] / data['buyin_sum']) * 100
-            else:
-                avg_roi_by_interval[key] = 0
-        
-        median_value = median(stack_values) if stack_values else None
-
-        return avg_roi_by_interval, median_value
-
-    def _calculate_ft_stack_conversion_distribution(self, tournaments, ft_hands, step: int = 200):
-        """Рассчитывает конверсию стека в ранние KO для интервалов стеков."""
-
-        conv_by_interval = {}
-        stack_values = []
-
-        def format_range(start, end):
-            if start >= 1000:
-                start_str = f"{start/1000:.1f}k".rstrip('0').rstrip('.')
-            else:
-                start_str = str(start)
-            if end >= 1000:
-                end_str = f"{end/1000:.1f}k".rstrip('0').rstrip('.')
-            else:
-                end_str = str(end)
-            return f"{start_str}-{end_str}"
-
-        interval_keys = ["≤800"]
-        current = 800
-        while current < 4000:
-            next_boundary = current + step
-            if next_boundary > 4000:
-                break
-            key = format_range(current, next_boundary)
-            interval_keys.append(key)
-            current = next_boundary
-        interval_keys.append("≥4k")
-
-        for key in interval_keys:
-            conv_by_interval[key] = []
-
-        hands_map = {}
-        for h in ft_hands:
-            hands_map.setdefault(h.tournament_id, []).append(h)
-
-        for t in tournaments:
-            if (
-                t.reached_final_table and
-                t.final_table_initial_stack_chips is not None and
-                t.final_table_start_players is not None
-            ):
-                chips = t.final_table_initial_stack_chips
-                stack_values.append(chips)
-
-                early_hands = [hh for hh in hands_map.get(t.tournament_id, []) if hh.is_early_final]
-                actual_ko = sum(h.hero_ko_this_hand - h.pre_ft_ko for h in early_hands)
-                possible_ko = max(0, t.final_table_start_players - 5)
-                expected_ko = (chips / 18000) * possible_ko
-                conv = actual_ko / expected_ko if expected_ko > 0 else 0.0
-
-                if chips <= 800:
-                    key = "≤800"
-                elif chips >= 4000:
-                    key = "≥4k"
-                else:
-                    interval_start = int((chips - 800) / step) * step + 800
-                    interval_end = interval_start + step
-                    if interval_end > 4000:
-                        key = "≥4k"
-                    else:
-                        key = format_range(interval_start, interval_end)
-                if key in conv_by_interval:
-                    conv_by_interval[key].append(conv)
-
-        avg_conv_by_interval = {}
-        for key in interval_keys:
-            vals = conv_by_interval[key]
-            avg_conv_by_interval[key] = sum(vals) / len(vals) if vals else 0.0
-
-        median_value = median(stack_values) if stack_values else None
-
-        return avg_conv_by_interval, median_value
-
-    def _calculate_ko_attempts_distribution(self, ft_hands):
-        """Рассчитывает распределение количества попыток KO в одной руке."""
-        # Игнорируем руки без попыток KO и объединяем все значения 5+
-        dist = {i: 0 for i in range(1, 6)}  # 1-4 и 5+
-        for hand in ft_hands:
-            attempts = hand.hero_ko_attempts or 0
-            if attempts == 0:
-                continue  # не учитываем руки без попыток
-            bucket = attempts if attempts < 5 else 5
-            dist[bucket] += 1
-        return dist
-
     def _clear_chart_overlays(self):
         """Удаляет вспомогательные элементы (метки и медианную линию) с графика."""
         current_chart = self.chart_view.chart()
@@ -1440,6 +1179,12 @@ class StatsGrid(QtWidgets.QWidget):
 
     def _update_chart(self, place_dist=None):
         """Обновляет гистограмму распределения мест."""
+        if self.chart_type in TIME_SERIES_CHARTS:
+            self._update_time_series_chart()
+            return
+        self._ts_line = None
+        self.chart_view.setRubberBand(QChartView.RubberBand.NoRubberBand)
+
         if place_dist is None:
             place_dist = self._get_current_distribution()
 
@@ -1458,7 +1203,7 @@ class StatsGrid(QtWidgets.QWidget):
             
         chart = QChart()
         chart.setTitle("")  # Убираем заголовок, так как он уже есть над графиком
-        chart.setAnimationOptions(QChart.AnimationOption.SeriesAnimations)
+        chart.setAnimationOptions(self._animation_options(len(place_dist)))
         chart.setTheme(QChart.ChartTheme.ChartThemeDark)
         chart.setBackgroundBrush(QtGui.QBrush(QtGui.QColor("#18181B")))
         chart.legend().setVisible(False)
@@ -1507,7 +1252,7 @@ class StatsGrid(QtWidgets.QWidget):
         # Специальная сортировка для стеков FT
         if self.chart_type in ['ft_stack', 'ft_stack_roi', 'ft_stack_conv']:
             # Сохраняем порядок категорий, как они были сгенерированы
-            # в _calculate_ft_stack_distribution
+            # в analytics.ft_stack_bucket_labels
             categories = []
             for key in place_dist.keys():
                 if key not in categories:
@@ -1938,6 +1683,148 @@ class StatsGrid(QtWidgets.QWidget):
         """Обновляет позицию медианной линии при изменении размера графика."""
         self._add_median_line(chart, place_dist)
 
+    @staticmethod
+    def _animation_options(points: int):
+        """Анимация серий только для небольших графиков: на больших она тормозит перерисовку."""
+        if points > CHART_ANIMATION_MAX_POINTS:
+            return QChart.AnimationOption.NoAnimation
+        return QChart.AnimationOption.SeriesAnimations
+
+    def _load_time_series(self):
+        """Загружает в фоне временной ряд турниров для графиков по времени."""
+        session_id = self.current_session_id
+        buyin_filter = self.current_buyin_filter
+        date_from_str = self.current_date_from.strftime("%Y/%m/%d %H:%M:%S") if self.current_date_from else None
+        date_to_str = self.current_date_to.strftime("%Y/%m/%d %H:%M:%S") if self.current_date_to else None
+
+        def load_series(is_cancelled_callback=None):
+            if is_cancelled_callback and is_cancelled_callback():
+                return None
+            return self.app_service.get_time_series(
+                session_id=session_id,
+                buyin_filter=buyin_filter,
+                date_from=date_from_str,
+                date_to=date_to_str
+            )
+
+        thread_manager.run_in_thread(
+            widget_id=f"{id(self)}_time_series",
+            fn=load_series,
+            callback=self._on_time_series_loaded,
+            error_callback=self._on_load_error,
+            owner=self
+        )
+
+    def _on_time_series_loaded(self, series):
+        """Сохраняет загруженный временной ряд и перестраивает график по времени."""
+        if series is None:
+            return
+        self._time_series = series
+        if self.chart_type in TIME_SERIES_CHARTS:
+            self._update_chart()
+
+    def _update_time_series_chart(self):
+        """Строит линейный график по времени (накопленный профит или скользящий ROI)."""
+        self._clear_chart_overlays()
+        self._ts_line = None
+
+        chart = QChart()
+        chart.setTitle("")
+        chart.setTheme(QChart.ChartTheme.ChartThemeDark)
+        chart.setBackgroundBrush(QtGui.QBrush(QtGui.QColor("#18181B")))
+        chart.legend().setVisible(False)
+        chart.setMargins(QtCore.QMargins(10, 10, 10, 10))
+
+        series = self._time_series
+        if series is None:
+            chart.setTitle("Загрузка...")
+            self.chart_view.setChart(chart)
+            self._load_time_series()
+            return
+        if not len(series):
+            chart.setTitle("Нет турниров с известным временем начала")
+            self.chart_view.setChart(chart)
+            return
+
+        # QDateTimeAxis подписывает ось в локальном времени, а start_epoch -
+        # время из истории, посчитанное как UTC: сдвигаем на смещение пояса,
+        # чтобы даты на оси совпадали с датами турниров
+        offset = QtCore.QDateTime.currentDateTime().offsetFromUtc()
+        self._ts_x = (series.start_epoch - offset) * 1000.0
+        if self.chart_type == 'profit':
+            self._ts_y = series.cumulative_profit()
+        else:
+            self._ts_y = series.rolling(ROLLING_ROI_WINDOW).roi
+        self._ts_method = TIME_SERIES_CHARTS[self.chart_type]
+
+        line = QLineSeries()
+        line.setPen(QtGui.QPen(QtGui.QColor("#10B981"), 2))
+        chart.addSeries(line)
+
+        axis_x = QDateTimeAxis()
+        axis_x.setFormat("dd.MM.yy")
+        axis_x.setTickCount(6)
+        axis_x.setLabelsColor(QtGui.QColor("#E4E4E7"))
+        axis_x.setGridLineVisible(False)
+        first_ms, last_ms = int(self._ts_x[0]), int(self._ts_x[-1])
+        if first_ms == last_ms:
+            last_ms = first_ms + 86400 * 1000
+        axis_x.setRange(
+            QtCore.QDateTime.fromMSecsSinceEpoch(first_ms),
+            QtCore.QDateTime.fromMSecsSinceEpoch(last_ms),
+        )
+        chart.addAxis(axis_x, QtCore.Qt.AlignmentFlag.AlignBottom)
+        line.attachAxis(axis_x)
+
+        axis_y = QValueAxis()
+        axis_y.setTitleText("Профит" if self.chart_type == 'profit' else "ROI (%)")
+        axis_y.setLabelFormat("%.0f")
+        axis_y.setLabelsColor(QtGui.QColor("#E4E4E7"))
+        axis_y.setGridLineColor(QtGui.QColor("#3F3F46"))
+        axis_y.setMinorGridLineVisible(False)
+        chart.addAxis(axis_y, QtCore.Qt.AlignmentFlag.AlignLeft)
+        line.attachAxis(axis_y)
+
+        self._ts_line = line
+        self._ts_axes = (axis_x, axis_y)
+        self.chart_view.setChart(chart)
+        # Масштаб - выделением по оси времени, правый клик - отдаление
+        self.chart_view.setRubberBand(QChartView.RubberBand.HorizontalRubberBand)
+        axis_x.rangeChanged.connect(self._schedule_time_series_refresh)
+        chart.plotAreaChanged.connect(self._schedule_time_series_refresh)
+        self._refresh_time_series_points()
+
+    def _schedule_time_series_refresh(self, *args):
+        """Откладывает пересчёт прореживания, пока идут изменения размера или масштаба."""
+        self._ts_refresh_timer.start(50)
+
+    def _refresh_time_series_points(self):
+        """
+        Прореживает видимую часть ряда под текущую ширину области построения
+        и заменяет точки линии: на графике не больше нескольких тысяч точек
+        при любом размере выборки.
+        """
+        line = self._ts_line
+        if line is None:
+            return
+        chart = line.chart()
+        axis_x, axis_y = self._ts_axes
+        visible = visible_slice(
+            self._ts_x, axis_x.min().toMSecsSinceEpoch(), axis_x.max().toMSecsSinceEpoch()
+        )
+        width = chart.plotArea().width() or self.chart_view.width()
+        xs, ys = downsample(
+            self._ts_x[visible], self._ts_y[visible], chart_points_for_width(width), self._ts_method
+        )
+        chart.setAnimationOptions(self._animation_options(len(xs)))
+        line.replace([QtCore.QPointF(px, py) for px, py in zip(xs.tolist(), ys.tolist())])
+        if len(ys):
+            low, high = float(ys.min()), float(ys.max())
+            if low == high:
+                low, high = low - 1, high + 1
+            axis_y.setRange(low, high)
+            axis_y.applyNiceNumbers()
+
     def _get_current_distribution(self):
         """Возвращает распределение в зависимости от выбранного типа графика."""
         if self.chart_type == 'pre_ft':
@@ -1955,7 +1842,10 @@ class StatsGrid(QtWidgets.QWidget):
         return getattr(self, 'place_dist_ft', {})
 
     def _on_chart_selector_changed(self, index: int):
-        types = ['ft', 'pre_ft', 'all', 'ft_stack', 'ft_stack_roi', 'ft_stack_conv', 'ko_attempts']
+        types = [
+            'ft', 'pre_ft', 'all', 'ft_stack', 'ft_stack_roi', 'ft_stack_conv', 'ko_attempts',
+            'profit', 'rolling_roi',
+        ]
         self.chart_type = types[index]
         if self.chart_type == 'ft':
             self.chart_header.setText("Распределение финишных мест на финальном столе")
@@ -1975,9 +1865,15 @@ class StatsGrid(QtWidgets.QWidget):
         elif self.chart_type == 'ft_stack_conv':
             self.chart_header.setText("Конверсия по стекам выхода на FT")
             self.ft_stack_density_selector.setVisible(True)
-        else:  # ko_attempts
+        elif self.chart_type == 'ko_attempts':
             self.chart_header.setText("Попытки KO за раздачу")
             self.ft_stack_density_selector.setVisible(False)
+        elif self.chart_type == 'profit':
+            self.chart_header.setText("Накопленный профит по времени")
+            self.ft_stack_density_selector.setVisible(False)
+        else:  # rolling_roi
+            self.chart_header.setText(f"Скользящий ROI по последним {ROLLING_ROI_WINDOW} турнирам")
+            self.ft_stack_density_selector.setVisible(False)
 
         self._update_chart(self._get_current_distribution())
 
@@ -1985,16 +1881,11 @@ class StatsGrid(QtWidgets.QWidget):
         """Меняет шаг интервалов гистограммы стеков FT."""
         steps = [200, 400, 1000]
         self.ft_stack_step = steps[index]
-        if self._current_tournaments:
-            self.ft_stack_dist, self.ft_stack_median = self._calculate_ft_stack_distribution(
-                self._current_tournaments, step=self.ft_stack_step
-            )
-            self.ft_stack_roi_dist, _ = self._calculate_ft_stack_roi_distribution(
-                self._current_tournaments, step=self.ft_stack_step
-            )
-            self.ft_stack_conv_dist, _ = self._calculate_ft_stack_conversion_distribution(
-                self._current_tournaments, self._current_ft_hands, step=self.ft_stack_step
-            )
+        if self._ft_stack_distributions is not None:
+            distributions = self._ft_stack_distributions
+            self.ft_stack_dist, self.ft_stack_median = distributions.stack_distribution(self.ft_stack_step)
+            self.ft_stack_roi_dist, _ = distributions.roi_distribution(self.ft_stack_step)
+            self.ft_stack_conv_dist, _ = distributions.conversion_distribution(self.ft_stack_step)
         if self.chart_type in ['ft_stack', 'ft_stack_roi', 'ft_stack_conv']:
             self._update_chart(self._get_current_distribution())
 
@@ -548,8 +548,8 @@ class TournamentView(QtWidgets.QWidget):
             self.loading_label.setText("Удаление турнира...")
 
             def delete_tournament(is_cancelled_callback=None):
+                # Статистика обновляется дельтой удалённого турнира внутри AppFacade
                 self.app_service.delete_tournament(tournament.tournament_id)
-                self.app_service.update_all_statistics(progress_callback=None)
                 return tournament.tournament_id
 
             thread_manager.run_in_thread(
@@ -6,11 +6,21 @@ ViewModel классы для изоляции бизнес-логики от UI
 """
 
 from .stat_card import StatCardViewModel
-from .stats_grid import StatsGridViewModel, BigKOCardViewModel, PlaceDistributionViewModel
+from .stats_grid import (
+    StatsGridViewModel,
+    StatsGridDataset,
+    StatsGridChartData,
+    StatsGridResult,
+    BigKOCardViewModel,
+    PlaceDistributionViewModel,
+)
 
 __all__ = [
     'StatCardViewModel',
     'StatsGridViewModel',
+    'StatsGridDataset',
+    'StatsGridChartData',
+    'StatsGridResult',
     'BigKOCardViewModel',
     'PlaceDistributionViewModel'
 ]
\ No newline at end of file
@@ -5,21 +5,11 @@ ViewModel для StatsGrid.
 Содержит всю логику подготовки данных для отображения.
 """
 
-from dataclasses import dataclass
-from typing import Dict, List, Optional, Any
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Any, Tuple
 from .stat_card import StatCardViewModel
 from models import Tournament, FinalTableHand, OverallStats
-
-# Импортируем стат-плагины для расчетов
-from stats import (
-    TotalKOStat, ITMStat, ROIStat, BigKOStat,
-    AvgKOPerTournamentStat, FinalTableReachStat,
-    AvgFTInitialStackStat, EarlyFTKOStat, EarlyFTBustStat,
-    FTStackConversionStat, FTStackConversionAttemptsStat,
-    PreFTKOStat, KOLuckStat, ROIAdjustedStat, KOContributionStat,
-    KOStage23Stat, KOStage45Stat, KOStage69Stat,
-    WinningsFromITMStat, WinningsFromKOStat, DeepFTStat
-)
+from analytics import ko_attempts_distribution
 
 
 @dataclass
@@ -90,6 +80,64 @@ class BigKOCardViewModel:
         )
 
 
+@dataclass
+class StatsGridDataset:
+    """
+    Снимок отфильтрованных данных для StatsGrid.
+
+    Загружается один раз на изменение фильтров и используется
+    как для построения ViewModel, так и для расчета распределений графиков.
+    """
+
+    tournaments: List[Tournament] = field(default_factory=list)
+    final_table_hands: List[FinalTableHand] = field(default_factory=list)
+
+
+# Строка данных турнира для графиков по стекам FT:
+# (стек в фишках, бай-ин, выплата, игроков на старте FT, ранние KO Hero)
+FTStackRow = Tuple[float, Optional[float], Optional[float], Optional[int], float]
+
+
+@dataclass
+class StatsGridChartData:
+    """
+    Компактные входные данные для графиков StatsGrid.
+
+    Хранит только то, что нужно для перестроения распределений
+    при смене шага, без полных списков турниров и рук.
+    """
+
+    ft_stacks: List[FTStackRow] = field(default_factory=list)
+    ko_attempts_dist: Dict[int, int] = field(default_factory=dict)
+
+    @classmethod
+    def from_dataset(cls, dataset: StatsGridDataset) -> 'StatsGridChartData':
+        """Сворачивает снимок данных в компактное представление."""
+        early_ko: Dict[str, float] = {}
+        for hand in dataset.final_table_hands:
+            if hand.is_early_final:
+                early_ko[hand.tournament_id] = (
+                    early_ko.get(hand.tournament_id, 0.0)
+                    + hand.hero_ko_this_hand - hand.pre_ft_ko
+                )
+        ko_attempts_dist = ko_attempts_distribution(
+            hand.hero_ko_attempts for hand in dataset.final_table_hands
+        )
+
+        ft_stacks = [
+            (
+                t.final_table_initial_stack_chips,
+                t.buyin,
+                t.payout,
+                t.final_table_start_players,
+                early_ko.get(t.tournament_id, 0.0),
+            )
+            for t in dataset.tournaments
+            if t.reached_final_table and t.final_table_initial_stack_chips is not None
+        ]
+        return cls(ft_stacks=ft_stacks, ko_attempts_dist=ko_attempts_dist)
+
+
 @dataclass
 class PlaceDistributionViewModel:
     """ViewModel для распределения мест."""
@@ -123,6 +171,15 @@ class StatsGridViewModel:
                         overall_stats: OverallStats,
                         precomputed_stats: Optional[Dict[str, Any]] = None) -> 'StatsGridViewModel':
         """Создает ViewModel из сырых данных."""
+        # Модули стат-плагинов импортируются при первом расчёте карточек
+        from stats import (
+            ITMStat, ROIStat, FinalTableReachStat,
+            AvgFTInitialStackStat, EarlyFTKOStat, EarlyFTBustStat,
+            FTStackConversionStat, FTStackConversionAttemptsStat,
+            PreFTKOStat, KOLuckStat, ROIAdjustedStat, KOContributionStat,
+            KOStage23Stat, KOStage45Stat, KOStage69Stat,
+            WinningsFromITMStat, WinningsFromKOStat, DeepFTStat
+        )
         
         # Подготовка предварительно рассчитанных значений
         if precomputed_stats is None:
@@ -147,10 +204,10 @@ class StatsGridViewModel:
         early_ko = early_res.get('early_ft_ko_count', 0)
         early_ko_per = early_res.get('early_ft_ko_per_tournament', 0.0)
         
-        conv_res = FTStackConversionStat().compute(tournaments, final_table_hands)
+        conv_res = FTStackConversionStat().compute(tournaments, final_table_hands, precomputed_stats=precomputed_stats)
         ft_stack_conv = conv_res.get('ft_stack_conversion', 0.0)
         
-        attempts_res = FTStackConversionAttemptsStat().compute(tournaments, final_table_hands)
+        attempts_res = FTStackConversionAttemptsStat().compute(tournaments, final_table_hands, precomputed_stats=precomputed_stats)
         avg_attempts = attempts_res.get('avg_ko_attempts_per_ft', 0.0)
         
         pre_ft_ko_res = PreFTKOStat().compute(tournaments, final_table_hands)
@@ -351,4 +408,14 @@ class StatsGridViewModel:
             place_distributions=place_distributions,
             overall_stats=overall_stats,
             total_tournaments=overall_stats.total_tournaments
-        )
\ No newline at end of file
+        )
+
+
+@dataclass
+class StatsGridResult:
+    """Готовый результат для StatsGrid, который можно хранить в кеше."""
+
+    viewmodel: StatsGridViewModel
+    chart_data: StatsGridChartData
+    # БД, не попавшие в сводный результат по нескольким БД: путь -> причина
+    failed_databases: Dict[str, str] = field(default_factory=dict)